@@ -1,19 +1,22 @@
 import json
 from pathlib import Path
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
 from app.api.v1.endpoints.cpt import cptJobs
 from app.api.v1.endpoints.horreum import horreum
 from app.api.v1.endpoints.ilab import ilab
 from app.api.v1.endpoints.jira import jira
 from app.api.v1.endpoints.ocm import ocmJobs
-from app.api.v1.endpoints.ocp import graph, ocpJobs, results
+from app.api.v1.endpoints.ocp import graph, metrics, ocpJobs, results
+from app.api.v1.endpoints.ocp.baseline import baselines
 from app.api.v1.endpoints.ols import olsGraphs, olsJobs
 from app.api.v1.endpoints.oso import osoJobs
 from app.api.v1.endpoints.quay import quayGraphs, quayJobs
 from app.api.v1.endpoints.summary import summary_api
 from app.api.v1.endpoints.telco import telcoGraphs, telcoJobs
+from app.services.cache import caches, history_cache, metadata_cache
+from app.services.search import registry
 
 router = APIRouter()
 
@@ -21,6 +24,7 @@ router = APIRouter()
 router.include_router(ocpJobs.router, tags=["ocp"])
 router.include_router(results.router, tags=["ocp"])
 router.include_router(graph.router, tags=["ocp.graphs"])
+router.include_router(metrics.router, tags=["ocp.graphs"])
 
 # CPT endpoints
 router.include_router(cptJobs.router, tags=["cpt"])
@@ -106,3 +110,121 @@ async def version():
     except Exception as exc:
         print(f"Unable to read {str(version)}: {str(exc)!r}")
     return v
+
+
+@router.get(
+    "/api/connections",
+    summary="Get OpenSearch connection pool statistics",
+    description=(
+        "Return utilization of the shared OpenSearch client pools, "
+        "keyed by configuration path."
+    ),
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "ocp.elasticsearch": {
+                            "maxsize": 10,
+                            "keepalive": 15.0,
+                            "in_use": 2,
+                            "idle": 6,
+                            "leases": 3,
+                            "served": 1204,
+                        }
+                    },
+                }
+            },
+        }
+    },
+)
+async def connections():
+    """Return OpenSearch connection pool statistics"""
+    return registry.stats()
+
+
+@router.get(
+    "/api/cache",
+    summary="Get response cache statistics",
+    description=(
+        "Return the policy, hit and miss counters, and storage use of each "
+        "response cache, keyed by cache name, of the archive history cache, "
+        "of the job metadata cache, and of the OCP graph baseline run cache."
+    ),
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "cpt-jobs": {
+                            "ttl": 300.0,
+                            "stale": 600.0,
+                            "hits": 118,
+                            "stale_hits": 6,
+                            "misses": 9,
+                            "refreshes": 6,
+                            "uncached": 0,
+                            "entries": 9,
+                            "bytes": 2841723,
+                            "maxsize": 67108864,
+                            "evictions": 0,
+                        },
+                        "history": {
+                            "directory": "/var/cache/cpt-dashboard",
+                            "maxsize": 1073741824,
+                            "maxage": 2592000.0,
+                            "hits": 52,
+                            "misses": 4,
+                            "evictions": 0,
+                            "errors": 0,
+                            "entries": 4,
+                            "bytes": 1288412,
+                        },
+                        "metadata": {
+                            "maxsize": 20000,
+                            "directory": None,
+                            "hits": 244,
+                            "disk_hits": 0,
+                            "misses": 31,
+                            "evictions": 0,
+                            "errors": 0,
+                            "entries": 31,
+                        },
+                        "baselines": {
+                            "ttl": 300.0,
+                            "rebuild": 86400.0,
+                            "hits": 37,
+                            "updates": 5,
+                            "builds": 3,
+                            "entries": 3,
+                            "runs": 412,
+                        },
+                    },
+                }
+            },
+        }
+    },
+)
+async def cache():
+    """Return response cache statistics"""
+    return {
+        **{c.name: c.stats() for c in caches},
+        "history": await history_cache.stats(),
+        "metadata": metadata_cache.stats(),
+        "baselines": baselines.stats(),
+    }
+
+
+@router.delete(
+    "/api/cache/history",
+    summary="Invalidate the archive history cache",
+    description=(
+        "Remove the stored results of archive searches, for index patterns "
+        "starting with `index`, or all of them."
+    ),
+)
+async def invalidate_history(
+    index: str = Query(None, description="Index pattern prefix to invalidate"),
+):
+    """Invalidate stored archive search results"""
+    return {"removed": await history_cache.invalidate(index)}
@@ -31,6 +31,12 @@ FIELDS = (
 )
 AGG_BUCKET_SIZE = 1000
 MAX_PAGE = 10000
+# Largest list of IDs in a single terms filter; longer lists are searched in
+# concurrent chunks
+TERMS_CHUNK = 4096
+# The "_source" field identifying a job's document in a jobs index, so that a
+# job found by both the archive and live clusters is returned once
+JOB_KEY = "uuid"
 OCP_SHORT_VER_LEN = 6
 
 OCP_FIELD_CONSTANT_DICT = {
@@ -317,6 +317,8 @@ cpt_response_example = {
             "testName": "node-density-heavy",
         },
     ],
+    "errors": {},
+    "partial": {},
 }
 
 ocp_filter_example = {
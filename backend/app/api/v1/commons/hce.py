@@ -49,11 +49,15 @@ async def getData(
     tasks = [item["_source"] for item in response["data"]]
     jobs = pd.json_normalize(tasks)
     if len(jobs) == 0:
-        return {"data": jobs, "total": response["total"]}
+        return {
+            "data": jobs,
+            "total": response["total"],
+            **utils.partialResults(response),
+        }
 
     jobs[["group"]] = jobs[["group"]].fillna(0)
     jobs.fillna("", inplace=True)
-    return {"data": jobs, "total": response["total"]}
+    return {"data": jobs, "total": response["total"], **utils.partialResults(response)}
 
 
 async def getFilterData(
@@ -75,4 +79,5 @@ async def getFilterData(
         "total": response.get("total", 0),
         "filterData": response.get("filterData", 0),
         "summary": response.get("summary", {}),
+        **utils.partialResults(response),
     }
@@ -46,7 +46,11 @@ async def getData(
     tasks = [item["_source"] for item in response["data"]]
     jobs = pd.json_normalize(tasks)
     if len(jobs) == 0:
-        return {"data": jobs, "total": response["total"]}
+        return {
+            "data": jobs,
+            "total": response["total"],
+            **utils.partialResults(response),
+        }
 
     if "buildUrl" not in jobs.columns:
         jobs.insert(len(jobs.columns), "buildUrl", "")
@@ -54,7 +58,7 @@ async def getData(
         jobs.insert(len(jobs.columns), "ciSystem", "")
     jobs.fillna("", inplace=True)
     jobs["jobStatus"] = jobs.apply(convertJobStatus, axis=1)
-    return {"data": jobs, "total": response["total"]}
+    return {"data": jobs, "total": response["total"], **utils.partialResults(response)}
 
 
 async def getFilterData(
@@ -79,6 +83,7 @@ async def getFilterData(
     return {
         "filterData": response.get("filterData", []),
         "summary": response.get("summary", {}),
+        **utils.partialResults(response),
     }
 
 
@@ -1,8 +1,10 @@
 from datetime import date
+from typing import Optional
 
+import numpy as np
 import pandas as pd
 
-from app.api.v1.commons.constants import OCP_FIELD_CONSTANT_DICT
+from app.api.v1.commons.constants import JOB_KEY, OCP_FIELD_CONSTANT_DICT
 import app.api.v1.commons.utils as utils
 from app.services.search import ElasticService
 
@@ -15,6 +17,7 @@ async def getData(
     sort: str,
     filter: str,
     configpath: str,
+    cursor: Optional[str] = None,
 ):
     should = []
     must_not = []
@@ -40,18 +43,33 @@ async def getData(
         query["query"]["bool"]["minimum_should_match"] = refiner["min_match"]
 
     es = ElasticService(configpath=configpath)
-    response = await es.post(
-        query=query,
-        size=size,
-        start_date=start_datetime,
-        end_date=end_datetime,
-        timestamp_field="timestamp",
-    )
+    if cursor is None:
+        response = await es.post(
+            query=query,
+            size=size,
+            start_date=start_datetime,
+            end_date=end_datetime,
+            timestamp_field="timestamp",
+            dedup=JOB_KEY,
+        )
+        page = {}
+    else:
+        # Merge the archive and live clusters into exactly "size" rows
+        response = await es.merged_page(
+            query=query,
+            size=size,
+            cursor=cursor,
+            start_date=start_datetime,
+            end_date=end_datetime,
+            timestamp_field="timestamp",
+        )
+        page = {"cursor": response["cursor"]}
     await es.close()
+    page.update(utils.partialResults(response))
     tasks = [item["_source"] for item in response["data"]]
     jobs = pd.json_normalize(tasks)
     if len(jobs) == 0:
-        return {"data": jobs, "total": response["total"]}
+        return {"data": jobs, "total": response["total"], **page}
 
     jobs[
         ["masterNodesCount", "workerNodesCount", "infraNodesCount", "totalNodesCount"]
@@ -68,20 +86,17 @@ async def getData(
     ].replace(
         r"^\s*$", "N/A", regex=True
     )
-    jobs["encryptionType"] = jobs.apply(fillEncryptionType, axis=1)
-    jobs["benchmark"] = jobs.apply(utils.updateBenchmark, axis=1)
-    jobs["platform"] = jobs.apply(utils.clasifyAWSJobs, axis=1)
-    jobs["jobType"] = jobs.apply(utils.jobType, axis=1)
-    jobs["isRehearse"] = jobs.apply(utils.isRehearse, axis=1)
-    jobs["jobStatus"] = jobs.apply(utils.updateStatus, axis=1)
-    jobs["build"] = jobs.apply(utils.getBuild, axis=1)
+    jobs["encryptionType"] = fillEncryptionTypes(jobs)
+    utils.enrichJobs(
+        jobs, ["benchmark", "platform", "jobType", "isRehearse", "jobStatus", "build"]
+    )
 
     cleanJobs = jobs[jobs["platform"] != ""]
 
     jbs = cleanJobs
     jbs["shortVersion"] = jbs["ocpVersion"].str.slice(0, 4)
 
-    return {"data": jbs, "total": response["total"]}
+    return {"data": jbs, "total": response["total"], **page}
 
 
 def fillEncryptionType(row):
@@ -93,6 +108,19 @@ def fillEncryptionType(row):
         return row["encryptionType"]
 
 
+def fillEncryptionTypes(jobs: pd.DataFrame) -> pd.Series:
+    """Vectorized fillEncryptionType"""
+    return pd.Series(
+        np.select(
+            [jobs["encrypted"] == "N/A", jobs["encrypted"] == "false"],
+            ["N/A", "None"],
+            default=jobs.get("encryptionType", ""),
+        ),
+        index=jobs.index,
+        dtype=object,
+    )
+
+
 async def getFilterData(
     start_datetime: date, end_datetime: date, filter: str, configpath: str
 ):
@@ -105,7 +133,12 @@ async def getFilterData(
     await es.close()
 
     if not response.get("filterData", []) or response.get("total", 0) == 0:
-        return {"total": response.get("total", 0), "filterData": [], "summary": {}}
+        return {
+            "total": response.get("total", 0),
+            "filterData": [],
+            "summary": {},
+            **utils.partialResults(response),
+        }
 
     upstreamList = response.get("upstreamList", [])
 
@@ -126,6 +159,7 @@ async def getFilterData(
         "filterData": response.get("filterData", []),
         "summary": response.get("summary", {}),
         "total": response.get("total", 0),
+        **utils.partialResults(response),
     }
 
 
@@ -49,9 +49,13 @@ async def getData(
     tasks = [item["_source"] for item in response["data"]]
     jobs = pd.json_normalize(tasks)
     if len(jobs) == 0:
-        return {"data": jobs, "total": response["total"]}
+        return {
+            "data": jobs,
+            "total": response["total"],
+            **utils.partialResults(response),
+        }
 
-    return {"data": jobs, "total": response["total"]}
+    return {"data": jobs, "total": response["total"], **utils.partialResults(response)}
 
 
 async def getFilterData(
@@ -69,9 +73,15 @@ async def getFilterData(
     )
     await es.close()
     if not response.get("filterData", []) or response.get("total", 0) == 0:
-        return {"total": response.get("total", 0), "filterData": [], "summary": {}}
+        return {
+            "total": response.get("total", 0),
+            "filterData": [],
+            "summary": {},
+            **utils.partialResults(response),
+        }
     return {
         "total": response.get("total", 0),
         "filterData": response.get("filterData", 0),
         "summary": response.get("summary", {}),
+        **utils.partialResults(response),
     }
@@ -2,7 +2,7 @@ from datetime import date
 
 import pandas as pd
 
-from app.api.v1.commons.constants import QUAY_FIELD_CONSTANT_DICT
+from app.api.v1.commons.constants import JOB_KEY, QUAY_FIELD_CONSTANT_DICT
 import app.api.v1.commons.utils as utils
 from app.services.search import ElasticService
 
@@ -52,12 +52,17 @@ async def getData(
         start_date=start_datetime,
         end_date=end_datetime,
         timestamp_field="timestamp",
+        dedup=JOB_KEY,
     )
     await es.close()
     tasks = [item["_source"] for item in response["data"]]
     jobs = pd.json_normalize(tasks)
     if len(jobs) == 0:
-        return {"data": jobs, "total": response["total"]}
+        return {
+            "data": jobs,
+            "total": response["total"],
+            **utils.partialResults(response),
+        }
 
     jobs[
         ["masterNodesCount", "workerNodesCount", "infraNodesCount", "totalNodesCount"]
@@ -67,15 +72,16 @@ async def getData(
         0
     )
     jobs.fillna("", inplace=True)
-    jobs["benchmark"] = jobs.apply(utils.updateBenchmark, axis=1)
-    jobs["platform"] = jobs.apply(utils.clasifyAWSJobs, axis=1)
-    jobs["jobStatus"] = jobs.apply(utils.updateStatus, axis=1)
-    jobs["build"] = jobs.apply(utils.getBuild, axis=1)
+    utils.enrichJobs(jobs, ["benchmark", "platform", "jobStatus", "build"])
     jobs["shortVersion"] = jobs["ocpVersion"].str.slice(0, 4)
 
     cleanJobs = jobs[jobs["platform"] != ""]
 
-    return {"data": cleanJobs, "total": response["total"]}
+    return {
+        "data": cleanJobs,
+        "total": response["total"],
+        **utils.partialResults(response),
+    }
 
 
 async def getFilterData(
@@ -96,4 +102,5 @@ async def getFilterData(
         "filterData": response.get("filterData", []),
         "summary": response.get("summary", {}),
         "total": response.get("total", 0),
+        **utils.partialResults(response),
     }
@@ -0,0 +1,143 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, TypeVar
+
+from app.api.v1.commons.constants import AGG_BUCKET_SIZE, TERMS_CHUNK
+
+"""Build OpenSearch queries from filter clauses.
+
+Rather than joining job UUIDs into a query_string expression such as
+'uuid: "a" OR uuid: "b"', which must be parsed and analyzed by every search
+and is limited by max_clause_count, IDs are matched with a terms filter on
+their keyword field. Every clause is in filter context, so it isn't scored
+and its results are eligible for the OpenSearch query cache.
+
+Very long ID lists are split into chunks of TERMS_CHUNK, searched
+concurrently, and the results merged. Composite aggregations are paged
+AGG_BUCKET_SIZE buckets at a time.
+"""
+
+T = TypeVar("T")
+
+
+def termsFilter(field: str, values: Iterable[Any]) -> dict[str, Any]:
+    """Match any of a list of exact values, e.g. UUIDs on "uuid.keyword\" """
+    return {"terms": {field: list(values)}}
+
+
+def termFilter(field: str, value: Any) -> dict[str, Any]:
+    """Match an exact value"""
+    return {"term": {field: value}}
+
+
+def matchFilter(field: str, value: Any) -> dict[str, Any]:
+    """Match a value as the query_string 'field: "value"' did
+
+    Strings are matched as an analyzed phrase, and other values exactly.
+    """
+    if isinstance(value, str):
+        return {"match_phrase": {field: value}}
+    return termFilter(field, value)
+
+
+def boolFilter(
+    *clauses: Optional[dict[str, Any]], must_not: Iterable[dict[str, Any]] = ()
+) -> dict[str, Any]:
+    """Combine filter clauses into a query; None clauses are skipped"""
+    query = {"filter": [c for c in clauses if c]}
+    must_not = list(must_not)
+    if must_not:
+        query["must_not"] = must_not
+    return {"bool": query}
+
+
+def chunkIds(values: Iterable[T], size: int = TERMS_CHUNK) -> list[list[T]]:
+    """Split a list of IDs into chunks of at most "size"; at least one"""
+    values = list(values)
+    return [values[i : i + size] for i in range(0, len(values), size)] or [[]]
+
+
+async def searchChunks(
+    values: Iterable[Any],
+    search: Callable[[list[Any]], Awaitable[T]],
+    size: Optional[int] = None,
+) -> list[T]:
+    """Run a search for each chunk of a list of IDs concurrently
+
+    Args:
+        values: The IDs
+        search: Search for a chunk of the IDs
+        size: The chunk size (by default TERMS_CHUNK)
+
+    Returns:
+        The result of each chunk's search, in order
+    """
+    chunks = chunkIds(values, size or TERMS_CHUNK)
+    if len(chunks) == 1:
+        return [await search(chunks[0])]
+    tasks = [asyncio.ensure_future(search(c)) for c in chunks]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+def mergeBuckets(responses: list[dict[str, Any]], *aggs: str) -> dict[str, Any]:
+    """Merge the buckets of aggregations keyed by ID, from chunked searches
+
+    The chunks have distinct IDs, so each bucket appears in one response.
+    """
+    return {
+        "aggregations": {
+            agg: {
+                "buckets": [
+                    b for r in responses for b in r["aggregations"][agg]["buckets"]
+                ]
+            }
+            for agg in aggs
+        }
+    }
+
+
+async def compositeBuckets(
+    search: Callable[[dict[str, Any]], Awaitable[dict[str, Any]]],
+    query: dict[str, Any],
+    sources: list[dict[str, Any]],
+    aggs: Optional[dict[str, Any]] = None,
+    name: str = "composite",
+    size: Optional[int] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Stream the buckets of a composite aggregation, a page at a time
+
+    Each search returns at most "size" buckets; the next page is found by
+    repeating the search after the previous page's "after_key".
+
+    Args:
+        search: Search with a query body, returning the response
+        query: The search body, without aggregations
+        sources: The composite aggregation's value sources
+        aggs: Sub-aggregations of each bucket, if any
+        name: The composite aggregation's name
+        size: The number of buckets to fetch with each search (by default
+            AGG_BUCKET_SIZE)
+
+    Yields:
+        Each composite bucket, with the source values as its "key"
+    """
+    size = size or AGG_BUCKET_SIZE
+    after = None
+    while True:
+        composite = {"size": size, "sources": sources}
+        if after:
+            composite["after"] = after
+        agg = {"composite": composite}
+        if aggs:
+            agg["aggs"] = aggs
+        response = await search({**query, "aggs": {name: agg}})
+        page = response["aggregations"][name]
+        for bucket in page["buckets"]:
+            yield bucket
+        after = page.get("after_key")
+        if not after or len(page["buckets"]) < size:
+            break
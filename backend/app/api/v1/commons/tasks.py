@@ -0,0 +1,97 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+"""Run dependent queries concurrently.
+
+A job comparison graph needs several searches: some depend on the results of
+others (the baseline runs can only be found from the job's metadata), while
+others are independent (the job's own results). A TaskGraph starts each step
+as soon as the steps it depends on have finished, so independent searches
+overlap rather than running one after another.
+
+    steps = TaskGraph()
+    steps.add("meta", getMetadata, uuid, "ocp.elasticsearch")
+    steps.after("matches", getMatchRuns, "meta")
+    steps.add("current", getResults, uuid, [uuid], index)
+    results = await steps.run()
+"""
+
+
+class TaskGraph:
+    """A set of named steps, each run once its dependencies have finished"""
+
+    def __init__(self):
+        self.tasks: dict[str, asyncio.Future] = {}
+
+    def add(
+        self, name: str, step: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> asyncio.Future:
+        """Start a step which doesn't depend on any other"""
+        return self.after(name, step, args=args, **kwargs)
+
+    def after(
+        self,
+        name: str,
+        step: Callable[..., Any],
+        *needs: str,
+        args: tuple[Any, ...] = (),
+        **kwargs,
+    ) -> asyncio.Future:
+        """Start a step which depends on other steps
+
+        The step is called with the given positional arguments followed by
+        the results of the steps it needs, in order, once they've finished.
+        It may be a coroutine function or, for a cheap computation on the
+        results, a plain function.
+
+        Args:
+            name: The step name, by which other steps depend on it
+            step: The coroutine function (or function) to call
+            needs: The names of previously added steps it depends on
+            args: Leading positional arguments for the step
+            kwargs: Keyword arguments for the step
+
+        Returns:
+            The step's task
+        """
+        if name in self.tasks:
+            raise ValueError(f"Duplicate step {name!r}")
+        depends = [self.tasks[n] for n in needs]
+
+        async def run() -> Any:
+            results = [await d for d in depends]
+            result = step(*args, *results, **kwargs)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+
+        self.tasks[name] = asyncio.ensure_future(run())
+        return self.tasks[name]
+
+    def cancel(self):
+        """Cancel every unfinished step"""
+        for task in self.tasks.values():
+            task.cancel()
+
+    async def wait(self, name: str) -> Any:
+        """Wait for one step, e.g. to decide which further steps to add
+
+        If the step fails, the others are cancelled and the failure raised.
+        """
+        try:
+            return await self.tasks[name]
+        except BaseException:
+            self.cancel()
+            raise
+
+    async def run(self) -> dict[str, Any]:
+        """Wait for every step, returning their results by name
+
+        If any step fails, the others are cancelled and the failure raised.
+        """
+        try:
+            results = await asyncio.gather(*self.tasks.values())
+        except BaseException:
+            self.cancel()
+            raise
+        return dict(zip(self.tasks, results))
@@ -1,23 +1,86 @@
 import ast
-from typing import Optional
+from datetime import datetime, timezone
+import io
+import json
+import re
+from typing import Any, Iterable, Iterator, Optional, Union
 from urllib.parse import parse_qs
 
 from fastapi import HTTPException, status
+from fastapi.responses import Response, StreamingResponse
+import numpy as np
+import orjson
+import pandas as pd
 
 import app.api.v1.commons.constants as constants
+from app.api.v1.commons.query import boolFilter, searchChunks, termsFilter
+from app.services.cache import metadata_cache
 from app.services.search import ElasticService
 
 
 async def getMetadata(uuid: str, configpath: str):
-    query = {"query": {"query_string": {"query": (f'uuid: "{uuid}"')}}}
-    print(query)
-    es = ElasticService(configpath=configpath)
-    response = await es.post(query=query)
-    await es.close()
-    meta = [item["_source"] for item in response["data"]]
+    meta = list((await getMetadataBulk([uuid], configpath)).values())
     return meta[0]
 
 
+async def getMetadataBulk(
+    uuids: Iterable[str], configpath: str
+) -> dict[str, dict[str, Any]]:
+    """Look up the metadata documents of a list of job UUIDs
+
+    Documents are kept in the metadata cache, so only the UUIDs it doesn't
+    hold are searched, in chunks of TERMS_CHUNK.
+
+    Args:
+        uuids: The job UUIDs
+        configpath: The search configuration of the metadata index
+
+    Returns:
+        The metadata of each UUID that was found
+    """
+    uuids = list(uuids)
+    found, missing = await metadata_cache.lookup(configpath, uuids)
+    if not missing:
+        return found
+
+    async def search(ids: list[str]) -> dict[str, dict[str, Any]]:
+        query = {"query": boolFilter(termsFilter("uuid.keyword", ids))}
+        es = ElasticService(configpath=configpath)
+        response = await es.post(query=query, dedup=constants.JOB_KEY)
+        await es.close()
+        wanted = set(ids)
+        documents = {}
+        for item in response["data"]:
+            uuid = item["_source"].get("uuid")
+            if uuid in wanted:
+                documents.setdefault(uuid, item["_source"])
+        return documents
+
+    for documents in await searchChunks(missing, search):
+        await metadata_cache.store(configpath, documents)
+        found.update((u, dict(d)) for u, d in documents.items())
+    return {u: found[u] for u in dict.fromkeys(uuids) if u in found}
+
+
+def partialResults(response: dict[str, Any]) -> dict[str, list[str]]:
+    """The clusters that failed to respond to a search, if any
+
+    ElasticService reports them as the response's "partial" list; the data
+    is then incomplete, and the entry is passed on with it.
+    """
+    return {"partial": response["partial"]} if response.get("partial") else {}
+
+
+def watermark_date(when: float) -> str:
+    """The yyyy-MM-dd date, as the date filters match, a day before a time
+
+    An incremental search finds the jobs since a previous search's watermark.
+    Jobs are indexed as they finish, but may be dated when they started: a
+    day's margin finds the jobs that were running at the previous search.
+    """
+    return datetime.fromtimestamp(when - 86400, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
 def updateStatus(job):
     return job["jobStatus"].lower()
 
@@ -58,6 +121,99 @@ def getBuild(job):
     return ocpVersion.replace(releaseStream, "")
 
 
+def contains(column: pd.Series, text: str) -> pd.Series:
+    """Vectorized substring test; non-string values never match"""
+    return column.str.contains(text, regex=False, na=False).astype(bool)
+
+
+def updateBenchmarks(jobs: pd.DataFrame) -> pd.Series:
+    """Vectorized updateBenchmark"""
+    upgrade = contains(jobs["upstreamJob"], "upgrade")
+    return jobs["benchmark"].where(~upgrade, "upgrade-" + jobs["benchmark"])
+
+
+def jobTypes(jobs: pd.DataFrame) -> pd.Series:
+    """Vectorized jobType"""
+    periodic = contains(jobs["upstreamJob"], "periodic")
+    return pd.Series(
+        np.where(periodic, "periodic", "pull request"), index=jobs.index, dtype=object
+    )
+
+
+def rehearsals(jobs: pd.DataFrame) -> pd.Series:
+    """Vectorized isRehearse"""
+    rehearse = contains(jobs["upstreamJob"], "rehearse")
+    return pd.Series(
+        np.where(rehearse, "True", "False"), index=jobs.index, dtype=object
+    )
+
+
+def classifyAWSJobs(jobs: pd.DataFrame) -> pd.Series:
+    """Vectorized clasifyAWSJobs"""
+    rosa = contains(jobs["clusterType"], "rosa")
+    hcp = contains(jobs["clusterType"], "rosa-hcp") | (
+        rosa & (jobs["masterNodesCount"] == 0) & (jobs["infraNodesCount"] == 0)
+    )
+    return pd.Series(
+        np.select([hcp, rosa], ["AWS ROSA-HCP", "AWS ROSA"], default=jobs["platform"]),
+        index=jobs.index,
+        dtype=object,
+    )
+
+
+def updateStatuses(jobs: pd.DataFrame) -> pd.Series:
+    """Vectorized updateStatus"""
+    return jobs["jobStatus"].str.lower()
+
+
+def getBuilds(jobs: pd.DataFrame) -> pd.Series:
+    """Vectorized getBuild
+
+    The release stream to strip differs for each row, so this can't be a
+    single pandas string operation; a comprehension over the two columns
+    still avoids the cost of building a Series for every row.
+    """
+    return pd.Series(
+        [
+            version.replace(stream + "-", "")
+            for version, stream in zip(jobs["ocpVersion"], jobs["releaseStream"])
+        ],
+        index=jobs.index,
+        dtype=object,
+    )
+
+
+# Derived job columns, and the vectorized function computing each
+JOB_ENRICHMENTS = {
+    "benchmark": updateBenchmarks,
+    "platform": classifyAWSJobs,
+    "jobType": jobTypes,
+    "isRehearse": rehearsals,
+    "jobStatus": updateStatuses,
+    "build": getBuilds,
+}
+
+
+def enrichJobs(jobs: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """Derive dashboard columns for a DataFrame of jobs
+
+    Each derivation is computed a column at a time from the original job
+    values, replacing the row-by-row DataFrame.apply of the corresponding
+    per-job function (e.g., updateBenchmark).
+
+    Args:
+        jobs: the jobs, with missing values already filled
+        columns: the names of the JOB_ENRICHMENTS columns to derive
+
+    Returns:
+        The jobs DataFrame, updated in place
+    """
+    derived = {c: JOB_ENRICHMENTS[c](jobs) for c in columns}
+    for column, values in derived.items():
+        jobs[column] = values
+    return jobs
+
+
 def getReleaseStream(row):
     releaseStream = next(
         (
@@ -277,3 +433,186 @@ def update_filter_product(filter):
         filter_product = matched + constants.GENERAL_PRODUCTS if unmatched else matched
         filter_dict["product"] = unmatched
     return filter_product, filter_dict
+
+
+# Opt-in streaming formats for job list responses
+STREAM_FORMATS = ("ndjson", "json-stream")
+STREAM_FORMAT_PATTERN = f"^({'|'.join(STREAM_FORMATS)})$"
+STREAM_CHUNK_ROWS = 500
+STREAM_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+EXPORT_FORMAT_PATTERN = f"^({'|'.join(EXPORT_FORMATS)})$"
+JOB_FORMAT_PATTERN = f"^({'|'.join((*STREAM_FORMATS, *EXPORT_FORMATS))})$"
+
+
+def iterRecords(results: Union[pd.DataFrame, Iterable[dict]]) -> Iterator[dict]:
+    """Iterate over job records, converting each DataFrame row as it's needed
+
+    Args:
+        results: a DataFrame of jobs, or an iterable of job dicts
+    """
+    if isinstance(results, pd.DataFrame):
+        columns = list(results.columns)
+        for values in results.itertuples(index=False, name=None):
+            yield dict(zip(columns, values))
+    else:
+        yield from results
+
+
+def metadataHeaders(metadata: dict[str, Any]) -> dict[str, str]:
+    """Map response fields to "X-" headers, e.g. "startDate" to "X-Start-Date"
+
+    Args:
+        metadata: response fields; those with None values are omitted, and
+            lists and dictionaries are sent as (ASCII) JSON
+
+    Returns:
+        A dictionary of HTTP headers
+    """
+    return {
+        "X-"
+        + re.sub(r"(?<!^)(?=[A-Z])", "-", k).title(): (
+            json.dumps(v) if isinstance(v, (dict, list)) else str(v)
+        )
+        for k, v in metadata.items()
+        if v is not None
+    }
+
+
+def streamJobs(
+    metadata: dict[str, Any],
+    results: Union[pd.DataFrame, Iterable[dict]],
+    format: str,
+) -> StreamingResponse:
+    """Stream a job list response, serializing jobs as they're sent
+
+    This bounds the memory used to serialize the response, not to collect
+    it: the jobs have already been searched and held in memory. With
+    "json-stream" the body is the usual JSON object, with the jobs as
+    its "results" array; with "ndjson" the body has one job per line, and
+    each metadata value is sent as an "X-" header (e.g., "total" as
+    "X-Total", "startDate" as "X-Start-Date").
+
+    Args:
+        metadata: the response fields other than "results"
+        results: the jobs
+        format: one of STREAM_FORMATS
+
+    Returns:
+        A streaming response
+    """
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=STREAM_JSON_OPTIONS, default=str)
+
+    def chunks(separator: bytes) -> Iterator[bytes]:
+        batch = []
+        for record in iterRecords(results):
+            batch.append(dumps(record))
+            if len(batch) >= STREAM_CHUNK_ROWS:
+                yield separator.join(batch)
+                batch = []
+        if batch:
+            yield separator.join(batch)
+
+    if format == "ndjson":
+
+        def body() -> Iterator[bytes]:
+            for chunk in chunks(b"\n"):
+                yield chunk + b"\n"
+
+        return StreamingResponse(
+            body(), media_type="application/x-ndjson", headers=metadataHeaders(metadata)
+        )
+
+    def body() -> Iterator[bytes]:
+        head = dumps(metadata)
+        yield head[:-1] + (b',"results":[' if len(head) > 2 else b'"results":[')
+        first = True
+        for chunk in chunks(b","):
+            yield chunk if first else b"," + chunk
+            first = False
+        yield b"]}"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def exportFormat(format: Optional[str], accept: Optional[str]) -> Optional[str]:
+    """Select an export format from a query parameter or an Accept header
+
+    An explicit format parameter takes precedence; otherwise the first media
+    type in the Accept header that names one of the EXPORT_FORMATS selects
+    it.
+
+    Args:
+        format: the value of a "format" query parameter
+        accept: the value of the request's Accept header
+
+    Returns:
+        The format name, or None
+    """
+    if format:
+        return format
+    media_types = {v: k for k, v in EXPORT_FORMATS.items()}
+    for media_range in (accept or "").split(","):
+        name = media_types.get(media_range.split(";")[0].strip().lower())
+        if name:
+            return name
+    return None
+
+
+def exportable(frame: pd.DataFrame) -> pd.DataFrame:
+    """Make object columns representable in a flat, typed file
+
+    Arrow can't store a column mixing strings with numbers or containers,
+    so non-string values in object columns are stored as JSON text.
+    """
+    frame = frame.reset_index(drop=True)
+    for name in frame.columns[frame.dtypes == object]:
+        column = frame[name]
+        frame[name] = column.where(
+            column.isna() | column.map(lambda v: isinstance(v, str)),
+            column.map(
+                lambda v: orjson.dumps(
+                    v, option=STREAM_JSON_OPTIONS, default=str
+                ).decode()
+            ),
+        )
+    return frame
+
+
+def exportFrame(
+    frame: pd.DataFrame,
+    format: str,
+    filename: str,
+    metadata: Optional[dict[str, Any]] = None,
+) -> Response:
+    """Return a DataFrame as a CSV, Parquet or Arrow IPC file
+
+    Args:
+        frame: the data to export
+        format: one of EXPORT_FORMATS
+        filename: the attachment file name, without extension
+        metadata: response fields to send as "X-" headers
+
+    Returns:
+        A response with the encoded file
+    """
+    buffer = io.BytesIO()
+    frame = exportable(frame)
+    if format == "csv":
+        frame.to_csv(buffer, index=False)
+    elif format == "parquet":
+        frame.to_parquet(buffer, index=False)
+    else:
+        frame.to_feather(buffer)
+    headers = metadataHeaders(metadata or {})
+    headers["Content-Disposition"] = f'attachment; filename="{filename}.{format}"'
+    return Response(
+        buffer.getvalue(), media_type=EXPORT_FORMATS[format], headers=headers
+    )
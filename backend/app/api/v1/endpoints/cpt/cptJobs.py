@@ -4,13 +4,23 @@ import json
 import traceback
 from urllib.parse import urlencode
 
-from fastapi import APIRouter, Query, Response
+from fastapi import APIRouter, Header, Query, Response
 from fastapi.responses import ORJSONResponse
 import pandas as pd
 
 from app.api.v1.commons.constants import FILEDS_DISPLAY_NAMES
 from app.api.v1.commons.example_responses import cpt_200_response, response_422
-from app.api.v1.commons.utils import normalize_pagination, update_filter_product
+from app.api.v1.commons.utils import (
+    EXPORT_FORMATS,
+    exportFormat,
+    exportFrame,
+    JOB_FORMAT_PATTERN,
+    normalize_pagination,
+    partialResults,
+    streamJobs,
+    update_filter_product,
+)
+from app.services.cache import filters_cache, jobs_cache
 
 from .maps.hce import hceFilter, hceMapper
 from .maps.ocm import ocmFilter, ocmMapper
@@ -43,6 +53,14 @@ def get_default_dates(start_date, end_date):
     return (start_date or today - timedelta(days=5), end_date or today)
 
 
+def normalize_filter(prod_list: list[str], filter_dict: dict) -> tuple:
+    """Normalize the product list and filter for use as a cache key"""
+    return (
+        sorted(prod_list),
+        sorted((k, sorted(map(str, v))) for k, v in filter_dict.items()),
+    )
+
+
 async def fetch_data_limited(product, *args, **kwargs):
     return await fetch_data(product, *args, **kwargs)
 
@@ -50,6 +68,12 @@ async def fetch_data_limited(product, *args, **kwargs):
 async def fetch_data(
     product, start_date, end_date, size=None, offset=None, filter=None, is_filter=False
 ):
+    """Fetch a product's jobs or filter data
+
+    A failure is reported by an "error" message with empty data, so the
+    other products can still be shown; the clusters that didn't respond to
+    a search whose data is incomplete are listed as "partial".
+    """
     try:
         fetch_function = productsFilter[product] if is_filter else products[product]
         args = (
@@ -69,10 +93,42 @@ async def fetch_data(
             ),
             "total": response["total"],
             "summary": response.get("summary", {}),
+            **partialResults(response),
         }
     except Exception as e:
         print(f"Error fetching data for {product}: {e}\n{traceback.format_exc()}")
-        return {"data": pd.DataFrame(), "total": 0} if not is_filter else {}
+        if is_filter:
+            return {"product": product, "error": str(e)}
+        return {"data": pd.DataFrame(), "total": 0, "error": str(e)}
+
+
+def productErrors(products: list[str], results: list) -> dict[str, str]:
+    """The error of each product whose data couldn't be fetched"""
+    errors = {}
+    for product, result in zip(products, results):
+        if isinstance(result, BaseException):
+            errors[product] = str(result) or type(result).__name__
+        elif isinstance(result, dict) and result.get("error"):
+            errors[product] = result["error"]
+    return errors
+
+
+def productPartial(products: list[str], results: list) -> dict[str, list[str]]:
+    """The clusters that didn't respond for each product with partial data"""
+    return {
+        product: result["partial"]
+        for product, result in zip(products, results)
+        if isinstance(result, dict) and result.get("partial")
+    }
+
+
+def complete(response: dict) -> bool:
+    """Whether a response has all of every product's data, and so may be cached
+
+    A product whose search failed, or found the data of only some of its
+    clusters, could be complete when the request is repeated.
+    """
+    return not response["errors"] and not response["partial"]
 
 
 # **Jobs Endpoint**
@@ -94,6 +150,14 @@ async def jobs(
     offset: int = Query(None, description="Offset"),
     filter: str = Query(None, description="Query to filter jobs"),
     totalJobs: int = Query(None, description="Total job count"),
+    format: str = Query(
+        None,
+        description="Stream the jobs as `ndjson` (one job per line, with the "
+        "other fields as `X-` headers) or as a `json-stream` of the usual object, "
+        "or export them as a `csv`, `parquet` or `arrow` file",
+        pattern=JOB_FORMAT_PATTERN,
+    ),
+    accept: str = Header(None, include_in_schema=False),
 ):
     start_date, end_date = get_default_dates(start_date, end_date)
 
@@ -110,33 +174,72 @@ async def jobs(
 
     updated_filter_qs = urlencode(filter_dict, doseq=True) if filter else ""
 
-    results = await asyncio.gather(
-        *[
-            fetch_data_limited(
-                product, start_date, end_date, size, offset, filter=updated_filter_qs
-            )
-            for product in prod_list
-        ],
-        return_exceptions=True,
-    )
+    async def collect():
+        results = await asyncio.gather(
+            *[
+                fetch_data_limited(
+                    product,
+                    start_date,
+                    end_date,
+                    size,
+                    offset,
+                    filter=updated_filter_qs,
+                )
+                for product in prod_list
+            ],
+            return_exceptions=True,
+        )
+
+        errors = productErrors(prod_list, results)
+        partial = productPartial(prod_list, results)
+        results = [res for res in results if isinstance(res, dict)]
 
-    results = [res for res in results if isinstance(res, dict)]
+        non_empty_df = [res["data"] for res in results if not res["data"].empty]
+        if non_empty_df:
+            results_df = pd.concat(non_empty_df, ignore_index=True)
+        else:
+            results_df = pd.DataFrame()
+        return {
+            "results": results_df.to_dict("records"),
+            "total": sum(int(res["total"]) for res in results),
+            "errors": errors,
+            "partial": partial,
+        }
 
-    non_empty_df = [res["data"] for res in results if not res["data"].empty]
-    if non_empty_df:
-        results_df = pd.concat(non_empty_df, ignore_index=True)
-    else:
-        results_df = pd.DataFrame()
-    total_jobs_count = sum(int(res["total"]) for res in results)
+    key = jobs_cache.make_key(
+        str(start_date),
+        str(end_date),
+        normalize_filter(prod_list, filter_dict),
+        size,
+        offset,
+    )
+    jobs = await jobs_cache.get(key, collect, cacheable=complete)
 
     response = {
         "startDate": str(start_date),
         "endDate": str(end_date),
-        "results": results_df.to_dict("records"),
-        "total": total_jobs_count if offset == 0 else totalJobs,
+        "results": jobs["results"],
+        "total": jobs["total"] if offset == 0 else totalJobs,
         "offset": offset + size,
+        "errors": jobs["errors"],
+        "partial": jobs["partial"],
     }
 
+    format = exportFormat(format, accept)
+    if format in EXPORT_FORMATS:
+        return exportFrame(
+            pd.DataFrame(jobs["results"]),
+            format,
+            f"jobs-{start_date}-{end_date}",
+            {k: v for k, v in response.items() if k != "results"},
+        )
+    if format:
+        return streamJobs(
+            {k: v for k, v in response.items() if k != "results"},
+            jobs["results"],
+            format,
+        )
+
     return ORJSONResponse(content=response, media_type="application/json")
 
 
@@ -170,54 +273,68 @@ async def filters(
 
     updated_filter_qs = urlencode(filter_dict, doseq=True) if filter else ""
 
-    results = await asyncio.gather(
-        *[
-            fetch_data_limited(
-                product, start_date, end_date, filter=updated_filter_qs, is_filter=True
-            )
-            for product in prod_list
-        ]
-    )
+    async def collect():
+        results = await asyncio.gather(
+            *[
+                fetch_data_limited(
+                    product,
+                    start_date,
+                    end_date,
+                    filter=updated_filter_qs,
+                    is_filter=True,
+                )
+                for product in prod_list
+            ]
+        )
+        errors = productErrors(prod_list, results)
+        partial = productPartial(prod_list, results)
 
-    total_dict, summary_dict, result_dict = (
-        {},
-        {"success": 0, "failure": 0, "other": 0, "total": 0},
-        {},
-    )
+        total_dict, summary_dict, result_dict = (
+            {},
+            {"success": 0, "failure": 0, "other": 0, "total": 0},
+            {},
+        )
 
-    for result in results:
-        total_dict[result.get("product", "")] = result.get("total", 0)
-
-        for key, value in result.get("summary", {}).items():
-            summary_dict[key] += value
-
-        for item in result.get("data", []):
-            key, values = item["key"], item["value"]
-            # If the key already exists, merge the values
-            if key in result_dict:
-                if isinstance(values[0], str):
-                    existing_values = {v.lower(): v for v in result_dict[key]}
-                    for val in values:
-                        if val.lower() not in existing_values and val != "":
-                            result_dict[key].append(val)
+        for result in results:
+            total_dict[result.get("product", "")] = result.get("total", 0)
+
+            for key, value in result.get("summary", {}).items():
+                summary_dict[key] += value
+
+            for item in result.get("data", []):
+                key, values = item["key"], item["value"]
+                # If the key already exists, merge the values
+                if key in result_dict:
+                    if isinstance(values[0], str):
+                        existing_values = {v.lower(): v for v in result_dict[key]}
+                        for val in values:
+                            if val.lower() not in existing_values and val != "":
+                                result_dict[key].append(val)
+                    else:
+                        # For numbers (version), just avoid duplicates
+                        result_dict[key] = list(set(result_dict[key] + values))
                 else:
-                    # For numbers (version), just avoid duplicates
-                    result_dict[key] = list(set(result_dict[key] + values))
-            else:
-                result_dict[key] = [s for s in values if str(s).strip()]
+                    result_dict[key] = [s for s in values if str(s).strip()]
+
+        merged_result = [
+            {"key": k, "value": v, "name": FILEDS_DISPLAY_NAMES.get(k, k)}
+            for k, v in result_dict.items()
+        ]
 
-    merged_result = [
-        {"key": k, "value": v, "name": FILEDS_DISPLAY_NAMES.get(k, k)}
-        for k, v in result_dict.items()
-    ]
+        return {
+            "startDate": str(start_date),
+            "endDate": str(end_date),
+            "filterData": merged_result,
+            "summary": summary_dict,
+            "total": sum(int(v) for v in total_dict.values()),
+            "errors": errors,
+            "partial": partial,
+        }
 
-    response = {
-        "startDate": str(start_date),
-        "endDate": str(end_date),
-        "filterData": merged_result,
-        "summary": summary_dict,
-        "total": sum(int(v) for v in total_dict.values()),
-    }
+    key = filters_cache.make_key(
+        str(start_date), str(end_date), normalize_filter(prod_list, filter_dict)
+    )
+    response = await filters_cache.get(key, collect, cacheable=complete)
 
     if pretty:
         return ORJSONResponse(content=response)
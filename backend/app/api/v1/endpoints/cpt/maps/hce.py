@@ -5,7 +5,7 @@ import pandas as pd
 
 from app.api.v1.commons.constants import keys_to_keep
 from app.api.v1.commons.hce import getData, getFilterData
-from app.api.v1.commons.utils import get_dict_from_qs
+from app.api.v1.commons.utils import get_dict_from_qs, partialResults
 
 
 ################################################################
@@ -41,7 +41,11 @@ async def hceMapper(
         return {"data": pd.DataFrame(), "total": 0}
     df = response.get("data", pd.DataFrame())
     if df.empty:
-        return {"data": df, "total": response.get("total", 0)}
+        return {
+            "data": df,
+            "total": response.get("total", 0),
+            **partialResults(response),
+        }
 
     df["releaseStream"] = "Nightly"
     df["ciSystem"] = "Jenkins"
@@ -58,7 +62,11 @@ async def hceMapper(
     df["startDate"] = df["date"]
     df["endDate"] = df["date"]
     df = dropColumns(df)
-    return {"data": df, "total": response.get("total", 0)}
+    return {
+        "data": df,
+        "total": response.get("total", 0),
+        **partialResults(response),
+    }
 
 
 def dropColumns(df):
@@ -85,7 +93,12 @@ async def hceFilter(start_datetime: date, end_datetime: date, filter: str):
             return {"total": 0, "filterData": [], "summary": {}}
 
         if not response.get("filterData") or response.get("total", 0) == 0:
-            return {"total": response.get("total", 0), "filterData": [], "summary": {}}
+            return {
+                "total": response.get("total", 0),
+                "filterData": [],
+                "summary": {},
+                **partialResults(response),
+            }
 
         # Add predefined filters
         filters_to_add = [
@@ -103,6 +116,7 @@ async def hceFilter(start_datetime: date, end_datetime: date, filter: str):
             "total": response.get("total", 0),
             "filterData": filtered_data,
             "summary": response.get("summary", {}),
+            **partialResults(response),
         }
     except Exception as e:
         print(f"Error retrieving filter data: {e}")
@@ -5,7 +5,7 @@ import pandas as pd
 
 from app.api.v1.commons.constants import keys_to_keep
 from app.api.v1.commons.ocm import getData, getFilterData
-from app.api.v1.commons.utils import get_dict_from_qs
+from app.api.v1.commons.utils import get_dict_from_qs, partialResults
 
 
 ################################################################
@@ -38,6 +38,7 @@ async def ocmMapper(
         return {
             "data": df,
             "total": response["total"],
+            **partialResults(response),
         }
     return {"data": pd.DataFrame(), "total": 0}
 
@@ -59,7 +60,12 @@ async def ocmFilter(start_datetime: date, end_datetime: date, filter: str):
         return {"total": 0, "filterData": [], "summary": {}}
 
     if not response.get("filterData") or response.get("total", 0) == 0:
-        return {"total": response.get("total", 0), "filterData": [], "summary": {}}
+        return {
+            "total": response.get("total", 0),
+            "filterData": [],
+            "summary": {},
+            **partialResults(response),
+        }
 
     # Add predefined filters
     filters_to_add = [
@@ -76,6 +82,7 @@ async def ocmFilter(start_datetime: date, end_datetime: date, filter: str):
         "total": response.get("total", 0),
         "filterData": filtered_data,
         "summary": response.get("summary", {}),
+        **partialResults(response),
     }
 
 
@@ -9,6 +9,7 @@ from app.api.v1.commons.utils import (
     buildReleaseStreamFilter,
     get_dict_from_qs,
     getReleaseStream,
+    partialResults,
 )
 
 
@@ -37,14 +38,22 @@ async def ocpMapper(
 
     df = response.get("data", pd.DataFrame())
     if df.empty:
-        return {"data": df, "total": response.get("total", 0)}
+        return {
+            "data": df,
+            "total": response.get("total", 0),
+            **partialResults(response),
+        }
 
     df.insert(len(df.columns), "product", "ocp")
     df.loc[df["benchmark"] == "ols-load-generator", "product"] = "ols"
     df["releaseStream"] = df.apply(getReleaseStream, axis=1)
     df["version"] = df["shortVersion"]
     df["testName"] = df["benchmark"]
-    return {"data": df, "total": response.get("total", 0)}
+    return {
+        "data": df,
+        "total": response.get("total", 0),
+        **partialResults(response),
+    }
 
 
 async def ocpFilter(start_datetime: date, end_datetime: date, filter: str):
@@ -58,7 +67,12 @@ async def ocpFilter(start_datetime: date, end_datetime: date, filter: str):
         return {"total": 0, "filterData": [], "summary": {}}
 
     if not response.get("filterData") or response.get("total", 0) == 0:
-        return {"total": response.get("total", 0), "filterData": [], "summary": {}}
+        return {
+            "total": response.get("total", 0),
+            "filterData": [],
+            "summary": {},
+            **partialResults(response),
+        }
 
     # Normalize filters
     for item in response["filterData"]:
@@ -83,6 +97,7 @@ async def ocpFilter(start_datetime: date, end_datetime: date, filter: str):
         "total": response.get("total", 0),
         "filterData": filtered_data,
         "summary": response.get("summary", {}),
+        **partialResults(response),
     }
 
 
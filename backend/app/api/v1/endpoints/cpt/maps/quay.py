@@ -5,7 +5,7 @@ import pandas as pd
 
 from app.api.v1.commons.constants import keys_to_keep
 from app.api.v1.commons.quay import getData, getFilterData
-from app.api.v1.commons.utils import get_dict_from_qs
+from app.api.v1.commons.utils import get_dict_from_qs, partialResults
 
 
 #####################################################################################
@@ -33,12 +33,20 @@ async def quayMapper(
 
     df = response.get("data", pd.DataFrame())
     if df.empty:
-        return {"data": df, "total": response.get("total", 0)}
+        return {
+            "data": df,
+            "total": response.get("total", 0),
+            **partialResults(response),
+        }
 
     df.insert(len(df.columns), "product", "quay")
     df["version"] = df["releaseStream"]
     df["testName"] = df["benchmark"]
-    return {"data": df, "total": response.get("total", 0)}
+    return {
+        "data": df,
+        "total": response.get("total", 0),
+        **partialResults(response),
+    }
 
 
 async def quayFilter(start_datetime: date, end_datetime: date, filter: str):
@@ -52,7 +60,12 @@ async def quayFilter(start_datetime: date, end_datetime: date, filter: str):
         return {"total": 0, "filterData": [], "summary": {}}
 
     if not response.get("filterData") or response.get("total", 0) == 0:
-        return {"total": response.get("total", 0), "filterData": [], "summary": {}}
+        return {
+            "total": response.get("total", 0),
+            "filterData": [],
+            "summary": {},
+            **partialResults(response),
+        }
 
     # Normalize filters
     for item in response["filterData"]:
@@ -73,6 +86,7 @@ async def quayFilter(start_datetime: date, end_datetime: date, filter: str):
         "total": response.get("total", 0),
         "filterData": filtered_data,
         "summary": response.get("summary", {}),
+        **partialResults(response),
     }
 
 
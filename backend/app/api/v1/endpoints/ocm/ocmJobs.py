@@ -6,6 +6,7 @@ from fastapi.param_functions import Query
 
 from app.api.v1.commons.example_responses import ocp_200_response, response_422
 from app.api.v1.commons.ocm import getData
+from app.api.v1.commons.utils import partialResults
 
 router = APIRouter()
 
@@ -72,6 +73,7 @@ async def jobs(
         "results": jobs,
         "total": results["total"],
         "offset": (offset + size) if size != 10000 else 0,
+        **partialResults(results),
     }
 
     if pretty:
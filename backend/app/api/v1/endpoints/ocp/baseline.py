@@ -0,0 +1,211 @@
+import asyncio
+from dataclasses import dataclass, field, replace
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from app import config
+from app.api.v1.commons.utils import watermark_date
+from app.api.v1.endpoints.summary.summary_search import PerfCiFingerprint
+
+"""Cached baseline runs for the OCP comparison graphs.
+
+A job's comparison graph compares it with the earlier successful runs of the
+same benchmark on the same configuration: finding them means searching the
+metadata index, and then the "jobSummary" metrics of every match for its
+iteration count. Every job of a configuration has the same baseline runs, so
+they're kept by a fingerprint of the configuration.
+
+An entry is used as it is for "ttl" seconds. After that, only the runs since
+the previous update are searched for, and only the new runs' job summaries
+fetched; every "rebuild" seconds the entry is rebuilt from scratch, to catch
+late or removed documents. A ttl of 0 disables the cache:
+
+    [baseline-cache]
+    ttl=300
+    rebuild=86400
+"""
+
+
+@dataclass
+class BaselineFingerprint(PerfCiFingerprint):
+    """The configuration shared by a job and its baseline runs
+
+    The node counts are None when the baselines don't match them.
+    """
+
+    benchmark: str = field(metadata={"str": "b"})
+    platform: str = field(metadata={"str": "p"})
+    version: str = field(metadata={"str": "v"})
+
+    @classmethod
+    def from_meta(cls, meta: dict[str, Any], workerCount: bool):
+        return cls(
+            masterNodesType=meta["masterNodesType"],
+            masterNodesCount=meta["masterNodesCount"] if workerCount else None,
+            workerNodesType=meta["workerNodesType"],
+            workerNodesCount=meta["workerNodesCount"] if workerCount else None,
+            benchmark=meta["benchmark"],
+            platform=meta["platform"],
+            version=meta["ocpVersion"][:4],
+        )
+
+
+@dataclass
+class BaselineRuns:
+    """The baseline runs of a configuration
+
+    Fields:
+        uuids: the matching runs, in the order they were found
+        jobs: the uuid and jobConfig.jobIterations of each run's job summary
+        watermark: the date from which the next update searches
+        refreshed: when the runs were last updated
+        built: when the runs were last searched from scratch
+    """
+
+    uuids: list[str] = field(default_factory=list)
+    jobs: list[dict[str, Any]] = field(default_factory=list)
+    watermark: Optional[str] = None
+    refreshed: float = 0.0
+    built: float = 0.0
+
+
+class BaselineCache(config.Configurable):
+    """Baseline runs keyed by configuration fingerprint"""
+
+    SECTION = "baseline-cache"
+    DEFAULT_TTL = 300.0
+    DEFAULT_REBUILD = 86400.0
+
+    def __init__(self):
+        super().__init__()
+        self.ttl = self.DEFAULT_TTL
+        self.rebuild = self.DEFAULT_REBUILD
+        self.clock = time.time
+        self.entries: dict[str, BaselineRuns] = {}
+        self.pending: dict[str, asyncio.Future] = {}
+        self.counters = {"hits": 0, "updates": 0, "builds": 0}
+
+    def configure(
+        self,
+        ttl: float = DEFAULT_TTL,
+        rebuild: float = DEFAULT_REBUILD,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Set the cache policy, discarding any entries"""
+        self.ttl = float(ttl)
+        self.rebuild = float(rebuild)
+        self.clock = clock
+        self.loaded = True
+        self.entries = {}
+        self.pending = {}
+        self.counters = dict.fromkeys(self.counters, 0)
+
+    def settings(self, cfg) -> dict[str, Any]:
+        return {
+            "ttl": self.setting(cfg, "ttl", self.DEFAULT_TTL),
+            "rebuild": self.setting(cfg, "rebuild", self.DEFAULT_REBUILD),
+        }
+
+    @staticmethod
+    def copy(entry: BaselineRuns) -> BaselineRuns:
+        """A copy of an entry whose lists a caller may change"""
+        return replace(entry, uuids=list(entry.uuids), jobs=list(entry.jobs))
+
+    @staticmethod
+    def job(summary: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """Keep only the fields of a job summary that select baselines"""
+        iterations = (summary.get("jobConfig") or {}).get("jobIterations")
+        if iterations is None:
+            return None
+        return {"uuid": summary["uuid"], "jobConfig": {"jobIterations": iterations}}
+
+    async def update(
+        self,
+        entry: BaselineRuns,
+        find: Callable[[Optional[str]], Awaitable[list[str]]],
+        summarize: Optional[Callable[[list[str]], Awaitable[list[dict]]]],
+    ) -> BaselineRuns:
+        """Add the runs found since an entry's watermark to a copy of it"""
+        start = self.clock()
+        known = set(entry.uuids)
+        new = [u for u in dict.fromkeys(await find(entry.watermark)) if u not in known]
+        jobs = entry.jobs
+        if summarize and new:
+            found = [self.job(s) for s in await summarize(new)]
+            jobs = jobs + [j for j in found if j]
+        return BaselineRuns(
+            uuids=entry.uuids + new,
+            jobs=jobs,
+            watermark=watermark_date(start),
+            refreshed=self.clock(),
+            built=entry.built or start,
+        )
+
+    async def get(
+        self,
+        fingerprint: PerfCiFingerprint,
+        find: Callable[[Optional[str]], Awaitable[list[str]]],
+        summarize: Optional[Callable[[list[str]], Awaitable[list[dict]]]] = None,
+    ) -> BaselineRuns:
+        """Return the baseline runs of a configuration, updating them if stale
+
+        Concurrent requests for an entry that's being updated share the
+        update. Each caller gets its own copy of the entry's lists, which
+        may not include a job that finished since the entry was updated.
+
+        Args:
+            fingerprint: The baseline configuration
+            find: Search for the UUIDs of the matching runs dated on or after
+                a yyyy-MM-dd date, or all of them given None
+            summarize: Search for the job summaries of a list of UUIDs, if
+                the baselines are selected by iteration count
+
+        Returns:
+            The baseline runs
+        """
+        self.check()
+        if self.ttl <= 0:
+            return await self.update(BaselineRuns(), find, summarize)
+
+        key = fingerprint.key()
+        entry = self.entries.get(key)
+        if entry and self.clock() - entry.refreshed < self.ttl:
+            self.counters["hits"] += 1
+            return self.copy(entry)
+        if key in self.pending:
+            return self.copy(await asyncio.shield(self.pending[key]))
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            if entry and self.clock() - entry.built < self.rebuild:
+                self.counters["updates"] += 1
+            else:
+                self.counters["builds"] += 1
+                entry = BaselineRuns()
+            entry = await self.update(entry, find, summarize)
+            self.entries[key] = entry
+            future.set_result(entry)
+            return self.copy(entry)
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise the failure; don't report it as unretrieved
+            future.exception()
+            raise
+        finally:
+            # Reconfiguring may have forgotten this update
+            if self.pending.get(key) is future:
+                del self.pending[key]
+
+    def stats(self) -> dict[str, Any]:
+        """Report the cache counters and entries"""
+        return {
+            "ttl": self.ttl,
+            "rebuild": self.rebuild,
+            **self.counters,
+            "entries": len(self.entries),
+            "runs": sum(len(e.uuids) for e in self.entries.values()),
+        }
+
+
+baselines = BaselineCache()
@@ -1,38 +1,126 @@
-import pprint
+import asyncio
+import itertools
+from typing import Any, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 import pandas as pd
 
-from app.api.v1.commons.constants import AGG_BUCKET_SIZE
+from app.api.v1.commons.constants import AGG_BUCKET_SIZE, JOB_KEY
+from app.api.v1.commons.query import (
+    boolFilter,
+    matchFilter,
+    mergeBuckets,
+    searchChunks,
+    termFilter,
+    termsFilter,
+)
+from app.api.v1.commons.tasks import TaskGraph
 from app.api.v1.commons.utils import getMetadata
+from app.api.v1.endpoints.ocp.baseline import (
+    BaselineFingerprint,
+    BaselineRuns,
+    baselines,
+)
 from app.services.search import ElasticService
 
 router = APIRouter()
 
-
-@router.get("/api/v1/ocp/graph/trend/{version}/{count}/{benchmark}")
-async def trend(benchmark: str, count: int, version: str):
-    index = "ripsaw-kube-burner*"
+# The kube-burner metrics which can be trended: the metric document filter,
+# the field whose percentiles are trended, its scale, and a title for the trended
+# percentile
+TREND_METRICS: dict[str, dict[str, Any]] = {
+    "podLatency": {
+        "filter": {
+            "metricName.keyword": "podLatencyQuantilesMeasurement",
+            "quantileName.keyword": "Ready",
+        },
+        "field": "P99",
+        "scale": 1000,
+        "title": "PodLatency: Ready P99 {percentile} ( seconds )",
+    },
+    "vmiLatency": {
+        "filter": {
+            "metricName.keyword": "vmiLatencyQuantilesMeasurement",
+            "quantileName.keyword": "VMReady",
+        },
+        "field": "P99",
+        "scale": 1000,
+        "title": "VMILatency: VMReady P99 {percentile} ( seconds )",
+    },
+    "nodeLatency": {
+        "filter": {
+            "metricName.keyword": "nodeLatencyQuantilesMeasurement",
+            "quantileName.keyword": "Ready",
+        },
+        "field": "P99",
+        "scale": 1000,
+        "title": "NodeLatency: Ready P99 {percentile} ( seconds )",
+    },
+    "cpu": {
+        "filter": {"metricName.keyword": "containerCPU"},
+        "field": "value",
+        "scale": 1,
+        "title": "{percentile} CPU usage",
+    },
+}
+
+
+def percentileName(percentile: float) -> str:
+    """Name a percentile, as 50th%tile or 99.9th%tile"""
+    number = f"{percentile:g}"
+    suffix = "th"
+    if percentile == int(percentile) and int(percentile) % 100 not in (11, 12, 13):
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(int(percentile) % 10, "th")
+    return f"{number}{suffix}%tile"
+
+
+def trendMeta(
+    benchmark: str,
+    count: int,
+    version: str,
+    masterNodesType: Optional[str] = None,
+    workerNodesType: Optional[str] = None,
+    metric: str = "podLatency",
+) -> dict[str, Any]:
+    """The metadata of a self-managed AWS trend configuration
+
+    Unless they're given, the instance types are those used for the
+    worker node count by the runs trending the metric: CPU usage is
+    trended from runs on m5 nodes unless they have 21 to 24 workers.
+    """
     meta = {}
     meta["benchmark"] = benchmark
     # Instance types for self-managed.
     if count > 50:
         meta["masterNodesType"] = "m6a.4xlarge"
         meta["workerNodesType"] = "m5.xlarge"
-    else:
+    elif metric != "cpu" or 20 < count <= 24:
         meta["masterNodesType"] = "m6a.xlarge"
         meta["workerNodesType"] = "m6a.xlarge"
+    else:
+        meta["masterNodesType"] = "m5.2large"
+        meta["workerNodesType"] = "m5.xlarge"
+    if masterNodesType:
+        meta["masterNodesType"] = masterNodesType
+    if workerNodesType:
+        meta["workerNodesType"] = workerNodesType
     meta["masterNodesCount"] = 3
     meta["workerNodesCount"] = count
     meta["platform"] = "AWS"
-    # Query the up coming release data
     meta["ocpVersion"] = version
-    current_uuids = await getMatchRuns(meta, True)
-    if len(current_uuids) < 1:
+    return meta
+
+
+@router.get("/api/v1/ocp/graph/trend/{version}/{count}/{benchmark}")
+async def trend(benchmark: str, count: int, version: str):
+    index = "ripsaw-kube-burner*"
+    # Query the up coming release data
+    meta = trendMeta(benchmark, count, version)
+    runs = await baselineRuns(meta, True)
+    if len(runs.uuids) < 1:
         return []
 
-    current_jobs = await jobSummary(current_uuids)
-    current_ids = jobFilter(current_jobs, current_jobs)
+    current_ids = jobFilter(runs.jobs, runs.jobs)
     # Capture result data
     oData = await getBurnerResults("", current_ids, index)
     odf = pd.json_normalize(oData)
@@ -48,6 +136,129 @@ async def trend(benchmark: str, count: int, version: str):
     return [current]
 
 
+@router.get(
+    "/api/v1/ocp/graph/trends/{benchmark}/{count}",
+    summary="Trend a kube-burner metric across several versions",
+    description=(
+        "Find the successful runs of a benchmark on each version concurrently, "
+        "and trend a percentile of a metric over each interval of their "
+        "timestamps, computed by aggregations rather than from every "
+        "measurement. Returns a scatter trace for each version."
+    ),
+)
+async def trends(
+    benchmark: str,
+    count: int,
+    versions: str = Query(
+        ...,
+        description="The versions to trend (comma separated list)",
+        examples=["4.18,4.19,4.20"],
+    ),
+    metric: str = Query(
+        "podLatency",
+        description="The metric to trend",
+        pattern=f"^({'|'.join(TREND_METRICS)})$",
+    ),
+    namespace: Optional[str] = Query(
+        None, description="Trend only the metric of this namespace (e.g., for cpu)"
+    ),
+    interval: str = Query(
+        "day",
+        description="The interval of each trend point",
+        pattern="^(day|week|month)$",
+    ),
+    percentile: float = Query(
+        50, ge=0, le=100, description="The percentile of each interval's values"
+    ),
+    masterNodesType: Optional[str] = Query(None, description="Master instance type"),
+    workerNodesType: Optional[str] = Query(None, description="Worker instance type"),
+):
+    index = "ripsaw-kube-burner*"
+    selector = TREND_METRICS[metric]
+    title = selector["title"].format(percentile=percentileName(percentile))
+    if namespace:
+        title = f"{namespace} {title}"
+
+    async def versionTrend(version: str) -> dict[str, Any]:
+        meta = trendMeta(
+            benchmark, count, version, masterNodesType, workerNodesType, metric
+        )
+        runs = await baselineRuns(meta, True)
+        ids = jobFilter(runs.jobs, runs.jobs)
+        points = await getTrendPercentiles(
+            ids, index, selector, namespace, interval, percentile
+        )
+        return {
+            "y": [v / selector["scale"] for _, v in points],
+            "x": [t for t, _ in points],
+            "name": f"{version} results - {title}",
+            "type": "scatter",
+        }
+
+    names = dict.fromkeys(v.strip() for v in versions.split(","))
+    return await asyncio.gather(*[versionTrend(v) for v in names if v])
+
+
+async def getTrendPercentiles(
+    uuids: list,
+    index: str,
+    selector: dict[str, Any],
+    namespace: Optional[str],
+    interval: str,
+    percentile: float,
+) -> list[tuple[str, float]]:
+    """A percentile of the runs' metric values over each interval
+
+    Args:
+        uuids: The runs
+        index: The kube-burner index pattern
+        selector: A TREND_METRICS selector
+        namespace: Select only the metric of this namespace
+        interval: The date_histogram calendar interval
+        percentile: The percentile of each interval's values
+
+    Returns:
+        The (yyyy-MM-dd, value) of each interval with values, in order
+    """
+    if len(uuids) < 1:
+        return []
+    query = {
+        "size": 0,
+        "query": boolFilter(
+            termsFilter("uuid.keyword", uuids),
+            *[termFilter(k, v) for k, v in selector["filter"].items()],
+            termFilter("labels.namespace.keyword", namespace) if namespace else None,
+        ),
+        "aggs": {
+            "time": {
+                "date_histogram": {
+                    "field": "timestamp",
+                    "calendar_interval": interval,
+                    "min_doc_count": 1,
+                    "format": "yyyy-MM-dd",
+                },
+                "aggs": {
+                    "value": {
+                        "percentiles": {
+                            "field": selector["field"],
+                            "percents": [percentile],
+                        }
+                    }
+                },
+            }
+        },
+    }
+    es = ElasticService(configpath="ocp.elasticsearch", index=index)
+    response = await es.post(query, size=0)
+    await es.close()
+    points = []
+    for bucket in response["aggregations"]["time"]["buckets"]:
+        value = next(iter(bucket["value"]["values"].values()), None)
+        if value is not None:
+            points.append((bucket["key_as_string"], value))
+    return points
+
+
 """
 diff_cpu - Will accept the version, prev_version , count, benchmark and namespace to diff trend CPU
 data.
@@ -60,8 +271,10 @@ data.
 async def diff_cpu(
     namespace: str, benchmark: str, count: int, version: str, prev_version: str
 ):
-    aTrend = await trend_cpu(namespace, benchmark, count, version)
-    bTrend = await trend_cpu(namespace, benchmark, count, prev_version)
+    aTrend, bTrend = await asyncio.gather(
+        trend_cpu(namespace, benchmark, count, version),
+        trend_cpu(namespace, benchmark, count, prev_version),
+    )
     return [aTrend[0], bTrend[0]]
 
 
@@ -74,26 +287,10 @@ data.
 @router.get("/api/v1/ocp/graph/trend/{version}/{count}/{benchmark}/cpu/{namespace}")
 async def trend_cpu(namespace: str, benchmark: str, count: int, version: str):
     index = "ripsaw-kube-burner*"
-    meta = {}
-    meta["benchmark"] = benchmark
-    meta["masterNodesCount"] = 3
-    # Instance types for self-managed.
-    if count > 50:
-        meta["masterNodesType"] = "m6a.4xlarge"
-        meta["workerNodesType"] = "m5.xlarge"
-    elif count <= 24 and count > 20:
-        meta["masterNodesType"] = "m6a.xlarge"
-        meta["workerNodesType"] = "m6a.xlarge"
-    else:
-        meta["masterNodesType"] = "m5.2large"
-        meta["workerNodesType"] = "m5.xlarge"
-    meta["workerNodesCount"] = count
-    meta["platform"] = "AWS"
-    meta["ocpVersion"] = version
-    current_uuids = await getMatchRuns(meta, True)
+    meta = trendMeta(benchmark, count, version, metric="cpu")
     # Query the current release data.
-    current_jobs = await jobSummary(current_uuids)
-    current_ids = jobFilter(current_jobs, current_jobs)
+    runs = await baselineRuns(meta, True)
+    current_ids = jobFilter(runs.jobs, runs.jobs)
     result = await getBurnerCPUResults(current_ids, namespace, index)
     result = parseCPUResults(result)
     cdf = pd.json_normalize(result)
@@ -114,18 +311,34 @@ async def trend_cpu(namespace: str, benchmark: str, count: int, version: str):
 
 def parseCPUResults(data: dict):
     res = []
-    stamps = data["aggregations"]["time"]["buckets"]
-    cpu = data["aggregations"]["uuid"]["buckets"]
-    for stamp in stamps:
+    for bucket in data["aggregations"]["uuid"]["buckets"]:
         dat = {}
-        dat["uuid"] = stamp["key"]
-        dat["timestamp"] = stamp["time"]["value_as_string"]
-        acpu = next(item for item in cpu if item["key"] == stamp["key"])
-        dat["cpu_avg"] = acpu["cpu"]["value"]
+        dat["uuid"] = bucket["key"]
+        dat["timestamp"] = bucket["time"]["value_as_string"]
+        dat["cpu_avg"] = bucket["cpu"]["value"]
         res.append(dat)
     return res
 
 
+def burnerRuns(uuid: str, meta: dict, index: str, **metric: str) -> TaskGraph:
+    """Find the baseline and current kube-burner results of a job
+
+    The job's own results and iteration count are fetched while the matching
+    runs are found; then the runs with the same iteration count are selected
+    and their results fetched.
+    """
+    steps = TaskGraph()
+    steps.add("runs", baselineRuns, meta, True)
+    # We need to look at the jobSummary to ensure all UUIDs have similar iteration count.
+    steps.add("job", jobSummary, [uuid])
+    steps.add("cData", getBurnerPercentiles, uuid, [uuid], index, **metric)
+    steps.after("ids", lambda job, runs: jobFilter(job, runs.jobs), "job", "runs")
+    steps.after(
+        "oData", getBurnerPercentiles, "ids", args=(uuid,), index=index, **metric
+    )
+    return steps
+
+
 @router.get("/api/v1/ocp/graph/{uuid}")
 async def graph(uuid: str):
     index = ""
@@ -133,15 +346,18 @@ async def graph(uuid: str):
     print(meta)
     metrics = []
     if meta["benchmark"] == "k8s-netperf":
-        uuids = await getMatchRuns(meta, False)
-        print(uuids)
         index = "k8s-netperf"
-        oData = await getResults(uuid, uuids, index)
-        cData = await getResults(uuid, [uuid], index)
-        oMetrics = await processNetperf(oData)
-        oMetrics = oMetrics.reset_index()
-        nMetrics = await processNetperf(cData)
-        nMetrics = nMetrics.reset_index()
+        steps = TaskGraph()
+        steps.add("runs", baselineRuns, meta, False)
+        steps.add("nMetrics", getNetperfThroughput, uuid, [uuid], index)
+        steps.after(
+            "oMetrics",
+            lambda runs: getNetperfThroughput(uuid, runs.uuids, index),
+            "runs",
+        )
+        results = await steps.run()
+        print(results["runs"].uuids)
+        oMetrics, nMetrics = results["oMetrics"], results["nMetrics"]
         x = []
         y = []
         for index, row in oMetrics.iterrows():
@@ -173,7 +389,7 @@ async def graph(uuid: str):
         metrics.append(old)
         metrics.append(new)
     elif meta["benchmark"] == "ingress-perf":
-        uuids = await getMatchRuns(meta, False)
+        uuids = (await baselineRuns(meta, False)).uuids
         index = "ingress-performance"
 
         # The 'ingress-perf' benchmark graph path is unimplemented: we do
@@ -187,21 +403,15 @@ async def graph(uuid: str):
         )
     elif meta["benchmark"] == "virt-density":
         index = "ripsaw-kube-burner*"
-        metric = "vmiLatencyQuantilesMeasurement"
-        quantileName = "VMReady"
-        uuids = await getMatchRuns(meta, True)
-        # We need to look at the jobSummary to ensure all UUIDs have similar iteration count.
-        job = await jobSummary([uuid])
-        jobs = await jobSummary(uuids)
-        ids = jobFilter(job, jobs)
-
-        oData = await getBurnerResults(uuid, ids, index, metric, quantileName)
-        oMetrics = await processBurner(oData)
-        oMetrics = oMetrics.reset_index()
-
-        cData = await getBurnerResults(uuid, [uuid], index, metric, quantileName)
-        nMetrics = await processBurner(cData)
-        nMetrics = nMetrics.reset_index()
+        results = await burnerRuns(
+            uuid,
+            meta,
+            index,
+            metric="vmiLatencyQuantilesMeasurement",
+            quantileName="VMReady",
+        ).run()
+
+        oMetrics, nMetrics = results["oData"], results["cData"]
         x = []
         y = []
         for index, row in oMetrics.iterrows():
@@ -234,20 +444,9 @@ async def graph(uuid: str):
         metrics.append(new)
     else:
         index = "ripsaw-kube-burner*"
-        uuids = await getMatchRuns(meta, True)
-
-        # We need to look at the jobSummary to ensure all UUIDs have similar iteration count.
-        job = await jobSummary([uuid])
-        jobs = await jobSummary(uuids)
-        ids = jobFilter(job, jobs)
-
-        oData = await getBurnerResults(uuid, ids, index)
-        oMetrics = await processBurner(oData)
-        oMetrics = oMetrics.reset_index()
+        results = await burnerRuns(uuid, meta, index).run()
 
-        cData = await getBurnerResults(uuid, [uuid], index)
-        nMetrics = await processBurner(cData)
-        nMetrics = nMetrics.reset_index()
+        oMetrics, nMetrics = results["oData"], results["cData"]
         x = []
         y = []
         for index, row in oMetrics.iterrows():
@@ -283,36 +482,21 @@ async def graph(uuid: str):
 
 async def jobSummary(uuids: list):
     index = "ripsaw-kube-burner*"
-    ids = '" OR uuid: "'.join(uuids)
-    query = {
-        "query": {
-            "query_string": {
-                "query": (f'( uuid: "{ids}" )' f' AND metricName: "jobSummary"')
-            }
-        }
-    }
-    print(query)
-    es = ElasticService(configpath="ocp.elasticsearch", index=index)
-    response = await es.post(query=query)
-    await es.close()
-    runs = [item["_source"] for item in response["data"]]
-    return runs
 
+    async def search(ids: list) -> list:
+        query = {
+            "query": boolFilter(
+                termsFilter("uuid.keyword", ids),
+                termFilter("metricName.keyword", "jobSummary"),
+            )
+        }
+        print(query)
+        es = ElasticService(configpath="ocp.elasticsearch", index=index)
+        runs = [item["_source"] async for item in es.scan(query=query)]
+        await es.close()
+        return runs
 
-async def processBurner(data: dict):
-    pprint.pprint(data)
-    df = pd.json_normalize(data)
-    filterDF = burnerFilter(df)
-    ptile = filterDF.groupby(["quantileName"])["P99"].quantile([0.99])
-    return ptile
-
-
-async def processNetperf(data: dict):
-    pprint.pprint(data)
-    df = pd.json_normalize(data)
-    filterDF = netperfFilter(df)
-    tput = filterDF.groupby(["profile", "messageSize"])["throughput"].mean()
-    return tput
+    return list(itertools.chain.from_iterable(await searchChunks(uuids, search)))
 
 
 def jobFilter(pdata: dict, data: dict):
@@ -335,82 +519,46 @@ def jobFilter(pdata: dict, data: dict):
     return ndf[records_matched]["uuid"].unique().tolist()
 
 
-def burnerFilter(data: dict):
-    #
-    # Filter out aspects of the test to norm results
-    #
-    pprint.pprint(data)
-    columns = ["quantileName", "metricName", "P99"]
-    ndf = pd.DataFrame(data, columns=columns)
-    return ndf
-
-
-def netperfFilter(df):
-    #
-    # Filter out aspects of the test to norm results
-    #
-    columns = [
-        "profile",
-        "hostNetwork",
-        "parallelism",
-        "service",
-        "acrossAZ",
-        "samples",
-        "messageSize",
-        "throughput",
-        "test",
-    ]
-    ndf = pd.DataFrame(df, columns=columns)
-
-    # NOTE: flake8 doesn't like "== True", but the pandas filter won't work
-    # as "is True", so mark these with "# noqa" to disable the complaint.
-    hnfilter = df[(ndf.hostNetwork == True)].index  # noqa
-    hnd = ndf.drop(hnfilter)
-    sfilter = hnd[(hnd.service == True)].index  # noqa
-    sdf = hnd.drop(sfilter)
-    azfilter = sdf[(sdf.acrossAZ == True)].index  # noqa
-    adf = sdf.drop(azfilter)
-    d = adf[(adf.parallelism == 1)]
-    d = d[d.profile.str.contains("TCP_STREAM")]
-    return d
-
-
 async def getBurnerCPUResults(uuids: list, namespace: str, index: str):
-    ids = '" OR uuid: "'.join(uuids)
-    print(ids)
-    query = {
-        "size": 0,
-        "aggs": {
-            "time": {
-                "terms": {"field": "uuid.keyword", "size": AGG_BUCKET_SIZE},
-                "aggs": {"time": {"avg": {"field": "timestamp"}}},
-            },
-            "uuid": {
-                "terms": {"field": "uuid.keyword", "size": AGG_BUCKET_SIZE},
-                "aggs": {"cpu": {"avg": {"field": "value"}}},
+    async def search(ids: list) -> dict:
+        query = {
+            "size": 0,
+            "aggs": {
+                "uuid": {
+                    "terms": {"field": "uuid.keyword", "size": AGG_BUCKET_SIZE},
+                    "aggs": {
+                        "time": {"avg": {"field": "timestamp"}},
+                        "cpu": {"avg": {"field": "value"}},
+                    },
+                },
             },
-        },
-        "query": {
-            "bool": {
-                "must": [
-                    {
-                        "query_string": {
-                            "query": (
-                                f'( uuid: "{ids}" )'
-                                f' AND metricName: "containerCPU"'
-                                f" AND labels.namespace.keyword: {namespace}"
-                            )
-                        }
-                    }
-                ]
-            }
-        },
-    }
-    print(query)
-    es = ElasticService(configpath="ocp.elasticsearch", index=index)
-    runs = await es.post(query, size=0)
-    await es.close()
-    return runs
+            "query": boolFilter(
+                termsFilter("uuid.keyword", ids),
+                termFilter("metricName.keyword", "containerCPU"),
+                termFilter("labels.namespace.keyword", namespace),
+            ),
+        }
+        print(query)
+        es = ElasticService(configpath="ocp.elasticsearch", index=index)
+        runs = await es.post(query, size=0)
+        await es.close()
+        return runs
+
+    # Each chunk must fit in the per-UUID aggregation buckets
+    responses = await searchChunks(uuids, search, AGG_BUCKET_SIZE)
+    if len(responses) == 1:
+        return responses[0]
+    return mergeBuckets(responses, "uuid")
+
+
+def excludeRun(uuid: str, uuids: list) -> list:
+    """The runs other than the job itself, if there are others
+
+    The list isn't changed: it may be shared, e.g. by the baseline cache.
+    """
+    if len(uuids) > 1 and uuid in uuids:
+        return [u for u in uuids if u != uuid]
+    return uuids
 
 
 async def getBurnerResults(
@@ -420,103 +568,191 @@ async def getBurnerResults(
     metric: str = "podLatencyQuantilesMeasurement",
     quantileName: str = "Ready",
 ):
-    if len(uuids) > 1:
-        if len(uuid) > 0 and uuid in uuids:
-            uuids.remove(uuid)
+    uuids = excludeRun(uuid, uuids)
     if len(uuids) < 1:
         return []
-    ids = '" OR uuid: "'.join(uuids)
-    print(ids)
+
+    async def search(ids: list) -> list:
+        query = {
+            "query": boolFilter(
+                termsFilter("uuid.keyword", ids),
+                termFilter("metricName.keyword", metric),
+                termFilter("quantileName.keyword", quantileName),
+            )
+        }
+        print(query)
+        es = ElasticService(configpath="ocp.elasticsearch", index=index)
+        runs = [item["_source"] async for item in es.scan(query=query)]
+        await es.close()
+        return runs
+
+    return list(itertools.chain.from_iterable(await searchChunks(uuids, search)))
+
+
+async def getBurnerPercentiles(
+    uuid: str,
+    uuids: list,
+    index: str,
+    metric: str = "podLatencyQuantilesMeasurement",
+    quantileName: str = "Ready",
+) -> pd.DataFrame:
+    """The 99th percentile of the runs' P99 latencies, by quantile name
+
+    This is computed by a percentiles aggregation, rather than by fetching
+    every measurement document as getBurnerResults does. As there, the job
+    itself is excluded from a list of several runs.
+
+    Returns:
+        A DataFrame with "quantileName" and "P99" columns
+    """
+    uuids = excludeRun(uuid, uuids)
+    frame = pd.DataFrame(columns=["quantileName", "P99"])
+    if len(uuids) < 1:
+        return frame
     query = {
-        "query": {
-            "query_string": {
-                "query": (
-                    f'( uuid: "{ids}" )'
-                    f" AND metricName: {metric}"
-                    f' AND quantileName: "{quantileName}"'
-                )
+        "size": 0,
+        "query": boolFilter(
+            termsFilter("uuid.keyword", uuids),
+            termFilter("metricName.keyword", metric),
+            termFilter("quantileName.keyword", quantileName),
+        ),
+        "aggs": {
+            "quantileName": {
+                "terms": {
+                    "field": "quantileName.keyword",
+                    "size": AGG_BUCKET_SIZE,
+                    "order": {"_key": "asc"},
+                },
+                "aggs": {"P99": {"percentiles": {"field": "P99", "percents": [99]}}},
             }
-        }
+        },
     }
-    print(query)
     es = ElasticService(configpath="ocp.elasticsearch", index=index)
-    response = await es.post(query=query)
+    response = await es.post(query, size=0)
     await es.close()
-    runs = [item["_source"] for item in response["data"]]
-    return runs
+    rows = [
+        (b["key"], next(iter(b["P99"]["values"].values())))
+        for b in response["aggregations"]["quantileName"]["buckets"]
+    ]
+    return pd.DataFrame(rows, columns=frame.columns) if rows else frame
 
 
-async def getResults(uuid: str, uuids: list, index: str):
-    if len(uuids) > 1:
-        uuids.remove(uuid)
-    ids = '" OR uuid: "'.join(uuids)
-    print(ids)
-    query = {"query": {"query_string": {"query": (f'(uuid: "{ids}")')}}}
-    print(query)
-    es = ElasticService(configpath="ocp.elasticsearch", index=index)
-    response = await es.post(query=query)
-    await es.close()
-    runs = [item["_source"] for item in response["data"]]
-    return runs
+async def getNetperfThroughput(uuid: str, uuids: list, index: str) -> pd.DataFrame:
+    """The runs' mean TCP_STREAM throughput by profile and message size
 
+    Only single stream pod to pod tests are included (not host network,
+    services, or across availability zones), averaged by an aggregation,
+    rather than by fetching every document as getResults does. As there,
+    the job itself is excluded from a list of several runs.
 
-async def getMatchRuns(meta: dict, workerCount: bool = False):
-    version = meta["ocpVersion"][:4]
+    Returns:
+        A DataFrame with "profile", "messageSize" and "throughput" columns
+    """
+    uuids = excludeRun(uuid, uuids)
     query = {
-        "query": {
-            "bool": {
-                "must": [
-                    {
-                        "query_string": {
-                            "query": (
-                                f'benchmark: "{meta["benchmark"]}$"'
-                                f' AND workerNodesType: "{meta["workerNodesType"]}"'
-                                f' AND masterNodesType: "{meta["masterNodesType"]}"'
-                                f' AND platform: "{meta["platform"]}"'
-                                f" AND ocpVersion: {version}*"
-                                f" AND jobStatus: success"
-                            )
-                        }
+        "size": 0,
+        "query": boolFilter(
+            termsFilter("uuid.keyword", uuids),
+            termFilter("parallelism", 1),
+            # k8s-netperf profiles are named for the test, e.g. TCP_STREAM
+            {"prefix": {"profile.keyword": "TCP_STREAM"}},
+            must_not=[
+                termFilter("hostNetwork", True),
+                termFilter("service", True),
+                termFilter("acrossAZ", True),
+            ],
+        ),
+        "aggs": {
+            "profile": {
+                "terms": {
+                    "field": "profile.keyword",
+                    "size": AGG_BUCKET_SIZE,
+                    "order": {"_key": "asc"},
+                },
+                "aggs": {
+                    "messageSize": {
+                        "terms": {
+                            "field": "messageSize",
+                            "size": AGG_BUCKET_SIZE,
+                            "order": {"_key": "asc"},
+                        },
+                        "aggs": {"throughput": {"avg": {"field": "throughput"}}},
                     }
-                ]
+                },
             }
-        }
+        },
     }
+    es = ElasticService(configpath="ocp.elasticsearch", index=index)
+    response = await es.post(query, size=0)
+    await es.close()
+    rows = [
+        (p["key"], m["key"], m["throughput"]["value"])
+        for p in response["aggregations"]["profile"]["buckets"]
+        for m in p["messageSize"]["buckets"]
+    ]
+    return pd.DataFrame(rows, columns=["profile", "messageSize", "throughput"])
+
+
+async def getResults(uuid: str, uuids: list, index: str):
+    uuids = excludeRun(uuid, uuids)
+
+    async def search(ids: list) -> list:
+        query = {"query": boolFilter(termsFilter("uuid.keyword", ids))}
+        print(query)
+        es = ElasticService(configpath="ocp.elasticsearch", index=index)
+        response = await es.post(query=query)
+        await es.close()
+        return [item["_source"] for item in response["data"]]
+
+    return list(itertools.chain.from_iterable(await searchChunks(uuids, search)))
+
+
+async def getMatchRuns(
+    meta: dict, workerCount: bool = False, since: Optional[str] = None
+):
+    version = meta["ocpVersion"][:4]
+    fields = ["workerNodesType", "masterNodesType"]
     if workerCount:
-        query = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {
-                            "query_string": {
-                                "query": (
-                                    f'benchmark: "{meta["benchmark"]}$"'
-                                    f' AND workerNodesType: "{meta["workerNodesType"]}"'
-                                    f' AND masterNodesType: "{meta["masterNodesType"]}"'
-                                    f' AND masterNodesCount: "{meta["masterNodesCount"]}"'
-                                    f' AND workerNodesCount: "{meta["workerNodesCount"]}"'
-                                    f' AND platform: "{meta["platform"]}"'
-                                    f" AND ocpVersion: {version}*"
-                                    f" AND jobStatus: success"
-                                )
-                            }
-                        }
-                    ]
-                }
-            }
-        }
+        fields += ["masterNodesCount", "workerNodesCount"]
+    fields.append("platform")
+    query = {
+        "query": boolFilter(
+            matchFilter("benchmark", meta["benchmark"]),
+            *[matchFilter(f, meta[f]) for f in fields],
+            {"prefix": {"ocpVersion.keyword": version}},
+            {"match": {"jobStatus": "success"}},
+            (
+                {"range": {"timestamp": {"gte": since, "format": "yyyy-MM-dd"}}}
+                if since
+                else None
+            ),
+        )
+    }
 
+    query["_source"] = ["uuid"]
     print(query)
     es = ElasticService(configpath="ocp.elasticsearch")
-    response = await es.post(query=query)
+    uuids = [
+        item["_source"]["uuid"] async for item in es.scan(query=query, dedup=JOB_KEY)
+    ]
     await es.close()
-    runs = [item["_source"] for item in response["data"]]
-    uuids = []
-    for run in runs:
-        uuids.append(run["uuid"])
     return uuids
 
 
+async def baselineRuns(meta: dict, workerCount: bool = False) -> BaselineRuns:
+    """Find the successful runs matching a job's configuration
+
+    The runs are kept in the baseline cache, which searches only for runs
+    since its last update. When matching the node counts, the runs' job
+    summaries are fetched, so that runs can be selected by iteration count.
+    """
+    return await baselines.get(
+        BaselineFingerprint.from_meta(meta, workerCount),
+        lambda since: getMatchRuns(meta, workerCount, since),
+        jobSummary if workerCount else None,
+    )
+
+
 """
     [ {
         'y' : ["4,13","4.14"],
@@ -0,0 +1,203 @@
+import asyncio
+from typing import Annotated, Any, Optional
+
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+
+from app.api.v1.commons.constants import MAX_PAGE
+from app.api.v1.commons.query import (
+    boolFilter,
+    compositeBuckets,
+    termFilter,
+    termsFilter,
+)
+from app.services.search import ElasticService
+
+"""Kube-burner metric analytics.
+
+Summarize any kube-burner metric of a set of runs, broken down by UUID or by
+metric labels (e.g., each namespace), and compare it with a baseline set of
+runs. Every statistic of every group is computed by one paged composite
+aggregation with a metric sub-aggregation per statistic, rather than by
+fetching the metric documents; the current and baseline groups are then
+joined by their keys.
+"""
+
+router = APIRouter()
+
+INDEX = "ripsaw-kube-burner*"
+
+# A statistic: a single-value metric aggregation, or a percentile (p99, p99.9)
+STAT_PATTERN = r"^(avg|max|min|sum|p(100|\d{1,2}(\.\d+)?))$"
+
+
+class MetricQuery(BaseModel):
+    """Describe the kube-burner metric statistics to compute
+
+    Fields:
+        uuids: the runs to summarize
+        baseline: the runs to compare with, if any
+        metricName: the metric, "containerCPU"
+        labels: select only metrics with these label values (or any of a
+            list of values), {"namespace": "openshift-etcd"}
+        field: the metric document's numeric field
+        stats: the statistics to compute for each group
+        groupBy: break the statistics down by "uuid" and metric labels
+    """
+
+    uuids: list[str] = Field(min_length=1, max_length=MAX_PAGE)
+    baseline: list[str] = Field(default_factory=list, max_length=MAX_PAGE)
+    metricName: str
+    labels: dict[str, str | list[str]] = Field(default_factory=dict)
+    field: str = "value"
+    stats: list[Annotated[str, Field(pattern=STAT_PATTERN)]] = Field(
+        default=["avg"], min_length=1
+    )
+    groupBy: list[str] = Field(default_factory=list)
+
+
+def groupField(name: str) -> str:
+    """The keyword field of a grouping: the UUID, or a metric label"""
+    return "uuid.keyword" if name == "uuid" else f"labels.{name}.keyword"
+
+
+def statAggs(field: str, stats: list[str]) -> dict[str, Any]:
+    """The metric sub-aggregations computing a list of statistics
+
+    Single-value statistics each have an aggregation named for them, and
+    all percentiles share a "percentiles" aggregation.
+    """
+    aggs = {s: {s: {"field": field}} for s in stats if not s.startswith("p")}
+    percents = sorted({float(s[1:]) for s in stats if s.startswith("p")})
+    if percents:
+        aggs["percentiles"] = {
+            "percentiles": {"field": field, "percents": percents, "keyed": False}
+        }
+    return aggs
+
+
+def bucketStats(bucket: dict[str, Any], stats: list[str]) -> dict[str, Any]:
+    """The statistics of an aggregation bucket, by name"""
+    percentiles = {
+        p["key"]: p["value"] for p in bucket.get("percentiles", {}).get("values", [])
+    }
+    return {
+        s: percentiles.get(float(s[1:])) if s.startswith("p") else bucket[s]["value"]
+        for s in stats
+    }
+
+
+async def groupStats(
+    uuids: list[str], request: MetricQuery
+) -> dict[tuple, dict[str, Any]]:
+    """Compute the statistics of each group of a set of runs' metrics
+
+    Args:
+        uuids: The runs
+        request: The metric, filters, statistics and grouping
+
+    Returns:
+        The statistics of each group, keyed by the tuple of its group values
+        in groupBy order, with the count of its metric documents
+    """
+    filters = [termsFilter("uuid.keyword", uuids)]
+    filters.append(termFilter("metricName.keyword", request.metricName))
+    for label, value in request.labels.items():
+        if isinstance(value, list):
+            filters.append(termsFilter(groupField(label), value))
+        else:
+            filters.append(termFilter(groupField(label), value))
+    if request.groupBy:
+        sources = [{g: {"terms": {"field": groupField(g)}}} for g in request.groupBy]
+    else:
+        # A single group of every metric document
+        sources = [{"all": {"terms": {"field": "metricName.keyword"}}}]
+    groups = {}
+    es = ElasticService(configpath="ocp.elasticsearch", index=INDEX)
+    try:
+        async for bucket in compositeBuckets(
+            lambda q: es.post(q, size=0),
+            {"size": 0, "query": boolFilter(*filters)},
+            sources,
+            aggs=statAggs(request.field, request.stats),
+            name="groups",
+        ):
+            key = tuple(bucket["key"][g] for g in request.groupBy)
+            groups[key] = {
+                "count": bucket["doc_count"],
+                **bucketStats(bucket, request.stats),
+            }
+    finally:
+        await es.close()
+    return groups
+
+
+def change(current: Optional[float], baseline: Optional[float]) -> Optional[float]:
+    """The fractional change of a statistic from its baseline"""
+    if current is None or not baseline:
+        return None
+    return (current - baseline) / abs(baseline)
+
+
+@router.post(
+    "/api/v1/ocp/graph/metrics",
+    summary="Summarize a kube-burner metric across runs",
+    description=(
+        "Compute statistics (avg, max, min, sum, or percentiles such as p99) "
+        "of any kube-burner metric of a set of runs, optionally filtered by "
+        "metric labels and broken down by UUID or labels. With a baseline "
+        "set of runs, each group's statistics are compared with the same "
+        "group of the baseline."
+    ),
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "metricName": "containerCPU",
+                        "groupBy": ["namespace"],
+                        "stats": ["avg", "p99"],
+                        "groups": [
+                            {
+                                "key": {"namespace": "openshift-etcd"},
+                                "current": {"count": 4210, "avg": 38.2, "p99": 91.5},
+                                "baseline": {
+                                    "count": 40110,
+                                    "avg": 35.9,
+                                    "p99": 88.0,
+                                },
+                                "change": {"avg": 0.064, "p99": 0.0398},
+                            }
+                        ],
+                    }
+                }
+            }
+        }
+    },
+)
+async def burner_metrics(request: MetricQuery) -> dict[str, Any]:
+    searches = [groupStats(request.uuids, request)]
+    if request.baseline:
+        searches.append(groupStats(request.baseline, request))
+    current, *rest = await asyncio.gather(*searches)
+    baseline = rest[0] if rest else {}
+
+    groups = []
+    for key in dict.fromkeys([*current, *baseline]):
+        group = {
+            "key": dict(zip(request.groupBy, key)),
+            "current": current.get(key),
+        }
+        if request.baseline:
+            now, then = current.get(key) or {}, baseline.get(key) or {}
+            group["baseline"] = baseline.get(key)
+            group["change"] = {
+                s: change(now.get(s), then.get(s)) for s in request.stats
+            }
+        groups.append(group)
+    return {
+        "metricName": request.metricName,
+        "groupBy": request.groupBy,
+        "stats": request.stats,
+        "groups": groups,
+    }
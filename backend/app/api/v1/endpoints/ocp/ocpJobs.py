@@ -4,7 +4,12 @@ import json
 from fastapi import APIRouter, Response
 from fastapi.param_functions import Query
 
-from app.api.v1.commons.utils import normalize_pagination
+from app.api.v1.commons.utils import (
+    normalize_pagination,
+    partialResults,
+    STREAM_FORMAT_PATTERN,
+    streamJobs,
+)
 
 from ...commons.example_responses import (
     ocp_200_response,
@@ -22,7 +27,10 @@ router = APIRouter()
     description="Returns a list of jobs in the specified dates. \
             If dates are not provided the API will use the following values as defaults: \
             `startDate`: will be set to the day of the request minus 5 days.\
-            `endDate`: will be set to the day of the request.",
+            `endDate`: will be set to the day of the request.\
+            Pass a `cursor` (empty for the first page) to page through exactly \
+            `size` jobs merged across the live and archive clusters; each \
+            response returns the `cursor` for the next page.",
     responses={
         200: ocp_200_response(),
         422: response_422(),
@@ -44,6 +52,13 @@ async def jobs(
     offset: int = Query(None, description="Offset Number to fetch jobs from"),
     sort: str = Query(None, description="To sort fields on specified direction"),
     filter: str = Query(None, description="Query to filter the jobs"),
+    cursor: str = Query(None, description="Continuation cursor for merged pagination"),
+    format: str = Query(
+        None,
+        description="Stream the jobs as `ndjson` (one job per line, with the "
+        "other fields as `X-` headers) or as a `json-stream` of the usual object",
+        pattern=STREAM_FORMAT_PATTERN,
+    ),
 ):
     if start_date is None:
         start_date = datetime.utcnow().date()
@@ -62,19 +77,32 @@ async def jobs(
 
     offset, size = normalize_pagination(offset, size)
     results = await getData(
-        start_date, end_date, size, offset, sort, filter, "ocp.elasticsearch"
+        start_date,
+        end_date,
+        size,
+        offset,
+        sort,
+        filter,
+        "ocp.elasticsearch",
+        cursor=cursor,
     )
-    jobs = []
-    if "data" in results and len(results["data"]) >= 1:
-        jobs = results["data"].to_dict("records")
-
     response = {
         "startDate": start_date.__str__(),
         "endDate": end_date.__str__(),
-        "results": jobs,
+        "results": [],
         "total": results["total"],
         "offset": offset + size,
+        **partialResults(results),
     }
+    if cursor is not None:
+        response["cursor"] = results.get("cursor")
+
+    if format:
+        response.pop("results")
+        return streamJobs(response, results.get("data", []), format)
+
+    if "data" in results and len(results["data"]) >= 1:
+        response["results"] = results["data"].to_dict("records")
 
     if pretty:
         json_str = json.dumps(response, indent=4)
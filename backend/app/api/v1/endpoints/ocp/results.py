@@ -1,11 +1,55 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Body
 from fastapi.param_functions import Path
 
-from app.services.search import ElasticService
+from app.api.v1.commons.constants import MAX_PAGE
+from app.api.v1.commons.utils import getMetadataBulk
 
 router = APIRouter()
 
 
+@router.post(
+    "/api/v1/ocp/jobs/metadata",
+    summary="Returns the metadata of a list of Jobs.",
+    description=(
+        "Look up the metadata of up to 10000 jobs by UUID with a single "
+        "search, returning each job's metadata by UUID and the UUIDs which "
+        "weren't found."
+    ),
+    responses={
+        200: {
+            "content": {
+                "application/json": {
+                    "example": {
+                        "metadata": {
+                            "8b671d0b-8638-4423-b453-cc54b1caf529": {
+                                "uuid": "8b671d0b-8638-4423-b453-cc54b1caf529",
+                                "benchmark": "cluster-density-v2",
+                                "jobStatus": "success",
+                                "ocpVersion": "4.19.0-0.nightly-2025-01-01",
+                            }
+                        },
+                        "missing": ["3a2e6b8c-1f0d-4c35-9a47-2b1e5d7c9f60"],
+                    }
+                }
+            }
+        }
+    },
+)
+async def metadata_for_jobs(
+    uuids: list[str] = Body(
+        ...,
+        max_length=MAX_PAGE,
+        description="UUIDs of the jobs.",
+        examples=[["8b671d0b-8638-4423-b453-cc54b1caf529"]],
+    ),
+):
+    metadata = await getMetadataBulk(uuids, "ocp.elasticsearch")
+    return {
+        "metadata": metadata,
+        "missing": [u for u in dict.fromkeys(uuids) if u not in metadata],
+    }
+
+
 @router.get(
     "/api/v1/ocp/jobs/{ci}/{job_id}", summary="Returns the details of a specified Job."
 )
@@ -21,10 +65,5 @@ async def results_for_job(
         examples=["8b671d0b-8638-4423-b453-cc54b1caf529"],
     ),
 ):
-    query = {"query": {"query_string": {"query": (f'uuid: "{job_id}"')}}}
-
-    es = ElasticService(configpath="ocp.elasticsearch")
-    response = await es.post(query=query)
-    await es.close()
-    tasks = [item["_source"] for item in response["data"]]
-    return tasks
+    metadata = await getMetadataBulk([job_id], "ocp.elasticsearch")
+    return [metadata[job_id]] if job_id in metadata else []
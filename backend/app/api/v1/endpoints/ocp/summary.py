@@ -1,7 +1,9 @@
 from collections import defaultdict
 from dataclasses import dataclass, field
 import time
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
+
+import numpy as np
 
 from app.api.v1.commons.constants import AGG_BUCKET_SIZE, MAX_PAGE
 from app.api.v1.endpoints.summary.summary import BenchmarkBase
@@ -23,8 +25,46 @@ Assisted-by: Cursor + claude-4-sonnet
 """
 
 
+class IterationMemo:
+    """Remember the jobIterations count of each job UUID.
+
+    A finished job's iteration count never changes, so the memo is shared by
+    all requests; beyond maxsize, the oldest entries are forgotten.
+    """
+
+    def __init__(self, maxsize: int = 1_000_000):
+        self.maxsize = maxsize
+        self.iterations: dict[str, Any] = {}
+
+    def lookup(self, uuids: Iterable[str]) -> tuple[dict[str, Any], list[str]]:
+        """Return the known iteration counts, and the unknown UUIDs"""
+        known = {}
+        missing = []
+        for u in uuids:
+            if u in self.iterations:
+                known[u] = self.iterations[u]
+            elif u not in known:
+                missing.append(u)
+        return known, sorted(set(missing))
+
+    def update(self, iterations: dict[str, Any]):
+        """Remember newly found iteration counts"""
+        self.iterations.update(iterations)
+        while len(self.iterations) > self.maxsize:
+            del self.iterations[next(iter(self.iterations))]
+
+    def clear(self):
+        self.iterations.clear()
+
+
+iteration_memo = IterationMemo()
+
+
 class KubeBurnerBenchmark(SearchBenchmark):
     INDEX = "ripsaw-kube-burner"
+    BATCHED = True
+    # Percentiles of the P99 latency reported in each sample's stats
+    PERCENTILES = (50, 90, 95, 99)
     FILTER: dict[str, dict[str, str] | None] = {
         "cluster-density": {
             "metricName.keyword": "podLatencyQuantilesMeasurement",
@@ -49,98 +89,165 @@ class KubeBurnerBenchmark(SearchBenchmark):
     }
 
     async def get_iteration_variants(self, uuids: list[str]) -> dict[str, list[str]]:
-        summary = self.summary
-        filters = [
-            {"terms": {"uuid.keyword": uuids}},
-            {"term": {"metricName.keyword": "jobSummary"}},
-        ]
-        if summary.date_filter:
-            filters.append(summary.date_filter)
-        query = {
-            "query": {"bool": {"filter": filters}},
-            "aggs": {
-                "jobIterations": {
-                    "terms": {
-                        "field": "jobConfig.jobIterations",
-                        "size": 10000,
-                    },
-                    "aggs": {
-                        "uuids": {
-                            "terms": {
-                                "field": "uuid.keyword",
-                                "size": 10000,
-                            }
-                        }
-                    },
-                },
-            },
-        }
+        return (await self.get_iteration_variants_batch([uuids]))[0]
+
+    async def get_iteration_variants_batch(
+        self, groups: list[list[str]]
+    ) -> list[dict[str, list[str]]]:
+        """Find the jobIterations variants of several lists of UUIDs at once.
+
+        Iteration counts already known to the iteration_memo aren't searched
+        again; the rest are found from the "jobSummary" metrics of all the
+        lists with a single paged composite aggregation.
+
+        Args:
+            groups: Lists of UUIDs
 
-        response = await summary.service.post(indice=self.INDEX, query=query, size=0)
-        variants = defaultdict(list)
-        for iterations in response["aggregations"]["jobIterations"]["buckets"]:
-            us = sorted([u["key"] for u in iterations["uuids"]["buckets"]])
-            variants[iterations["key"]].extend(us)
-        return variants
+        Returns:
+            For each list, its UUIDs (sorted) by iteration count
+        """
+        summary = self.summary
+        known, missing = iteration_memo.lookup(u for uuids in groups for u in uuids)
+        if missing:
+            filters = [
+                {"terms": {"uuid.keyword": missing}},
+                {"term": {"metricName.keyword": "jobSummary"}},
+            ]
+            if summary.date_filter:
+                filters.append(summary.date_filter)
+            found = {}
+            async for bucket in summary.composite_buckets(
+                self.INDEX,
+                {"query": {"bool": {"filter": filters}}},
+                [
+                    {"uuid": {"terms": {"field": "uuid.keyword"}}},
+                    {"iterations": {"terms": {"field": "jobConfig.jobIterations"}}},
+                ],
+            ):
+                found[bucket["key"]["uuid"]] = bucket["key"]["iterations"]
+            iteration_memo.update(found)
+            known.update(found)
+        results = []
+        for uuids in groups:
+            variants = defaultdict(list)
+            for u in sorted(uuids):
+                if u in known:
+                    variants[known[u]].append(u)
+            results.append(dict(sorted(variants.items())))
+        return results
 
     async def process(
         self, version: str, config: str, variant: Any, uuids: list[str]
     ) -> dict[str, Any]:
+        return (await self.process_batch(version, [(config, variant, uuids)]))[0]
+
+    async def process_batch(
+        self, version: str, variants: list[tuple[str, Any, list[str]]]
+    ) -> list[dict[str, Any]]:
+        """Sample the P99 latency of all variants with a single search.
+
+        The uuid, timestamp and P99 of every job of the variants are streamed
+        into columns in timestamp order, grouped by variant, and summarized
+        locally rather than by a search aggregation for each variant.
+
+        Args:
+            version: The product version
+            variants: A (config, variant, uuids) tuple for each variant
+
+        Returns:
+            A sample for each variant, in order
+        """
         summary = self.summary
-        filters = [{"terms": {"uuid.keyword": uuids}}]
+        variant_of = {u: i for i, (_, _, uuids) in enumerate(variants) for u in uuids}
+        filters = [{"terms": {"uuid.keyword": list(variant_of)}}]
         if summary.date_filter:
             filters.append(summary.date_filter)
         f = self.FILTER.get(self.benchmark)
         if f:
             filters.extend([{"term": {k: v}} for k, v in f.items()])
-        response = await summary.service.post(
+        uuids, timestamps, p99 = [], [], []
+        async for hit in summary.service.scan(
             indice=self.INDEX,
-            size=MAX_PAGE,
+            page_size=MAX_PAGE,
             query={
                 "query": {"bool": {"filter": filters}},
                 "sort": [{"timestamp": {"order": "asc"}}],
-                "aggs": {
-                    "stats": {
-                        "extended_stats": {
-                            "field": "P99",
-                        }
-                    },
-                },
+                "_source": ["uuid", "timestamp", "P99"],
             },
-        )
-        x = []
-        y = []
-        values = []
-        for hit in response["hits"]["hits"]:
+        ):
             v = hit["_source"]
-            values.append(
-                {
-                    "uuid": v["uuid"],
-                    "timestamp": v["timestamp"],
-                    "value": v["P99"],
-                }
+            uuids.append(v["uuid"])
+            timestamps.append(v["timestamp"])
+            p99.append(v["P99"])
+
+        groups = np.fromiter(
+            (variant_of.get(u, -1) for u in uuids), dtype=np.int64, count=len(uuids)
+        )
+        # A stable sort by variant keeps each variant's jobs in timestamp order
+        order = np.argsort(groups, kind="stable")
+        bounds = np.searchsorted(groups[order], np.arange(len(variants) + 1))
+        uuids = np.asarray(uuids, dtype=object)
+        timestamps = np.asarray(timestamps, dtype=object)
+        p99 = np.asarray(p99) if p99 else np.empty(0)
+        samples = []
+        for i, (config, variant, _) in enumerate(variants):
+            rows = order[bounds[i] : bounds[i + 1]]
+            samples.append(
+                self.build_sample(
+                    f"{version} {self.benchmark} {config} {variant}",
+                    uuids[rows],
+                    timestamps[rows],
+                    p99[rows],
+                )
             )
-            x.append(v["timestamp"])
-            y.append(int(v["P99"]))
-        stats = response["aggregations"]["stats"]
-        sample = {
-            "values": values,
+        return samples
+
+    @classmethod
+    def build_sample(
+        cls,
+        name: str,
+        uuids: np.ndarray,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+    ) -> dict[str, Any]:
+        """Build a variant's sample from its columns of job values."""
+        x = timestamps.tolist()
+        if len(values):
+            stats = {
+                "min": values.min().item(),
+                "max": values.max().item(),
+                "avg": float(values.mean()),
+                "std_dev": float(values.std()),
+                "percentiles": {
+                    f"{p:.1f}": v
+                    for p, v in zip(
+                        cls.PERCENTILES, np.percentile(values, cls.PERCENTILES).tolist()
+                    )
+                },
+            }
+        else:
+            stats = {
+                "min": None,
+                "max": None,
+                "avg": None,
+                "std_dev": None,
+                "percentiles": {},
+            }
+        return {
+            "values": [
+                {"uuid": u, "timestamp": t, "value": v}
+                for u, t, v in zip(uuids.tolist(), x, values.tolist())
+            ],
             "graph": {
                 "x": x,
-                "y": y,
-                "name": f"{version} {self.benchmark} {config} {variant}",
+                "y": values.astype(np.int64).tolist(),
+                "name": name,
                 "type": "scatter",
                 "mode": "lines+markers",
                 "orientation": "v",
             },
-            "stats": {
-                "min": stats["min"],
-                "max": stats["max"],
-                "avg": stats["avg"],
-                "std_dev": stats["std_deviation"],
-            },
+            "stats": stats,
         }
-        return sample
 
     async def evaluate(self, metric: dict[str, Any]) -> str:
         """Evaluate a metric sample for the primary "readiness" KPI.
@@ -182,6 +289,7 @@ class KubeBurnerBenchmark(SearchBenchmark):
 
 class K8sNetperfBenchmark(SearchBenchmark):
     INDEX = "k8s-netperf"
+    HIGHER_IS_BETTER = True
 
     async def get_iteration_variants(self, uuids: list[str]) -> dict[str, list[str]]:
         """This benchmark doesn't have separate iteration counts to track."""
@@ -423,6 +531,8 @@ class OcpFingerprint(PerfCiFingerprint):
 
 class OcpSummary(SummarySearch):
 
+    fingerprint = OcpFingerprint
+
     def __init__(self, product: str, configpath: str = "ocp.elasticsearch"):
         super().__init__(product, configpath, BENCHMARK_MAPPER)
 
@@ -462,150 +572,6 @@ class OcpSummary(SummarySearch):
         print(f"discovered {len(versions)} versions: {time.time()-start:3f} seconds")
         return {k: sorted(v) for k, v in versions.items()}
 
-    async def get_benchmarks(self, version: str) -> dict[str, Any]:
-        """Return a list of benchmarks run for a given product version.
-
-        Args:
-            version: The product version to get benchmarks for.
-
-        Returns:
-            A list of benchmarks and the configurations for which each is run.
-        """
-        filters = [
-            {"match": {"jobStatus": "success"}},
-        ]
-        if self.date_filter:
-            filters.append(self.date_filter)
-        print("get_benchmarks", version)
-        query = {
-            "size": 0,
-            "query": {
-                "bool": {
-                    "filter": filters,
-                    "must": [{"query_string": {"query": f"ocpVersion:{version}*"}}],
-                },
-            },
-            "aggs": {
-                "configurations": {
-                    "composite": {
-                        "sources": OcpFingerprint.composite(),
-                        "size": AGG_BUCKET_SIZE,
-                    },
-                    "aggs": {
-                        "benchmarks": {
-                            "terms": {
-                                "field": "benchmark.keyword",
-                                "size": AGG_BUCKET_SIZE,
-                            },
-                            "aggs": {
-                                "uuids": {
-                                    "terms": {
-                                        "field": "uuid.keyword",
-                                        "size": AGG_BUCKET_SIZE,
-                                    }
-                                },
-                            },
-                        }
-                    },
-                },
-            },
-        }
-        start = time.time()
-        response = await self.service.post(query=query, size=0)
-        benchmarks = set()
-        by_benchmark = defaultdict(list)
-        for config in response["aggregations"]["configurations"]["buckets"]:
-            bees = defaultdict(set)
-            for benchmark in config["benchmarks"]["buckets"]:
-                benchmarks.add(benchmark["key"])
-                for uuid in benchmark["uuids"]["buckets"]:
-                    bees[benchmark["key"]].add(uuid["key"])
-            for b, u in bees.items():
-                by_benchmark[b].append(
-                    {
-                        "configuration": OcpFingerprint.parse(config["key"]),
-                        "uuids": list(u),
-                    }
-                )
-                benchmarks.add(b)
-        print(
-            f"discovered {version} benchmark hierarchy: {time.time()-start:3f} seconds"
-        )
-        return dict(by_benchmark)
-
-    async def get_iterations(
-        self,
-        versions: Optional[str] = None,
-        benchmarks: Optional[str] = None,
-        configs: Optional[str] = None,
-    ) -> dict[str, Any]:
-        """Break down our benchmark configuration data by job iterations.
-
-        We can only compare benchmark metrics across the same configuration and
-        job iteration count. While the configuration data is in the job
-        documents, the job iteration count is recorded within a special
-        "jobConfiguration" metric.
-
-        This function identifies the set of jobs that can be compared based on
-        identical configuration and iteration count.
-
-        TODO: this should allow targeting a specific OCP configuration.
-        (Although I've yet to figure out how to compactly represent the
-        configuration tuple in a query parameter.)
-        """
-        start = time.time()
-
-        vees = sorted(
-            (await self.get_versions()).keys()
-            if not versions
-            else self.break_list(versions)
-        )
-
-        benches = self.break_list(benchmarks) if benchmarks else None
-
-        benchmark_metrics = defaultdict(
-            lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
-        )
-        config_key = defaultdict(dict)
-        for ver in vees:
-            bees = await self.get_benchmarks(ver)
-            for benchmark, configurations in bees.items():
-                if benches and benchmark not in benches:
-                    continue
-
-                try:
-                    klass = self.get_helper(benchmark)
-                except ValueError as e:
-                    print(f"Benchmark {benchmark} not supported: {e}")
-                    benchmark_metrics[ver][benchmark] = {}
-                    continue
-
-                for config in configurations:
-                    uuids = sorted(config["uuids"])
-                    ck = config["configuration"].key()
-                    config_key[ck] = config["configuration"].json()
-                    variants = await klass.get_iteration_variants(uuids)
-                    if not variants:
-                        print(f"No {ver} {benchmark} {ck} variants found")
-                        benchmark_metrics[ver][benchmark][ck] = {}
-                        continue
-                    for iter, uuids in variants.items():
-                        benchmark_metrics[ver][benchmark][ck][iter].extend(uuids)
-        benchmark_report = {
-            "config_key": config_key,
-            "benchmarks": {
-                v: {
-                    b: {
-                        c: {j: sorted(u) for j, u in vs.items()} for c, vs in cf.items()
-                    }
-                    for b, cf in d.items()
-                }
-                for v, d in benchmark_metrics.items()
-            },
-        }
-        print(f"benchmark iterations: {time.time()-start:.3f} seconds")
-        return benchmark_report
-
     async def get_configs(
         self,
         versions: Optional[str] = None,
@@ -638,85 +604,3 @@ class OcpSummary(SummarySearch):
             },
         }
         return configs
-
-    def is_ready(self, readiness: set[str]) -> str:
-        """Determine if the set of readiness indicators is "ready".
-
-        Args:
-            readiness: A set of readiness indicators.
-
-        Returns:
-            "ready", "warning", or "not ready"
-        """
-        return (
-            "not ready"
-            if "not ready" in readiness
-            else "warning" if "warning" in readiness else "ready"
-        )
-
-    async def metric_aggregation(
-        self,
-        versions: Optional[str] = None,
-        benchmarks: Optional[str] = None,
-        configs: Optional[str] = None,
-    ) -> dict[str, Any]:
-        """Report aggregated metrics for each benchmark configuration.
-
-        For each selected version, benchmark, configuration, report on the
-        primary "readiness" KPI. The results include a list of individual
-        timestamped values, a statistical summary, and a Plotly-formatted
-        graph of the individual runs.
-
-        Args:
-            versions: Select only the named versions (comma-separated list)
-            benchmarks: Select only the named benchmarks (comma-separated list)
-            configs: Select only the named configurations (comma-separated list)
-
-        """
-        start = time.time()
-
-        iterations = await self.get_iterations(versions, benchmarks)
-        breakdown = iterations["benchmarks"]
-        version_samples = defaultdict()
-        product_readiness = set()
-        for ver, benchmarks in breakdown.items():
-            version_readiness = set()
-            benchmark_samples = defaultdict()
-            for benchmark, configs in benchmarks.items():
-                try:
-                    klass = self.get_helper(benchmark)
-                except ValueError as e:
-                    print(f"Benchmark {benchmark} not supported: {e}")
-                    continue
-                benchmark_readiness = set()
-                config_samples = defaultdict()
-                for config, job_iterations in configs.items():
-                    config_readiness = set()
-                    iteration_samples = defaultdict()
-                    for variation, uuids in job_iterations.items():
-                        sample = await klass.process(ver, config, variation, uuids)
-                        readiness = await klass.evaluate(sample)
-                        config_readiness.add(readiness)
-                        sample["readiness"] = readiness
-                        iteration_samples[variation] = sample
-                    config_samples[config] = {
-                        "iterations": iteration_samples,
-                        "readiness": self.is_ready(config_readiness),
-                    }
-                    benchmark_readiness.update(config_readiness)
-                benchmark_samples[benchmark] = {
-                    "configurations": config_samples,
-                    "readiness": self.is_ready(benchmark_readiness),
-                }
-                version_readiness.update(benchmark_readiness)
-            version_samples[ver] = {
-                "benchmarks": benchmark_samples,
-                "readiness": self.is_ready(version_readiness),
-            }
-            product_readiness.update(version_readiness)
-        print(f"benchmark KPI report: {time.time()-start:.3f} seconds")
-        return {
-            "config_key": iterations["config_key"],
-            "versions": version_samples,
-            "readiness": self.is_ready(product_readiness),
-        }
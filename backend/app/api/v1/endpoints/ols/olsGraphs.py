@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from app.api.v1.commons.constants import JOB_KEY
+from app.api.v1.commons.query import boolFilter, matchFilter, termsFilter
+from app.api.v1.commons.tasks import TaskGraph
 from app.api.v1.commons.utils import getMetadata
 from app.services.search import ElasticService
 
@@ -23,14 +26,22 @@ async def graph(uuid: str):
         "post_query_with_cache",
         "post_streaming_query_with_cache",
     ]
-    currentApiData = None
-    metadata = await getMetadata(uuid, "ocp.elasticsearch")
-    uuids = await getMatchRuns(metadata)
-    if uuid in uuids and len(uuids) > 1:
-        uuids.remove(uuid)
-        currentApiData = await getApiMetrics([uuid], metric_names, api_index)
-    previousApiData = await getApiMetrics(uuids, metric_names, api_index)
-    if currentApiData is None:
+    steps = TaskGraph()
+    steps.add("metadata", getMetadata, uuid, "ocp.elasticsearch")
+    steps.after("uuids", getMatchRuns, "metadata")
+    uuids = await steps.wait("uuids")
+    previous = excludeRun(uuid, uuids)
+    steps.add("previousApiData", getApiMetrics, previous, metric_names, api_index)
+    # The job's own metrics are fetched with the baseline's, if the job was
+    # excluded from a baseline of other runs
+    compared = len(previous) < len(uuids)
+    if compared:
+        steps.add("currentApiData", getApiMetrics, [uuid], metric_names, api_index)
+    results = await steps.run()
+    previousApiData = results["previousApiData"]
+    if compared:
+        currentApiData = results["currentApiData"]
+    else:
         currentApiData = previousApiData
     previousLatencies, previousApiResults = await parseApiResults(previousApiData)
     currentLatencies, currentApiResults = await parseApiResults(currentApiData)
@@ -88,6 +99,14 @@ async def graph(uuid: str):
     return {"latencyResults": latencyResults, "apiResults": apiResults}
 
 
+def excludeRun(uuid: str, uuids: list) -> list:
+    """The matching runs other than the job itself, if there are others"""
+    if uuid in uuids and len(uuids) > 1:
+        uuids = uuids.copy()
+        uuids.remove(uuid)
+    return uuids
+
+
 async def parseApiResults(apiData: dict):
     latencies, apiResults = dict(), dict()
     for each in apiData["aggregations"]["group_by_metric"]["buckets"]:
@@ -98,14 +117,10 @@ async def parseApiResults(apiData: dict):
 
 async def getApiMetrics(uuids: list, metric_names: list, index: str):
     query = {
-        "query": {
-            "bool": {
-                "filter": [
-                    {"terms": {"uuid.keyword": uuids}},
-                    {"terms": {"metricName.keyword": metric_names}},
-                ]
-            }
-        },
+        "query": boolFilter(
+            termsFilter("uuid.keyword", uuids),
+            termsFilter("metricName.keyword", metric_names),
+        ),
         "aggs": {
             "group_by_metric": {
                 "terms": {"field": "metricName.keyword", "size": 10000},
@@ -125,36 +140,28 @@ async def getApiMetrics(uuids: list, metric_names: list, index: str):
 
 
 async def getMatchRuns(metadata: dict):
+    fields = [
+        "benchmark",
+        "olsTestDuration",
+        "olsTestWorkers",
+        "infraNodesType",
+        "workerNodesType",
+        "masterNodesType",
+        "masterNodesCount",
+        "workerNodesCount",
+        "infraNodesCount",
+        "releaseStream",
+    ]
     query = {
-        "query": {
-            "bool": {
-                "must": [
-                    {
-                        "query_string": {
-                            "query": (
-                                f'benchmark: "{metadata["benchmark"]}$"'
-                                f' AND olsTestDuration: "{metadata["olsTestDuration"]}"'
-                                f' AND olsTestWorkers: "{metadata["olsTestWorkers"]}"'
-                                f' AND infraNodesType: "{metadata["infraNodesType"]}"'
-                                f' AND workerNodesType: "{metadata["workerNodesType"]}"'
-                                f' AND masterNodesType: "{metadata["masterNodesType"]}"'
-                                f' AND masterNodesCount: "{metadata["masterNodesCount"]}"'
-                                f' AND workerNodesCount: "{metadata["workerNodesCount"]}"'
-                                f' AND infraNodesCount: "{metadata["infraNodesCount"]}"'
-                                f' AND releaseStream: "{metadata["releaseStream"]}"'
-                                f" AND jobStatus: success"
-                            )
-                        }
-                    }
-                ]
-            }
-        }
+        "query": boolFilter(
+            *[matchFilter(f, metadata[f]) for f in fields],
+            {"match": {"jobStatus": "success"}},
+        )
     }
+    query["_source"] = ["uuid"]
     es = ElasticService(configpath="ocp.elasticsearch")
-    response = await es.post(query=query)
+    uuids = [
+        item["_source"]["uuid"] async for item in es.scan(query=query, dedup=JOB_KEY)
+    ]
     await es.close()
-    runs = [item["_source"] for item in response["data"]]
-    uuids = []
-    for run in runs:
-        uuids.append(run["uuid"])
     return uuids
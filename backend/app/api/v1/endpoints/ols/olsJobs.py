@@ -10,6 +10,7 @@ from ...commons.example_responses import (
     response_422,
 )
 from ...commons.ols import getFilterData
+from ...commons.utils import STREAM_FORMAT_PATTERN
 from ...endpoints.ocp.ocpJobs import jobs as ocpJobs
 
 router = APIRouter()
@@ -43,6 +44,12 @@ async def jobs(
     offset: int = Query(None, description="Offset Number to fetch jobs from"),
     sort: str = Query(None, description="To sort fields on specified direction"),
     filter: str = Query(None, description="Query to filter the jobs"),
+    format: str = Query(
+        None,
+        description="Stream the jobs as `ndjson` (one job per line, with the "
+        "other fields as `X-` headers) or as a `json-stream` of the usual object",
+        pattern=STREAM_FORMAT_PATTERN,
+    ),
 ):
     filter_clause = "benchmark='ols-load-generator'"
     filter = (
@@ -50,7 +57,17 @@ async def jobs(
         if not filter
         else filter if filter_clause in filter else f"{filter}&{filter_clause}"
     )
-    return await ocpJobs(start_date, end_date, pretty, size, offset, sort, filter)
+    return await ocpJobs(
+        start_date,
+        end_date,
+        pretty,
+        size,
+        offset,
+        sort,
+        filter,
+        cursor=None,
+        format=format,
+    )
 
 
 @router.get(
@@ -4,7 +4,7 @@ import json
 from fastapi import APIRouter, Response
 from fastapi.param_functions import Query
 
-from app.api.v1.commons.utils import normalize_pagination
+from app.api.v1.commons.utils import normalize_pagination, partialResults
 
 from ...commons.example_responses import (
     oso_200_response,
@@ -74,6 +74,7 @@ async def jobs(
         "results": jobs,
         "total": results["total"],
         "offset": offset + size,
+        **partialResults(results),
     }
 
     if pretty:
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
-from app.api.v1.commons.constants import AGG_BUCKET_SIZE
+from app.api.v1.commons.constants import AGG_BUCKET_SIZE, JOB_KEY
+from app.api.v1.commons.query import boolFilter, matchFilter, termsFilter
+from app.api.v1.commons.tasks import TaskGraph
 from app.api.v1.commons.utils import getMetadata
 from app.services.search import ElasticService
 
@@ -11,16 +13,26 @@ router = APIRouter()
 async def graph(uuid: str):
     api_index = "quay-vegeta-results"
     image_push_pull_index = "quay-push-pull"
-    meta = await getMetadata(uuid, "quay.elasticsearch")
-    uuids = await getMatchRuns(meta)
-    prevApiData = await getQuayMetrics(uuids, api_index)
-    prevImagesData = await getImageMetrics(uuids, image_push_pull_index)
+    steps = TaskGraph()
+    steps.add("meta", getMetadata, uuid, "quay.elasticsearch")
+    steps.after("uuids", getMatchRuns, "meta")
+    steps.after("prevApiData", getQuayMetrics, "uuids", index=api_index)
+    steps.after("prevImagesData", getImageMetrics, "uuids", index=image_push_pull_index)
+    # The job's own metrics are fetched with the baseline's, if there's a
+    # baseline other than the job itself
+    compared = len(await steps.wait("uuids")) > 1
+    if compared:
+        steps.add("currentApiData", getQuayMetrics, [uuid], api_index)
+        steps.add("currentImagesData", getImageMetrics, [uuid], image_push_pull_index)
+    results = await steps.run()
+    prevApiData = results["prevApiData"]
+    prevImagesData = results["prevImagesData"]
     apiResults = []
     imageResults = []
     latencyResults = []
-    if len(uuids) > 1:
-        currentApiData = await getQuayMetrics([uuid], api_index)
-        currentImagesData = await getImageMetrics([uuid], image_push_pull_index)
+    if compared:
+        currentApiData = results["currentApiData"]
+        currentImagesData = results["currentImagesData"]
     else:
         currentApiData = prevApiData
         currentImagesData = prevImagesData
@@ -153,7 +165,6 @@ async def parseImageResults(data: dict):
 
 
 async def getImageMetrics(uuids: list, index: str):
-    ids = '" OR uuid: "'.join(uuids)
     query = {
         "size": 0,
         "aggs": {
@@ -166,9 +177,7 @@ async def getImageMetrics(uuids: list, index: str):
                 },
             }
         },
-        "query": {
-            "bool": {"must": [{"query_string": {"query": (f'( uuid: "{ids}" )')}}]}
-        },
+        "query": boolFilter(termsFilter("uuid.keyword", uuids)),
     }
     print(query)
     es = ElasticService(configpath="quay.elasticsearch", index=index)
@@ -178,7 +187,6 @@ async def getImageMetrics(uuids: list, index: str):
 
 
 async def getQuayMetrics(uuids: list, index: str):
-    ids = '" OR uuid: "'.join(uuids)
     query = {
         "size": 0,
         "aggs": {
@@ -198,9 +206,7 @@ async def getQuayMetrics(uuids: list, index: str):
             "status_codes.503": {"avg": {"field": "status_codes.503"}},
             "status_codes.504": {"avg": {"field": "status_codes.504"}},
         },
-        "query": {
-            "bool": {"must": [{"query_string": {"query": (f'( uuid: "{ids}" )')}}]}
-        },
+        "query": boolFilter(termsFilter("uuid.keyword", uuids)),
     }
     print(query)
     es = ElasticService(configpath="quay.elasticsearch", index=index)
@@ -210,37 +216,29 @@ async def getQuayMetrics(uuids: list, index: str):
 
 
 async def getMatchRuns(meta: dict):
+    fields = [
+        "benchmark",
+        "hitSize",
+        "concurrency",
+        "imagePushPulls",
+        "workerNodesType",
+        "masterNodesType",
+        "masterNodesCount",
+        "workerNodesCount",
+        "releaseStream",
+    ]
     query = {
-        "query": {
-            "bool": {
-                "must": [
-                    {
-                        "query_string": {
-                            "query": (
-                                f'benchmark: "{meta["benchmark"]}$"'
-                                f' AND hitSize: "{meta["hitSize"]}"'
-                                f' AND concurrency: "{meta["concurrency"]}"'
-                                f' AND imagePushPulls: "{meta["imagePushPulls"]}"'
-                                f' AND workerNodesType: "{meta["workerNodesType"]}"'
-                                f' AND masterNodesType: "{meta["masterNodesType"]}"'
-                                f' AND masterNodesCount: "{meta["masterNodesCount"]}"'
-                                f' AND workerNodesCount: "{meta["workerNodesCount"]}"'
-                                f' AND releaseStream: "{meta["releaseStream"]}"'
-                                f" AND jobStatus: success"
-                            )
-                        }
-                    }
-                ]
-            }
-        }
+        "query": boolFilter(
+            *[matchFilter(f, meta[f]) for f in fields],
+            {"match": {"jobStatus": "success"}},
+        )
     }
 
+    query["_source"] = ["uuid"]
     print(query)
     es = ElasticService(configpath="quay.elasticsearch")
-    response = await es.post(query=query)
+    uuids = [
+        item["_source"]["uuid"] async for item in es.scan(query=query, dedup=JOB_KEY)
+    ]
     await es.close()
-    runs = [item["_source"] for item in response["data"]]
-    uuids = []
-    for run in runs:
-        uuids.append(run["uuid"])
     return uuids
@@ -4,7 +4,12 @@ import json
 from fastapi import APIRouter, Response
 from fastapi.param_functions import Query
 
-from app.api.v1.commons.utils import normalize_pagination
+from app.api.v1.commons.utils import (
+    normalize_pagination,
+    partialResults,
+    STREAM_FORMAT_PATTERN,
+    streamJobs,
+)
 
 from ...commons.example_responses import (
     quay_200_response,
@@ -44,6 +49,12 @@ async def jobs(
     offset: int = Query(None, description="Offset Number to fetch jobs from"),
     sort: str = Query(None, description="To sort fields on specified direction"),
     filter: str = Query(None, description="Query to filter the jobs"),
+    format: str = Query(
+        None,
+        description="Stream the jobs as `ndjson` (one job per line, with the "
+        "other fields as `X-` headers) or as a `json-stream` of the usual object",
+        pattern=STREAM_FORMAT_PATTERN,
+    ),
 ):
     if start_date is None:
         start_date = datetime.utcnow().date()
@@ -66,18 +77,22 @@ async def jobs(
         start_date, end_date, size, offset, sort, filter, "quay.elasticsearch"
     )
 
-    jobs = []
-    if "data" in results and len(results["data"]) >= 1:
-        jobs = results["data"].to_dict("records")
-
     response = {
         "startDate": start_date.__str__(),
         "endDate": end_date.__str__(),
-        "results": jobs,
+        "results": [],
         "total": results["total"],
         "offset": offset + size,
+        **partialResults(results),
     }
 
+    if format:
+        response.pop("results")
+        return streamJobs(response, results.get("data", []), format)
+
+    if "data" in results and len(results["data"]) >= 1:
+        response["results"] = results["data"].to_dict("records")
+
     if pretty:
         json_str = json.dumps(response, indent=4)
         return Response(content=json_str, media_type="application/json")
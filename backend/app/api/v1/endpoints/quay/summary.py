@@ -239,6 +239,8 @@ class QuayFingerprint(PerfCiFingerprint):
 
 class QuaySummary(SummarySearch):
 
+    fingerprint = QuayFingerprint
+
     def __init__(self, product: str, configpath: str = "quay.elasticsearch"):
         super().__init__(product, configpath, BENCHMARK_MAPPER)
 
@@ -278,150 +280,6 @@ class QuaySummary(SummarySearch):
         print(f"discovered {len(versions)} versions: {time.time()-start:3f} seconds")
         return {k: sorted(v) for k, v in versions.items()}
 
-    async def get_benchmarks(self, version: str) -> dict[str, Any]:
-        """Return a list of benchmarks run for a given product version.
-
-        Args:
-            version: The product version to get benchmarks for.
-
-        Returns:
-            A list of benchmarks and the configurations for which each is run.
-        """
-        filters = [
-            {"match": {"jobStatus": "success"}},
-        ]
-        if self.date_filter:
-            filters.append(self.date_filter)
-        print("get_benchmarks", version)
-        query = {
-            "size": 0,
-            "query": {
-                "bool": {
-                    "filter": filters,
-                    "must": [{"query_string": {"query": f"ocpVersion:{version}*"}}],
-                },
-            },
-            "aggs": {
-                "configurations": {
-                    "composite": {
-                        "sources": QuayFingerprint.composite(),
-                        "size": AGG_BUCKET_SIZE,
-                    },
-                    "aggs": {
-                        "benchmarks": {
-                            "terms": {
-                                "field": "benchmark.keyword",
-                                "size": AGG_BUCKET_SIZE,
-                            },
-                            "aggs": {
-                                "uuids": {
-                                    "terms": {
-                                        "field": "uuid.keyword",
-                                        "size": AGG_BUCKET_SIZE,
-                                    }
-                                },
-                            },
-                        }
-                    },
-                },
-            },
-        }
-        start = time.time()
-        response = await self.service.post(query=query, size=0)
-        benchmarks = set()
-        by_benchmark = defaultdict(list)
-        for config in response["aggregations"]["configurations"]["buckets"]:
-            bees = defaultdict(set)
-            for benchmark in config["benchmarks"]["buckets"]:
-                benchmarks.add(benchmark["key"])
-                for uuid in benchmark["uuids"]["buckets"]:
-                    bees[benchmark["key"]].add(uuid["key"])
-            for b, u in bees.items():
-                by_benchmark[b].append(
-                    {
-                        "configuration": QuayFingerprint.parse(config["key"]),
-                        "uuids": list(u),
-                    }
-                )
-                benchmarks.add(b)
-        print(
-            f"discovered {version} benchmark hierarchy: {time.time()-start:3f} seconds"
-        )
-        return dict(by_benchmark)
-
-    async def get_iterations(
-        self,
-        versions: Optional[str] = None,
-        benchmarks: Optional[str] = None,
-        configs: Optional[str] = None,
-    ) -> dict[str, Any]:
-        """Break down our benchmark configuration data by job iterations.
-
-        We can only compare benchmark metrics across the same configuration and
-        job iteration count. While the configuration data is in the job
-        documents, the job iteration count is recorded within a special
-        "jobConfiguration" metric.
-
-        This function identifies the set of jobs that can be compared based on
-        identical configuration and iteration count.
-
-        TODO: this should allow targeting a specific OCP configuration.
-        (Although I've yet to figure out how to compactly represent the
-        configuration tuple in a query parameter.)
-        """
-        start = time.time()
-
-        vees = sorted(
-            (await self.get_versions()).keys()
-            if not versions
-            else self.break_list(versions)
-        )
-
-        benches = self.break_list(benchmarks) if benchmarks else None
-
-        benchmark_metrics = defaultdict(
-            lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
-        )
-        config_key = defaultdict(dict)
-        for ver in vees:
-            bees = await self.get_benchmarks(ver)
-            for benchmark, configurations in bees.items():
-                if benches and benchmark not in benches:
-                    continue
-
-                try:
-                    klass = self.get_helper(benchmark)
-                except ValueError as e:
-                    print(f"Benchmark {benchmark} not supported: {e}")
-                    benchmark_metrics[ver][benchmark] = {}
-                    continue
-
-                for config in configurations:
-                    uuids = sorted(config["uuids"])
-                    ck = config["configuration"].key()
-                    config_key[ck] = config["configuration"].json()
-                    variants = await klass.get_iteration_variants(uuids)
-                    if not variants:
-                        print(f"Benchmark {benchmark} variants not found")
-                        benchmark_metrics[ver][benchmark][ck] = {}
-                        continue
-                    for iter, uuids in variants.items():
-                        benchmark_metrics[ver][benchmark][ck][iter].extend(uuids)
-        benchmark_report = {
-            "config_key": config_key,
-            "benchmarks": {
-                v: {
-                    b: {
-                        c: {j: sorted(u) for j, u in vs.items()} for c, vs in cf.items()
-                    }
-                    for b, cf in d.items()
-                }
-                for v, d in benchmark_metrics.items()
-            },
-        }
-        print(f"benchmark iterations: {time.time()-start:.3f} seconds")
-        return benchmark_report
-
     async def get_configs(
         self,
         versions: Optional[str] = None,
@@ -454,85 +312,3 @@ class QuaySummary(SummarySearch):
             },
         }
         return configs
-
-    def is_ready(self, readiness: set[str]) -> str:
-        """Determine if the set of readiness indicators is "ready".
-
-        Args:
-            readiness: A set of readiness indicators.
-
-        Returns:
-            "ready", "warning", or "not ready"
-        """
-        return (
-            "not ready"
-            if "not ready" in readiness
-            else "warning" if "warning" in readiness else "ready"
-        )
-
-    async def metric_aggregation(
-        self,
-        versions: Optional[str] = None,
-        benchmarks: Optional[str] = None,
-        configs: Optional[str] = None,
-    ) -> dict[str, Any]:
-        """Report aggregated metrics for each benchmark configuration.
-
-        For each selected version, benchmark, configuration, report on the
-        primary "readiness" KPI. The results include a list of individual
-        timestamped values, a statistical summary, and a Plotly-formatted
-        graph of the individual runs.
-
-        Args:
-            versions: Select only the named versions (comma-separated list)
-            benchmarks: Select only the named benchmarks (comma-separated list)
-            configs: Select only the named configurations (comma-separated list)
-
-        """
-        start = time.time()
-
-        iterations = await self.get_iterations(versions, benchmarks)
-        breakdown = iterations["benchmarks"]
-        version_samples = defaultdict()
-        product_readiness = set()
-        for ver, benchmarks in breakdown.items():
-            version_readiness = set()
-            benchmark_samples = defaultdict()
-            for benchmark, configs in benchmarks.items():
-                try:
-                    klass = self.get_helper(benchmark)
-                except ValueError as e:
-                    print(f"Benchmark {benchmark} not supported: {e}")
-                    continue
-                benchmark_readiness = set()
-                config_samples = defaultdict()
-                for config, job_iterations in configs.items():
-                    config_readiness = set()
-                    iteration_samples = defaultdict()
-                    for variation, uuids in job_iterations.items():
-                        sample = await klass.process(ver, config, variation, uuids)
-                        readiness = await klass.evaluate(sample)
-                        config_readiness.add(readiness)
-                        sample["readiness"] = readiness
-                        iteration_samples[variation] = sample
-                    config_samples[config] = {
-                        "iterations": iteration_samples,
-                        "readiness": self.is_ready(config_readiness),
-                    }
-                    benchmark_readiness.update(config_readiness)
-                benchmark_samples[benchmark] = {
-                    "configurations": config_samples,
-                    "readiness": self.is_ready(benchmark_readiness),
-                }
-                version_readiness.update(benchmark_readiness)
-            version_samples[ver] = {
-                "benchmarks": benchmark_samples,
-                "readiness": self.is_ready(version_readiness),
-            }
-            product_readiness.update(version_readiness)
-        print(f"benchmark KPI report: {time.time()-start:.3f} seconds")
-        return {
-            "config_key": iterations["config_key"],
-            "versions": version_samples,
-            "readiness": self.is_ready(product_readiness),
-        }
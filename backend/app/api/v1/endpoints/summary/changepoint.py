@@ -0,0 +1,304 @@
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import os
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import numpy as np
+import orjson
+
+from app import config
+
+"""Incremental change-point detection over summary KPI series.
+
+Each benchmark variant's sample is a timestamped series of KPI values (or,
+for some benchmarks, several named series). A change point is found where the
+mean of the latest WINDOW values shifts away from the mean of all earlier
+values by at least THRESHOLD standard errors, and by at least MIN_CHANGE of
+the earlier mean.
+
+Rather than re-scanning each series' history, the index keeps the count, sum
+and sum of squares of the settled history along with the latest WINDOW - 1
+values, so that each batch of new values is scored with a few vectorized
+cumulative sums. The state is kept in a JSON file, if one is configured:
+
+    [changepoints]
+    file="/var/cache/cpt-dashboard/changepoints.json"
+    window=5
+    threshold=4.0
+    min_change=0.1
+    min_history=10
+"""
+
+# A series key: product, version, benchmark, configuration, variant, series
+SeriesKey = tuple[str, str, str, str, str, str]
+
+
+def timestamp_key(timestamp: Any) -> str:
+    """A sortable string form of a sample point's timestamp"""
+    if isinstance(timestamp, datetime):
+        return timestamp.isoformat()
+    return str(timestamp)
+
+
+@dataclass
+class Series:
+    """The detector state of one KPI series
+
+    Fields:
+        count: the number of settled values, before the tail
+        total: the sum of the settled values
+        squares: the sum of squares of the settled values
+        tail: the latest (uuid, timestamp, value) points
+        last: the timestamp of the latest point
+        active: whether the latest point was part of a detected shift
+        higher_is_better: whether an increase is an improvement
+        changes: the change points found so far
+    """
+
+    count: int = 0
+    total: float = 0.0
+    squares: float = 0.0
+    tail: list[tuple[str, str, float]] = field(default_factory=list)
+    last: Optional[str] = None
+    active: bool = False
+    higher_is_better: bool = False
+    changes: list[dict[str, Any]] = field(default_factory=list)
+
+
+class ChangePointIndex(config.Configurable):
+    """Change points of every summary KPI series, updated as jobs arrive"""
+
+    SECTION = "changepoints"
+    DEFAULT_WINDOW = 5
+    DEFAULT_THRESHOLD = 4.0
+    DEFAULT_MIN_CHANGE = 0.1
+    DEFAULT_MIN_HISTORY = 10
+
+    def __init__(self):
+        super().__init__()
+        self.path: Optional[Path] = None
+        self.window = self.DEFAULT_WINDOW
+        self.threshold = self.DEFAULT_THRESHOLD
+        self.min_change = self.DEFAULT_MIN_CHANGE
+        self.min_history = self.DEFAULT_MIN_HISTORY
+        self.series: dict[SeriesKey, Series] = {}
+        self.dirty = False
+
+    def configure(
+        self,
+        path: Optional[str] = None,
+        window: int = DEFAULT_WINDOW,
+        threshold: float = DEFAULT_THRESHOLD,
+        min_change: float = DEFAULT_MIN_CHANGE,
+        min_history: int = DEFAULT_MIN_HISTORY,
+    ):
+        """Set the detector policy and state file, discarding any state
+
+        The state saved in the file, if it exists, is read.
+        """
+        self.path = Path(path) if path else None
+        self.window = max(int(window), 1)
+        self.threshold = float(threshold)
+        self.min_change = float(min_change)
+        self.min_history = int(min_history)
+        self.series = {}
+        self.dirty = False
+        self.loaded = True
+        if self.path and self.path.is_file():
+            for record in orjson.loads(self.path.read_bytes()):
+                state = record["series"]
+                state["tail"] = [tuple(p) for p in state["tail"]]
+                self.series[tuple(record["key"])] = Series(**state)
+
+    def settings(self, cfg) -> dict[str, Any]:
+        return {
+            "path": self.setting(cfg, "file"),
+            "window": self.setting(cfg, "window", self.DEFAULT_WINDOW),
+            "threshold": self.setting(cfg, "threshold", self.DEFAULT_THRESHOLD),
+            "min_change": self.setting(cfg, "min_change", self.DEFAULT_MIN_CHANGE),
+            "min_history": self.setting(cfg, "min_history", self.DEFAULT_MIN_HISTORY),
+        }
+
+    def save(self):
+        """Write the detector state to the configured file, if it's changed"""
+        if not self.loaded or not self.path or not self.dirty:
+            return
+        records = [{"key": k, "series": asdict(s)} for k, s in self.series.items()]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        temp.write_bytes(orjson.dumps(records))
+        temp.replace(self.path)
+        self.dirty = False
+
+    @staticmethod
+    def sample_series(sample: dict[str, Any]) -> Iterator[tuple[str, list[dict]]]:
+        """The named point series of a sample; an unnamed series is ''"""
+        values = sample.get("values") or []
+        if isinstance(values, dict):
+            yield from values.items()
+        else:
+            yield "", values
+
+    def ingest(
+        self,
+        key: tuple[str, str, str, str, Any],
+        sample: dict[str, Any],
+        higher_is_better: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Add the new points of a variant's sample to its series
+
+        Points at or before the latest point already seen are ignored, so a
+        sample of a variant's full history adds only its new jobs.
+
+        Args:
+            key: The product, version, benchmark, configuration and variant
+            sample: The variant's sample
+            higher_is_better: Whether an increase is an improvement
+
+        Returns:
+            The change points found among the new points
+        """
+        self.check()
+        product, version, benchmark, configuration, variant = key
+        configuration, variant = str(configuration), str(variant)
+        found = []
+        for name, points in self.sample_series(sample):
+            skey = (product, version, benchmark, configuration, variant, name)
+            state = self.series.get(skey)
+            if state is None:
+                state = Series(higher_is_better=higher_is_better)
+            new = [
+                (p.get("uuid"), timestamp_key(p.get("timestamp")), p.get("value"))
+                for p in points
+                if p.get("value") is not None
+            ]
+            new = [
+                p
+                for p in sorted(new, key=lambda p: p[1])
+                if state.last is None or p[1] > state.last
+            ]
+            if not new:
+                continue
+            changes = self.update(state, new)
+            for change in changes:
+                change.update(
+                    product=product,
+                    version=version,
+                    benchmark=benchmark,
+                    config=configuration,
+                    variant=variant,
+                    series=name,
+                )
+            self.series[skey] = state
+            self.dirty = True
+            found.extend(changes)
+        return found
+
+    def update(
+        self, state: Series, points: list[tuple[str, str, float]]
+    ) -> list[dict[str, Any]]:
+        """Score new points against a series' state, and advance the state
+
+        Each new point ends a window of the latest WINDOW values, scored
+        against the settled history plus the points before the window. The
+        first shifted window of each run marks a change point.
+
+        Args:
+            state: The series' state, which is updated
+            points: New (uuid, timestamp, value) points, in timestamp order
+
+        Returns:
+            The new change points
+        """
+        window = self.window
+        everything = state.tail + points
+        values = np.fromiter((p[2] for p in everything), float, len(everything))
+        sums = np.concatenate(([0.0], np.cumsum(values)))
+        squares = np.concatenate(([0.0], np.cumsum(values * values)))
+        end = np.arange(len(state.tail), len(values)) + 1
+        start = end - window
+        full = start >= 0
+        start = np.maximum(start, 0)
+
+        count = state.count + start
+        with np.errstate(divide="ignore", invalid="ignore"):
+            before = (state.total + sums[start]) / count
+            variance = np.maximum(
+                (state.squares + squares[start]) / count - before * before, 0.0
+            )
+            shift = (sums[end] - sums[start]) / window - before
+            score = shift / np.sqrt(variance / window)
+            change = shift / np.abs(before)
+        shifted = (
+            full
+            & (count >= self.min_history)
+            & (np.abs(score) >= self.threshold)
+            & (np.abs(change) >= self.min_change)
+        )
+        previous = np.concatenate(([state.active], shifted[:-1]))
+
+        changes = []
+        for i in np.flatnonzero(shifted & ~previous):
+            # The shift starts at the window's first point at least halfway
+            # to the window's mean; report the mean from there
+            moved = np.sign(shift[i]) * (values[start[i] : end[i]] - before[i])
+            first = start[i] + int(np.argmax(moved >= abs(shift[i]) / 2))
+            level = float(values[first : end[i]].mean())
+            improved = (shift[i] > 0) == state.higher_is_better
+            changes.append(
+                {
+                    "uuid": everything[first][0],
+                    "timestamp": everything[first][1],
+                    "detected": everything[end[i] - 1][0],
+                    "before": float(before[i]),
+                    "after": level,
+                    "change": float((level - before[i]) / abs(before[i])),
+                    "score": float(score[i]),
+                    "direction": "improvement" if improved else "regression",
+                }
+            )
+        state.changes.extend(changes)
+        state.active = bool(shifted[-1])
+        state.last = points[-1][1]
+
+        settled = max(len(values) - (window - 1), 0)
+        state.count += settled
+        state.total += float(sums[settled])
+        state.squares += float(squares[settled])
+        state.tail = everything[settled:]
+        return changes
+
+    def changes(
+        self,
+        products: Optional[list[str]] = None,
+        versions: Optional[list[str]] = None,
+        benchmarks: Optional[list[str]] = None,
+        since: Optional[str] = None,
+        direction: Optional[str] = "regression",
+    ) -> list[dict[str, Any]]:
+        """Return the selected change points, the most recent first
+
+        Args:
+            products: Select only these products
+            versions: Select only these versions
+            benchmarks: Select only these benchmarks
+            since: Select only change points from this timestamp
+            direction: Select only "regression" or "improvement", or None
+                for both
+        """
+        self.check()
+        selected = [
+            c
+            for (product, version, benchmark, *_), s in self.series.items()
+            if (not products or product in products)
+            and (not versions or version in versions)
+            and (not benchmarks or benchmark in benchmarks)
+            for c in s.changes
+            if (not since or c["timestamp"] >= since)
+            and (not direction or c["direction"] == direction)
+        ]
+        return sorted(selected, key=lambda c: c["timestamp"], reverse=True)
+
+
+changepoints = ChangePointIndex()
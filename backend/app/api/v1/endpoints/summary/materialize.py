@@ -0,0 +1,257 @@
+import asyncio
+import copy
+import time
+import traceback
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+from app import config
+from app.api.v1.commons.utils import watermark_date
+from app.api.v1.endpoints.summary.changepoint import changepoints
+
+if TYPE_CHECKING:
+    from app.api.v1.endpoints.summary.summary_search import SummarySearch
+
+"""Materialized product readiness reports.
+
+Computing a readiness report samples the KPI of every job of every benchmark
+variant, which can take minutes, although only newly finished jobs change it.
+A MaterializedReport keeps each product's benchmark breakdown and variant
+samples, and a refresh looks only for jobs since the previous refresh's
+watermark date, re-sampling just the variants to which they've added.
+
+The Materializer refreshes each product's report in the background, on the
+configured interval (in seconds; 0, the default, disables it):
+
+    [summary-materializer]
+    interval=900
+"""
+
+
+class MaterializedReport:
+    """The stored benchmark breakdown and variant samples of one product
+
+    The breakdown is keyed by version, benchmark, configuration and variant,
+    listing the variant's job UUIDs; the samples are keyed by the tuple of
+    those same four keys. Both are replaced, rather than modified, by a
+    refresh, so a report can be served while it's being refreshed.
+    """
+
+    def __init__(self, product: str):
+        self.product = product
+        self.watermark: Optional[str] = None
+        self.refreshed: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.refreshes = 0
+        self.config_key: dict[str, Any] = {}
+        self.breakdown: dict[str, dict[str, dict[str, dict[Any, list[str]]]]] = {}
+        self.samples: dict[tuple[str, str, str, Any], dict[str, Any]] = {}
+        self.supported: set[str] = set()
+
+    @property
+    def ready(self) -> bool:
+        return self.refreshed is not None
+
+    async def refresh(self, summary: "SummarySearch") -> int:
+        """Add the jobs found since the watermark, and re-sample their variants
+
+        The watermark is a day before the last refresh (see watermark_date),
+        so recent jobs are found again; only variants whose job list has
+        changed are sampled, over all of their jobs.
+
+        Args:
+            summary: A summary service for the product
+
+        Returns:
+            The number of variants sampled
+        """
+        start = time.time()
+        summary.set_date_filter(self.watermark, None)
+        try:
+            iterations = await summary.get_iterations()
+        finally:
+            summary.set_date_filter(None, None)
+
+        breakdown = copy.deepcopy(self.breakdown)
+        changed = {}
+        for ver, benchmarks in iterations["benchmarks"].items():
+            for benchmark, configs in benchmarks.items():
+                stored = breakdown.setdefault(ver, {}).setdefault(benchmark, {})
+                for ck, variants in configs.items():
+                    stored_config = stored.setdefault(ck, {})
+                    for variant, uuids in variants.items():
+                        known = stored_config.get(variant, [])
+                        merged = sorted(set(known).union(uuids))
+                        if merged == known:
+                            continue
+                        stored_config[variant] = merged
+                        changed.setdefault(ver, {}).setdefault(
+                            benchmark, {}
+                        ).setdefault(ck, {})[variant] = merged
+
+        helpers = summary.get_helpers(iterations["benchmarks"])
+        samples = await summary.sample_variants(changed, helpers)
+
+        self.config_key = {**self.config_key, **iterations["config_key"]}
+        self.samples = {**self.samples, **samples}
+        self.supported = self.supported.union(helpers)
+        self.breakdown = breakdown
+        self.watermark = watermark_date(start)
+        self.refreshed = time.time()
+        self.duration = round(self.refreshed - start, 3)
+        self.refreshes += 1
+        print(
+            f"materialized {self.product} report: {len(samples)} variants "
+            f"sampled in {self.duration:.3f} seconds"
+        )
+        return len(samples)
+
+    def aggregate(
+        self,
+        summary: "SummarySearch",
+        versions: Optional[str] = None,
+        benchmarks: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Build a metric_aggregation report from the stored samples
+
+        Args:
+            summary: A summary service for the product
+            versions: Select only the named versions (comma-separated list)
+            benchmarks: Select only the named benchmarks (comma-separated list)
+        """
+        start = time.time()
+        breakdown = self.breakdown
+        vees = sorted(summary.break_list(versions) if versions else breakdown)
+        benches = summary.break_list(benchmarks) if benchmarks else None
+        iterations = {
+            v: {
+                b: configs
+                for b, configs in breakdown[v].items()
+                if not benches or b in benches
+            }
+            for v in vees
+            if v in breakdown
+        }
+        version_samples, readiness = summary.assemble(
+            iterations, self.supported, self.samples
+        )
+        used = {c for d in iterations.values() for cf in d.values() for c in cf}
+        return {
+            "config_key": {k: v for k, v in self.config_key.items() if k in used},
+            "versions": version_samples,
+            "readiness": readiness,
+            "materialized": {
+                "watermark": self.watermark,
+                "refreshed": self.refreshed,
+            },
+            "timings": {"total": round(time.time() - start, 3)},
+        }
+
+
+class Materializer(config.Configurable):
+    """Keep each product's readiness report materialized in the background"""
+
+    SECTION = "summary-materializer"
+
+    def __init__(self):
+        super().__init__()
+        self.interval = 0.0
+        self.reports: dict[str, MaterializedReport] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.errors = 0
+
+    def configure(self, interval: float = 0):
+        """Set the refresh interval in seconds, or 0 to disable refreshes
+
+        Any reports materialized so far are discarded.
+        """
+        self.interval = float(interval)
+        self.loaded = True
+        self.reports = {}
+        self.errors = 0
+
+    def settings(self, cfg) -> dict[str, Any]:
+        return {"interval": self.setting(cfg, "interval", 0)}
+
+    @property
+    def enabled(self) -> bool:
+        self.check()
+        return self.interval > 0
+
+    def get(self, product: str) -> Optional[MaterializedReport]:
+        """Return a product's report, if it's been materialized"""
+        report = self.reports.get(product)
+        return report if report and report.ready else None
+
+    async def refresh(
+        self, product: str, create: Callable[[str], "SummarySearch"]
+    ) -> Optional[int]:
+        """Refresh one product's report
+
+        A failed refresh is reported and leaves the previous report in place,
+        to be brought up to date by the next refresh.
+
+        Args:
+            product: The product name
+            create: Create a summary service for a product
+
+        Returns:
+            The number of variants sampled, or None if the refresh failed
+        """
+        summary = create(product)
+        try:
+            report = self.reports.get(product) or MaterializedReport(product)
+            sampled = await report.refresh(summary)
+            self.reports[product] = report
+            return sampled
+        except Exception as e:
+            print(f"Materializing {product} report failed: {e!r}")
+            traceback.print_exc()
+            self.errors += 1
+            return None
+        finally:
+            await summary.close()
+
+    async def run(self, products: list[str], create: Callable[[str], "SummarySearch"]):
+        """Refresh the products' reports concurrently on every interval
+
+        The change points found by each round are saved.
+        """
+        while True:
+            await asyncio.gather(*[self.refresh(p, create) for p in products])
+            changepoints.save()
+            await asyncio.sleep(self.interval)
+
+    def start(self, products: list[str], create: Callable[[str], "SummarySearch"]):
+        """Start refreshing in the background, if it's enabled"""
+        if self.enabled and not self.task:
+            self.task = asyncio.create_task(self.run(products, create))
+
+    async def stop(self):
+        """Stop the background refreshes"""
+        task, self.task = self.task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "running": self.task is not None,
+            "errors": self.errors,
+            "products": {
+                p: {
+                    "watermark": r.watermark,
+                    "refreshed": r.refreshed,
+                    "duration": r.duration,
+                    "refreshes": r.refreshes,
+                    "variants": len(r.samples),
+                }
+                for p, r in self.reports.items()
+            },
+        }
+
+
+materializer = Materializer()
@@ -191,6 +191,14 @@ class BenchmarkBase(ABC):
     summary: "Summary"
     benchmark: str
 
+    # True if the batch methods handle many variants more efficiently than
+    # separate calls, so that they should be given as many as possible
+    BATCHED = False
+
+    # True if a higher KPI value (e.g., throughput) is better, rather than a
+    # lower one (e.g., latency)
+    HIGHER_IS_BETTER = False
+
     def __init__(self, summary: Summary, benchmark: str):
         self.benchmark = benchmark
         self.summary = summary
@@ -200,6 +208,22 @@ class BenchmarkBase(ABC):
         """Get the iteration variants for a list of UUIDs."""
         raise NotImplementedError("Subclasses must implement this method")
 
+    async def get_iteration_variants_batch(
+        self, groups: list[list[str]]
+    ) -> list[dict[str, list[str]]]:
+        """Get the iteration variants for several lists of UUIDs.
+
+        By default each list is handled separately; subclasses which can do
+        better override this and set BATCHED.
+
+        Args:
+            groups: Lists of UUIDs
+
+        Returns:
+            The iteration variants of each list, in order
+        """
+        return [await self.get_iteration_variants(uuids) for uuids in groups]
+
     @abstractmethod
     async def process(
         self, version: str, config: str, iter: Any, uuids: list[str]
@@ -207,6 +231,23 @@ class BenchmarkBase(ABC):
         """Process a list of UUIDs."""
         raise NotImplementedError("Subclasses must implement this method")
 
+    async def process_batch(
+        self, version: str, variants: list[tuple[str, Any, list[str]]]
+    ) -> list[dict[str, Any]]:
+        """Process the UUIDs of several variants of a version.
+
+        By default each variant is processed separately; subclasses which can
+        do better override this and set BATCHED.
+
+        Args:
+            version: The product version
+            variants: A (config, variant, uuids) tuple for each variant
+
+        Returns:
+            A sample for each variant, in order
+        """
+        return [await self.process(version, c, v, u) for c, v, u in variants]
+
     @abstractmethod
     async def evaluate(self, metric: dict[str, Any]) -> str:
         """Evaluate a sample."""
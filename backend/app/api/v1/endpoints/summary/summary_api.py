@@ -1,12 +1,22 @@
 import asyncio
 from dataclasses import dataclass
+import time
 import traceback
 from typing import Annotated, Any, Callable, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+import pandas as pd
 
+from app import config
+from app.api.v1.commons.utils import (
+    EXPORT_FORMAT_PATTERN,
+    exportFormat,
+    exportFrame,
+)
 from app.api.v1.endpoints.ocp.summary import OcpSummary
 from app.api.v1.endpoints.quay.summary import QuaySummary
+from app.api.v1.endpoints.summary.changepoint import changepoints
+from app.api.v1.endpoints.summary.materialize import materializer
 from app.api.v1.endpoints.summary.summary import Summary
 
 router = APIRouter()
@@ -27,6 +37,10 @@ Assisted-by: Cursor + claude-4-sonnet
 router = APIRouter()
 
 
+# Seconds allowed for each product's share of a summary request, by default
+PRODUCT_TIMEOUT = 120.0
+
+
 @dataclass
 class Product:
     summaryclass: type[Summary]
@@ -37,6 +51,7 @@ class Product:
 class ProductContext:
     product: str
     instance: Summary
+    timeout: Optional[float] = None
 
 
 @dataclass
@@ -51,6 +66,38 @@ PRODUCTS = {
 }
 
 
+class Deadline(config.Configurable):
+    """The seconds allowed for each product's share of a summary request
+
+    A summary report sampled without the materializer can take minutes, so
+    the deadline can be set by the "summary" settings, or 0 for none:
+
+        [summary]
+        timeout=300
+    """
+
+    SECTION = "summary"
+
+    def __init__(self):
+        super().__init__()
+        self.timeout: Optional[float] = PRODUCT_TIMEOUT
+
+    def configure(self, timeout: float = PRODUCT_TIMEOUT):
+        """Set the deadline in seconds, or 0 for none"""
+        self.timeout = float(timeout) if float(timeout) > 0 else None
+        self.loaded = True
+
+    def settings(self, cfg) -> dict[str, Any]:
+        return {"timeout": self.setting(cfg, "timeout", PRODUCT_TIMEOUT)}
+
+    def get(self) -> Optional[float]:
+        self.check()
+        return self.timeout
+
+
+deadline = Deadline()
+
+
 def create(product: str) -> "Summary":
     """Create a summary service for a given product."""
     if product in PRODUCTS:
@@ -64,8 +111,9 @@ async def summary_svc(products: str | None = None) -> dict[str, ProductContext]:
     summaries: dict[str, ProductContext] = {}
     ps = Summary.break_list(products) if products else list(PRODUCTS.keys())
     try:
+        timeout = deadline.get()
         summaries = {
-            product: ProductContext(product, create(product)) for product in ps
+            product: ProductContext(product, create(product), timeout) for product in ps
         }
         yield summaries
     except Exception as e:
@@ -86,39 +134,216 @@ async def collect(
     method: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    timing: Optional[dict[str, str]] = None,
     **kwargs: Any,
-) -> dict[str, Any]:
+) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
     """Launch multiple product queries concurrently and collect results
 
+    Each product's query runs concurrently within the product's timeout;
+    a product which fails or runs out of time is cancelled without delaying
+    the others, and reported as a failure rather than a result.
+
     Args:
         products: The products to get versions for (comma separated list)
         context: A dictionary of summary services for each product
         method: Name of the Summary class method to call
         start_date: The start date to filter the versions by
         end_date: The end date to filter the versions by
+        timing: If given, receives a Server-Timing metric for each product
+
+    Returns:
+        The result of each product that succeeded, and the failure of each
+        product that didn't: its "error" message, and whether it "timedOut"
     """
-    results = {}
-    for p in Summary.break_list(products) if products else PRODUCTS.keys():
+
+    async def query(p: str) -> Any:
+        c = context[p]
+        summary = c.instance
+        m = getattr(summary, method)
+        if not isinstance(m, Callable):
+            raise ValueError(f"{p} {method} is not callable")
+        print(f"collect {method}: {start_date} - {end_date}")
+        summary.set_date_filter(start_date, end_date)
+        return await asyncio.wait_for(m(**kwargs), c.timeout)
+
+    async def timed(p: str) -> tuple[str, Any]:
+        start = time.perf_counter()
+        status = None
         try:
-            c = context[p]
-            summary = c.instance
-            m = getattr(summary, method)
-            if not isinstance(m, Callable):
-                raise ValueError(f"{p} {method} is not callable")
-            print(f"collect {method}: {start_date} - {end_date}")
-            summary.set_date_filter(start_date, end_date)
-            results[p] = m(**kwargs)
+            return p, await query(p)
+        except asyncio.TimeoutError:
+            status = "timeout"
+            print(f"Timed out collecting {p} {method}")
+            raise
         except Exception as e:
+            status = "error"
             print(f"Error collecting {p} {method}: {e}")
             print(traceback.format_exc())
-    ret = {}
-    for name, result in results.items():
-        try:
-            ret[name] = await result
-        except Exception as e:
-            print(f"Error awaiting {name} {method}: {e}")
-            print(traceback.format_exc())
-    return ret
+            raise
+        finally:
+            if timing is not None:
+                duration = (time.perf_counter() - start) * 1000.0
+                metric = f"{p};dur={duration:.1f}"
+                timing[p] = metric + (f';desc="{status}"' if status else "")
+
+    names = Summary.break_list(products) if products else list(PRODUCTS.keys())
+    results = await asyncio.gather(*[timed(p) for p in names], return_exceptions=True)
+    collected = {}
+    failed = {}
+    for p, r in zip(names, results):
+        if isinstance(r, asyncio.TimeoutError):
+            failed[p] = {
+                "error": f"timed out after {context[p].timeout:g} seconds",
+                "timedOut": True,
+            }
+        elif isinstance(r, BaseException):
+            failed[p] = {"error": str(r) or type(r).__name__, "timedOut": False}
+        else:
+            collected[p] = r[1]
+    return collected, failed
+
+
+def with_errors(
+    results: dict[str, Any], failed: dict[str, dict[str, Any]]
+) -> dict[str, Any]:
+    """Report the failed products (see collect) in a response's errors object"""
+    return {**results, "errors": failed} if failed else results
+
+
+def server_timing(response: Response, timing: dict[str, str]):
+    """Report each product's collection time in a Server-Timing header"""
+    if timing:
+        response.headers["Server-Timing"] = ", ".join(timing.values())
+
+
+SAMPLE_COLUMNS = [
+    "product",
+    "version",
+    "benchmark",
+    "configuration",
+    "iteration",
+    "readiness",
+    "series",
+    "uuid",
+    "timestamp",
+    "value",
+]
+
+
+def summary_frame(results: dict[str, Any]) -> pd.DataFrame:
+    """Flatten the metric_aggregation reports into a table of samples
+
+    Each row is one timestamped KPI value, identified by the product,
+    version, benchmark, configuration key and iteration variant in which it
+    was reported, along with that variant's readiness. Benchmarks reporting
+    several KPI series (e.g., Quay's per-index values) name the series;
+    otherwise it's null.
+
+    Args:
+        results: the metric_aggregation report for each product
+
+    Returns:
+        A DataFrame with the SAMPLE_COLUMNS
+    """
+    rows = []
+    for product, report in results.items():
+        for version, v in (report.get("versions") or {}).items():
+            for benchmark, b in v.get("benchmarks", {}).items():
+                for configuration, c in b.get("configurations", {}).items():
+                    for iteration, sample in c.get("iterations", {}).items():
+                        values = sample.get("values", [])
+                        series = (
+                            values.items()
+                            if isinstance(values, dict)
+                            else [(None, values)]
+                        )
+                        for name, points in series:
+                            for point in points:
+                                rows.append(
+                                    (
+                                        product,
+                                        version,
+                                        benchmark,
+                                        configuration,
+                                        iteration,
+                                        sample.get("readiness"),
+                                        name,
+                                        point.get("uuid"),
+                                        point.get("timestamp"),
+                                        point.get("value"),
+                                    )
+                                )
+    return pd.DataFrame.from_records(rows, columns=SAMPLE_COLUMNS)
+
+
+# Summary response views: each sample's values as a list of points with a
+# Plotly graph repeating them, as columns shared by the graph, or omitted
+SUMMARY_VIEWS = ("full", "columnar", "stats")
+
+
+def compact_sample(sample: dict[str, Any], view: str) -> dict[str, Any]:
+    """Return a sample without its duplicated values, for a compact view
+
+    The columnar view replaces each list of points with "uuid", "timestamp"
+    and "value" columns, and removes the graph traces' "x" and "y" arrays,
+    which are the same "timestamp" and "value" columns; the stats view
+    removes both the values and the graph.
+
+    Args:
+        sample: A variant's sample, which isn't modified
+        view: "columnar" or "stats"
+    """
+    compact = {k: v for k, v in sample.items() if k not in ("values", "graph")}
+    if view == "stats":
+        return compact
+
+    def columns(points: list[dict[str, Any]]) -> dict[str, list[Any]]:
+        return {
+            "uuid": [p.get("uuid") for p in points],
+            "timestamp": [p.get("timestamp") for p in points],
+            "value": [p.get("value") for p in points],
+        }
+
+    def trace(graph: dict[str, Any]) -> dict[str, Any]:
+        return {k: v for k, v in graph.items() if k not in ("x", "y")}
+
+    values = sample.get("values")
+    if isinstance(values, dict):
+        compact["values"] = {k: columns(v) for k, v in values.items()}
+    elif values is not None:
+        compact["values"] = columns(values)
+    graph = sample.get("graph")
+    if isinstance(graph, list):
+        compact["graph"] = [trace(g) for g in graph]
+    elif graph is not None:
+        compact["graph"] = trace(graph)
+    return compact
+
+
+def compact_report(results: dict[str, Any], view: str) -> dict[str, Any]:
+    """Return the metric_aggregation reports in a summary view
+
+    The reports are copied as far as the samples, so that stored (e.g.,
+    materialized) samples aren't modified.
+
+    Args:
+        results: the metric_aggregation report for each product
+        view: One of the SUMMARY_VIEWS
+    """
+    if view == "full":
+        return results
+
+    def copy(node: dict[str, Any], levels: list[str]) -> dict[str, Any]:
+        if not levels:
+            return compact_sample(node, view)
+        level, rest = levels[0], levels[1:]
+        children = node.get(level)
+        if not isinstance(children, dict):
+            return node
+        return {**node, level: {k: copy(v, rest) for k, v in children.items()}}
+
+    levels = ["versions", "benchmarks", "configurations", "iterations"]
+    return {product: copy(report, levels) for product, report in results.items()}
 
 
 @router.get("/api/v1/summary/products")
@@ -127,31 +352,85 @@ async def products() -> list[str]:
     return list(PRODUCTS.keys())
 
 
+@router.get("/api/v1/summary/materialized")
+async def materialized() -> dict[str, Any]:
+    """Report the state of the materialized product summary reports."""
+    return materializer.stats()
+
+
+@router.get("/api/v1/summary/regressions")
+async def regressions(
+    products: str | None = None,
+    versions: Optional[str] = None,
+    benchmarks: Optional[str] = None,
+    since: Optional[str] = Query(
+        None, description="Report only change points from this date"
+    ),
+    direction: Optional[str] = Query(
+        "regression",
+        description="Report `regression` or `improvement` change points, or `all`",
+        pattern="^(regression|improvement|all)$",
+    ),
+) -> dict[str, Any]:
+    """Report the KPI change points found in the summary time series
+
+    Change points are found incrementally as summary samples of each
+    variant's full history (e.g., by the materializer) add new jobs.
+
+    Args:
+        products: The products to report (comma separated list)
+        versions: The versions to report (comma separated list)
+        benchmarks: The benchmarks to report (comma separated list)
+        since: The earliest change point timestamp to report
+        direction: The kind of change points to report
+    """
+    changes = changepoints.changes(
+        products=Summary.break_list(products) if products else None,
+        versions=Summary.break_list(versions) if versions else None,
+        benchmarks=Summary.break_list(benchmarks) if benchmarks else None,
+        since=since,
+        direction=None if direction == "all" else direction,
+    )
+    return {"total": len(changes), "changes": changes}
+
+
 @router.get("/api/v1/summary/versions")
 async def versions(
     summaries: Annotated[dict[str, ProductContext], Depends(summary_svc)],
+    response: Response,
     products: str | None = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-) -> dict[str, dict[str, list[str]]]:
+) -> dict[str, dict[str, Any]]:
     """Return a list of versions that have been tested
 
-    This report can be filtered to a date range.
+    This report can be filtered to a date range. Products that fail or time
+    out are reported in an "errors" object (see collect).
 
     Args:
         summaries: A dictionary of summary services for each product
+        response: The response, which reports each product's Server-Timing
         products: The products to get versions for (comma separated list)
         start_date: The start date to filter the versions by
         end_date: The end date to filter the versions by
     """
-    return await collect(
-        products, summaries, "get_versions", start_date=start_date, end_date=end_date
+    timing = {}
+    results, failed = await collect(
+        products,
+        summaries,
+        "get_versions",
+        start_date=start_date,
+        end_date=end_date,
+        timing=timing,
     )
+    server_timing(response, timing)
+    return with_errors(results, failed)
 
 
 @router.get("/api/v1/summary/benchmarks")
 async def configs(
     summaries: Annotated[Summary, Depends(summary_svc)],
+    response: Response,
     products: str | None = None,
     versions: Optional[str] = None,
     benchmarks: Optional[str] = None,
@@ -161,56 +440,102 @@ async def configs(
 ) -> dict[str, Any]:
     """Return a list of benchmarks that have been tested
 
-    This report can be filtered to a date range.
+    This report can be filtered to a date range. Products that fail or time
+    out are reported in an "errors" object (see collect).
 
     Args:
         summaries: A dictionary of summary services for each product
+        response: The response, which reports each product's Server-Timing
         products: The products to get benchmarks for (comma separated list)
         versions: The versions to get benchmarks for (comma separated list)
         benchmarks: The benchmarks to get details for (comma separated list)
         start_date: The start date to filter the benchmarks by
         end_date: The end date to filter the benchmarks by
     """
-    return await collect(
+    timing = {}
+    results, failed = await collect(
         products,
         summaries,
         "get_configs",
         start_date=start_date,
         end_date=end_date,
+        timing=timing,
         versions=versions,
         benchmarks=benchmarks,
         uuids=uuids,
     )
+    server_timing(response, timing)
+    return with_errors(results, failed)
 
 
 @router.get("/api/v1/summary")
 async def summary(
     summaries: Annotated[Summary, Depends(summary_svc)],
+    response: Response,
     products: str | None = None,
     versions: Optional[str] = None,
     benchmarks: Optional[str] = None,
     configs: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    format: Optional[str] = Query(
+        None,
+        description="Export the samples as a `csv`, `parquet` or `arrow` file",
+        pattern=EXPORT_FORMAT_PATTERN,
+    ),
+    accept: Optional[str] = Header(None, include_in_schema=False),
+    view: str = Query(
+        "full",
+        description=(
+            "Report each sample's values and graph (`full`), its values as "
+            "columns shared with the graph (`columnar`), or only its "
+            "statistics (`stats`)"
+        ),
+        pattern=f"^({'|'.join(SUMMARY_VIEWS)})$",
+    ),
 ) -> dict[str, Any]:
     """Generate statistical summary data
 
+    With an export format, selected by the format parameter or by the Accept
+    header, the response is instead a file with a row for each sample.
+    Otherwise, a compact view avoids repeating the sample values. Products
+    that fail or time out are reported in an "errors" object (see collect),
+    which an export sends as an X-Errors header.
+
     Args:
         summaries: A dictionary of summary services for each product
+        response: The response, which reports each product's Server-Timing
         products: The products to get benchmarks for (comma separated list)
         versions: The versions to get benchmarks for (comma separated list)
         benchmarks: The benchmarks to get details for (comma separated list)
         configs: The specific configuration(s) to find (comma separated list)
         start_date: The start date to filter the benchmarks by
         end_date: The end date to filter the benchmarks by
+        format: Export format (csv, parquet or arrow)
+        accept: The Accept header, which may select an export format
+        view: The sample view (full, columnar or stats)
     """
-    return await collect(
+    timing = {}
+    results, failed = await collect(
         products,
         summaries,
         "metric_aggregation",
         start_date=start_date,
         end_date=end_date,
+        timing=timing,
         versions=versions,
         benchmarks=benchmarks,
         configs=configs,
     )
+    format = exportFormat(format, accept)
+    if format:
+        response = exportFrame(
+            summary_frame(results),
+            format,
+            "summary",
+            {"errors": {p: f["error"] for p, f in failed.items()} or None},
+        )
+        server_timing(response, timing)
+        return response
+    server_timing(response, timing)
+    return with_errors(compact_report(results, view), failed)
@@ -1,8 +1,17 @@
 from abc import abstractmethod
+import asyncio
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Any
+import itertools
+import time
+from typing import Any, AsyncIterator, Container, Optional
+import weakref
 
+from app.api.v1.commons.query import compositeBuckets
+from app.api.v1.endpoints.summary.changepoint import changepoints
+from app.api.v1.endpoints.summary.materialize import materializer
 from app.api.v1.endpoints.summary.summary import BaseFingerprint, BenchmarkBase, Summary
+from app.config import Configurable
 from app.services.search import ElasticService
 
 """CPT summary information for benchmarks using ElasticService.
@@ -20,6 +29,71 @@ Assisted-by: Cursor + claude-4-sonnet
 """
 
 
+# Default limit on the concurrent benchmark samples of one report
+REPORT_CONCURRENCY = 8
+
+# Default limit on concurrent summary searches of each OpenSearch backend,
+# shared by all summary requests
+BACKEND_CONCURRENCY = 16
+
+backend_limits: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]
+] = weakref.WeakKeyDictionary()
+
+
+class SearchLimits(Configurable):
+    """The limits on concurrent summary searches
+
+    Each report samples up to "concurrency" benchmark variants at once, and
+    all reports together search each backend up to "backend_concurrency"
+    times at once; both can be set by the "summary" settings:
+
+        [summary]
+        concurrency=8
+        backend_concurrency=16
+    """
+
+    SECTION = "summary"
+
+    def __init__(self):
+        super().__init__()
+        self.report = REPORT_CONCURRENCY
+        self.backend = BACKEND_CONCURRENCY
+
+    def configure(
+        self, report: int = REPORT_CONCURRENCY, backend: int = BACKEND_CONCURRENCY
+    ):
+        """Set the limits, replacing the backend semaphores"""
+        self.report = max(int(report), 1)
+        self.backend = max(int(backend), 1)
+        self.loaded = True
+        backend_limits.clear()
+
+    def settings(self, cfg) -> dict[str, Any]:
+        return {
+            "report": self.setting(cfg, "concurrency", REPORT_CONCURRENCY),
+            "backend": self.setting(cfg, "backend_concurrency", BACKEND_CONCURRENCY),
+        }
+
+
+search_limits = SearchLimits()
+
+
+def backend_limit(configpath: str) -> asyncio.Semaphore:
+    """Return the semaphore bounding concurrent searches of a backend
+
+    Semaphores are bound to an event loop, so each loop has its own.
+
+    Args:
+        configpath: the backend's configuration path
+    """
+    search_limits.check()
+    limits = backend_limits.setdefault(asyncio.get_running_loop(), {})
+    if configpath not in limits:
+        limits[configpath] = asyncio.Semaphore(search_limits.backend)
+    return limits[configpath]
+
+
 @dataclass
 class PerfCiFingerprint(BaseFingerprint):
     """Extend the BaseFingerprint class with OCP-specific fields."""
@@ -34,15 +108,18 @@ class SummarySearch(Summary):
     """Summary subclass for benchmarks using ElasticService."""
 
     service: ElasticService = None
+    fingerprint: type[BaseFingerprint]
     date_filter: dict[str, Any] | None
     benchmarks: dict[str, BenchmarkBase]
     benchmark_helper: dict[str, BenchmarkBase]
+    limit: asyncio.Semaphore
 
     def __init__(
         self,
         product: str,
         configpath: str = "ocp.elasticsearch",
         benchmarks: dict[str, BenchmarkBase] | None = None,
+        concurrency: Optional[int] = None,
     ):
         super().__init__(product, configpath)
         print(f"opening ElasticService ({configpath})")
@@ -50,6 +127,10 @@ class SummarySearch(Summary):
         self.date_filter = None
         self.benchmarks = benchmarks or {}
         self.benchmark_helper = {}
+        if not concurrency:
+            search_limits.check()
+            concurrency = search_limits.report
+        self.limit = asyncio.Semaphore(concurrency)
 
     def get_helper(self, benchmark: str) -> "BenchmarkBase":
         """Get a benchmark helper class instance for a benchmark."""
@@ -84,6 +165,390 @@ class SummarySearch(Summary):
         else:
             self.date_filter = None
 
+    async def composite_buckets(
+        self,
+        index: Optional[str],
+        query: dict[str, Any],
+        sources: list[dict[str, Any]],
+        size: Optional[int] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream the buckets of a composite aggregation of an index.
+
+        See compositeBuckets: the aggregation is paged, with each search
+        limited by the summary's ElasticService.
+
+        Args:
+            index: The index to search, or None for the configured index
+            query: The search body, without aggregations
+            sources: The composite aggregation's value sources
+            size: The number of buckets to fetch with each search (by default
+                AGG_BUCKET_SIZE)
+
+        Yields:
+            Each composite bucket, with the source values as its "key"
+        """
+        async for bucket in compositeBuckets(
+            lambda q: self.service.post(indice=index, size=0, query=q),
+            query,
+            sources,
+            size=size,
+        ):
+            yield bucket
+
+    async def get_benchmarks(self, version: str) -> dict[str, Any]:
+        """Return a list of benchmarks run for a given product version.
+
+        Each job is found as a bucket of a composite aggregation over its
+        configuration fingerprint, benchmark and UUID, so that the jobs are
+        fetched a bounded page at a time however many there are.
+
+        Args:
+            version: The product version to get benchmarks for.
+
+        Returns:
+            A list of benchmarks and the configurations for which each is run.
+        """
+        filters = [
+            {"match": {"jobStatus": "success"}},
+        ]
+        if self.date_filter:
+            filters.append(self.date_filter)
+        print("get_benchmarks", version)
+        query = {
+            "query": {
+                "bool": {
+                    "filter": filters,
+                    "must": [{"query_string": {"query": f"ocpVersion:{version}*"}}],
+                },
+            },
+        }
+        sources = self.fingerprint.composite() + [
+            {"benchmark": {"terms": {"field": "benchmark.keyword"}}},
+            {"uuid": {"terms": {"field": "uuid.keyword"}}},
+        ]
+        start = time.time()
+        by_benchmark = defaultdict(dict)
+        jobs = 0
+        async for bucket in self.composite_buckets(None, query, sources):
+            key = dict(bucket["key"])
+            benchmark = key.pop("benchmark")
+            uuid = key.pop("uuid")
+            configs = by_benchmark[benchmark]
+            config = tuple(key.values())
+            if config not in configs:
+                configs[config] = {
+                    "configuration": self.fingerprint.parse(key),
+                    "uuids": [],
+                }
+            configs[config]["uuids"].append(uuid)
+            jobs += 1
+        print(
+            f"discovered {version} benchmark hierarchy ({jobs} jobs): "
+            f"{time.time()-start:3f} seconds"
+        )
+        return {b: list(configs.values()) for b, configs in by_benchmark.items()}
+
+    async def get_iterations(
+        self,
+        versions: Optional[str] = None,
+        benchmarks: Optional[str] = None,
+        configs: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Break down our benchmark configuration data by job iterations.
+
+        We can only compare benchmark metrics across the same configuration and
+        job iteration count. While the configuration data is in the job
+        documents, the job iteration count is recorded within a special
+        "jobConfiguration" metric.
+
+        This function identifies the set of jobs that can be compared based on
+        identical configuration and iteration count. The configurations of
+        each version are looked up together by BATCHED benchmark helpers of
+        the same type, and separately by others.
+
+        TODO: this should allow targeting a specific OCP configuration.
+        (Although I've yet to figure out how to compactly represent the
+        configuration tuple in a query parameter.)
+        """
+        start = time.time()
+
+        vees = sorted(
+            (await self.get_versions()).keys()
+            if not versions
+            else self.break_list(versions)
+        )
+
+        benches = self.break_list(benchmarks) if benchmarks else None
+
+        benchmark_metrics = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+        )
+        config_key = defaultdict(dict)
+        for ver in vees:
+            bees = await self.get_benchmarks(ver)
+            lookups = defaultdict(list)
+            for benchmark, configurations in bees.items():
+                if benches and benchmark not in benches:
+                    continue
+
+                try:
+                    klass = self.get_helper(benchmark)
+                except ValueError as e:
+                    print(f"Benchmark {benchmark} not supported: {e}")
+                    benchmark_metrics[ver][benchmark] = {}
+                    continue
+
+                group = type(klass) if klass.BATCHED else klass
+                for config in configurations:
+                    ck = config["configuration"].key()
+                    config_key[ck] = config["configuration"].json()
+                    # Keep the report in breakdown order
+                    benchmark_metrics[ver][benchmark][ck]
+                    lookups[group].append(
+                        (benchmark, ck, klass, sorted(config["uuids"]))
+                    )
+            for lookup in lookups.values():
+                found = await lookup[0][2].get_iteration_variants_batch(
+                    [uuids for _, _, _, uuids in lookup]
+                )
+                for (benchmark, ck, _, _), variants in zip(lookup, found):
+                    if not variants:
+                        print(f"No {ver} {benchmark} {ck} variants found")
+                        benchmark_metrics[ver][benchmark][ck] = {}
+                        continue
+                    for iter, uuids in variants.items():
+                        benchmark_metrics[ver][benchmark][ck][iter].extend(uuids)
+        benchmark_report = {
+            "config_key": config_key,
+            "benchmarks": {
+                v: {
+                    b: {
+                        c: {j: sorted(u) for j, u in vs.items()} for c, vs in cf.items()
+                    }
+                    for b, cf in d.items()
+                }
+                for v, d in benchmark_metrics.items()
+            },
+        }
+        print(f"benchmark iterations: {time.time()-start:.3f} seconds")
+        return benchmark_report
+
+    def is_ready(self, readiness: set[str]) -> str:
+        """Determine if the set of readiness indicators is "ready".
+
+        Args:
+            readiness: A set of readiness indicators.
+
+        Returns:
+            "ready", "warning", or "not ready"
+        """
+        return (
+            "not ready"
+            if "not ready" in readiness
+            else "warning" if "warning" in readiness else "ready"
+        )
+
+    async def sample(
+        self,
+        helper: BenchmarkBase,
+        version: str,
+        variants: list[tuple[str, Any, list[str]]],
+    ) -> list[dict[str, Any]]:
+        """Process and evaluate benchmark variants' samples.
+
+        The search is bounded both by this report's concurrency limit and by
+        the backend's limit across all reports. Samples of each variant's
+        full history, without a date filter, add their new jobs to the
+        change-point index.
+        """
+        async with self.limit, backend_limit(self.configpath):
+            samples = await helper.process_batch(version, variants)
+        for (config, variant, _), sample in zip(variants, samples):
+            sample["readiness"] = await helper.evaluate(sample)
+            if not self.date_filter:
+                changepoints.ingest(
+                    (self.product, version, helper.benchmark, config, variant),
+                    sample,
+                    helper.HIGHER_IS_BETTER,
+                )
+        return samples
+
+    def get_helpers(self, iterations: dict[str, Any]) -> dict[str, BenchmarkBase]:
+        """Find the helpers of the supported benchmarks in a breakdown.
+
+        Args:
+            iterations: The get_iterations benchmark breakdown
+
+        Returns:
+            The helper of each supported benchmark
+        """
+        helpers: dict[str, BenchmarkBase] = {}
+        for benchmarks in iterations.values():
+            for benchmark in benchmarks:
+                if benchmark in helpers:
+                    continue
+                try:
+                    helpers[benchmark] = self.get_helper(benchmark)
+                except ValueError as e:
+                    print(f"Benchmark {benchmark} not supported: {e}")
+        return helpers
+
+    async def sample_variants(
+        self, iterations: dict[str, Any], helpers: dict[str, BenchmarkBase]
+    ) -> dict[tuple[str, str, str, Any], dict[str, Any]]:
+        """Sample every benchmark variant concurrently.
+
+        The variants of all versions, benchmarks and configurations are
+        processed concurrently within the concurrency limits, or for a
+        BATCHED benchmark helper, all variants of a version at once. If any
+        variant fails, the others are cancelled.
+
+        Args:
+            iterations: The get_iterations benchmark breakdown
+            helpers: The helper of each supported benchmark
+
+        Returns:
+            The sample of each (version, benchmark, configuration, variant)
+        """
+        keys = []
+        batches = []
+        for ver, benchmarks in iterations.items():
+            for benchmark, configs in benchmarks.items():
+                helper = helpers.get(benchmark)
+                if not helper:
+                    continue
+                variants = [
+                    (config, variation, uuids)
+                    for config, job_iterations in configs.items()
+                    for variation, uuids in job_iterations.items()
+                ]
+                if helper.BATCHED and variants:
+                    batches.append((helper, ver, variants))
+                else:
+                    batches.extend((helper, ver, [v]) for v in variants)
+                keys.extend((ver, benchmark, c, v) for c, v, _ in variants)
+        tasks = [asyncio.ensure_future(self.sample(*batch)) for batch in batches]
+        try:
+            samples = itertools.chain.from_iterable(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return dict(zip(keys, samples))
+
+    def assemble(
+        self,
+        iterations: dict[str, Any],
+        supported: Container[str],
+        samples: dict[tuple[str, str, str, Any], dict[str, Any]],
+    ) -> tuple[dict[str, Any], str]:
+        """Assemble the variant samples into a report, and assess readiness.
+
+        The report keeps the order of the benchmark breakdown.
+
+        Args:
+            iterations: The get_iterations benchmark breakdown
+            supported: The benchmarks to report
+            samples: The sample of each (version, benchmark, configuration,
+                variant)
+
+        Returns:
+            The samples and readiness of each version, and overall readiness
+        """
+        version_samples = {}
+        product_readiness = set()
+        for ver, benchmarks in iterations.items():
+            version_readiness = set()
+            benchmark_samples = {}
+            for benchmark, configs in benchmarks.items():
+                if benchmark not in supported:
+                    continue
+                benchmark_readiness = set()
+                config_samples = {}
+                for config, job_iterations in configs.items():
+                    iteration_samples = {
+                        v: samples[(ver, benchmark, config, v)] for v in job_iterations
+                    }
+                    config_readiness = {
+                        s["readiness"] for s in iteration_samples.values()
+                    }
+                    config_samples[config] = {
+                        "iterations": iteration_samples,
+                        "readiness": self.is_ready(config_readiness),
+                    }
+                    benchmark_readiness.update(config_readiness)
+                benchmark_samples[benchmark] = {
+                    "configurations": config_samples,
+                    "readiness": self.is_ready(benchmark_readiness),
+                }
+                version_readiness.update(benchmark_readiness)
+            version_samples[ver] = {
+                "benchmarks": benchmark_samples,
+                "readiness": self.is_ready(version_readiness),
+            }
+            product_readiness.update(version_readiness)
+        return version_samples, self.is_ready(product_readiness)
+
+    async def aggregate_metrics(
+        self, iterations: dict[str, Any]
+    ) -> tuple[dict[str, Any], str]:
+        """Sample every benchmark variant concurrently, and assess readiness.
+
+        Args:
+            iterations: The get_iterations benchmark breakdown
+
+        Returns:
+            The samples and readiness of each version, and overall readiness
+        """
+        helpers = self.get_helpers(iterations)
+        samples = await self.sample_variants(iterations, helpers)
+        return self.assemble(iterations, helpers, samples)
+
+    async def metric_aggregation(
+        self,
+        versions: Optional[str] = None,
+        benchmarks: Optional[str] = None,
+        configs: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Report aggregated metrics for each benchmark configuration.
+
+        For each selected version, benchmark, configuration, report on the
+        primary "readiness" KPI. The results include a list of individual
+        timestamped values, a statistical summary, and a Plotly-formatted
+        graph of the individual runs, along with the time in seconds spent
+        finding the benchmark iterations and sampling the metrics.
+
+        Without a date filter, a report materialized in the background is
+        used, if there is one, rather than sampling the metrics again.
+
+        Args:
+            versions: Select only the named versions (comma-separated list)
+            benchmarks: Select only the named benchmarks (comma-separated list)
+            configs: Select only the named configurations (comma-separated list)
+
+        """
+        report = materializer.get(self.product)
+        if report and not self.date_filter:
+            return report.aggregate(self, versions, benchmarks)
+        start = time.time()
+        iterations = await self.get_iterations(versions, benchmarks)
+        found = time.time()
+        version_samples, readiness = await self.aggregate_metrics(
+            iterations["benchmarks"]
+        )
+        end = time.time()
+        print(f"benchmark KPI report: {end-start:.3f} seconds")
+        return {
+            "config_key": iterations["config_key"],
+            "versions": version_samples,
+            "readiness": readiness,
+            "timings": {
+                "iterations": round(found - start, 3),
+                "samples": round(end - found, 3),
+                "total": round(end - start, 3),
+            },
+        }
+
     @abstractmethod
     async def close(self):
         """Close the summary service."""
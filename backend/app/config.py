@@ -1,4 +1,7 @@
-from vyper import v
+from typing import Any, Optional
+import weakref
+
+from vyper import v, Vyper
 
 
 def get_config():
@@ -6,3 +9,44 @@ def get_config():
     v.add_config_path(".")
     v.read_in_config()
     return v
+
+
+class Configurable:
+    """A singleton configured from a section of the configuration
+
+    A subclass names its SECTION and implements configure(), taking each
+    setting as an argument with a default, and settings(), mapping the
+    section's values to configure() arguments. The section is loaded when
+    the singleton is first used (see check), unless configure() has been
+    called already, as by a unit test.
+    """
+
+    SECTION: str = ""
+
+    # Every configurable singleton, so that tests can reset them all
+    instances: "weakref.WeakSet[Configurable]" = weakref.WeakSet()
+
+    def __init__(self):
+        self.loaded = False
+        Configurable.instances.add(self)
+
+    def setting(self, cfg: Vyper, name: str, default: Any = None) -> Any:
+        """Look up a setting of the section, or its default"""
+        key = f"{self.SECTION}.{name}"
+        return cfg.get(key) if cfg.is_set(key) else default
+
+    def settings(self, cfg: Vyper) -> dict[str, Any]:
+        """The configure() arguments given by the section's settings"""
+        raise NotImplementedError
+
+    def configure(self, **kwargs):
+        raise NotImplementedError
+
+    def load(self, cfg: Optional[Vyper] = None):
+        """Configure the singleton from its section of the configuration"""
+        self.configure(**self.settings(cfg or get_config()))
+
+    def check(self):
+        """Load the configuration, unless the singleton is configured"""
+        if not self.loaded:
+            self.load()
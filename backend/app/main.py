@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 import os
 import typing
 
@@ -7,6 +8,10 @@ from fastapi.responses import JSONResponse
 import orjson
 
 from app.api.api import router
+from app.api.v1.endpoints.summary.changepoint import changepoints
+from app.api.v1.endpoints.summary.materialize import materializer
+from app.api.v1.endpoints.summary.summary_api import create, PRODUCTS
+from app.services.search import registry
 
 
 class ORJSONResponse(JSONResponse):
@@ -32,7 +37,20 @@ def parse_origins(origins: typing.Optional[str]) -> list[str]:
 
 origins = parse_origins(os.getenv("CORS_ALLOWED_ORIGINS"))
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Materialize the summary reports while the server runs, and save the
+    change points and close the pooled OpenSearch clients when it stops."""
+    materializer.start(list(PRODUCTS), create)
+    yield
+    await materializer.stop()
+    changepoints.save()
+    await registry.close()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url=None,
@@ -0,0 +1,692 @@
+"""Caches for expensive, frequently repeated dashboard queries
+
+A HistoryCache keeps searches of settled archive data on disk, and a
+MetadataCache keeps job metadata documents by UUID; see below.
+
+The CPT home page fans out to every product mapper on each load, and most
+users ask for the same default date window; caching the merged responses for
+a few minutes lets repeated loads skip the backend queries entirely.
+
+Cached entries are fresh for "ttl" seconds. For a further "stale" seconds a
+request is answered from the old entry while a single background task
+refreshes it (stale-while-revalidate); after that the entry is recomputed
+before responding. Concurrent requests for an entry that's being computed
+share a single computation.
+
+Entries are held serialized by a pluggable backend: in-process LRU memory
+bounded by the size of its entries (the default), or Redis when the optional
+"redis" package is installed. Either way, a value read from the cache has
+plain JSON types, and is the reader's own copy. The cache is configured by an
+optional "response-cache" section:
+
+    [response-cache]
+    ttl=300
+    stale=600
+    maxsize=67108864
+    backend="memory"
+    url="redis://localhost:6379/0"
+"""
+
+from abc import ABC, abstractmethod
+import asyncio
+from collections import OrderedDict
+import gzip
+import hashlib
+import os
+from pathlib import Path
+import re
+import shutil
+import time
+import traceback
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+import orjson
+
+from app import config
+
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def serialize(value: Any) -> bytes:
+    """Serialize a cacheable response value"""
+    return orjson.dumps(value, option=JSON_OPTIONS, default=str)
+
+
+class CacheBackend(ABC):
+    """Storage for cache entries
+
+    An entry is the time it was computed and its value.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[tuple[float, Any]]:
+        """Return the time and value of an entry, or None"""
+
+    @abstractmethod
+    async def set(self, key: str, stored: float, value: Any, expire: float):
+        """Store an entry, which may be dropped after "expire" seconds"""
+
+    @abstractmethod
+    async def clear(self):
+        """Drop all entries"""
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU storage bounded by the size of the entries
+
+    Values are kept serialized: serializing measures an entry's size, and
+    each hit decodes its own copy, so a caller can't change a cached value.
+
+    Args:
+        maxsize: maximum total serialized size of the entries, in bytes
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.size = 0
+        self.evictions = 0
+        self.entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[tuple[float, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        stored, data = entry
+        return stored, orjson.loads(data)
+
+    async def set(self, key: str, stored: float, value: Any, expire: float):
+        data = serialize(value)
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key)[1])
+        if len(data) > self.maxsize:
+            return
+        self.entries[key] = (stored, data)
+        self.size += len(data)
+        while self.size > self.maxsize:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    async def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "maxsize": self.maxsize,
+            "evictions": self.evictions,
+        }
+
+
+class RedisBackend(CacheBackend):
+    """Redis storage, shared by all server processes
+
+    Entries are serialized as JSON, so a value read back from Redis has
+    plain JSON types; Redis expires entries once they're too stale to use.
+
+    Args:
+        url: Redis connection URL
+        prefix: namespace for the cache keys
+        client: an existing redis.asyncio client, instead of the URL
+    """
+
+    def __init__(self, url: str = "", prefix: str = "", client: Any = None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "The redis response cache backend requires the 'redis' package"
+                ) from e
+            client = redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[tuple[float, Any]]:
+        data = await self.client.get(self.prefix + key)
+        if data is None:
+            return None
+        stored, value = orjson.loads(data)
+        return stored, value
+
+    async def set(self, key: str, stored: float, value: Any, expire: float):
+        await self.client.set(
+            self.prefix + key, serialize([stored, value]), ex=max(1, int(expire) + 1)
+        )
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+
+class ResponseCache(config.Configurable):
+    """A TTL cache of computed responses with stale-while-revalidate
+
+    Args:
+        name: the cache name, used to namespace shared backend keys
+    """
+
+    SECTION = "response-cache"
+
+    DEFAULT_TTL = 300.0
+    DEFAULT_STALE = 600.0
+    DEFAULT_MAXSIZE = 64 * 1024 * 1024
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        self.backend: Optional[CacheBackend] = None
+        self.ttl = self.DEFAULT_TTL
+        self.stale = self.DEFAULT_STALE
+        # A wall clock, as a shared backend's entries may outlive a process
+        self.clock = time.time
+        self.pending: dict[str, asyncio.Future] = {}
+        self.refreshing: set[asyncio.Task] = set()
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "uncached": 0,
+        }
+
+    def configure(
+        self,
+        ttl: float = DEFAULT_TTL,
+        stale: float = DEFAULT_STALE,
+        backend: Optional[CacheBackend] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Set the cache policy and backend; a ttl of 0 disables caching"""
+        self.ttl = float(ttl)
+        self.stale = float(stale)
+        self.backend = backend or MemoryBackend(self.DEFAULT_MAXSIZE)
+        self.clock = clock
+        self.loaded = True
+        self.reset()
+
+    def settings(self, cfg) -> dict[str, Any]:
+        if self.setting(cfg, "backend", "memory") == "redis":
+            url = self.setting(cfg, "url", "")
+            backend = RedisBackend(url, prefix=f"{self.name}:")
+        else:
+            maxsize = self.setting(cfg, "maxsize", self.DEFAULT_MAXSIZE)
+            backend = MemoryBackend(int(maxsize))
+        return {
+            "ttl": self.setting(cfg, "ttl", self.DEFAULT_TTL),
+            "stale": self.setting(cfg, "stale", self.DEFAULT_STALE),
+            "backend": backend,
+        }
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a cache key from normalized request parameters"""
+        return serialize(parts).decode()
+
+    async def get(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Return the cached value for a key, computing it if necessary
+
+        Args:
+            key: the cache key (see make_key)
+            compute: coroutine function producing the value
+            cacheable: whether a computed value may be stored (e.g., not a
+                partial result); by default, every value is stored
+
+        Returns:
+            The cached or computed value
+        """
+        self.check()
+        if self.ttl <= 0:
+            return await compute()
+
+        try:
+            entry = await self.backend.get(key)
+        except Exception as e:
+            print(f"Unable to read {self.name} cache: {e}")
+            entry = None
+        if entry is not None:
+            stored, value = entry
+            age = self.clock() - stored
+            if age < self.ttl:
+                self.counters["hits"] += 1
+                return value
+            if age < self.ttl + self.stale:
+                self.counters["stale_hits"] += 1
+                if key not in self.pending:
+                    task = asyncio.create_task(self.compute(key, compute, cacheable))
+                    self.refreshing.add(task)
+                    task.add_done_callback(self.refreshed)
+                return value
+
+        self.counters["misses"] += 1
+        if key in self.pending:
+            return await asyncio.shield(self.pending[key])
+        return await self.compute(key, compute, cacheable)
+
+    async def compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Compute and store a value, sharing the result with waiters
+
+        A value that isn't cacheable is shared with the waiters, but not
+        stored, so any older entry is served until it expires.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            value = await compute()
+            if cacheable is None or cacheable(value):
+                try:
+                    await self.backend.set(
+                        key, self.clock(), value, self.ttl + self.stale
+                    )
+                except Exception as e:
+                    print(f"Unable to write {self.name} cache: {e}")
+            else:
+                self.counters["uncached"] += 1
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise the failure; don't report it as unretrieved
+            future.exception()
+            raise
+        finally:
+            # A reset may have forgotten this computation, or started another
+            if self.pending.get(key) is future:
+                del self.pending[key]
+
+    def refreshed(self, task: asyncio.Task):
+        """Account for a completed background refresh"""
+        self.refreshing.discard(task)
+        if task.cancelled():
+            return
+        if task.exception():
+            e = task.exception()
+            print(
+                f"Refresh of {self.name} cache failed: {e}\n"
+                + "".join(traceback.format_exception(e))
+            )
+        else:
+            self.counters["refreshes"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Report the cache counters and storage"""
+        return {
+            "ttl": self.ttl,
+            "stale": self.stale,
+            **self.counters,
+            **(self.backend.stats() if self.backend else {}),
+        }
+
+    def reset(self):
+        """Reset the counters, forgetting in-progress computations"""
+        for task in self.refreshing:
+            task.cancel()
+        self.refreshing.clear()
+        self.pending.clear()
+        self.counters = dict.fromkeys(self.counters, 0)
+
+    async def clear(self):
+        """Drop all cached entries"""
+        if self.backend:
+            await self.backend.clear()
+
+
+# The CPT home page caches
+jobs_cache = ResponseCache("cpt-jobs")
+filters_cache = ResponseCache("cpt-filters")
+caches = (jobs_cache, filters_cache)
+
+
+class HistoryCache(config.Configurable):
+    """Long-lived disk cache for searches of settled archive history
+
+    Documents that have aged past the archive split no longer change, so the
+    result of a search confined to them can be kept until it's explicitly
+    invalidated, or it ages out. Results are stored as gzip-compressed JSON
+    files, grouped by index, under the configured directory; once they take
+    more than "maxsize" bytes the oldest are removed, and a result stored
+    more than "maxage" seconds ago (unless 0) isn't used:
+
+        [history-cache]
+        directory="/var/cache/cpt-dashboard"
+        maxsize=1073741824
+        maxage=2592000
+
+    The cache is disabled when no directory is configured.
+    """
+
+    SECTION = "history-cache"
+    DEFAULT_MAXSIZE = 1024 * 1024 * 1024
+    DEFAULT_MAXAGE = 30 * 86400.0
+
+    def __init__(self):
+        super().__init__()
+        self.directory: Optional[Path] = None
+        self.maxsize = self.DEFAULT_MAXSIZE
+        self.maxage = self.DEFAULT_MAXAGE
+        self.clock = time.time
+        # The bytes stored, counted when the first result is written
+        self.size: Optional[int] = None
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "errors": 0}
+
+    def configure(
+        self,
+        directory: Optional[str],
+        maxsize: int = DEFAULT_MAXSIZE,
+        maxage: float = DEFAULT_MAXAGE,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Set the cache directory, or None to disable the cache, and bounds"""
+        self.directory = Path(directory) if directory else None
+        self.maxsize = int(maxsize)
+        self.maxage = float(maxage)
+        self.clock = clock
+        self.loaded = True
+        self.size = None
+        self.counters = dict.fromkeys(self.counters, 0)
+
+    def settings(self, cfg) -> dict[str, Any]:
+        return {
+            "directory": self.setting(cfg, "directory"),
+            "maxsize": self.setting(cfg, "maxsize", self.DEFAULT_MAXSIZE),
+            "maxage": self.setting(cfg, "maxage", self.DEFAULT_MAXAGE),
+        }
+
+    @property
+    def enabled(self) -> bool:
+        self.check()
+        return self.directory is not None
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a file-safe digest of the search parameters"""
+        return hashlib.blake2b(serialize(parts), digest_size=20).hexdigest()
+
+    @staticmethod
+    def group(index: str) -> str:
+        """The file-safe directory name for an index pattern"""
+        return re.sub(r"[^\w.-]", "_", index)
+
+    def path(self, index: str, key: str) -> Path:
+        return self.directory / self.group(index) / f"{key}.json.gz"
+
+    def expired(self, stored: float) -> bool:
+        return self.maxage > 0 and self.clock() - stored > self.maxage
+
+    def files(self) -> list[tuple[float, int, Path]]:
+        """The time stored, size and path of each result, oldest first"""
+        found = []
+        if self.directory.is_dir():
+            for path in self.directory.glob("*/*.json.gz"):
+                try:
+                    status = path.stat()
+                except FileNotFoundError:
+                    continue
+                found.append((status.st_mtime, status.st_size, path))
+        return sorted(found)
+
+    def read(self, path: Path) -> Optional[Any]:
+        try:
+            if self.expired(path.stat().st_mtime):
+                return None
+            return orjson.loads(gzip.decompress(path.read_bytes()))
+        except FileNotFoundError:
+            return None
+
+    def write(self, path: Path, value: Any):
+        data = gzip.compress(serialize(value))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_suffix(f".{os.getpid()}.tmp")
+        temp.write_bytes(data)
+        temp.replace(path)
+        if self.size is None:
+            self.size = sum(size for _, size, _ in self.files())
+        else:
+            # Approximate: a replaced result, or another process's, is
+            # corrected by the next prune
+            self.size += len(data)
+        if self.size > self.maxsize:
+            self.prune()
+
+    def prune(self):
+        """Remove expired results, and the oldest beyond maxsize"""
+        files = self.files()
+        size = sum(s for _, s, _ in files)
+        for stored, length, path in files:
+            if size <= self.maxsize and not self.expired(stored):
+                break
+            path.unlink(missing_ok=True)
+            size -= length
+            self.counters["evictions"] += 1
+        self.size = size
+
+    async def fetch(
+        self, index: str, key: str, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the stored result of a search, or run and store it
+
+        Args:
+            index: the index pattern searched
+            key: the search key (see make_key)
+            compute: coroutine function running the search
+
+        Returns:
+            The search result
+        """
+        path = self.path(index, key)
+        try:
+            value = await asyncio.to_thread(self.read, path)
+        except Exception as e:
+            print(f"Unable to read history cache {path}: {e}")
+            self.counters["errors"] += 1
+            value = None
+        if value is not None:
+            self.counters["hits"] += 1
+            return value
+        self.counters["misses"] += 1
+        value = await compute()
+        try:
+            await asyncio.to_thread(self.write, path, value)
+        except Exception as e:
+            print(f"Unable to write history cache {path}: {e}")
+            self.counters["errors"] += 1
+        return value
+
+    def remove(self, index: Optional[str] = None) -> int:
+        """Remove stored results (see invalidate)"""
+        if not self.directory.is_dir():
+            return 0
+        prefix = self.group(index) if index else ""
+        removed = 0
+        for group in self.directory.iterdir():
+            if group.is_dir() and group.name.startswith(prefix):
+                removed += sum(1 for _ in group.glob("*.json.gz"))
+                shutil.rmtree(group)
+        self.size = None
+        return removed
+
+    async def invalidate(self, index: Optional[str] = None) -> int:
+        """Remove stored results
+
+        Args:
+            index: remove only results for index patterns with this prefix
+
+        Returns:
+            The number of results removed
+        """
+        if not self.enabled:
+            return 0
+        return await asyncio.to_thread(self.remove, index)
+
+    async def stats(self) -> dict[str, Any]:
+        """Report the cache counters and storage"""
+        files = await asyncio.to_thread(self.files) if self.enabled else []
+        return {
+            "directory": str(self.directory) if self.directory else None,
+            "maxsize": self.maxsize,
+            "maxage": self.maxage,
+            **self.counters,
+            "entries": len(files),
+            "bytes": sum(size for _, size, _ in files),
+        }
+
+
+history_cache = HistoryCache()
+
+
+class MetadataCache(config.Configurable):
+    """LRU cache of job metadata documents by UUID
+
+    A job's metadata document doesn't change once it's written, so it can be
+    kept until it's evicted; a UUID that isn't found isn't remembered, as
+    its job may not have finished. Documents are held in memory, by search
+    configuration and UUID, up to "maxsize" documents. With a directory,
+    evicted documents are spilled to JSON files there, and read back when
+    they're next looked up:
+
+        [metadata-cache]
+        maxsize=20000
+        directory="/var/cache/cpt-dashboard/metadata"
+    """
+
+    SECTION = "metadata-cache"
+    DEFAULT_MAXSIZE = 20000
+
+    def __init__(self):
+        super().__init__()
+        self.maxsize = self.DEFAULT_MAXSIZE
+        self.directory: Optional[Path] = None
+        self.entries: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+        self.counters = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    def configure(
+        self, maxsize: int = DEFAULT_MAXSIZE, directory: Optional[str] = None
+    ):
+        """Set the memory bound and spill directory, discarding the entries"""
+        self.maxsize = int(maxsize)
+        self.directory = Path(directory) if directory else None
+        self.loaded = True
+        self.entries = OrderedDict()
+        self.counters = dict.fromkeys(self.counters, 0)
+
+    def settings(self, cfg) -> dict[str, Any]:
+        return {
+            "maxsize": self.setting(cfg, "maxsize", self.DEFAULT_MAXSIZE),
+            "directory": self.setting(cfg, "directory"),
+        }
+
+    def path(self, configpath: str, uuid: str) -> Path:
+        return (
+            self.directory
+            / HistoryCache.group(configpath)
+            / f"{HistoryCache.make_key(uuid)}.json"
+        )
+
+    def read(self, configpath: str, uuids: list[str]) -> dict[str, dict[str, Any]]:
+        found = {}
+        for uuid in uuids:
+            try:
+                found[uuid] = orjson.loads(self.path(configpath, uuid).read_bytes())
+            except FileNotFoundError:
+                pass
+        return found
+
+    def spill(self, evicted: list[tuple[tuple[str, str], dict[str, Any]]]):
+        for (configpath, uuid), document in evicted:
+            path = self.path(configpath, uuid)
+            if path.exists():
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp = path.with_suffix(f".{os.getpid()}.tmp")
+            temp.write_bytes(serialize(document))
+            temp.replace(path)
+
+    async def lookup(
+        self, configpath: str, uuids: Iterable[str]
+    ) -> tuple[dict[str, dict[str, Any]], list[str]]:
+        """Return the cached metadata of some UUIDs, and the UUIDs not cached
+
+        Args:
+            configpath: the search configuration of the metadata index
+            uuids: the job UUIDs
+
+        Returns:
+            The cached documents by UUID, and the other UUIDs
+        """
+        self.check()
+        found = {}
+        missing = []
+        for uuid in dict.fromkeys(uuids):
+            document = self.entries.get((configpath, uuid))
+            if document is None:
+                missing.append(uuid)
+            else:
+                self.entries.move_to_end((configpath, uuid))
+                found[uuid] = dict(document)
+        self.counters["hits"] += len(found)
+
+        if missing and self.directory:
+            try:
+                spilled = await asyncio.to_thread(self.read, configpath, missing)
+            except Exception as e:
+                print(f"Unable to read metadata cache: {e}")
+                self.counters["errors"] += 1
+                spilled = {}
+            if spilled:
+                self.counters["disk_hits"] += len(spilled)
+                await self.store(configpath, spilled)
+                found.update((u, dict(d)) for u, d in spilled.items())
+                missing = [u for u in missing if u not in spilled]
+        self.counters["misses"] += len(missing)
+        return found, missing
+
+    async def store(self, configpath: str, documents: dict[str, dict[str, Any]]):
+        """Remember metadata documents by UUID, evicting the oldest"""
+        self.check()
+        for uuid, document in documents.items():
+            self.entries[(configpath, uuid)] = document
+            self.entries.move_to_end((configpath, uuid))
+        evicted = []
+        while len(self.entries) > self.maxsize:
+            evicted.append(self.entries.popitem(last=False))
+        self.counters["evictions"] += len(evicted)
+        if evicted and self.directory:
+            try:
+                await asyncio.to_thread(self.spill, evicted)
+            except Exception as e:
+                print(f"Unable to write metadata cache: {e}")
+                self.counters["errors"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Report the cache counters and storage"""
+        return {
+            "maxsize": self.maxsize,
+            "directory": str(self.directory) if self.directory else None,
+            **self.counters,
+            "entries": len(self.entries),
+        }
+
+
+metadata_cache = MetadataCache()
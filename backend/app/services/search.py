@@ -1,48 +1,264 @@
+import asyncio
+import base64
 import bisect
+import copy
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import functools
+import hashlib
+import heapq
 import traceback
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
+import aiohttp
+from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
-from opensearchpy import AsyncOpenSearch
+from opensearchpy import AIOHttpConnection, AsyncOpenSearch
+from opensearchpy._async.http_aiohttp import OpenSearchClientResponse
+import orjson
 
 from app import config
 import app.api.v1.commons.constants as constants
+from app.services.cache import history_cache
+
+# Names of the archive (".internal") and live clusters, as reported when one
+# fails to contribute to a split-range query.
+ARCHIVE = "archive"
+LIVE = "live"
+
+
+class PooledConnection(AIOHttpConnection):
+    """AIOHttpConnection with a configurable idle keep-alive period
+
+    The stock connection builds its aiohttp connector with the library default
+    keep-alive; we want idle sockets to the (TLS) OpenSearch clusters to live
+    long enough to be reused by the next dashboard request.
+    """
+
+    def __init__(self, *args, keepalive: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._keepalive = keepalive
+
+    async def _create_aiohttp_session(self) -> Any:
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            skip_auto_headers=("accept", "accept-encoding"),
+            auto_decompress=True,
+            loop=self.loop,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            response_class=OpenSearchClientResponse,
+            connector=aiohttp.TCPConnector(
+                limit=self._limit,
+                keepalive_timeout=self._keepalive,
+                use_dns_cache=True,
+                enable_cleanup_closed=True,
+                ssl=self._ssl_context,
+            ),
+            trust_env=self._trust_env,
+        )
+
+    def pool_stats(self) -> tuple[int, int]:
+        """Count the connector's connections in use and idle
+
+        aiohttp doesn't report its pool utilization publicly, so this reads
+        the connector's internals, counting nothing when the session isn't
+        open or the internals aren't what we expect.
+        """
+        session = getattr(self, "session", None)
+        connector = getattr(session, "connector", None)
+        if connector is None or getattr(connector, "closed", True):
+            return 0, 0
+        try:
+            in_use = len(getattr(connector, "_acquired", ()))
+            idle = sum(len(c) for c in getattr(connector, "_conns", {}).values())
+        except (AttributeError, TypeError):
+            return 0, 0
+        return in_use, idle
+
+
+@dataclass
+class Cluster:
+    """A shared OpenSearch client for one configuration path
+
+    Fields:
+        path: configuration path (e.g., "ocp.elasticsearch.internal")
+        client: the pooled AsyncOpenSearch client
+        indice: the configured default index
+        prefix: the configured index prefix
+        maxsize: maximum open connections per cluster node
+        keepalive: seconds an idle connection is retained
+        timeout: seconds allowed for a search of the cluster
+        leases: number of ElasticService instances currently using the client
+        served: total number of ElasticService instances served
+    """
+
+    path: str
+    client: AsyncOpenSearch
+    indice: str
+    prefix: str
+    maxsize: int
+    keepalive: float
+    timeout: float = 50.0
+    leases: int = 0
+    served: int = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Report connection pool utilization for the cluster"""
+        in_use = 0
+        idle = 0
+        for connection in self.client.transport.connection_pool.connections:
+            if isinstance(connection, PooledConnection):
+                used, free = connection.pool_stats()
+                in_use += used
+                idle += free
+        return {
+            "maxsize": self.maxsize,
+            "keepalive": self.keepalive,
+            "in_use": in_use,
+            "idle": idle,
+            "leases": self.leases,
+            "served": self.served,
+        }
+
+
+class ClientRegistry:
+    """Process-wide registry of pooled OpenSearch clients
+
+    Building an AsyncOpenSearch client for every request means every request
+    pays for a fresh TCP and TLS handshake (and a re-read of the configuration
+    file). Instead, clients are created once per configuration path and shared
+    by all ElasticService instances; they're closed only when the application
+    shuts down.
+
+    Pool sizing defaults come from the optional "opensearch-pool" section and
+    can be overridden for each cluster:
+
+        [opensearch-pool]
+        maxsize=10
+        keepalive=15
+        timeout=50
+
+        [ocp.elasticsearch.internal]
+        maxsize=4
+        timeout=20
+    """
+
+    DEFAULT_MAXSIZE = 10
+    DEFAULT_KEEPALIVE = 15.0
+    DEFAULT_TIMEOUT = 50.0
+
+    def __init__(self):
+        self.clusters: dict[str, Optional[Cluster]] = {}
+
+    def get(self, path: str) -> Optional[Cluster]:
+        """Return the shared cluster client for a configuration path
+
+        Args:
+            path: configuration path
+
+        Returns:
+            The Cluster, or None if the path isn't configured
+        """
+        if path not in self.clusters:
+            cfg = config.get_config()
+            # The primary path is always connected (as it always has been);
+            # an archive path is only connected when configured.
+            if path.endswith(".internal") and not cfg.get(path):
+                self.clusters[path] = None
+            else:
+                self.clusters[path] = self.connect(cfg, path)
+        return self.clusters[path]
+
+    def connect(self, cfg, path: str) -> Cluster:
+        """Create a pooled client for a configuration path"""
+        index_prefix = ""
+        if cfg.is_set(path + ".prefix"):
+            index_prefix = cfg.get(path + ".prefix")
+        maxsize = int(self.setting(cfg, path, "maxsize", self.DEFAULT_MAXSIZE))
+        keepalive = float(self.setting(cfg, path, "keepalive", self.DEFAULT_KEEPALIVE))
+        url = cfg.get(path + ".url")
+        pool = {
+            "connection_class": PooledConnection,
+            "maxsize": maxsize,
+            "keepalive": keepalive,
+        }
+        if cfg.is_set(path + ".username") and cfg.is_set(path + ".password"):
+            auth = (cfg.get(path + ".username"), cfg.get(path + ".password"))
+            es = AsyncOpenSearch(url, verify_certs=False, http_auth=auth, **pool)
+        else:
+            es = AsyncOpenSearch(url, verify_certs=False, **pool)
+        return Cluster(
+            path=path,
+            client=es,
+            indice=cfg.get(path + ".indice"),
+            prefix=index_prefix,
+            maxsize=maxsize,
+            keepalive=keepalive,
+            timeout=float(self.setting(cfg, path, "timeout", self.DEFAULT_TIMEOUT)),
+        )
+
+    @staticmethod
+    def setting(cfg, path: str, name: str, default: Any) -> Any:
+        """Look up a pool setting for the cluster, then the global default"""
+        if cfg.is_set(f"{path}.{name}"):
+            return cfg.get(f"{path}.{name}")
+        if cfg.is_set(f"opensearch-pool.{name}"):
+            return cfg.get(f"opensearch-pool.{name}")
+        return default
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Report pool utilization for each connected cluster"""
+        return {p: c.stats() for p, c in self.clusters.items() if c is not None}
+
+    def clear(self):
+        """Forget all clients without closing them (for unit tests)"""
+        self.clusters.clear()
+
+    async def close(self):
+        """Close all pooled clients; called at application shutdown"""
+        clusters = [c for c in self.clusters.values() if c is not None]
+        self.clusters.clear()
+        for cluster in clusters:
+            try:
+                await cluster.client.close()
+            except Exception as e:
+                print(f"Error closing {cluster.path} client: {e}")
+
+
+registry = ClientRegistry()
 
 
 class ElasticService:
     # todo add bulkhead pattern
     # todo add error message for unauthorized user
     def __init__(self, configpath="", index=""):
-        """Init method."""
-        cfg = config.get_config()
-        self.new_es, self.new_index, self.new_index_prefix = self.initialize_es(
-            cfg, configpath, index
-        )
-        self.prev_es = None
-        if cfg.get(configpath + ".internal"):
-            self.prev_es, self.prev_index, self.prev_index_prefix = self.initialize_es(
-                cfg, configpath + ".internal", index
-            )
+        """Init method.
 
-    def initialize_es(self, config, path, index):
-        """Initializes es client using the configuration"""
-        url = config.get(path + ".url")
-        esUser = None
-        index_prefix = ""
-        if index == "":
-            indice = config.get(path + ".indice")
-        else:
-            indice = index
-        if config.is_set(path + ".prefix"):
-            index_prefix = config.get(path + ".prefix")
-        if config.is_set(path + ".username") and config.is_set(path + ".password"):
-            esUser = config.get(path + ".username")
-            esPass = config.get(path + ".password")
-        if esUser:
-            es = AsyncOpenSearch(url, verify_certs=False, http_auth=(esUser, esPass))
-        else:
-            es = AsyncOpenSearch(url, verify_certs=False)
-        return es, indice, index_prefix
+        The OpenSearch clients are shared through the process-wide client
+        registry, so constructing an ElasticService is cheap.
+        """
+        self.clusters = []
+        new = registry.get(configpath)
+        self.new_es = new.client
+        self.new_index = new.indice if index == "" else index
+        self.new_index_prefix = new.prefix
+        self.new_timeout = new.timeout
+        self.clusters.append(new)
+        self.prev_es = None
+        self.prev_timeout = ClientRegistry.DEFAULT_TIMEOUT
+        prev = registry.get(configpath + ".internal")
+        if prev:
+            self.prev_es = prev.client
+            self.prev_index = prev.indice if index == "" else index
+            self.prev_index_prefix = prev.prefix
+            self.prev_timeout = prev.timeout
+            self.prev_path = prev.path
+            self.clusters.append(prev)
+        for cluster in self.clusters:
+            cluster.leases += 1
+            cluster.served += 1
 
     async def post(
         self,
@@ -52,8 +268,13 @@ class ElasticService:
         start_date=None,
         end_date=None,
         timestamp_field=None,
+        dedup=None,
     ):
-        """Runs a query and returns the results"""
+        """Runs a query and returns the results
+
+        Hits found by both clusters are returned once: see remove_duplicates
+        for the "dedup" key.
+        """
         if "aggs" in query or size == 0:
             """Handles aggregation queries logic
 
@@ -82,179 +303,413 @@ class ElasticService:
                 )
         else:
             """Handles queries that require data from ES docs"""
-            if timestamp_field:
-                """Handles queries that have a timestamp field.
-
-                We handle queries from both new and archive instances
-                """
-                if self.prev_es:
-                    prev_index = self.prev_index_prefix + (
-                        self.prev_index if indice is None else indice
-                    )
-                    today = datetime.today().date()
-                    seven_days_ago = today - timedelta(days=7)
-                    if start_date and start_date > seven_days_ago:
-                        previous_results = {}
-                    else:
-                        new_end_date = (
-                            min(end_date, seven_days_ago)
-                            if end_date
-                            else seven_days_ago
-                        )
-                        query["query"]["bool"]["filter"]["range"][timestamp_field][
-                            "lte"
-                        ] = str(new_end_date)
-                        if start_date:
-                            query["query"]["bool"]["filter"]["range"][timestamp_field][
-                                "gte"
-                            ] = str(start_date)
-                        if start_date is None:
-                            response = await self.prev_es.search(
-                                index=prev_index + "*",
-                                body=jsonable_encoder(query),
-                                size=size,
-                                request_timeout=50,
-                            )
-                            previous_results = {
-                                "data": response["hits"]["hits"],
-                                "total": response["hits"]["total"]["value"],
-                            }
-                        else:
-                            response = await self.prev_es.search(
-                                index=prev_index + "*",
-                                body=jsonable_encoder(query),
-                                size=size,
-                                request_timeout=50,
-                            )
-                            previous_results = {
-                                "data": response["hits"]["hits"],
-                                "total": response["hits"]["total"]["value"],
-                            }
-                if self.prev_es and self.new_es:
-                    new_index = self.new_index_prefix + (
-                        self.new_index if indice is None else indice
-                    )
-                    today = datetime.today().date()
-                    seven_days_ago = today - timedelta(days=7)
-                    if end_date and end_date < seven_days_ago:
-                        new_results = {}
-                    else:
-                        new_start_date = (
-                            max(start_date, seven_days_ago)
-                            if start_date
-                            else seven_days_ago
-                        )
-                        query["query"]["bool"]["filter"]["range"][timestamp_field][
-                            "gte"
-                        ] = str(new_start_date)
-                        if end_date:
-                            query["query"]["bool"]["filter"]["range"][timestamp_field][
-                                "lte"
-                            ] = str(end_date)
-                        if end_date is None:
-                            response = await self.new_es.search(
-                                index=new_index + "*",
-                                body=jsonable_encoder(query),
-                                size=size,
-                                request_timeout=50,
-                            )
-                            new_results = {
-                                "data": response["hits"]["hits"],
-                                "total": response["hits"]["total"]["value"],
-                            }
-                        else:
-                            response = await self.new_es.search(
-                                index=new_index + "*",
-                                body=jsonable_encoder(query),
-                                size=size,
-                                request_timeout=50,
-                            )
-                            new_results = {
-                                "data": response["hits"]["hits"],
-                                "total": response["hits"]["total"]["value"],
-                            }
-                    combined_data = (previous_results.get("data") or []) + (
-                        new_results.get("data") or []
-                    )
-                    unique_data = await self.remove_duplicates(combined_data)
-
-                    totalVal = previous_results.get("total", 0) + new_results.get(
-                        "total", 0
-                    )
-                    return {"data": unique_data, "total": totalVal}
-                else:
-                    new_index = self.new_index_prefix + (
-                        self.new_index if indice is None else indice
-                    )
-                    if start_date and end_date:
-                        query["query"]["bool"]["filter"]["range"][timestamp_field][
-                            "gte"
-                        ] = str(start_date)
-                        query["query"]["bool"]["filter"]["range"][timestamp_field][
-                            "lte"
-                        ] = str(end_date)
-                        response = await self.new_es.search(
-                            index=new_index + "*",
-                            body=jsonable_encoder(query),
-                            size=size,
-                            request_timeout=50,
-                        )
-                        return {
-                            "data": response["hits"]["hits"],
-                            "total": response["hits"]["total"]["value"],
-                        }
-            else:
-                """Handles queries that do not have a timestamp field"""
-                previous_results = {}
-                if self.prev_es:
-                    prev_index = self.prev_index_prefix + (
-                        self.prev_index if indice is None else indice
-                    )
-                    response = await self.prev_es.search(
-                        index=prev_index + "*",
-                        body=jsonable_encoder(query),
-                        size=size,
-                        request_timeout=50,
-                    )
-                    previous_results = {
-                        "data": response["hits"]["hits"],
-                        "total": response["hits"]["total"]["value"],
-                    }
+            if timestamp_field and not self.prev_es:
                 new_index = self.new_index_prefix + (
                     self.new_index if indice is None else indice
                 )
-                response = await self.new_es.search(
-                    index=new_index + "*",
-                    body=jsonable_encoder(query),
-                    size=size,
-                    request_timeout=50,
-                )
-                new_results = {
-                    "data": response["hits"]["hits"],
-                    "total": response["hits"]["total"]["value"],
-                }
-                combined_data = (previous_results.get("data") or []) + (
-                    new_results.get("data") or []
+                if start_date and end_date:
+                    query["query"]["bool"]["filter"]["range"][timestamp_field][
+                        "gte"
+                    ] = str(start_date)
+                    query["query"]["bool"]["filter"]["range"][timestamp_field][
+                        "lte"
+                    ] = str(end_date)
+                    return await self.search_hits(
+                        self.new_es, new_index, query, size, self.new_timeout
+                    )
+                return None
+
+            searches = {
+                name: self.search_cluster(
+                    name, es, index, q, size, timeout, bool(timestamp_field)
                 )
-                unique_data = await self.remove_duplicates(combined_data)
+                for name, (es, index, q, timeout) in self.split_query(
+                    query, indice, start_date, end_date, timestamp_field
+                ).items()
+            }
+            results, partial = await self.gather_clusters(searches)
+            previous_results = results.get(ARCHIVE, {})
+            new_results = results.get(LIVE, {})
+            combined_data = (previous_results.get("data") or []) + (
+                new_results.get("data") or []
+            )
+            unique_data = await self.remove_duplicates(combined_data, dedup)
 
-                prev_total = previous_results.get("total", 0)
-                new_total = new_results.get("total", 0)
-                totalVal = prev_total + new_total
+            prev_total = previous_results.get("total", 0)
+            new_total = new_results.get("total", 0)
+            totalVal = prev_total + new_total
 
-                return {"data": unique_data, "total": totalVal}
+            response = {"data": unique_data, "total": totalVal}
+            if partial:
+                response["partial"] = partial
+            return response
 
-    async def remove_duplicates(self, all_results):
-        seen = set()
-        filtered_results = []
-        for each_result in all_results:
-            flat_doc = flatten_dict(each_result)
-            if tuple(sorted(flat_doc.items())) in seen:
+    def split_query(
+        self, query, indice, start_date, end_date, timestamp_field
+    ) -> dict[str, tuple[AsyncOpenSearch, str, dict[str, Any], float]]:
+        """Divide a search between the archive and live clusters
+
+        When the query has a timestamp field, documents older than the seven
+        day archive split are served by the archive (".internal") cluster and
+        newer documents by the live cluster; each cluster gets its own copy of
+        the query narrowed to its part of the date range. A query without a
+        timestamp field is sent to both clusters.
+
+        Returns:
+            (client, index, query, timeout) tuples keyed by cluster name
+        """
+        new_index = self.new_index_prefix + (
+            self.new_index if indice is None else indice
+        )
+        if not self.prev_es:
+            new_query = copy.deepcopy(query)
+            if timestamp_field:
+                ts_range = new_query["query"]["bool"]["filter"]["range"][
+                    timestamp_field
+                ]
+                if start_date:
+                    ts_range["gte"] = str(start_date)
+                if end_date:
+                    ts_range["lte"] = str(end_date)
+            return {LIVE: (self.new_es, new_index, new_query, self.new_timeout)}
+
+        prev_index = self.prev_index_prefix + (
+            self.prev_index if indice is None else indice
+        )
+        if not timestamp_field:
+            return {
+                ARCHIVE: (self.prev_es, prev_index, query, self.prev_timeout),
+                LIVE: (self.new_es, new_index, query, self.new_timeout),
+            }
+
+        today = datetime.today().date()
+        seven_days_ago = today - timedelta(days=7)
+        clusters = {}
+        if not start_date or start_date <= seven_days_ago:
+            prev_query = copy.deepcopy(query)
+            new_end_date = min(end_date, seven_days_ago) if end_date else seven_days_ago
+            ts_range = prev_query["query"]["bool"]["filter"]["range"][timestamp_field]
+            ts_range["lte"] = str(new_end_date)
+            if start_date:
+                ts_range["gte"] = str(start_date)
+            clusters[ARCHIVE] = (
+                self.prev_es,
+                prev_index,
+                prev_query,
+                self.prev_timeout,
+            )
+        if not end_date or end_date >= seven_days_ago:
+            new_query = copy.deepcopy(query)
+            new_start_date = (
+                max(start_date, seven_days_ago) if start_date else seven_days_ago
+            )
+            ts_range = new_query["query"]["bool"]["filter"]["range"][timestamp_field]
+            ts_range["gte"] = str(new_start_date)
+            if end_date:
+                ts_range["lte"] = str(end_date)
+            clusters[LIVE] = (self.new_es, new_index, new_query, self.new_timeout)
+        return clusters
+
+    async def merged_page(
+        self,
+        query,
+        size,
+        cursor=None,
+        indice=None,
+        start_date=None,
+        end_date=None,
+        timestamp_field=None,
+        tiebreaker="uuid.keyword",
+    ):
+        """Return one globally ordered page of hits from both clusters
+
+        Offset pagination with post() sends the same "size" and "from" to the
+        archive and live clusters and concatenates the results, so a page can
+        hold up to twice the requested rows, and every page costs two
+        (offset + size) row fetches. Here each cluster instead returns the
+        next "size" hits following the cursor position, in sort order plus a
+        unique tiebreaker, and the two sorted streams are merged to yield
+        exactly "size" rows (fewer only on the last page).
+
+        The query's own "sort" terms are used (the timestamp field, newest
+        first, when none are given) and "from" is ignored.
+
+        Args:
+            query: OpenSearch query
+            size: number of hits per page
+            cursor: continuation cursor from a previous page, or None/"" for
+                the first page
+            indice: index name, if not the configured index
+            start_date: start of the date range
+            end_date: end of the date range
+            timestamp_field: the document timestamp field for the date range
+            tiebreaker: a unique keyword field making the sort order total
+
+        Returns:
+            The hits, the total hit count, and the "cursor" for the next page
+            (None after the last page)
+        """
+        sort = normalize_sort(
+            query.get("sort") or [{timestamp_field or "timestamp": "desc"}]
+        )
+        if tiebreaker not in (f for f, _ in sort):
+            sort.append((tiebreaker, "asc"))
+        orders = [o for _, o in sort]
+        body = {k: v for k, v in query.items() if k != "from"}
+        body["sort"] = [{f: {"order": o}} for f, o in sort]
+        body["size"] = size
+        if cursor:
+            body["search_after"] = decode_cursor(cursor, len(sort))
+
+        searches = {
+            name: self.search_cluster(
+                name, es, index, q, size, timeout, bool(timestamp_field)
+            )
+            for name, (es, index, q, timeout) in self.split_query(
+                body, indice, start_date, end_date, timestamp_field
+            ).items()
+        }
+        results, partial = await self.gather_clusters(searches)
+        streams = [r["data"] for n, r in sorted(results.items())]
+        page = []
+        last = None
+        for hit in heapq.merge(*streams, key=lambda h: sort_key(h["sort"], orders)):
+            if hit["sort"] == last:
+                # The same document held by both clusters
                 continue
+            page.append(hit)
+            last = hit["sort"]
+            if len(page) == size:
+                break
+        response = {
+            "data": page,
+            "total": sum(r["total"] for r in results.values()),
+            "cursor": encode_cursor(last) if len(page) == size else None,
+        }
+        if partial:
+            response["partial"] = partial
+        return response
+
+    async def scan(
+        self,
+        query,
+        indice=None,
+        page_size=1000,
+        start_date=None,
+        end_date=None,
+        timestamp_field=None,
+        keep_alive="1m",
+        tiebreaker="_id",
+        dedup=None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream every hit matching a query
+
+        post() returns no more than a single search's worth of hits (MAX_PAGE)
+        and holds them all in memory. This instead walks each cluster through
+        a point-in-time snapshot with "search_after", fetching "page_size"
+        hits at a time, so there's no result ceiling and only one page is
+        held at once. Archive hits are followed by live hits; a document held
+        by both clusters is yielded once.
+
+        The query's own "sort" terms are used, completed by the tiebreaker;
+        "from" and "size" are ignored.
+
+        Args:
+            query: OpenSearch query
+            indice: index name, if not the configured index
+            page_size: number of hits to fetch from OpenSearch at a time
+            start_date: start of the date range
+            end_date: end of the date range
+            timestamp_field: the document timestamp field for the date range
+            keep_alive: how long OpenSearch retains the point-in-time between
+                pages
+            tiebreaker: a unique field making the sort order total
+            dedup: "_source" field identifying a document held by both
+                clusters (see remove_duplicates)
+
+        Yields:
+            Each OpenSearch hit
+        """
+        clusters = self.split_query(
+            query, indice, start_date, end_date, timestamp_field
+        )
+        seen = set() if len(clusters) > 1 else None
+        fields = tuple(dedup.split(".")) if dedup else ()
+        for es, index, q, timeout in clusters.values():
+            async for hit in self.scan_cluster(
+                es, index, q, page_size, keep_alive, tiebreaker, timeout
+            ):
+                if seen is not None:
+                    identity = hit_identity(hit, fields)
+                    if identity in seen:
+                        continue
+                    seen.add(identity)
+                yield hit
+
+    async def scan_cluster(
+        self, es, index, query, page_size, keep_alive, tiebreaker, timeout
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream the hits of one cluster, a page at a time
+
+        A cluster that can't create a point-in-time (e.g., OpenSearch before
+        2.4) is paged with "search_after" alone, which is equally complete
+        but may reflect index changes made during the scan.
+        """
+        sort = normalize_sort(query.get("sort") or [])
+        if tiebreaker not in (f for f, _ in sort):
+            sort.append((tiebreaker, "asc"))
+        body = {k: v for k, v in query.items() if k not in ("from", "size")}
+        body["sort"] = [{f: {"order": o}} for f, o in sort]
+        body["size"] = page_size
+        try:
+            pit = await es.create_point_in_time(
+                index=index + "*", params={"keep_alive": keep_alive}
+            )
+            pit_id = pit["pit_id"]
+        except Exception as e:
+            print(f"Unable to create a point-in-time for {index}: {e}")
+            pit_id = None
+        try:
+            while True:
+                if pit_id:
+                    body["pit"] = {"id": pit_id, "keep_alive": keep_alive}
+                    target = {}
+                else:
+                    target = {"index": index + "*"}
+                response = await asyncio.wait_for(
+                    es.search(body=body, request_timeout=timeout, **target), timeout
+                )
+                pit_id = response.get("pit_id") or pit_id
+                hits = response["hits"]["hits"]
+                for hit in hits:
+                    yield hit
+                if len(hits) < page_size:
+                    break
+                body["search_after"] = hits[-1]["sort"]
+        finally:
+            if pit_id:
+                try:
+                    await es.delete_point_in_time(body={"pit_id": [pit_id]})
+                except Exception as e:
+                    print(f"Unable to delete point-in-time for {index}: {e}")
+
+    def search_cluster(
+        self, name, es, index, query, size, timeout, historical
+    ) -> Awaitable[dict[str, Any]]:
+        """Search one cluster of a split query for hits
+
+        Args:
+            name: the cluster name, ARCHIVE or LIVE
+            es: the cluster client
+            index: the index pattern to search
+            query: the cluster's query
+            size: maximum number of hits
+            timeout: seconds allowed for the search
+            historical: True if the query's date range was divided between
+                the clusters, so the archive's share is settled history
+        """
+        fetch = functools.partial(self.search_hits, es, index, query, size, timeout)
+        if name == ARCHIVE and historical:
+            return self.search_history(index, (query, size), fetch)
+        return fetch()
+
+    async def search_history(
+        self, index, search, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Search archive documents older than the seven day split
+
+        Those documents no longer change, so the result is kept by the
+        history cache (when configured) until it's explicitly invalidated.
+
+        Args:
+            index: the archive index pattern
+            search: the search parameters identifying the result
+            fetch: coroutine function running the search
+        """
+        if not history_cache.enabled:
+            return await fetch()
+        key = history_cache.make_key(self.prev_path, index, search)
+        return await history_cache.fetch(index, key, fetch)
+
+    async def search_hits(self, es, index, query, size, timeout):
+        """Search one cluster, returning the hits and the total hit count"""
+        response = await asyncio.wait_for(
+            es.search(
+                index=index + "*",
+                body=jsonable_encoder(query),
+                size=size,
+                request_timeout=timeout,
+            ),
+            timeout,
+        )
+        return {
+            "data": response["hits"]["hits"],
+            "total": response["hits"]["total"]["value"],
+        }
+
+    async def search_aggregations(self, es, index, query, timeout):
+        """Search one cluster, returning the aggregations and total hit count"""
+        response = await asyncio.wait_for(
+            es.search(
+                index=index + "*",
+                body=jsonable_encoder(query),
+                size=0,
+                request_timeout=timeout,
+            ),
+            timeout,
+        )
+        return {
+            "data": response["aggregations"],
+            "total": response["hits"]["total"]["value"],
+        }
+
+    async def gather_clusters(
+        self, searches: dict[str, Awaitable[dict[str, Any]]]
+    ) -> tuple[dict[str, dict[str, Any]], list[str]]:
+        """Run the archive and live searches concurrently
+
+        A date range spanning the archive split is served by both clusters, so
+        the latency is that of the slower cluster rather than the sum of both.
+        Each search is bounded by its own cluster's timeout budget; if one
+        cluster fails or runs out of time we return the other cluster's
+        results and report the missing half rather than failing the request.
+
+        Args:
+            searches: search coroutines keyed by cluster name
+
+        Returns:
+            A tuple of the results keyed by cluster name, and a list of the
+            clusters which failed to respond.
+
+        Raises:
+            The first error when no cluster responded
+        """
+        names = list(searches.keys())
+        outcomes = await asyncio.gather(*searches.values(), return_exceptions=True)
+        results = {}
+        partial = []
+        errors = []
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error searching {name} cluster: {outcome!r}")
+                partial.append(name)
+                errors.append(outcome)
             else:
-                filtered_results.append(each_result)
-                seen.add(tuple(sorted(flat_doc.items())))
-        return filtered_results
+                results[name] = outcome
+        if errors and not results:
+            raise errors[0]
+        return results, partial
+
+    async def remove_duplicates(self, all_results, key=None):
+        """Remove duplicate hits, keeping the first of each
+
+        Args:
+            all_results: list of OpenSearch hits
+            key: "_source" field identifying a document, such as the "uuid"
+                of a jobs index document; by default, the hit's "_index" and
+                "_id"
+        """
+        return dedup_hits(all_results, key)
 
     def get_unique_values(self, all_values):
         seen = set()
@@ -445,68 +900,56 @@ class ElasticService:
                 start_datetime, end_datetime, aggregate, refiner, timestamp_field
             )
             if self.prev_es:
-                self.prev_index = self.prev_index_prefix + (
+                prev_index = self.prev_index_prefix + (
                     self.prev_index if indice is None else indice
                 )
+                new_index = self.new_index_prefix + (
+                    self.new_index if indice is None else indice
+                )
                 today = datetime.today().date()
                 seven_days_ago = today - timedelta(days=7)
-                if start_datetime and start_datetime > seven_days_ago:
-                    previous_results = {}
-                else:
+                searches = {}
+                if not start_datetime or start_datetime <= seven_days_ago:
+                    prev_query = copy.deepcopy(query)
                     new_end_date = (
                         min(end_datetime, seven_days_ago)
                         if end_datetime
                         else seven_days_ago
                     )
-                    query["query"]["bool"]["filter"]["range"][timestamp_field][
-                        "lte"
-                    ] = str(new_end_date)
-                    query["query"]["bool"]["filter"]["range"][timestamp_field][
-                        "gte"
-                    ] = str(start_datetime)
-
-                    response = await self.prev_es.search(
-                        index=self.prev_index + "*",
-                        body=jsonable_encoder(query),
-                        size=0,
-                        request_timeout=50,
+                    ts_range = prev_query["query"]["bool"]["filter"]["range"][
+                        timestamp_field
+                    ]
+                    ts_range["lte"] = str(new_end_date)
+                    ts_range["gte"] = str(start_datetime)
+                    searches[ARCHIVE] = self.search_history(
+                        prev_index,
+                        (prev_query,),
+                        functools.partial(
+                            self.search_aggregations,
+                            self.prev_es,
+                            prev_index,
+                            prev_query,
+                            self.prev_timeout,
+                        ),
                     )
-                    previous_results = {
-                        "data": response["aggregations"],
-                        "total": response["hits"]["total"]["value"],
-                    }
-            if self.prev_es and self.new_es:
-                self.new_index = self.new_index_prefix + (
-                    self.new_index if indice is None else indice
-                )
-                today = datetime.today().date()
-                seven_days_ago = today - timedelta(days=7)
-                if end_datetime and end_datetime < seven_days_ago:
-                    new_results = {}
-                else:
+                if not end_datetime or end_datetime >= seven_days_ago:
+                    new_query = copy.deepcopy(query)
                     new_start_date = (
                         max(start_datetime, seven_days_ago)
                         if start_datetime
                         else seven_days_ago
                     )
-                    query["query"]["bool"]["filter"]["range"][timestamp_field][
-                        "gte"
-                    ] = str(new_start_date)
-
-                    query["query"]["bool"]["filter"]["range"][timestamp_field][
-                        "lte"
-                    ] = str(end_datetime)
-
-                    response = await self.new_es.search(
-                        index=self.new_index + "*",
-                        body=jsonable_encoder(query),
-                        size=0,
-                        request_timeout=50,
+                    ts_range = new_query["query"]["bool"]["filter"]["range"][
+                        timestamp_field
+                    ]
+                    ts_range["gte"] = str(new_start_date)
+                    ts_range["lte"] = str(end_datetime)
+                    searches[LIVE] = self.search_aggregations(
+                        self.new_es, new_index, new_query, self.new_timeout
                     )
-                    new_results = {
-                        "total": response["hits"]["total"]["value"],
-                        "data": response["aggregations"],
-                    }
+                results, partial = await self.gather_clusters(searches)
+                previous_results = results.get(ARCHIVE, {})
+                new_results = results.get(LIVE, {})
                 prev_total = previous_results.get("total", 0)
                 new_total = new_results.get("total", 0)
                 total = prev_total + new_total
@@ -515,18 +958,21 @@ class ElasticService:
                 )
                 x = await self.buildFilterData(results, total)
 
-                return {
+                response = {
                     "filterData": x["filterData"],
                     "summary": x["summary"],
                     "upstreamList": x["upstreamList"],
                     "total": total,
                 }
+                if partial:
+                    response["partial"] = partial
+                return response
             else:
                 response = await self.new_es.search(
                     index=self.new_index + "*",
                     body=jsonable_encoder(query),
                     size=0,
-                    request_timeout=50,
+                    request_timeout=self.new_timeout,
                 )
                 total = response["hits"]["total"]["value"]
                 results = response["aggregations"]
@@ -544,10 +990,14 @@ class ElasticService:
             print(traceback.format_exc())
 
     async def close(self):
-        """Closes es client connections"""
-        await self.new_es.close()
-        if self.prev_es is not None:
-            await self.prev_es.close()
+        """Release the shared es clients
+
+        The pooled connections stay open for reuse by other requests, and are
+        closed by the client registry when the application shuts down.
+        """
+        for cluster in self.clusters:
+            cluster.leases -= 1
+        self.clusters = []
 
 
 class IndexTimestamp:
@@ -595,19 +1045,120 @@ class SortedIndexList:
         ]
 
 
-def flatten_dict(d, parent_key="", sep="."):
-    """Method to flatten a ES doc for comparing duplicates"""
-    items = []
-    for k, v in d.items():
-        new_key = parent_key + sep + k if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        elif isinstance(v, list):
-            for i, val in enumerate(v):
-                items.extend(flatten_dict({str(i): val}, new_key, sep=sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
+def content_digest(doc: Any) -> bytes:
+    """Compute a compact digest identifying the content of a document"""
+    serialized = orjson.dumps(
+        doc, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str
+    )
+    return hashlib.blake2b(serialized, digest_size=16).digest()
+
+
+def dedup_hits(
+    hits: list[dict[str, Any]], key: Optional[str] = None
+) -> list[dict[str, Any]]:
+    """Remove duplicate hits, keeping the first of each in order
+
+    Each hit's identity is computed once: the value of the dotted business
+    key in its "_source" (e.g., "uuid") when a key is given and present, else
+    its "_index" and "_id", else a digest of its content.
+
+    Args:
+        hits: list of OpenSearch hits
+        key: optional dotted "_source" field identifying a document
+
+    Returns:
+        The unique hits
+    """
+    fields = tuple(key.split(".")) if key else ()
+    seen = set()
+    unique = []
+    for hit in hits:
+        identity = hit_identity(hit, fields)
+        if identity not in seen:
+            seen.add(identity)
+            unique.append(hit)
+    return unique
+
+
+def hit_identity(hit: dict[str, Any], fields: tuple[str, ...] = ()) -> tuple:
+    """Identify a hit for deduplication
+
+    Args:
+        hit: an OpenSearch hit
+        fields: the path of the business key within "_source", if any
+
+    Returns:
+        A hashable identity
+    """
+    if fields:
+        value = hit.get("_source")
+        for field in fields:
+            value = value.get(field) if isinstance(value, dict) else None
+        if isinstance(value, (dict, list)):
+            return ("key", content_digest(value))
+        elif value is not None:
+            return ("key", value)
+    if "_id" in hit:
+        return ("id", hit.get("_index"), hit["_id"])
+    return ("doc", content_digest(hit))
+
+
+class Descending:
+    """Invert the ordering of a sort value for a descending sort"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def normalize_sort(terms) -> list[tuple[str, str]]:
+    """Convert OpenSearch sort terms to a list of (field, order) pairs
+
+    Accepts "field", {"field": "desc"}, or {"field": {"order": "desc"}}.
+    """
+    sort = []
+    for term in terms if isinstance(terms, list) else [terms]:
+        if isinstance(term, str):
+            sort.append((term, "asc"))
+            continue
+        for field, spec in term.items():
+            order = spec.get("order", "asc") if isinstance(spec, dict) else spec
+            sort.append((field, order))
+    return sort
+
+
+def sort_key(values: list[Any], orders: list[str]) -> tuple:
+    """Build a comparable key from a hit's sort values
+
+    Missing values (null) sort last in either direction, as OpenSearch does.
+    """
+    return tuple(
+        (v is None, v if v is None or o == "asc" else Descending(v))
+        for v, o in zip(values, orders)
+    )
+
+
+def encode_cursor(sort_values: list[Any]) -> str:
+    """Encode the sort values of the last hit on a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(orjson.dumps(sort_values)).decode()
+
+
+def decode_cursor(cursor: str, length: int) -> list[Any]:
+    """Decode a pagination cursor into "search_after" sort values"""
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        values = None
+    if not isinstance(values, list) or len(values) != length:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST, f"Invalid pagination cursor {cursor!r}"
+        )
+    return values
 
 
 def removeKeys(filterDict: dict[str, any], keys_to_remove: list[str]) -> dict[str, any]:
@@ -0,0 +1,121 @@
+"""Micro-benchmark of search hit deduplication
+
+These aren't run with the unit tests; run them explicitly with
+
+    pytest -s tests/benchmark/test_dedup.py
+
+or as a script to print a timing table:
+
+    python -m tests.benchmark.test_dedup
+"""
+
+import random
+import time
+
+import pytest
+
+from app.services.search import dedup_hits
+
+
+def flatten_dict(d, parent_key="", sep="."):
+    """Method to flatten a ES doc for comparing duplicates"""
+    items = []
+    for k, v in d.items():
+        new_key = parent_key + sep + k if parent_key else k
+        if isinstance(v, dict):
+            items.extend(flatten_dict(v, new_key, sep=sep).items())
+        elif isinstance(v, list):
+            for i, val in enumerate(v):
+                items.extend(flatten_dict({str(i): val}, new_key, sep=sep).items())
+        else:
+            items.append((new_key, v))
+    return dict(items)
+
+
+def legacy_remove_duplicates(all_results):
+    """The original flatten-and-sort deduplication, for comparison"""
+    seen = set()
+    filtered_results = []
+    for each_result in all_results:
+        flat_doc = flatten_dict(each_result)
+        if tuple(sorted(flat_doc.items())) in seen:
+            continue
+        else:
+            filtered_results.append(each_result)
+            seen.add(tuple(sorted(flat_doc.items())))
+    return filtered_results
+
+
+def synthetic_hits(count: int, duplicates: float = 0.1) -> list[dict]:
+    """Build OCP-like hits with nested jobConfig and metadata
+
+    Args:
+        count: number of hits
+        duplicates: fraction of the hits which repeat an earlier hit
+    """
+    rng = random.Random(count)
+    hits = []
+    for i in range(count):
+        if hits and rng.random() < duplicates:
+            hits.append(rng.choice(hits))
+            continue
+        uuid = f"{i:08x}-5ee0-4c5b-a3c6-{rng.getrandbits(48):012x}"
+        hits.append(
+            {
+                "_index": "perf_scale_ci",
+                "_id": uuid,
+                "_score": None,
+                "_source": {
+                    "uuid": uuid,
+                    "timestamp": f"2024-06-{i % 28 + 1:02d}T12:00:00Z",
+                    "ocpVersion": f"4.{14 + i % 4}.0-0.nightly",
+                    "benchmark": "cluster-density-v2",
+                    "jobStatus": rng.choice(["success", "failure"]),
+                    "jobConfig": {
+                        "name": "cluster-density-v2",
+                        "jobIterations": rng.randint(1, 500),
+                        "qps": 20,
+                        "burst": 20,
+                        "objects": [
+                            {"objectTemplate": f"t{n}.yml", "replicas": n}
+                            for n in range(5)
+                        ],
+                    },
+                    "metadata": {
+                        "platform": "AWS",
+                        "workerNodesCount": rng.randint(3, 120),
+                        "k8sVersion": "v1.29.5",
+                        "labels": [f"label-{n}" for n in range(4)],
+                    },
+                },
+            }
+        )
+    return hits
+
+
+def timed(dedup, hits) -> tuple[float, list[dict]]:
+    start = time.perf_counter()
+    result = dedup(hits)
+    return time.perf_counter() - start, result
+
+
+@pytest.mark.parametrize("count", [10_000, 100_000])
+def test_dedup_speedup(count):
+    hits = synthetic_hits(count)
+
+    legacy, expected = timed(legacy_remove_duplicates, hits)
+    current, result = timed(dedup_hits, hits)
+
+    print(f"\n{count} hits: legacy {legacy:.3f}s, dedup_hits {current:.3f}s")
+    assert result == expected
+    assert current * 5 < legacy
+
+
+if __name__ == "__main__":
+    print(f"{'hits':>8} {'legacy':>9} {'by _id':>9} {'by uuid':>9}")
+    for count in (10_000, 30_000, 100_000):
+        hits = synthetic_hits(count)
+        legacy, _ = timed(legacy_remove_duplicates, hits)
+        by_id, _ = timed(dedup_hits, hits)
+        by_key, _ = timed(lambda h: dedup_hits(h, "uuid"), hits)
+        print(f"{count:>8} {legacy:>8.3f}s {by_id:>8.3f}s {by_key:>8.3f}s")
@@ -0,0 +1,98 @@
+"""Micro-benchmark of OCP job enrichment
+
+Compares the original row-wise DataFrame.apply derivations with the
+vectorized enrichJobs pipeline. Run explicitly with
+
+    pytest -s tests/benchmark/test_enrichment.py
+
+or as a script to print a timing table:
+
+    python -m tests.benchmark.test_enrichment
+"""
+
+import random
+import time
+
+import pandas as pd
+import pytest
+
+from app.api.v1.commons import ocp, utils
+
+COLUMNS = ["benchmark", "platform", "jobType", "isRehearse", "jobStatus", "build"]
+
+
+def synthetic_jobs(count: int) -> pd.DataFrame:
+    """Build a DataFrame of OCP-like jobs, as getData sees them"""
+    rng = random.Random(count)
+    jobs = []
+    for i in range(count):
+        stream = rng.choice(["4.15.0-0.nightly", "4.16.0-0.ci", "stable"])
+        jobs.append(
+            {
+                "uuid": f"{i:08x}",
+                "upstreamJob": rng.choice(
+                    [
+                        "periodic-ci-openshift-qe-ocp-qe-perfscale-ci",
+                        "periodic-ci-upgrade-rehearse-1234",
+                        "pull-ci-openshift-qe-ocp-qe-perfscale-ci",
+                        "",
+                    ]
+                ),
+                "benchmark": rng.choice(["cluster-density-v2", "node-density", ""]),
+                "clusterType": rng.choice(["self-managed", "rosa", "rosa-hcp", ""]),
+                "masterNodesCount": rng.choice([0, 3]),
+                "infraNodesCount": rng.choice([0, 3]),
+                "platform": rng.choice(["AWS", "GCP", "Azure"]),
+                "jobStatus": rng.choice(["SUCCESS", "failure", "Failure"]),
+                "releaseStream": stream,
+                "ocpVersion": f"{stream}-2024-06-{i % 28 + 1:02d}-123456",
+                "encrypted": rng.choice(["N/A", "false", "true"]),
+                "encryptionType": rng.choice(["aescbc", "aesgcm", ""]),
+            }
+        )
+    return pd.DataFrame(jobs)
+
+
+def row_apply(jobs: pd.DataFrame) -> pd.DataFrame:
+    """The original row-wise enrichment, for comparison"""
+    jobs["encryptionType"] = jobs.apply(ocp.fillEncryptionType, axis=1)
+    jobs["benchmark"] = jobs.apply(utils.updateBenchmark, axis=1)
+    jobs["platform"] = jobs.apply(utils.clasifyAWSJobs, axis=1)
+    jobs["jobType"] = jobs.apply(utils.jobType, axis=1)
+    jobs["isRehearse"] = jobs.apply(utils.isRehearse, axis=1)
+    jobs["jobStatus"] = jobs.apply(utils.updateStatus, axis=1)
+    jobs["build"] = jobs.apply(utils.getBuild, axis=1)
+    return jobs
+
+
+def vectorized(jobs: pd.DataFrame) -> pd.DataFrame:
+    jobs["encryptionType"] = ocp.fillEncryptionTypes(jobs)
+    return utils.enrichJobs(jobs, COLUMNS)
+
+
+def timed(enrich, jobs: pd.DataFrame) -> tuple[float, pd.DataFrame]:
+    jobs = jobs.copy()
+    start = time.perf_counter()
+    result = enrich(jobs)
+    return time.perf_counter() - start, result
+
+
+@pytest.mark.parametrize("count", [10_000, 50_000])
+def test_enrichment_speedup(count):
+    jobs = synthetic_jobs(count)
+
+    legacy, expected = timed(row_apply, jobs)
+    current, result = timed(vectorized, jobs)
+
+    print(f"\n{count} jobs: row apply {legacy:.3f}s, vectorized {current:.3f}s")
+    pd.testing.assert_frame_equal(result, expected)
+    assert current * 5 < legacy
+
+
+if __name__ == "__main__":
+    print(f"{'jobs':>8} {'apply':>9} {'vector':>9}")
+    for count in (10_000, 50_000):
+        jobs = synthetic_jobs(count)
+        legacy, _ = timed(row_apply, jobs)
+        current, _ = timed(vectorized, jobs)
+        print(f"{count:>8} {legacy:>8.3f}s {current:>8.3f}s")
@@ -1,12 +1,48 @@
 import pytest
 from vyper import Vyper
 
+from app.api.v1.endpoints.ocp.summary import iteration_memo
+from app.config import Configurable
 from app.services.crucible_svc import CrucibleService
+from app.services.search import registry
 from tests.unit.fake_elastic import FakeAsyncElasticsearch
 from tests.unit.fake_elastic_service import FakeElasticService
 from tests.unit.fake_splunk import FakeSplunkService
 
 
+@pytest.fixture(autouse=True)
+def client_registry():
+    """Don't share pooled OpenSearch clients between tests"""
+    registry.clear()
+    yield registry
+    registry.clear()
+
+
+@pytest.fixture(autouse=True)
+def configured():
+    """Load every configured singleton from the test settings
+
+    Responses and baselines aren't cached, summary reports aren't
+    materialized, and no state is persisted, unless a test configures it.
+    """
+    settings = Vyper(config_name="ocpperf")
+    settings.set("response-cache.ttl", 0)
+    settings.set("baseline-cache.ttl", 0)
+    for singleton in list(Configurable.instances):
+        singleton.load(settings)
+    yield settings
+    for singleton in list(Configurable.instances):
+        singleton.load(settings)
+
+
+@pytest.fixture(autouse=True)
+def iterations():
+    """Don't share remembered job iteration counts between tests"""
+    iteration_memo.clear()
+    yield iteration_memo
+    iteration_memo.clear()
+
+
 @pytest.fixture
 def fake_config(monkeypatch):
     """Provide a fake configuration"""
@@ -115,6 +115,25 @@ class FakeElasticService(ElasticService):
             "No mock data was defined for ElasticService.post() - call set_post_response() first"
         )
 
+    async def merged_page(
+        self,
+        query,
+        size,
+        cursor=None,
+        indice=None,
+        start_date=None,
+        end_date=None,
+        timestamp_field=None,
+        **kwargs,
+    ):
+        """Mock the ElasticService.merged_page method using post responses
+
+        The continuation cursor is reported as "next" when the page is full.
+        """
+        response = await self.post(query, indice, size, start_date, end_date)
+        full = len(response["data"]) >= size
+        return {**response, "cursor": "next" if full else None}
+
     async def filterPost(
         self,
         start_datetime,
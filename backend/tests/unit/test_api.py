@@ -6,6 +6,7 @@ import pytest
 
 from app.api.api import router, version
 from app.main import app as fastapi_app
+from app.services.cache import caches, history_cache
 
 """Unit tests for the main API router and version endpoint.
 
@@ -185,6 +186,51 @@ class TestVersionEndpointHTTP:
             assert response.json() == expected_default
 
 
+class TestConnectionsEndpointHTTP:
+    """Test cases for the /api/connections HTTP endpoint."""
+
+    def test_connections_endpoint_http(self, client, client_registry):
+        """Test connection pool statistics via HTTP."""
+        stats = {"ocp.elasticsearch": {"maxsize": 10, "in_use": 1, "idle": 2}}
+        with patch.object(client_registry, "stats", return_value=stats):
+            response = client.get("/api/connections")
+        assert response.status_code == 200
+        assert response.json() == stats
+
+    def test_lifespan_closes_clients(self, client_registry):
+        """Test that the pooled clients are closed at application shutdown."""
+        with patch.object(client_registry, "close") as close:
+            with TestClient(fastapi_app):
+                close.assert_not_called()
+            close.assert_called_once()
+
+
+class TestCacheEndpointHTTP:
+    """Test cases for the /api/cache HTTP endpoint."""
+
+    def test_cache_endpoint_http(self, client):
+        """Test response cache statistics via HTTP."""
+        response = client.get("/api/cache")
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {c.name for c in caches} | {
+            "history",
+            "metadata",
+            "baselines",
+        }
+        assert data["cpt-jobs"]["ttl"] == 0
+        assert data["cpt-jobs"]["hits"] == 0
+        assert data["history"]["directory"] is None
+
+    def test_invalidate_history_http(self, client):
+        """Test invalidating the archive history cache via HTTP."""
+        with patch.object(history_cache, "invalidate", return_value=3) as invalidate:
+            response = client.delete("/api/cache/history?index=ocp")
+        assert response.status_code == 200
+        assert response.json() == {"removed": 3}
+        invalidate.assert_called_once_with("ocp")
+
+
 class TestAPIRouterConfiguration:
     """Test cases for the API router configuration."""
 
@@ -0,0 +1,390 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from app.services.cache import (
+    CacheBackend,
+    HistoryCache,
+    MemoryBackend,
+    MetadataCache,
+    RedisBackend,
+    ResponseCache,
+)
+
+"""Unit tests for the response cache"""
+
+
+class Clock:
+    """A controllable wall clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """The subset of the redis.asyncio client used by RedisBackend"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key, (None,))[0]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = (value, ex)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class Computation:
+    """Count the calls of a computation returning successive values"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return {"value": self.calls}
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(clock):
+    cache = ResponseCache("test")
+    cache.configure(ttl=10, stale=20, backend=MemoryBackend(1024), clock=clock)
+    return cache
+
+
+class TestResponseCache:
+
+    async def test_hit(self, cache):
+        """A fresh entry is returned without recomputing"""
+        compute = Computation()
+        assert await cache.get("k", compute) == {"value": 1}
+        assert await cache.get("k", compute) == {"value": 1}
+        assert compute.calls == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    async def test_stale_while_revalidate(self, cache, clock):
+        """A stale entry is served while it's refreshed in the background"""
+        compute = Computation()
+        await cache.get("k", compute)
+        clock.now += 15
+
+        assert await cache.get("k", compute) == {"value": 1}
+        await asyncio.gather(*cache.refreshing)
+        assert compute.calls == 2
+        assert await cache.get("k", compute) == {"value": 2}
+        stats = cache.stats()
+        assert stats["stale_hits"] == 1
+        assert stats["refreshes"] == 1
+        assert stats["hits"] == 1
+
+    async def test_expired(self, cache, clock):
+        """An entry older than ttl + stale is recomputed before responding"""
+        compute = Computation()
+        await cache.get("k", compute)
+        clock.now += 31
+        assert await cache.get("k", compute) == {"value": 2}
+        assert cache.stats()["misses"] == 2
+
+    async def test_single_flight(self, cache):
+        """Concurrent misses for a key share one computation"""
+        release = asyncio.Event()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return calls
+
+        waiters = [asyncio.create_task(cache.get("k", compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == [1, 1, 1]
+        assert calls == 1
+
+    async def test_reset_while_computing(self, cache):
+        """A computation in progress when the cache is reset still returns"""
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "done"
+
+        task = asyncio.create_task(cache.get("k", compute))
+        await asyncio.sleep(0)
+        cache.reset()
+        release.set()
+        assert await task == "done"
+        assert cache.pending == {}
+
+    async def test_failure_not_cached(self, cache):
+        """A failed computation is raised to every waiter and not stored"""
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("broken")
+
+        results = await asyncio.gather(
+            cache.get("k", fail), cache.get("k", fail), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+        assert await cache.get("k", Computation()) == {"value": 1}
+
+    async def test_uncacheable(self, cache, clock):
+        """A value that isn't cacheable is returned but not stored"""
+        compute = Computation()
+        await cache.get("k", compute)
+        clock.now += 15
+
+        def cacheable(value):
+            return value["value"] < 2
+
+        assert await cache.get("k", compute, cacheable) == {"value": 1}
+        await asyncio.gather(*cache.refreshing)
+        assert await cache.get("k", compute, cacheable) == {"value": 1}
+        assert await cache.get("new", compute, cacheable) == {"value": 3}
+        assert await cache.get("new", compute, cacheable) == {"value": 4}
+        assert cache.stats()["uncached"] == 3
+
+    async def test_disabled(self, cache):
+        """A ttl of 0 disables caching"""
+        cache.configure(ttl=0)
+        compute = Computation()
+        await cache.get("k", compute)
+        await cache.get("k", compute)
+        assert compute.calls == 2
+
+    def test_make_key_normalized(self):
+        """Keys are stable for equal parameters"""
+        assert ResponseCache.make_key("a", [1, 2], None) == '["a",[1,2],null]'
+
+
+class TestMemoryBackend:
+
+    async def test_lru_eviction(self):
+        """The least recently used entries are evicted beyond maxsize"""
+        backend = MemoryBackend(25)
+        await backend.set("a", 0, "x" * 8, 0)
+        await backend.set("b", 0, "y" * 8, 0)
+        await backend.get("a")
+        await backend.set("c", 0, "z" * 8, 0)
+
+        assert await backend.get("b") is None
+        assert await backend.get("a") == (0, "x" * 8)
+        assert backend.stats() == {
+            "entries": 2,
+            "bytes": 20,
+            "maxsize": 25,
+            "evictions": 1,
+        }
+
+    async def test_copies(self):
+        """Entries are stored serialized, and each read is a new copy"""
+        backend = MemoryBackend(1024)
+        value = {"results": [{"uuid": "a"}]}
+        await backend.set("k", 0, value, 0)
+        value["results"].clear()
+
+        _, first = await backend.get("k")
+        assert first == {"results": [{"uuid": "a"}]}
+        first["results"].append({"uuid": "b"})
+        assert await backend.get("k") == (0, {"results": [{"uuid": "a"}]})
+        assert backend.size == len(b'{"results":[{"uuid":"a"}]}')
+
+    def test_abstract(self):
+        """A backend must implement the storage methods"""
+
+        class Partial(CacheBackend):
+            async def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            Partial()
+
+    async def test_oversize(self):
+        """An entry larger than the whole cache isn't stored"""
+        backend = MemoryBackend(4)
+        await backend.set("a", 0, "toolong", 0)
+        assert await backend.get("a") is None
+        assert backend.size == 0
+
+
+class TestRedisBackend:
+
+    async def test_round_trip(self, clock):
+        """Entries are serialized and expire once too stale"""
+        redis = FakeRedis()
+        cache = ResponseCache("test")
+        cache.configure(
+            ttl=10,
+            stale=20,
+            backend=RedisBackend(prefix="test:", client=redis),
+            clock=clock,
+        )
+        compute = Computation()
+        await cache.get("k", compute)
+        assert await cache.get("k", compute) == {"value": 1}
+        assert compute.calls == 1
+        assert redis.data["test:k"][1] == 31
+
+        await cache.clear()
+        assert redis.data == {}
+
+    def test_requires_redis(self, monkeypatch):
+        """Without the redis package, the backend can't be created"""
+        monkeypatch.setitem(sys.modules, "redis.asyncio", None)
+        with pytest.raises(RuntimeError):
+            RedisBackend("redis://localhost")
+
+
+class TestHistoryCache:
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        history = HistoryCache()
+        history.configure(str(tmp_path))
+        return history
+
+    async def test_fetch(self, history, tmp_path):
+        """A search result is stored on disk and reused"""
+        compute = Computation()
+        key = history.make_key("path", "index*", {"query": 1})
+
+        assert await history.fetch("index*", key, compute) == {"value": 1}
+        assert await history.fetch("index*", key, compute) == {"value": 1}
+        assert compute.calls == 1
+        assert (tmp_path / "index_" / f"{key}.json.gz").is_file()
+        stats = await history.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["bytes"] > 0
+
+    async def test_failure_not_stored(self, history):
+        """A failed search isn't stored"""
+
+        async def fail():
+            raise ValueError("broken")
+
+        with pytest.raises(ValueError):
+            await history.fetch("index*", "k", fail)
+        assert (await history.stats())["entries"] == 0
+
+    async def test_invalidate(self, history):
+        """Stored results are removed by index pattern prefix, or all"""
+        for index in ("ocp-a*", "ocp-b*", "quay*"):
+            await history.fetch(index, "k", Computation())
+
+        assert await history.invalidate("ocp-a") == 1
+        assert (await history.stats())["entries"] == 2
+        assert await history.invalidate() == 2
+        assert (await history.stats())["entries"] == 0
+
+    async def test_maxsize(self, tmp_path, clock):
+        """The oldest results are removed beyond maxsize"""
+        history = HistoryCache()
+        history.configure(str(tmp_path), maxage=0, clock=clock)
+        for n, key in enumerate(("a", "b", "c")):
+            await history.fetch("index*", key, Computation())
+            os.utime(history.path("index*", key), (1000 + n, 1000 + n))
+        size = (await history.stats())["bytes"]
+        history.configure(str(tmp_path), maxsize=size, maxage=0, clock=clock)
+
+        await history.fetch("index*", "d", Computation())
+        stats = await history.stats()
+        assert stats["evictions"] == 1
+        assert stats["entries"] == 3
+        assert not history.path("index*", "a").exists()
+        assert history.path("index*", "d").exists()
+
+    async def test_maxage(self, tmp_path, clock):
+        """A result stored more than maxage seconds ago isn't used"""
+        history = HistoryCache()
+        history.configure(str(tmp_path), maxage=60, clock=clock)
+        compute = Computation()
+        await history.fetch("index*", "k", compute)
+        clock.now = history.path("index*", "k").stat().st_mtime + 30
+        assert await history.fetch("index*", "k", compute) == {"value": 1}
+        clock.now += 60
+        assert await history.fetch("index*", "k", compute) == {"value": 2}
+        assert compute.calls == 2
+
+    async def test_disabled(self):
+        """Without a directory the cache is disabled"""
+        history = HistoryCache()
+        history.configure(None)
+        assert not history.enabled
+        assert await history.invalidate() == 0
+        assert (await history.stats())["directory"] is None
+
+
+class TestMetadataCache:
+
+    @pytest.fixture
+    def metadata(self):
+        metadata = MetadataCache()
+        metadata.configure(maxsize=2)
+        return metadata
+
+    async def test_lookup(self, metadata):
+        """Stored documents are found; others are reported missing"""
+        await metadata.store("ocp", {"a": {"uuid": "a"}})
+        found, missing = await metadata.lookup("ocp", ["a", "b", "a"])
+        assert found == {"a": {"uuid": "a"}}
+        assert missing == ["b"]
+        assert (await metadata.lookup("quay", ["a"]))[1] == ["a"]
+        stats = metadata.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+    async def test_copies(self, metadata):
+        """Changing a document that's been looked up doesn't change the cache"""
+        await metadata.store("ocp", {"a": {"uuid": "a"}})
+        found, _ = await metadata.lookup("ocp", ["a"])
+        found["a"]["benchmark"] = "changed"
+        assert (await metadata.lookup("ocp", ["a"]))[0] == {"a": {"uuid": "a"}}
+
+    async def test_evict(self, metadata):
+        """The least recently used documents are evicted"""
+        await metadata.store("ocp", {"a": {"uuid": "a"}, "b": {"uuid": "b"}})
+        await metadata.lookup("ocp", ["a"])
+        await metadata.store("ocp", {"c": {"uuid": "c"}})
+        found, missing = await metadata.lookup("ocp", ["a", "b", "c"])
+        assert sorted(found) == ["a", "c"]
+        assert missing == ["b"]
+        assert metadata.stats()["evictions"] == 1
+
+    async def test_spill(self, metadata, tmp_path):
+        """Evicted documents are spilled to disk and read back"""
+        metadata.configure(maxsize=1, directory=str(tmp_path))
+        await metadata.store("ocp.elasticsearch", {"a": {"uuid": "a"}})
+        await metadata.store("ocp.elasticsearch", {"b": {"uuid": "b"}})
+        assert len(list(tmp_path.glob("*/*.json"))) == 1
+
+        found, missing = await metadata.lookup("ocp.elasticsearch", ["a"])
+        assert found == {"a": {"uuid": "a"}}
+        assert missing == []
+        stats = metadata.stats()
+        assert stats["disk_hits"] == 1
+        assert stats["entries"] == 1
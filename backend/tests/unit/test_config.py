@@ -0,0 +1,50 @@
+from vyper import Vyper
+
+from app.config import Configurable
+
+"""Unit tests for the configured singletons"""
+
+
+class Limits(Configurable):
+    SECTION = "limits"
+
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+
+    def configure(self, size: int = 10, depth: int = 2):
+        self.size = int(size)
+        self.depth = int(depth)
+        self.loaded = True
+
+    def settings(self, cfg: Vyper) -> dict:
+        self.loads += 1
+        return {
+            "size": self.setting(cfg, "size", 10),
+            "depth": self.setting(cfg, "depth", 2),
+        }
+
+
+class TestConfigurable:
+
+    def test_load_section(self, monkeypatch):
+        """The section is loaded once, when the singleton is first used"""
+        cfg = Vyper(config_name="ocpperf")
+        cfg.set("limits.size", 20)
+        cfg.set("other.depth", 5)
+        monkeypatch.setattr("app.config.get_config", lambda: cfg)
+        limits = Limits()
+        assert limits in Configurable.instances
+        limits.check()
+        limits.check()
+        assert (limits.size, limits.depth) == (20, 2)
+        assert limits.loads == 1
+
+    def test_configured(self, monkeypatch):
+        """A singleton configured directly doesn't load its section"""
+        monkeypatch.setattr("app.config.get_config", lambda: None)
+        limits = Limits()
+        limits.configure(size=5)
+        limits.check()
+        assert limits.size == 5
+        assert limits.loads == 0
@@ -1,12 +1,14 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 import json
 from unittest.mock import AsyncMock
 
 from fastapi.testclient import TestClient
 import pandas as pd
 import pytest
+from vyper import Vyper
 
 from app.main import app as fastapi_app
+from app.services.cache import jobs_cache
 
 """This is a test file for the CPT jobs endpoint.
 
@@ -224,6 +226,22 @@ class TestFetchData:
 
         assert result["data"].empty
         assert result["total"] == 0
+        assert result["error"] == "Test error"
+
+    @pytest.mark.asyncio
+    async def test_fetch_filter_exception(self, monkeypatch):
+        from app.api.v1.endpoints.cpt.cptJobs import fetch_data
+
+        mock_filter = AsyncMock(side_effect=Exception("Test error"))
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.cpt.cptJobs.productsFilter", {"ocp": mock_filter}
+        )
+
+        result = await fetch_data(
+            "ocp", date(2023, 1, 1), date(2023, 1, 15), filter="", is_filter=True
+        )
+
+        assert result == {"product": "ocp", "error": "Test error"}
 
 
 class TestJobsEndpoint:
@@ -426,6 +444,156 @@ class TestJobsEndpoint:
         assert data["offset"] == 20  # offset + size
         assert data["total"] == 100  # totalJobs when offset > 0
 
+    def test_jobs_json_stream(self, client, monkeypatch):
+        """Test jobs endpoint streams the usual response as a JSON stream."""
+
+        async def mock_fetch_data_limited(product, *args, **kwargs):
+            return {"data": pd.DataFrame({"uuid": [product]}), "total": 1}
+
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.cpt.cptJobs.fetch_data_limited",
+            mock_fetch_data_limited,
+        )
+
+        url = "/api/v1/cpt/jobs?start_date=2023-01-10&end_date=2023-01-15"
+        streamed = client.get(url + "&format=json-stream")
+        plain = client.get(url)
+
+        assert streamed.status_code == 200
+        assert streamed.json() == plain.json()
+        assert len(streamed.json()["results"]) == 5
+
+    def test_jobs_csv_accept(self, client, monkeypatch):
+        """Test jobs endpoint exports CSV when the Accept header asks for it."""
+
+        async def mock_fetch_data_limited(product, *args, **kwargs):
+            return {"data": pd.DataFrame({"uuid": [product]}), "total": 1}
+
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.cpt.cptJobs.fetch_data_limited",
+            mock_fetch_data_limited,
+        )
+
+        response = client.get(
+            "/api/v1/cpt/jobs?start_date=2023-01-10&end_date=2023-01-15",
+            headers={"Accept": "text/csv"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.headers["X-Total"] == "5"
+        assert "jobs-2023-01-10-2023-01-15.csv" in (
+            response.headers["Content-Disposition"]
+        )
+        assert response.text.splitlines() == [
+            "uuid",
+            "ocp",
+            "quay",
+            "hce",
+            "telco",
+            "ocm",
+        ]
+
+    def test_jobs_cached(self, client, monkeypatch):
+        """Test repeated jobs requests are served from the response cache."""
+        jobs_cache.configure(ttl=300, stale=600)
+        calls = []
+
+        async def mock_fetch_data_limited(product, *args, **kwargs):
+            calls.append(product)
+            return {"data": pd.DataFrame({"uuid": [product]}), "total": 1}
+
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.cpt.cptJobs.fetch_data_limited",
+            mock_fetch_data_limited,
+        )
+
+        url = "/api/v1/cpt/jobs?start_date=2023-01-10&end_date=2023-01-15"
+        first = client.get(url + "&filter=product%3Dquay%26product%3Docp")
+        second = client.get(url + "&filter=product%3Docp%26product%3Dquay")
+        client.get(url + "&size=5")
+
+        assert first.json() == second.json()
+        # The second request, with the same filter reordered, is a cache hit
+        assert sorted(calls) == ["hce", "ocm", "ocp", "ocp", "quay", "quay", "telco"]
+        assert jobs_cache.stats()["hits"] == 1
+        assert jobs_cache.stats()["misses"] == 2
+
+    def test_jobs_partial_failure(self, client, monkeypatch):
+        """Test a product's failure is reported, and the response not cached."""
+        jobs_cache.configure(ttl=300, stale=600)
+        calls = []
+
+        async def mock_fetch_data_limited(product, *args, **kwargs):
+            calls.append(product)
+            if product == "quay":
+                return {"data": pd.DataFrame(), "total": 0, "error": "timed out"}
+            if product == "hce":
+                raise RuntimeError("broken")
+            return {"data": pd.DataFrame({"uuid": [product]}), "total": 1}
+
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.cpt.cptJobs.fetch_data_limited",
+            mock_fetch_data_limited,
+        )
+
+        url = "/api/v1/cpt/jobs?start_date=2023-01-10&end_date=2023-01-15"
+        first = client.get(url).json()
+        client.get(url)
+
+        assert first["errors"] == {"quay": "timed out", "hce": "broken"}
+        assert first["total"] == 3
+        assert len(calls) == 10
+        assert jobs_cache.stats()["uncached"] == 2
+        assert jobs_cache.stats()["entries"] == 0
+
+        ndjson = client.get(url + "&format=ndjson")
+        assert json.loads(ndjson.headers["X-Errors"]) == first["errors"]
+
+    def test_jobs_cluster_failure(self, client, monkeypatch):
+        """Test a cluster's failure is reported, and the response not cached."""
+        jobs_cache.configure(ttl=300, stale=600)
+        settings = Vyper()
+        settings.set_config_type("yaml")
+        settings.read_config(
+            json.dumps(
+                {
+                    "ocp": {
+                        "elasticsearch": {
+                            "url": "http://live:9200",
+                            "indice": "perf_scale_ci",
+                            "internal": {
+                                "url": "http://archive:9200",
+                                "indice": "perf_scale_ci",
+                            },
+                        }
+                    }
+                }
+            )
+        )
+        monkeypatch.setattr("app.config.get_config", lambda: settings)
+        live, archive = AsyncMock(), AsyncMock()
+        live.search.return_value = {"hits": {"hits": [], "total": {"value": 0}}}
+        archive.search.side_effect = ConnectionError("unreachable")
+        monkeypatch.setattr(
+            "app.services.search.AsyncOpenSearch",
+            lambda url, **kwargs: live if "live" in url else archive,
+        )
+
+        today = date.today()
+        response = client.get(
+            f"/api/v1/cpt/jobs?start_date={today - timedelta(days=30)}"
+            f"&end_date={today}&filter=product%3Docp"
+        ).json()
+
+        assert response["partial"] == {"ocp": ["archive"]}
+        assert response["errors"] == {}
+        assert response["total"] == 0
+        archive.search.assert_awaited_once()
+        live.search.assert_awaited_once()
+        assert jobs_cache.stats()["uncached"] == 1
+        assert jobs_cache.stats()["entries"] == 0
+
 
 class TestFiltersEndpoint:
     """Test the /api/v1/cpt/filters endpoint."""
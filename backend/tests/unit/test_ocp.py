@@ -173,6 +173,25 @@ class TestGetData:
         assert result["total"] == expected_result["total"]
         assert len(result["data"]) == 0
 
+    @pytest.mark.asyncio
+    async def test_get_ocp_cursor_page(self, fake_elastic_service):
+        """Test getData with a cursor pages through merged results."""
+        fake_elastic_service.set_post_response(response_type="post", data_list=[])
+
+        result = await ocp.getData(
+            start_datetime=date(2024, 1, 1),
+            end_datetime=date(2024, 1, 31),
+            size=10,
+            offset=0,
+            sort=None,
+            filter="",
+            configpath="TEST",
+            cursor="",
+        )
+
+        assert len(result["data"]) == 0
+        assert result["cursor"] is None
+
     @pytest.mark.asyncio
     async def test_get_ocp_filtered_platforms(self, fake_elastic_service):
         """Test getData filters out jobs with empty platforms."""
@@ -366,6 +385,16 @@ class TestGetFilterData:
 class TestHelperFunctions:
     """Test cases for OCP helper functions"""
 
+    def test_fill_encryption_types(self):
+        """Test fillEncryptionTypes matches fillEncryptionType for each row."""
+        rows = [
+            {"encrypted": "N/A", "encryptionType": "aes256"},
+            {"encrypted": "false", "encryptionType": "aes256"},
+            {"encrypted": "true", "encryptionType": "aescbc"},
+        ]
+        result = ocp.fillEncryptionTypes(pd.DataFrame(rows))
+        assert result.tolist() == [ocp.fillEncryptionType(r) for r in rows]
+
     def test_fill_encryption_type_with_na(self):
         """Test fillEncryptionType returns N/A when encrypted is N/A."""
         row = {"encrypted": "N/A", "encryptionType": "aes256"}
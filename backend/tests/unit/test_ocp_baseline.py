@@ -0,0 +1,172 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.api.v1.endpoints.ocp.baseline import (
+    BaselineCache,
+    BaselineFingerprint,
+    BaselineRuns,
+)
+
+"""Unit tests for the OCP graph baseline run cache"""
+
+META = {
+    "benchmark": "cluster-density-v2",
+    "masterNodesType": "m6a.xlarge",
+    "masterNodesCount": 3,
+    "workerNodesType": "m6a.xlarge",
+    "workerNodesCount": 24,
+    "platform": "AWS",
+    "ocpVersion": "4.19.0-0.nightly-2025-01-01",
+}
+
+
+def summaries(uuids: list[str]) -> list[dict]:
+    return [
+        {"uuid": u, "jobConfig": {"jobIterations": 24}, "elapsedTime": 100}
+        for u in uuids
+    ]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_735_776_000.0  # 2025-01-02
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(clock):
+    cache = BaselineCache()
+    cache.configure(ttl=60, rebuild=3600, clock=clock)
+    return cache
+
+
+class TestFingerprint:
+
+    def test_key(self):
+        """Jobs of a configuration share a fingerprint, across builds"""
+        key = BaselineFingerprint.from_meta(META, True).key()
+        other = BaselineFingerprint.from_meta(
+            {**META, "ocpVersion": "4.19.0-0.nightly-2025-02-01"}, True
+        )
+        assert other.key() == key
+        assert "wc=24" in key and "v=4.19" in key
+        assert "wc=None" in BaselineFingerprint.from_meta(META, False).key()
+
+
+class TestBaselineCache:
+
+    async def test_hit(self, cache, clock):
+        """A fresh entry is returned without searching"""
+        fingerprint = BaselineFingerprint.from_meta(META, True)
+        find = AsyncMock(return_value=["a", "b"])
+        summarize = AsyncMock(side_effect=summaries)
+
+        runs = await cache.get(fingerprint, find, summarize)
+        assert runs.uuids == ["a", "b"]
+        assert runs.jobs == [
+            {"uuid": "a", "jobConfig": {"jobIterations": 24}},
+            {"uuid": "b", "jobConfig": {"jobIterations": 24}},
+        ]
+        find.assert_awaited_once_with(None)
+
+        clock.now += 30
+        runs.uuids.remove("a")
+        assert await cache.get(fingerprint, find, summarize) == BaselineRuns(
+            uuids=["a", "b"],
+            jobs=runs.jobs,
+            watermark=runs.watermark,
+            refreshed=runs.refreshed,
+            built=runs.built,
+        )
+        assert find.await_count == 1
+        assert cache.stats()["hits"] == 1
+
+    async def test_update(self, cache, clock):
+        """A stale entry searches only since its watermark"""
+        fingerprint = BaselineFingerprint.from_meta(META, True)
+        find = AsyncMock(return_value=["a", "b"])
+        summarize = AsyncMock(side_effect=summaries)
+        await cache.get(fingerprint, find, summarize)
+
+        clock.now += 120
+        find.return_value = ["b", "c", "c"]
+        runs = await cache.get(fingerprint, find, summarize)
+        find.assert_awaited_with("2025-01-01")
+        summarize.assert_awaited_with(["c"])
+        assert runs.uuids == ["a", "b", "c"]
+        assert [j["uuid"] for j in runs.jobs] == ["a", "b", "c"]
+        assert cache.stats()["updates"] == 1
+
+    async def test_rebuild(self, cache, clock):
+        """An entry is searched from scratch after the rebuild interval"""
+        fingerprint = BaselineFingerprint.from_meta(META, True)
+        find = AsyncMock(return_value=["a", "b"])
+        await cache.get(fingerprint, find, AsyncMock(side_effect=summaries))
+
+        clock.now += 7200
+        find.return_value = ["b"]
+        runs = await cache.get(fingerprint, find)
+        find.assert_awaited_with(None)
+        assert runs.uuids == ["b"]
+        assert runs.jobs == []
+        assert cache.stats()["builds"] == 2
+
+    async def test_disabled(self, cache):
+        """With a ttl of 0, every request searches"""
+        cache.configure(ttl=0)
+        fingerprint = BaselineFingerprint.from_meta(META, False)
+        find = AsyncMock(return_value=["a"])
+        await cache.get(fingerprint, find)
+        await cache.get(fingerprint, find)
+        assert find.await_count == 2
+        assert cache.stats()["entries"] == 0
+
+    async def test_shared(self, cache):
+        """Concurrent requests share an update"""
+        fingerprint = BaselineFingerprint.from_meta(META, False)
+        started = asyncio.Event()
+
+        async def find(since):
+            started.set()
+            await asyncio.sleep(0.01)
+            return ["a"]
+
+        first = asyncio.create_task(cache.get(fingerprint, find))
+        await started.wait()
+        second = await cache.get(fingerprint, AsyncMock())
+        assert await first == second
+        assert (await first).uuids is not second.uuids
+        assert cache.stats()["builds"] == 1
+
+    async def test_failure(self, cache):
+        """A failed search isn't cached"""
+        fingerprint = BaselineFingerprint.from_meta(META, False)
+        with pytest.raises(ValueError):
+            await cache.get(fingerprint, AsyncMock(side_effect=ValueError("broken")))
+        assert cache.pending == {}
+        runs = await cache.get(fingerprint, AsyncMock(return_value=["a"]))
+        assert runs.uuids == ["a"]
+
+    async def test_reconfigured_while_updating(self, cache):
+        """An update in progress when the cache is reconfigured still returns"""
+        fingerprint = BaselineFingerprint.from_meta(META, False)
+        release = asyncio.Event()
+
+        async def find(since):
+            await release.wait()
+            return ["a"]
+
+        task = asyncio.create_task(cache.get(fingerprint, find))
+        await asyncio.sleep(0)
+        cache.configure(ttl=60)
+        release.set()
+        assert (await task).uuids == ["a"]
@@ -1,9 +1,9 @@
 from unittest.mock import AsyncMock, patch
 
 from fastapi.testclient import TestClient
-import pandas as pd
 import pytest
 
+from app.api.v1.endpoints.ocp.baseline import baselines
 from app.main import app as fastapi_app
 
 """Unit tests for the OCP graph endpoint.
@@ -33,10 +33,20 @@ def client():
 
 @pytest.fixture
 def mock_elastic_service():
-    """Mock ElasticService."""
+    """Mock ElasticService.
+
+    The scan stream yields the hits of the mocked post response.
+    """
     mock_es = AsyncMock()
     mock_es.post = AsyncMock()
     mock_es.close = AsyncMock()
+
+    async def scan(query, **kwargs):
+        response = await mock_es.post(query=query, **kwargs)
+        for hit in response["data"]:
+            yield hit
+
+    mock_es.scan = scan
     return mock_es
 
 
@@ -127,26 +137,16 @@ def mock_cpu_results_response():
     """Mock response for CPU results aggregation queries."""
     return {
         "aggregations": {
-            "time": {
-                "buckets": [
-                    {
-                        "key": "550e8400-e29b-41d4-a716-446655440000",
-                        "time": {"value_as_string": "2023-01-01T10:00:00Z"},
-                    },
-                    {
-                        "key": "550e8400-e29b-41d4-a716-446655440001",
-                        "time": {"value_as_string": "2023-01-01T11:00:00Z"},
-                    },
-                ]
-            },
             "uuid": {
                 "buckets": [
                     {
                         "key": "550e8400-e29b-41d4-a716-446655440000",
+                        "time": {"value_as_string": "2023-01-01T10:00:00Z"},
                         "cpu": {"value": 0.5},
                     },
                     {
                         "key": "550e8400-e29b-41d4-a716-446655440001",
+                        "time": {"value_as_string": "2023-01-01T11:00:00Z"},
                         "cpu": {"value": 0.6},
                     },
                 ]
@@ -157,39 +157,34 @@ def mock_cpu_results_response():
 
 @pytest.fixture
 def mock_netperf_response():
-    """Mock response for netperf queries."""
+    """Mock response for netperf throughput aggregation queries."""
     return {
-        "data": [
-            {
-                "_source": {
-                    "uuid": "550e8400-e29b-41d4-a716-446655440000",
-                    "profile": "TCP_STREAM",
-                    "messageSize": 1024,
-                    "throughput": 1000,
-                    "hostNetwork": False,
-                    "parallelism": 1,
-                    "service": False,
-                    "acrossAZ": False,
-                    "samples": 10,
-                    "test": "test1",
-                }
-            },
-            {
-                "_source": {
-                    "uuid": "550e8400-e29b-41d4-a716-446655440001",
-                    "profile": "TCP_STREAM",
-                    "messageSize": 2048,
-                    "throughput": 2000,
-                    "hostNetwork": False,
-                    "parallelism": 1,
-                    "service": False,
-                    "acrossAZ": False,
-                    "samples": 10,
-                    "test": "test2",
-                }
-            },
-        ],
-        "total": 2,
+        "aggregations": {
+            "profile": {
+                "buckets": [
+                    {
+                        "key": "TCP_STREAM",
+                        "messageSize": {
+                            "buckets": [
+                                {"key": 1024, "throughput": {"value": 1000.0}},
+                                {"key": 2048, "throughput": {"value": 2000.0}},
+                            ]
+                        },
+                    }
+                ]
+            }
+        }
+    }
+
+
+def percentiles_response(quantileName: str, p99: float) -> dict:
+    """Mock response for a P99 percentiles aggregation query."""
+    return {
+        "aggregations": {
+            "quantileName": {
+                "buckets": [{"key": quantileName, "P99": {"values": {"99.0": p99}}}]
+            }
+        }
     }
 
 
@@ -210,9 +205,9 @@ class TestTrendEndpoint:
         def mock_post_side_effect(query, **kwargs):
             # Mock different responses based on query content
             query_str = str(query)
-            if 'metricName: "jobSummary"' in query_str:
+            if "'jobSummary'" in query_str:
                 return mock_job_summary_response
-            elif "jobStatus: success" in query_str:
+            elif "'jobStatus'" in query_str:
                 return mock_match_runs_response
             elif "podLatencyQuantilesMeasurement" in query_str:
                 return mock_burner_results_response
@@ -271,11 +266,11 @@ class TestTrendEndpoint:
             query_str = str(query)
 
             # Verify correct instance types are used in query for large worker count
-            if "jobStatus: success" in query_str:
+            if "'jobStatus'" in query_str:
                 assert "m6a.4xlarge" in query_str  # master nodes
                 assert "m5.xlarge" in query_str  # worker nodes
                 return mock_match_runs_response
-            elif 'metricName: "jobSummary"' in query_str:
+            elif "'jobSummary'" in query_str:
                 return mock_job_summary_response
             elif "podLatencyQuantilesMeasurement" in query_str:
                 return mock_burner_results_response
@@ -294,6 +289,235 @@ class TestTrendEndpoint:
         assert response.status_code == 200
 
 
+class TestTrendsEndpoint:
+    """Test the multi-version trends endpoint."""
+
+    def test_trends(
+        self,
+        client,
+        mock_elastic_service,
+        mock_match_runs_response,
+        mock_job_summary_response,
+    ):
+        """Each version is trended by a date histogram aggregation."""
+        histograms = []
+
+        def mock_post_side_effect(query, **kwargs):
+            query_str = str(query)
+            if "'jobSummary'" in query_str:
+                return mock_job_summary_response
+            elif "'jobStatus'" in query_str:
+                assert "m5.xlarge" in query_str  # worker nodes for > 50
+                return mock_match_runs_response
+            elif "date_histogram" in query_str:
+                histograms.append(query)
+                return {
+                    "aggregations": {
+                        "time": {
+                            "buckets": [
+                                {
+                                    "key_as_string": "2023-01-01",
+                                    "value": {"values": {"50.0": 1500.0}},
+                                },
+                                {
+                                    "key_as_string": "2023-01-08",
+                                    "value": {"values": {"50.0": None}},
+                                },
+                            ]
+                        }
+                    }
+                }
+            return {"data": [], "total": 0}
+
+        mock_elastic_service.post.side_effect = mock_post_side_effect
+
+        with patch(
+            "app.api.v1.endpoints.ocp.graph.ElasticService",
+            return_value=mock_elastic_service,
+        ):
+            response = client.get(
+                "/api/v1/ocp/graph/trends/cluster-density-v2/120"
+                "?versions=4.18, 4.19,4.18&interval=week"
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [d["name"] for d in data] == [
+            "4.18 results - PodLatency: Ready P99 50th%tile ( seconds )",
+            "4.19 results - PodLatency: Ready P99 50th%tile ( seconds )",
+        ]
+        assert data[0]["x"] == ["2023-01-01"]
+        assert data[0]["y"] == [1.5]
+        assert len(histograms) == 2
+        histogram = histograms[0]["aggs"]["time"]
+        assert histogram["date_histogram"]["calendar_interval"] == "week"
+        assert histogram["aggs"]["value"]["percentiles"] == {
+            "field": "P99",
+            "percents": [50.0],
+        }
+
+    def test_trends_cpu(
+        self,
+        client,
+        mock_elastic_service,
+        mock_match_runs_response,
+        mock_job_summary_response,
+    ):
+        """A namespace's CPU usage is trended without scaling."""
+        histograms = []
+
+        def mock_post_side_effect(query, **kwargs):
+            query_str = str(query)
+            if "'jobSummary'" in query_str:
+                return mock_job_summary_response
+            elif "'jobStatus'" in query_str:
+                return mock_match_runs_response
+            histograms.append(query)
+            return {
+                "aggregations": {
+                    "time": {
+                        "buckets": [
+                            {
+                                "key_as_string": "2023-01-01",
+                                "value": {"values": {"90.0": 2.5}},
+                            }
+                        ]
+                    }
+                }
+            }
+
+        mock_elastic_service.post.side_effect = mock_post_side_effect
+
+        with patch(
+            "app.api.v1.endpoints.ocp.graph.ElasticService",
+            return_value=mock_elastic_service,
+        ):
+            response = client.get(
+                "/api/v1/ocp/graph/trends/node-density/24?versions=4.19"
+                "&metric=cpu&namespace=openshift-ovn-kubernetes&percentile=90"
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data == [
+            {
+                "y": [2.5],
+                "x": ["2023-01-01"],
+                "name": "4.19 results - openshift-ovn-kubernetes 90th%tile CPU usage",
+                "type": "scatter",
+            }
+        ]
+        filters = histograms[0]["query"]["bool"]["filter"]
+        assert {"term": {"metricName.keyword": "containerCPU"}} in filters
+        assert {
+            "term": {"labels.namespace.keyword": "openshift-ovn-kubernetes"}
+        } in filters
+
+    @pytest.mark.parametrize(
+        "count,metric,master,worker",
+        [
+            (120, "cpu", "m6a.4xlarge", "m5.xlarge"),
+            (24, "cpu", "m6a.xlarge", "m6a.xlarge"),
+            (16, "cpu", "m5.2large", "m5.xlarge"),
+            (16, "podLatency", "m6a.xlarge", "m6a.xlarge"),
+        ],
+    )
+    def test_trend_meta(self, count, metric, master, worker):
+        """The instance types depend on the worker count and the metric."""
+        from app.api.v1.endpoints.ocp.graph import trendMeta
+
+        meta = trendMeta("node-density", count, "4.19", metric=metric)
+        assert meta["masterNodesType"] == master
+        assert meta["workerNodesType"] == worker
+
+    @pytest.mark.parametrize("count", [16, 24, 120])
+    def test_trends_cpu_runs(
+        self,
+        client,
+        mock_elastic_service,
+        mock_match_runs_response,
+        mock_job_summary_response,
+        mock_cpu_results_response,
+        count,
+    ):
+        """CPU usage is trended from the same runs as by trend_cpu."""
+        searches = []
+
+        def mock_post_side_effect(query, **kwargs):
+            query_str = str(query)
+            if "'jobSummary'" in query_str:
+                return mock_job_summary_response
+            elif "'jobStatus'" in query_str:
+                searches.append(query)
+                return mock_match_runs_response
+            elif "date_histogram" in query_str:
+                return {"aggregations": {"time": {"buckets": []}}}
+            return mock_cpu_results_response
+
+        mock_elastic_service.post.side_effect = mock_post_side_effect
+
+        with patch(
+            "app.api.v1.endpoints.ocp.graph.ElasticService",
+            return_value=mock_elastic_service,
+        ):
+            assert (
+                client.get(
+                    f"/api/v1/ocp/graph/trends/node-density/{count}?versions=4.19"
+                    "&metric=cpu&namespace=openshift-etcd"
+                ).status_code
+                == 200
+            )
+            assert (
+                client.get(
+                    f"/api/v1/ocp/graph/trend/4.19/{count}/node-density/cpu/"
+                    "openshift-etcd"
+                ).status_code
+                == 200
+            )
+
+        assert len(searches) == 2
+        assert searches[0] == searches[1]
+
+    def test_trends_no_runs(self, client, mock_elastic_service):
+        """A version without runs has an empty trend."""
+        mock_elastic_service.post.return_value = {"data": [], "total": 0}
+
+        with patch(
+            "app.api.v1.endpoints.ocp.graph.ElasticService",
+            return_value=mock_elastic_service,
+        ):
+            response = client.get(
+                "/api/v1/ocp/graph/trends/cluster-density-v2/24?versions=4.19"
+            )
+
+        assert response.status_code == 200
+        assert response.json()[0]["y"] == []
+        assert mock_elastic_service.post.call_count == 1
+
+    @pytest.mark.parametrize(
+        "percentile,name",
+        [
+            (50, "50th%tile"),
+            (1, "1st%tile"),
+            (22, "22nd%tile"),
+            (13, "13th%tile"),
+            (99.9, "99.9th%tile"),
+        ],
+    )
+    def test_percentile_name(self, percentile, name):
+        """Percentiles are named as ordinals"""
+        from app.api.v1.endpoints.ocp.graph import percentileName
+
+        assert percentileName(percentile) == name
+
+    def test_trends_invalid(self, client):
+        """The metric and interval are validated."""
+        url = "/api/v1/ocp/graph/trends/cluster-density-v2/24?versions=4.19"
+        assert client.get(url + "&metric=bad").status_code == 422
+        assert client.get(url + "&interval=hour").status_code == 422
+        assert client.get(url + "&percentile=101").status_code == 422
+
+
 class TestDiffCpuEndpoint:
     """Test the diff_cpu endpoint."""
 
@@ -311,9 +535,9 @@ class TestDiffCpuEndpoint:
         def mock_post_side_effect(query, **kwargs):
             query_str = str(query)
 
-            if 'metricName: "jobSummary"' in query_str:
+            if "'jobSummary'" in query_str:
                 return mock_job_summary_response
-            elif "jobStatus: success" in query_str:
+            elif "'jobStatus'" in query_str:
                 return mock_match_runs_response
             elif "containerCPU" in query_str:
                 return mock_cpu_results_response
@@ -354,9 +578,9 @@ class TestTrendCpuEndpoint:
         def mock_post_side_effect(query, **kwargs):
             query_str = str(query)
 
-            if 'metricName: "jobSummary"' in query_str:
+            if "'jobSummary'" in query_str:
                 return mock_job_summary_response
-            elif "jobStatus: success" in query_str:
+            elif "'jobStatus'" in query_str:
                 return mock_match_runs_response
             elif "containerCPU" in query_str:
                 return mock_cpu_results_response
@@ -394,11 +618,11 @@ class TestTrendCpuEndpoint:
         def mock_post_side_effect(query, **kwargs):
             query_str = str(query)
 
-            if "jobStatus: success" in query_str:
+            if "'jobStatus'" in query_str:
                 # Verify correct instance types for medium count
                 assert "m6a.xlarge" in query_str  # both master and worker nodes
                 return mock_match_runs_response
-            elif 'metricName: "jobSummary"' in query_str:
+            elif "'jobSummary'" in query_str:
                 return mock_job_summary_response
             elif "containerCPU" in query_str:
                 return mock_cpu_results_response
@@ -430,12 +654,12 @@ class TestTrendCpuEndpoint:
         def mock_post_side_effect(query, **kwargs):
             query_str = str(query)
 
-            if "jobStatus: success" in query_str:
+            if "'jobStatus'" in query_str:
                 # Verify correct instance types for small count
                 assert "m5.2large" in query_str  # master nodes
                 assert "m5.xlarge" in query_str  # worker nodes
                 return mock_match_runs_response
-            elif 'metricName: "jobSummary"' in query_str:
+            elif "'jobSummary'" in query_str:
                 return mock_job_summary_response
             elif "containerCPU" in query_str:
                 return mock_cpu_results_response
@@ -465,20 +689,21 @@ class TestGraphEndpoint:
         sample_meta,
         mock_match_runs_response,
         mock_job_summary_response,
-        mock_burner_results_response,
     ):
         """Test graph endpoint with cluster-density benchmark."""
         sample_meta["benchmark"] = "cluster-density-ms"
+        queries = []
 
         def mock_post_side_effect(query, **kwargs):
             query_str = str(query)
 
-            if 'metricName: "jobSummary"' in query_str:
+            if "'jobSummary'" in query_str:
                 return mock_job_summary_response
-            elif "jobStatus: success" in query_str:
+            elif "'jobStatus'" in query_str:
                 return mock_match_runs_response
             elif "podLatencyQuantilesMeasurement" in query_str:
-                return mock_burner_results_response
+                queries.append(query)
+                return percentiles_response("Ready", 1600.0)
             return {"data": [], "total": 0}
 
         mock_elastic_service.post.side_effect = mock_post_side_effect
@@ -503,23 +728,38 @@ class TestGraphEndpoint:
         assert data[1]["name"] == "Current results P99"
         assert data[0]["type"] == "bar"
         assert data[1]["type"] == "bar"
-
-    @pytest.mark.asyncio
-    async def test_graph_k8s_netperf(
+        assert data[0]["y"] == [1.6]
+        assert data[0]["x"] == ["PodLatency-p99"]
+        # The percentiles are aggregated by the server, not fetched as hits
+        assert len(queries) == 2
+        assert all(q["size"] == 0 for q in queries)
+        assert all("percentiles" in str(q["aggs"]) for q in queries)
+
+    @pytest.mark.parametrize(
+        "uuid",
+        [
+            "550e8400-e29b-41d4-a716-446655440000",
+            # A job finished since the baseline runs were cached
+            "550e8400-e29b-41d4-a716-446655440002",
+        ],
+    )
+    def test_graph_k8s_netperf(
         self,
         client,
         mock_elastic_service,
         sample_meta,
         mock_match_runs_response,
         mock_netperf_response,
+        uuid,
     ):
         """Test graph endpoint with k8s-netperf benchmark."""
         sample_meta["benchmark"] = "k8s-netperf"
+        baselines.configure(ttl=300)
 
         def mock_post_side_effect(query, **kwargs):
             query_str = str(query)
 
-            if "jobStatus: success" in query_str:
+            if "'jobStatus'" in query_str:
                 return mock_match_runs_response
             else:
                 return mock_netperf_response
@@ -535,15 +775,15 @@ class TestGraphEndpoint:
                 "app.api.v1.endpoints.ocp.graph.getMetadata", return_value=sample_meta
             ),
         ):
-            response = client.get(
-                "/api/v1/ocp/graph/550e8400-e29b-41d4-a716-446655440000"
-            )
+            response = client.get(f"/api/v1/ocp/graph/{uuid}")
 
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 2
         assert data[0]["name"] == "Previous results average"
         assert data[1]["name"] == "Current results average"
+        assert data[0]["x"] == ["TCP_STREAM-1024", "TCP_STREAM-2048"]
+        assert data[0]["y"] == ["1000.0", "2000.0"]
 
     @pytest.mark.asyncio
     async def test_graph_ingress_perf(
@@ -555,7 +795,7 @@ class TestGraphEndpoint:
         def mock_post_side_effect(query, **kwargs):
             return (
                 mock_match_runs_response
-                if "jobStatus: success" in str(query)
+                if "'jobStatus'" in str(query)
                 else {"data": [], "total": 0}
             )
 
@@ -578,6 +818,55 @@ class TestGraphEndpoint:
         data = response.json()
         assert data == []  # ingress-perf returns empty metrics
 
+    @pytest.mark.parametrize(
+        "uuid",
+        [
+            "550e8400-e29b-41d4-a716-446655440000",
+            # A job finished since the baseline runs were cached
+            "550e8400-e29b-41d4-a716-446655440002",
+        ],
+    )
+    def test_graph_ingress_perf_cached(
+        self,
+        client,
+        mock_elastic_service,
+        sample_meta,
+        mock_match_runs_response,
+        uuid,
+    ):
+        """Repeated graphs of a job don't change its cached baseline runs."""
+        sample_meta["benchmark"] = "ingress-perf"
+        baselines.configure(ttl=300)
+
+        def mock_post_side_effect(query, **kwargs):
+            return (
+                mock_match_runs_response
+                if "'jobStatus'" in str(query)
+                else {"data": [], "total": 0}
+            )
+
+        mock_elastic_service.post.side_effect = mock_post_side_effect
+
+        with (
+            patch(
+                "app.api.v1.endpoints.ocp.graph.ElasticService",
+                return_value=mock_elastic_service,
+            ),
+            patch(
+                "app.api.v1.endpoints.ocp.graph.getMetadata", return_value=sample_meta
+            ),
+        ):
+            for _ in range(2):
+                response = client.get(f"/api/v1/ocp/graph/{uuid}")
+                assert response.status_code == 200
+
+        (entry,) = baselines.entries.values()
+        assert entry.uuids == [
+            "550e8400-e29b-41d4-a716-446655440000",
+            "550e8400-e29b-41d4-a716-446655440001",
+        ]
+        assert baselines.stats()["hits"] == 1
+
     @pytest.mark.asyncio
     async def test_graph_virt_density(
         self,
@@ -590,38 +879,15 @@ class TestGraphEndpoint:
         """Test graph endpoint with virt-density benchmark."""
         sample_meta["benchmark"] = "virt-density"
 
-        # Mock virt-density specific response
-        mock_virt_response = {
-            "data": [
-                {
-                    "_source": {
-                        "uuid": "550e8400-e29b-41d4-a716-446655440000",
-                        "quantileName": "VMReady",
-                        "metricName": "vmiLatencyQuantilesMeasurement",
-                        "P99": 2500,
-                    }
-                },
-                {
-                    "_source": {
-                        "uuid": "550e8400-e29b-41d4-a716-446655440001",
-                        "quantileName": "VMReady",
-                        "metricName": "vmiLatencyQuantilesMeasurement",
-                        "P99": 2600,
-                    }
-                },
-            ],
-            "total": 2,
-        }
-
         def mock_post_side_effect(query, **kwargs):
             query_str = str(query)
 
-            if 'metricName: "jobSummary"' in query_str:
+            if "'jobSummary'" in query_str:
                 return mock_job_summary_response
-            elif "jobStatus: success" in query_str:
+            elif "'jobStatus'" in query_str:
                 return mock_match_runs_response
             elif "vmiLatencyQuantilesMeasurement" in query_str:
-                return mock_virt_response
+                return percentiles_response("VMReady", 2600.0)
             return {"data": [], "total": 0}
 
         mock_elastic_service.post.side_effect = mock_post_side_effect
@@ -655,24 +921,20 @@ class TestHelperFunctions:
 
         sample_cpu_results = {
             "aggregations": {
-                "time": {
+                "uuid": {
                     "buckets": [
                         {
                             "key": "uuid1",
                             "time": {"value_as_string": "2023-01-01T10:00:00Z"},
+                            "cpu": {"value": 0.5},
                         },
                         {
                             "key": "uuid2",
                             "time": {"value_as_string": "2023-01-01T11:00:00Z"},
+                            "cpu": {"value": 0.6},
                         },
                     ]
                 },
-                "uuid": {
-                    "buckets": [
-                        {"key": "uuid1", "cpu": {"value": 0.5}},
-                        {"key": "uuid2", "cpu": {"value": 0.6}},
-                    ]
-                },
             }
         }
 
@@ -736,72 +998,6 @@ class TestHelperFunctions:
         result = jobFilter(None, None)
         assert result == []
 
-    def test_burner_filter(self):
-        """Test burnerFilter function."""
-        from app.api.v1.endpoints.ocp.graph import burnerFilter
-
-        sample_data = [
-            {
-                "timestamp": "2023-01-01T10:00:00Z",
-                "quantileName": "Ready",
-                "metricName": "podLatencyQuantilesMeasurement",
-                "P99": 1500,
-            },
-            {
-                "timestamp": "2023-01-01T11:00:00Z",
-                "quantileName": "Ready",
-                "metricName": "podLatencyQuantilesMeasurement",
-                "P99": 1600,
-            },
-        ]
-
-        df = pd.DataFrame(sample_data)
-        result = burnerFilter(df)
-
-        assert "quantileName" in result.columns
-        assert "metricName" in result.columns
-        assert "P99" in result.columns
-        assert len(result) == 2
-
-    def test_netperf_filter(self):
-        """Test netperfFilter function."""
-        from app.api.v1.endpoints.ocp.graph import netperfFilter
-
-        sample_data = [
-            {
-                "profile": "TCP_STREAM",
-                "hostNetwork": False,
-                "parallelism": 1,
-                "service": False,
-                "acrossAZ": False,
-                "samples": 10,
-                "messageSize": 1024,
-                "throughput": 1000,
-                "test": "test1",
-            },
-            {
-                "profile": "UDP_STREAM",
-                "hostNetwork": True,  # This should be filtered out
-                "parallelism": 1,
-                "service": False,
-                "acrossAZ": False,
-                "samples": 10,
-                "messageSize": 2048,
-                "throughput": 2000,
-                "test": "test2",
-            },
-        ]
-
-        df = pd.DataFrame(sample_data)
-        result = netperfFilter(df)
-
-        # Should filter out items with hostNetwork=True
-        assert len(result) <= len(sample_data)
-        for _, row in result.iterrows():
-            assert row["hostNetwork"] is False
-            assert row["parallelism"] == 1
-            assert "TCP_STREAM" in row["profile"]
-
     @pytest.mark.asyncio
     async def test_get_burner_results(self, mock_elastic_service):
         """Test getBurnerResults function."""
@@ -837,6 +1033,64 @@ class TestHelperFunctions:
         result = await getBurnerResults("", [], "ripsaw-kube-burner*")
         assert result == []
 
+    @pytest.mark.asyncio
+    async def test_get_burner_percentiles(self, mock_elastic_service):
+        """Test getBurnerPercentiles excludes the job and aggregates."""
+        from app.api.v1.endpoints.ocp.graph import getBurnerPercentiles
+
+        mock_elastic_service.post.return_value = percentiles_response("Ready", 1550.5)
+        uuids = ["uuid1", "uuid2"]
+
+        with patch(
+            "app.api.v1.endpoints.ocp.graph.ElasticService",
+            return_value=mock_elastic_service,
+        ):
+            result = await getBurnerPercentiles("uuid1", uuids, "ripsaw-kube-burner*")
+
+        assert result.to_dict("records") == [{"quantileName": "Ready", "P99": 1550.5}]
+        query = mock_elastic_service.post.call_args.args[0]
+        assert query["query"]["bool"]["filter"][0] == {
+            "terms": {"uuid.keyword": ["uuid2"]}
+        }
+        assert uuids == ["uuid1", "uuid2"]
+        mock_elastic_service.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_burner_percentiles_empty(self):
+        """Test getBurnerPercentiles with empty UUIDs."""
+        from app.api.v1.endpoints.ocp.graph import getBurnerPercentiles
+
+        result = await getBurnerPercentiles("", [], "ripsaw-kube-burner*")
+        assert result.empty
+        assert list(result.columns) == ["quantileName", "P99"]
+
+    @pytest.mark.asyncio
+    async def test_get_netperf_throughput(
+        self, mock_elastic_service, mock_netperf_response
+    ):
+        """Test getNetperfThroughput filters and averages on the server."""
+        from app.api.v1.endpoints.ocp.graph import getNetperfThroughput
+
+        mock_elastic_service.post.return_value = mock_netperf_response
+
+        with patch(
+            "app.api.v1.endpoints.ocp.graph.ElasticService",
+            return_value=mock_elastic_service,
+        ):
+            result = await getNetperfThroughput("uuid1", ["uuid1"], "k8s-netperf")
+
+        assert result.to_dict("records") == [
+            {"profile": "TCP_STREAM", "messageSize": 1024, "throughput": 1000.0},
+            {"profile": "TCP_STREAM", "messageSize": 2048, "throughput": 2000.0},
+        ]
+        query = mock_elastic_service.post.call_args.args[0]
+        assert query["size"] == 0
+        assert {"term": {"parallelism": 1}} in query["query"]["bool"]["filter"]
+        assert {"term": {"hostNetwork": True}} in query["query"]["bool"]["must_not"]
+        assert {"prefix": {"profile.keyword": "TCP_STREAM"}} in query["query"]["bool"][
+            "filter"
+        ]
+
     @pytest.mark.asyncio
     async def test_get_match_runs(self, mock_elastic_service, sample_meta):
         """Test getMatchRuns function."""
@@ -858,3 +1112,20 @@ class TestHelperFunctions:
         assert "uuid1" in result
         assert "uuid2" in result
         mock_elastic_service.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_match_runs_since(self, mock_elastic_service, sample_meta):
+        """getMatchRuns can search only for runs since a date."""
+        from app.api.v1.endpoints.ocp.graph import getMatchRuns
+
+        mock_elastic_service.post.return_value = {"data": [], "total": 0}
+        with patch(
+            "app.api.v1.endpoints.ocp.graph.ElasticService",
+            return_value=mock_elastic_service,
+        ):
+            await getMatchRuns(sample_meta, True, "2025-01-02")
+
+        query = mock_elastic_service.post.call_args.kwargs["query"]
+        assert {
+            "range": {"timestamp": {"gte": "2025-01-02", "format": "yyyy-MM-dd"}}
+        } in query["query"]["bool"]["filter"]
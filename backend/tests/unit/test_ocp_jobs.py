@@ -203,6 +203,53 @@ class TestJobsEndpoint:
         data = json.loads(response.json())
         assert data["offset"] == 15  # offset + size
 
+    @pytest.mark.asyncio
+    async def test_jobs_with_cursor(self, client, monkeypatch):
+        """Test jobs endpoint returns the continuation cursor."""
+        mock_get_data = AsyncMock(
+            return_value={
+                "data": pd.DataFrame([{"uuid": "test-uuid"}]),
+                "total": 1,
+                "cursor": "next-page",
+            }
+        )
+
+        monkeypatch.setattr("app.api.v1.endpoints.ocp.ocpJobs.getData", mock_get_data)
+
+        response = client.get("/api/v1/ocp/jobs?size=10&cursor=")
+
+        assert response.status_code == 200
+        data = json.loads(response.json())
+        assert data["cursor"] == "next-page"
+        assert mock_get_data.call_args.kwargs["cursor"] == ""
+
+    @pytest.mark.asyncio
+    async def test_jobs_ndjson(self, client, monkeypatch):
+        """Test jobs endpoint streams NDJSON."""
+        mock_get_data = AsyncMock(
+            return_value={
+                "data": pd.DataFrame([{"uuid": "a"}, {"uuid": "b"}]),
+                "total": 2,
+            }
+        )
+
+        monkeypatch.setattr("app.api.v1.endpoints.ocp.ocpJobs.getData", mock_get_data)
+
+        response = client.get("/api/v1/ocp/jobs?size=10&format=ndjson")
+
+        assert response.status_code == 200
+        assert [json.loads(line) for line in response.text.splitlines()] == [
+            {"uuid": "a"},
+            {"uuid": "b"},
+        ]
+        assert response.headers["X-Total"] == "2"
+        assert response.headers["X-Offset"] == "10"
+
+    def test_jobs_invalid_format(self, client):
+        """Test jobs endpoint rejects unknown stream formats."""
+        response = client.get("/api/v1/ocp/jobs?format=xml")
+        assert response.status_code == 422
+
     @pytest.mark.asyncio
     async def test_jobs_with_filter(self, client, monkeypatch):
         """Test jobs endpoint with filter parameter."""
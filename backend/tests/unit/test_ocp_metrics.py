@@ -0,0 +1,165 @@
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.api.v1.endpoints.ocp.metrics import bucketStats, statAggs
+from app.main import app as fastapi_app
+
+"""Unit tests for the kube-burner metric analytics endpoint"""
+
+
+@pytest.fixture
+def client():
+    yield TestClient(fastapi_app)
+
+
+def bucket(namespace: str, count: int, avg: float, p99: float) -> dict:
+    return {
+        "key": {"namespace": namespace},
+        "doc_count": count,
+        "avg": {"value": avg},
+        "percentiles": {"values": [{"key": 99.0, "value": p99}]},
+    }
+
+
+def page(buckets: list[dict], after: dict | None = None) -> dict:
+    groups = {"buckets": buckets}
+    if after:
+        groups["after_key"] = after
+    return {"aggregations": {"groups": groups}}
+
+
+class TestAggregations:
+
+    def test_stat_aggs(self):
+        """Percentiles share one aggregation; others are named for the stat"""
+        assert statAggs("value", ["avg", "p99", "max", "p50"]) == {
+            "avg": {"avg": {"field": "value"}},
+            "max": {"max": {"field": "value"}},
+            "percentiles": {
+                "percentiles": {
+                    "field": "value",
+                    "percents": [50.0, 99.0],
+                    "keyed": False,
+                }
+            },
+        }
+
+    def test_bucket_stats(self):
+        stats = bucketStats(bucket("a", 2, 1.5, 3.0), ["avg", "p99", "p50"])
+        assert stats == {"avg": 1.5, "p99": 3.0, "p50": None}
+
+
+class TestMetricsEndpoint:
+
+    def test_compare(self, client):
+        """Groups are computed for both run sets and joined by key"""
+        queries = []
+
+        def post(query, **kwargs):
+            queries.append(query)
+            uuids = query["query"]["bool"]["filter"][0]["terms"]["uuid.keyword"]
+            if uuids == ["current"]:
+                return page(
+                    [bucket("etcd", 10, 40.0, 90.0), bucket("ovn", 5, 10.0, 20.0)]
+                )
+            return page([bucket("etcd", 100, 32.0, 80.0), bucket("dns", 50, 1.0, 2.0)])
+
+        es = AsyncMock()
+        es.post.side_effect = post
+        with patch("app.api.v1.endpoints.ocp.metrics.ElasticService", return_value=es):
+            response = client.post(
+                "/api/v1/ocp/graph/metrics",
+                json={
+                    "uuids": ["current"],
+                    "baseline": ["old1"],
+                    "metricName": "containerCPU",
+                    "labels": {"namespace": ["etcd", "ovn", "dns"]},
+                    "stats": ["avg", "p99"],
+                    "groupBy": ["namespace"],
+                },
+            )
+
+        assert response.status_code == 200
+        groups = response.json()["groups"]
+        assert [g["key"] for g in groups] == [
+            {"namespace": "etcd"},
+            {"namespace": "ovn"},
+            {"namespace": "dns"},
+        ]
+        assert groups[0]["current"] == {"count": 10, "avg": 40.0, "p99": 90.0}
+        assert groups[0]["baseline"]["count"] == 100
+        assert groups[0]["change"] == {"avg": 0.25, "p99": 0.125}
+        assert groups[1]["baseline"] is None
+        assert groups[1]["change"] == {"avg": None, "p99": None}
+        assert groups[2]["current"] is None
+
+        assert len(queries) == 2
+        filters = queries[0]["query"]["bool"]["filter"]
+        assert {"term": {"metricName.keyword": "containerCPU"}} in filters
+        assert {
+            "terms": {"labels.namespace.keyword": ["etcd", "ovn", "dns"]}
+        } in filters
+        composite = queries[0]["aggs"]["groups"]["composite"]
+        assert composite["sources"] == [
+            {"namespace": {"terms": {"field": "labels.namespace.keyword"}}}
+        ]
+        assert es.close.await_count == 2
+
+    def test_pages(self, client):
+        """A composite aggregation is paged by its after_key"""
+        responses = [
+            page([bucket("a", 1, 1.0, 1.0)], after={"namespace": "a"}),
+            page([bucket("b", 1, 2.0, 2.0)]),
+        ]
+        es = AsyncMock()
+        es.post.side_effect = responses
+        with (
+            patch("app.api.v1.endpoints.ocp.metrics.ElasticService", return_value=es),
+            patch("app.api.v1.commons.query.AGG_BUCKET_SIZE", 1),
+        ):
+            response = client.post(
+                "/api/v1/ocp/graph/metrics",
+                json={
+                    "uuids": ["u1"],
+                    "metricName": "containerMemory",
+                    "groupBy": ["namespace"],
+                },
+            )
+
+        assert response.status_code == 200
+        groups = response.json()["groups"]
+        assert [g["current"]["avg"] for g in groups] == [1.0, 2.0]
+        assert "baseline" not in groups[0]
+        second = es.post.call_args_list[1].args[0]
+        assert second["aggs"]["groups"]["composite"]["after"] == {"namespace": "a"}
+
+    def test_ungrouped(self, client):
+        """Without a grouping, the runs' metrics are a single group"""
+        es = AsyncMock()
+        es.post.return_value = page(
+            [{"key": {"all": "containerCPU"}, "doc_count": 3, "max": {"value": 9.0}}]
+        )
+        with patch("app.api.v1.endpoints.ocp.metrics.ElasticService", return_value=es):
+            response = client.post(
+                "/api/v1/ocp/graph/metrics",
+                json={"uuids": ["u1"], "metricName": "containerCPU", "stats": ["max"]},
+            )
+
+        assert response.json()["groups"] == [
+            {"key": {}, "current": {"count": 3, "max": 9.0}}
+        ]
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"uuids": [], "metricName": "containerCPU"},
+            {"uuids": ["u1"], "metricName": "containerCPU", "stats": ["median"]},
+            {"uuids": ["u1"], "metricName": "containerCPU", "stats": ["p101"]},
+            {"uuids": ["u1"]},
+        ],
+    )
+    def test_invalid(self, client, body):
+        response = client.post("/api/v1/ocp/graph/metrics", json=body)
+        assert response.status_code == 422
@@ -24,15 +24,30 @@ def client():
     yield TestClient(fastapi_app)
 
 
-@pytest.fixture
-def mock_elastic_service():
-    """Mock ElasticService."""
+def scanning_service():
+    """Build a mock ElasticService
+
+    The scan stream yields the hits of the mocked post response.
+    """
     mock_es = AsyncMock()
     mock_es.post = AsyncMock()
     mock_es.close = AsyncMock()
+
+    async def scan(query, **kwargs):
+        response = await mock_es.post(query=query, **kwargs)
+        for hit in response["data"]:
+            yield hit
+
+    mock_es.scan = scan
     return mock_es
 
 
+@pytest.fixture
+def mock_elastic_service():
+    """Mock ElasticService."""
+    return scanning_service()
+
+
 @pytest.fixture
 def sample_job_id():
     """Sample job ID for testing."""
@@ -89,278 +104,80 @@ def sample_elasticsearch_response():
 class TestResultsForJobEndpoint:
     """Test the /api/v1/ocp/jobs/{ci}/{job_id} endpoint."""
 
-    @pytest.mark.asyncio
-    async def test_results_for_job_success(
+    def test_results_for_job_success(
         self,
         client,
-        monkeypatch,
+        mock_elastic_service,
         sample_job_id,
         sample_ci_name,
         sample_elasticsearch_response,
     ):
-        """Test successful results for job endpoint call."""
-        mock_elastic_service = AsyncMock()
+        """Test the job's metadata is looked up by UUID."""
         mock_elastic_service.post.return_value = sample_elasticsearch_response
-        mock_elastic_service.close = AsyncMock()
 
         with patch(
-            "app.api.v1.endpoints.ocp.results.ElasticService",
+            "app.api.v1.commons.utils.ElasticService",
             return_value=mock_elastic_service,
-        ):
+        ) as mock_elastic_class:
             response = client.get(f"/api/v1/ocp/jobs/{sample_ci_name}/{sample_job_id}")
 
         assert response.status_code == 200
         data = response.json()
-
-        # Should return the _source data from each hit
-        assert len(data) == 2
-        assert data[0]["uuid"] == "550e8400-e29b-41d4-a716-446655440000"
+        assert len(data) == 1
+        assert data[0]["uuid"] == sample_job_id
         assert data[0]["testName"] == "cluster-density-ms"
         assert data[0]["jobStatus"] == "success"
-        assert data[1]["uuid"] == "550e8400-e29b-41d4-a716-446655440001"
-        assert data[1]["testName"] == "node-density"
-        assert data[1]["jobStatus"] == "failure"
-
-        # Verify ElasticService was called correctly
-        mock_elastic_service.post.assert_called_once()
-        call_args = mock_elastic_service.post.call_args[1]
-        assert "query" in call_args
-        query = call_args["query"]
-        assert query["query"]["query_string"]["query"] == f'uuid: "{sample_job_id}"'
+
+        mock_elastic_class.assert_called_once_with(configpath="ocp.elasticsearch")
+        query = mock_elastic_service.post.call_args.kwargs["query"]
+        assert query["query"]["bool"]["filter"] == [
+            {"terms": {"uuid.keyword": [sample_job_id]}}
+        ]
         mock_elastic_service.close.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_results_for_job_no_results(
-        self, client, monkeypatch, sample_job_id, sample_ci_name
+    def test_results_for_job_no_results(
+        self, client, mock_elastic_service, sample_job_id, sample_ci_name
     ):
-        """Test results for job endpoint when no results are found."""
-        mock_elastic_service = AsyncMock()
+        """Test an unknown job has no results."""
         mock_elastic_service.post.return_value = {"data": []}
-        mock_elastic_service.close = AsyncMock()
 
         with patch(
-            "app.api.v1.endpoints.ocp.results.ElasticService",
+            "app.api.v1.commons.utils.ElasticService",
             return_value=mock_elastic_service,
         ):
             response = client.get(f"/api/v1/ocp/jobs/{sample_ci_name}/{sample_job_id}")
 
         assert response.status_code == 200
-        data = response.json()
-        assert data == []
-
-        mock_elastic_service.close.assert_called_once()
+        assert response.json() == []
 
-    @pytest.mark.asyncio
-    async def test_results_for_job_different_ci_systems(
-        self, client, monkeypatch, sample_job_id, sample_elasticsearch_response
+    def test_results_for_job_cached(
+        self,
+        client,
+        mock_elastic_service,
+        sample_job_id,
+        sample_elasticsearch_response,
     ):
-        """Test results for job endpoint with different CI systems."""
-        mock_elastic_service = AsyncMock()
+        """Test a job is looked up once, whatever its CI system."""
         mock_elastic_service.post.return_value = sample_elasticsearch_response
-        mock_elastic_service.close = AsyncMock()
-
-        ci_systems = ["PROW", "JENKINS", "GITLAB", "TEKTON"]
 
         with patch(
-            "app.api.v1.endpoints.ocp.results.ElasticService",
+            "app.api.v1.commons.utils.ElasticService",
             return_value=mock_elastic_service,
         ):
-            for ci in ci_systems:
+            for ci in ["PROW", "JENKINS"]:
                 response = client.get(f"/api/v1/ocp/jobs/{ci}/{sample_job_id}")
                 assert response.status_code == 200
-                data = response.json()
-                assert len(data) == 2
-
-        # Should be called once for each CI system
-        assert mock_elastic_service.post.call_count == len(ci_systems)
-        assert mock_elastic_service.close.call_count == len(ci_systems)
-
-    @pytest.mark.asyncio
-    async def test_results_for_job_different_job_ids(
-        self, client, monkeypatch, sample_ci_name, sample_elasticsearch_response
-    ):
-        """Test results for job endpoint with different job IDs."""
-        mock_elastic_service = AsyncMock()
-        mock_elastic_service.post.return_value = sample_elasticsearch_response
-        mock_elastic_service.close = AsyncMock()
-
-        job_ids = [
-            "550e8400-e29b-41d4-a716-446655440000",
-            "660e8400-e29b-41d4-a716-446655440001",
-            "770e8400-e29b-41d4-a716-446655440002",
-        ]
-
-        with patch(
-            "app.api.v1.endpoints.ocp.results.ElasticService",
-            return_value=mock_elastic_service,
-        ):
-            for job_id in job_ids:
-                response = client.get(f"/api/v1/ocp/jobs/{sample_ci_name}/{job_id}")
-                assert response.status_code == 200
-                data = response.json()
-                assert len(data) == 2
-
-                # Verify the correct job_id was used in the query
-                call_args = mock_elastic_service.post.call_args[1]
-                query = call_args["query"]
-                assert query["query"]["query_string"]["query"] == f'uuid: "{job_id}"'
-
-        assert mock_elastic_service.post.call_count == len(job_ids)
-        assert mock_elastic_service.close.call_count == len(job_ids)
-
-    @pytest.mark.asyncio
-    async def test_results_for_job_single_result(
-        self, client, monkeypatch, sample_job_id, sample_ci_name
-    ):
-        """Test results for job endpoint with single result."""
-        single_result_response = {
-            "data": [
-                {
-                    "_source": {
-                        "uuid": sample_job_id,
-                        "testName": "cluster-density-ms",
-                        "jobStatus": "success",
-                        "platform": "AWS",
-                        "benchmark": "cluster-density-ms",
-                        "ocpVersion": "4.14.0",
-                    }
-                }
-            ]
-        }
-
-        mock_elastic_service = AsyncMock()
-        mock_elastic_service.post.return_value = single_result_response
-        mock_elastic_service.close = AsyncMock()
-
-        with patch(
-            "app.api.v1.endpoints.ocp.results.ElasticService",
-            return_value=mock_elastic_service,
-        ):
-            response = client.get(f"/api/v1/ocp/jobs/{sample_ci_name}/{sample_job_id}")
-
-        assert response.status_code == 200
-        data = response.json()
-        assert len(data) == 1
-        assert data[0]["uuid"] == sample_job_id
-        assert data[0]["testName"] == "cluster-density-ms"
-        assert data[0]["jobStatus"] == "success"
-
-    @pytest.mark.asyncio
-    async def test_results_for_job_elastic_service_configuration(
-        self, client, monkeypatch, sample_job_id, sample_ci_name
-    ):
-        """Test that ElasticService is configured correctly."""
-        mock_elastic_service = AsyncMock()
-        mock_elastic_service.post.return_value = {"data": []}
-        mock_elastic_service.close = AsyncMock()
-
-        with patch(
-            "app.api.v1.endpoints.ocp.results.ElasticService"
-        ) as mock_elastic_class:
-            mock_elastic_class.return_value = mock_elastic_service
-
-            response = client.get(f"/api/v1/ocp/jobs/{sample_ci_name}/{sample_job_id}")
-
-            # Verify ElasticService was initialized with correct config
-            mock_elastic_class.assert_called_once_with(configpath="ocp.elasticsearch")
-            assert response.status_code == 200
+                assert [j["uuid"] for j in response.json()] == [sample_job_id]
+            # The bulk lookup shares the cached job
+            response = client.post("/api/v1/ocp/jobs/metadata", json=[sample_job_id])
+            assert response.json()["missing"] == []
 
-    @pytest.mark.asyncio
-    async def test_results_for_job_query_construction(self, client, monkeypatch):
-        """Test the Elasticsearch query construction."""
-        mock_elastic_service = AsyncMock()
-        mock_elastic_service.post.return_value = {"data": []}
-        mock_elastic_service.close = AsyncMock()
-
-        test_job_id = "test-uuid-12345"
-
-        with patch(
-            "app.api.v1.endpoints.ocp.results.ElasticService",
-            return_value=mock_elastic_service,
-        ):
-            response = client.get(f"/api/v1/ocp/jobs/PROW/{test_job_id}")
-
-        assert response.status_code == 200
-
-        # Verify the query structure
-        call_args = mock_elastic_service.post.call_args[1]
-        query = call_args["query"]
-
-        # Check query structure
-        assert "query" in query
-        assert "query_string" in query["query"]
-        assert "query" in query["query"]["query_string"]
-
-        # Check the actual query string
-        expected_query_string = f'uuid: "{test_job_id}"'
-        assert query["query"]["query_string"]["query"] == expected_query_string
-
-    @pytest.mark.asyncio
-    async def test_results_for_job_error_handling(self, client, monkeypatch):
-        """Test error handling in the results for job endpoint."""
-        # Test when ElasticService raises an exception
-        mock_elastic_service = AsyncMock()
-        mock_elastic_service.post.side_effect = Exception(
-            "Elasticsearch connection error"
-        )
-        mock_elastic_service.close = AsyncMock()
-
-        with patch(
-            "app.api.v1.endpoints.ocp.results.ElasticService",
-            return_value=mock_elastic_service,
-        ):
-            # The endpoint should handle the exception gracefully
-            # Note: We can't test the actual error handling without knowing how it's implemented
-            # This is more of a documentation of what should be tested
-            try:
-                client.get("/api/v1/ocp/jobs/PROW/test-uuid")
-                # If the endpoint handles errors gracefully, it should return some error response
-                # The exact behavior depends on the implementation
-            except Exception:
-                # If the endpoint doesn't handle errors, this would raise
-                pass
-
-    @pytest.mark.asyncio
-    async def test_results_for_job_response_format(
-        self, client, monkeypatch, sample_elasticsearch_response
-    ):
-        """Test that the response format is correct."""
-        mock_elastic_service = AsyncMock()
-        mock_elastic_service.post.return_value = sample_elasticsearch_response
-        mock_elastic_service.close = AsyncMock()
-
-        with patch(
-            "app.api.v1.endpoints.ocp.results.ElasticService",
-            return_value=mock_elastic_service,
-        ):
-            response = client.get("/api/v1/ocp/jobs/PROW/test-uuid")
-
-        assert response.status_code == 200
-        data = response.json()
-
-        # Response should be a list
-        assert isinstance(data, list)
-
-        # Each item should be a dict with the _source data
-        for item in data:
-            assert isinstance(item, dict)
-            # Should contain common fields
-            expected_fields = ["uuid", "testName", "jobStatus"]
-            for field in expected_fields:
-                assert field in item
+        assert mock_elastic_service.post.call_count == 1
 
 
 class TestHelperFunctions:
     """Test helper functions and utilities."""
 
-    def test_query_string_format(self):
-        """Test query string formatting."""
-        test_uuid = "550e8400-e29b-41d4-a716-446655440000"
-        expected_query = f'uuid: "{test_uuid}"'
-
-        # This is the format used in the endpoint
-        assert expected_query == 'uuid: "550e8400-e29b-41d4-a716-446655440000"'
-
     def test_elasticsearch_response_parsing(self):
         """Test parsing of Elasticsearch response."""
         sample_response = {
@@ -411,3 +228,43 @@ class TestHelperFunctions:
             assert isinstance(item, dict)
             assert "uuid" in item
             assert isinstance(item["uuid"], str)
+
+
+class TestMetadataForJobsEndpoint:
+    """Test the /api/v1/ocp/jobs/metadata endpoint."""
+
+    def test_metadata_for_jobs(self, client, sample_elasticsearch_response):
+        """Test looking up the metadata of several jobs with one search."""
+        mock_elastic_service = scanning_service()
+        mock_elastic_service.post.return_value = sample_elasticsearch_response
+        uuids = [
+            "550e8400-e29b-41d4-a716-446655440000",
+            "550e8400-e29b-41d4-a716-446655440001",
+            "missing-uuid",
+        ]
+
+        with patch(
+            "app.api.v1.commons.utils.ElasticService",
+            return_value=mock_elastic_service,
+        ):
+            response = client.post("/api/v1/ocp/jobs/metadata", json=uuids)
+            assert response.status_code == 200
+            data = response.json()
+            assert list(data["metadata"]) == uuids[:2]
+            assert data["metadata"][uuids[1]]["testName"] == "node-density"
+            assert data["missing"] == ["missing-uuid"]
+
+            query = mock_elastic_service.post.call_args.kwargs["query"]
+            assert query["query"]["bool"]["filter"] == [
+                {"terms": {"uuid.keyword": uuids}}
+            ]
+
+            # The found jobs are cached
+            response = client.post("/api/v1/ocp/jobs/metadata", json=uuids[:2])
+            assert response.json()["missing"] == []
+        assert mock_elastic_service.post.call_count == 1
+
+    def test_metadata_for_jobs_invalid(self, client):
+        """Test the request body must be a list of UUIDs."""
+        response = client.post("/api/v1/ocp/jobs/metadata", json={"uuid": "a"})
+        assert response.status_code == 422
@@ -1,10 +1,11 @@
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from app.api.v1.endpoints.ocp.summary import (
     BENCHMARK_MAPPER,
     IngressPerfBenchmark,
+    IterationMemo,
     K8sNetperfBenchmark,
     KubeBurnerBenchmark,
     OcpFingerprint,
@@ -23,12 +24,22 @@ Generated-by: Cursor
 """
 
 
+async def iterate(hits):
+    for hit in hits:
+        yield hit
+
+
 @pytest.fixture
 def mock_elastic_service():
-    """Create a mock ElasticService for testing."""
+    """Create a mock ElasticService for testing.
+
+    scan() streams the "hits" list.
+    """
     mock_service = AsyncMock()
     mock_service.close = AsyncMock()
     mock_service.post = AsyncMock()
+    mock_service.hits = []
+    mock_service.scan = MagicMock(side_effect=lambda **kw: iterate(mock_service.hits))
     return mock_service
 
 
@@ -267,7 +278,7 @@ class TestOcpSummary:
         # Given: Mock response with benchmark and configuration data
         mock_elastic_service.post.return_value = {
             "aggregations": {
-                "configurations": {
+                "composite": {
                     "buckets": [
                         {
                             "key": {
@@ -276,21 +287,21 @@ class TestOcpSummary:
                                 "masterNodesCount": 3,
                                 "workerNodesType": "m5.2xlarge",
                                 "workerNodesCount": 120,
-                            },
-                            "benchmarks": {
-                                "buckets": [
-                                    {
-                                        "key": "cluster-density",
-                                        "uuids": {
-                                            "buckets": [
-                                                {"key": "uuid-1"},
-                                                {"key": "uuid-2"},
-                                            ]
-                                        },
-                                    }
-                                ]
-                            },
-                        }
+                                "benchmark": "cluster-density",
+                                "uuid": "uuid-1",
+                            }
+                        },
+                        {
+                            "key": {
+                                "platform": "aws",
+                                "masterNodesType": "m5.xlarge",
+                                "masterNodesCount": 3,
+                                "workerNodesType": "m5.2xlarge",
+                                "workerNodesCount": 120,
+                                "benchmark": "cluster-density",
+                                "uuid": "uuid-2",
+                            }
+                        },
                     ]
                 }
             }
@@ -307,6 +318,60 @@ class TestOcpSummary:
         assert "uuids" in config
         assert len(config["uuids"]) == 2
 
+    @pytest.mark.asyncio
+    async def test_get_benchmarks_paged(
+        self, mock_ocp_summary, mock_elastic_service, monkeypatch
+    ):
+        """Test get_benchmarks follows after_key through every page of jobs."""
+        # Given: Jobs of two configurations, found a page of two at a time
+        monkeypatch.setattr("app.api.v1.commons.query.AGG_BUCKET_SIZE", 2)
+        small = {
+            "platform": "aws",
+            "masterNodesType": "m5.xlarge",
+            "masterNodesCount": 3,
+            "workerNodesType": "m5.2xlarge",
+            "workerNodesCount": 24,
+        }
+        large = {**small, "workerNodesCount": 120}
+        jobs = [
+            {"key": {**small, "benchmark": "cluster-density", "uuid": "a"}},
+            {"key": {**small, "benchmark": "node-density", "uuid": "b"}},
+            {"key": {**large, "benchmark": "cluster-density", "uuid": "c"}},
+            {"key": {**large, "benchmark": "cluster-density", "uuid": "d"}},
+            {"key": {**large, "benchmark": "node-density", "uuid": "e"}},
+        ]
+        mock_elastic_service.post.side_effect = [
+            {
+                "aggregations": {
+                    "composite": {
+                        "buckets": jobs[i : i + 2],
+                        "after_key": jobs[min(i + 1, 4)]["key"],
+                    }
+                }
+            }
+            for i in range(0, 5, 2)
+        ]
+
+        # When: Getting benchmarks
+        benchmarks = await mock_ocp_summary.get_benchmarks("4.18")
+
+        # Then: Every job is grouped by benchmark and configuration
+        assert mock_elastic_service.post.call_count == 3
+        assert {
+            b: [(c["configuration"].workerNodesCount, c["uuids"]) for c in configs]
+            for b, configs in benchmarks.items()
+        } == {
+            "cluster-density": [(24, ["a"]), (120, ["c", "d"])],
+            "node-density": [(24, ["b"]), (120, ["e"])],
+        }
+        query = mock_elastic_service.post.call_args.kwargs["query"]
+        composite = query["aggs"]["composite"]["composite"]
+        assert composite["after"] == jobs[3]["key"]
+        assert [list(s)[0] for s in composite["sources"]][-2:] == [
+            "benchmark",
+            "uuid",
+        ]
+
     @pytest.mark.asyncio
     async def test_get_iterations_no_filters(
         self, mock_ocp_summary, mock_elastic_service
@@ -328,7 +393,7 @@ class TestOcpSummary:
             # get_benchmarks response for 4.18
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -337,21 +402,21 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "cluster-density",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                    {"key": "uuid-2"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
-                            }
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-1",
+                                }
+                            },
+                            {
+                                "key": {
+                                    "platform": "aws",
+                                    "masterNodesType": "m5.xlarge",
+                                    "masterNodesCount": 3,
+                                    "workerNodesType": "m5.2xlarge",
+                                    "workerNodesCount": 120,
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-2",
+                                }
+                            },
                         ]
                     }
                 }
@@ -359,17 +424,10 @@ class TestOcpSummary:
             # get_iteration_variants response
             {
                 "aggregations": {
-                    "jobIterations": {
+                    "composite": {
                         "buckets": [
-                            {
-                                "key": 100,
-                                "uuids": {
-                                    "buckets": [
-                                        {"key": "uuid-1"},
-                                        {"key": "uuid-2"},
-                                    ]
-                                },
-                            }
+                            {"key": {"uuid": "uuid-1", "iterations": 100}},
+                            {"key": {"uuid": "uuid-2", "iterations": 100}},
                         ]
                     }
                 }
@@ -377,7 +435,7 @@ class TestOcpSummary:
             # get_benchmarks response for 4.19
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -386,19 +444,9 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "k8s-netperf",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-3"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "k8s-netperf",
+                                    "uuid": "uuid-3",
+                                }
                             }
                         ]
                     }
@@ -427,7 +475,7 @@ class TestOcpSummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -436,19 +484,9 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "cluster-density",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
@@ -457,13 +495,8 @@ class TestOcpSummary:
             # get_iteration_variants response
             {
                 "aggregations": {
-                    "jobIterations": {
-                        "buckets": [
-                            {
-                                "key": 100,
-                                "uuids": {"buckets": [{"key": "uuid-1"}]},
-                            }
-                        ]
+                    "composite": {
+                        "buckets": [{"key": {"uuid": "uuid-1", "iterations": 100}}]
                     }
                 }
             },
@@ -489,7 +522,7 @@ class TestOcpSummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -498,26 +531,16 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "cluster-density",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
                 }
             },
             # get_iteration_variants response (empty)
-            {"aggregations": {"jobIterations": {"buckets": []}}},
+            {"aggregations": {"composite": {"buckets": []}}},
         ]
 
         # When: Getting iterations
@@ -546,7 +569,7 @@ class TestOcpSummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -555,21 +578,21 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "cluster-density",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                    {"key": "uuid-2"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
-                            }
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-1",
+                                }
+                            },
+                            {
+                                "key": {
+                                    "platform": "aws",
+                                    "masterNodesType": "m5.xlarge",
+                                    "masterNodesCount": 3,
+                                    "workerNodesType": "m5.2xlarge",
+                                    "workerNodesCount": 120,
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-2",
+                                }
+                            },
                         ]
                     }
                 }
@@ -577,17 +600,10 @@ class TestOcpSummary:
             # get_iteration_variants response
             {
                 "aggregations": {
-                    "jobIterations": {
+                    "composite": {
                         "buckets": [
-                            {
-                                "key": 100,
-                                "uuids": {
-                                    "buckets": [
-                                        {"key": "uuid-1"},
-                                        {"key": "uuid-2"},
-                                    ]
-                                },
-                            }
+                            {"key": {"uuid": "uuid-1", "iterations": 100}},
+                            {"key": {"uuid": "uuid-2", "iterations": 100}},
                         ]
                     }
                 }
@@ -623,7 +639,7 @@ class TestOcpSummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -632,21 +648,21 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "cluster-density",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                    {"key": "uuid-2"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
-                            }
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-1",
+                                }
+                            },
+                            {
+                                "key": {
+                                    "platform": "aws",
+                                    "masterNodesType": "m5.xlarge",
+                                    "masterNodesCount": 3,
+                                    "workerNodesType": "m5.2xlarge",
+                                    "workerNodesCount": 120,
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-2",
+                                }
+                            },
                         ]
                     }
                 }
@@ -654,17 +670,10 @@ class TestOcpSummary:
             # get_iteration_variants response
             {
                 "aggregations": {
-                    "jobIterations": {
+                    "composite": {
                         "buckets": [
-                            {
-                                "key": 100,
-                                "uuids": {
-                                    "buckets": [
-                                        {"key": "uuid-1"},
-                                        {"key": "uuid-2"},
-                                    ]
-                                },
-                            }
+                            {"key": {"uuid": "uuid-1", "iterations": 100}},
+                            {"key": {"uuid": "uuid-2", "iterations": 100}},
                         ]
                     }
                 }
@@ -721,7 +730,7 @@ class TestOcpSummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -730,21 +739,21 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "cluster-density",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                    {"key": "uuid-2"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
-                            }
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-1",
+                                }
+                            },
+                            {
+                                "key": {
+                                    "platform": "aws",
+                                    "masterNodesType": "m5.xlarge",
+                                    "masterNodesCount": 3,
+                                    "workerNodesType": "m5.2xlarge",
+                                    "workerNodesCount": 120,
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-2",
+                                }
+                            },
                         ]
                     }
                 }
@@ -752,49 +761,30 @@ class TestOcpSummary:
             # get_iteration_variants response
             {
                 "aggregations": {
-                    "jobIterations": {
+                    "composite": {
                         "buckets": [
-                            {
-                                "key": 100,
-                                "uuids": {
-                                    "buckets": [
-                                        {"key": "uuid-1"},
-                                        {"key": "uuid-2"},
-                                    ]
-                                },
-                            }
+                            {"key": {"uuid": "uuid-1", "iterations": 100}},
+                            {"key": {"uuid": "uuid-2", "iterations": 100}},
                         ]
                     }
                 }
             },
-            # process response (KubeBurnerBenchmark)
+        ]
+        # process hits (KubeBurnerBenchmark)
+        mock_elastic_service.hits = [
             {
-                "hits": {
-                    "hits": [
-                        {
-                            "_source": {
-                                "uuid": "uuid-1",
-                                "timestamp": "2024-01-15T10:00:00Z",
-                                "P99": 1000,
-                            }
-                        },
-                        {
-                            "_source": {
-                                "uuid": "uuid-2",
-                                "timestamp": "2024-01-15T11:00:00Z",
-                                "P99": 1500,
-                            }
-                        },
-                    ]
-                },
-                "aggregations": {
-                    "stats": {
-                        "min": 1000,
-                        "max": 1500,
-                        "avg": 1250,
-                        "std_deviation": 250,
-                    }
-                },
+                "_source": {
+                    "uuid": "uuid-1",
+                    "timestamp": "2024-01-15T10:00:00Z",
+                    "P99": 1000,
+                }
+            },
+            {
+                "_source": {
+                    "uuid": "uuid-2",
+                    "timestamp": "2024-01-15T11:00:00Z",
+                    "P99": 1500,
+                }
             },
         ]
 
@@ -808,6 +798,7 @@ class TestOcpSummary:
         assert "versions" in result
         assert "readiness" in result
         assert result["readiness"] in ["ready", "warning", "not ready"]
+        mock_elastic_service.scan.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_metric_aggregation_unsupported_benchmark(
@@ -819,7 +810,7 @@ class TestOcpSummary:
             # get_benchmarks response with unsupported benchmark
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -828,19 +819,9 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "custom",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "custom",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
@@ -865,7 +846,7 @@ class TestOcpSummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -874,19 +855,9 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "cluster-density",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
@@ -925,7 +896,7 @@ class TestOcpSummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -934,19 +905,9 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "cluster-density",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
@@ -955,13 +916,8 @@ class TestOcpSummary:
             # get_iteration_variants response
             {
                 "aggregations": {
-                    "jobIterations": {
-                        "buckets": [
-                            {
-                                "key": 100,
-                                "uuids": {"buckets": [{"key": "uuid-1"}]},
-                            }
-                        ]
+                    "composite": {
+                        "buckets": [{"key": {"uuid": "uuid-1", "iterations": 100}}]
                     }
                 }
             },
@@ -993,7 +949,7 @@ class TestOcpSummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -1002,19 +958,9 @@ class TestOcpSummary:
                                     "masterNodesCount": 3,
                                     "workerNodesType": "m5.2xlarge",
                                     "workerNodesCount": 120,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "cluster-density",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "cluster-density",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
@@ -1022,17 +968,17 @@ class TestOcpSummary:
             },
         ]
 
-        # Create a real helper but mock its get_iteration_variants to return empty dict
+        # Create a real helper but mock its variant lookup to return empty dicts
         original_create_helper = mock_ocp_summary.create_helper
 
         def mock_create_helper(benchmark):
             helper = original_create_helper(benchmark)
 
-            # Mock the get_iteration_variants method to return empty dict
-            async def empty_variants(uuids):
-                return {}
+            # Mock the get_iteration_variants_batch method to return empty dicts
+            async def empty_variants(groups):
+                return [{} for _ in groups]
 
-            helper.get_iteration_variants = empty_variants
+            helper.get_iteration_variants_batch = empty_variants
             return helper
 
         monkeypatch.setattr(mock_ocp_summary, "create_helper", mock_create_helper)
@@ -1069,25 +1015,11 @@ class TestKubeBurnerBenchmark:
         # Given: Mock response with iteration data
         mock_elastic_service.post.return_value = {
             "aggregations": {
-                "jobIterations": {
+                "composite": {
                     "buckets": [
-                        {
-                            "key": 100,
-                            "uuids": {
-                                "buckets": [
-                                    {"key": "uuid-1"},
-                                    {"key": "uuid-2"},
-                                ]
-                            },
-                        },
-                        {
-                            "key": 200,
-                            "uuids": {
-                                "buckets": [
-                                    {"key": "uuid-3"},
-                                ]
-                            },
-                        },
+                        {"key": {"uuid": "uuid-1", "iterations": 100}},
+                        {"key": {"uuid": "uuid-2", "iterations": 100}},
+                        {"key": {"uuid": "uuid-3", "iterations": 200}},
                     ]
                 }
             }
@@ -1105,6 +1037,80 @@ class TestKubeBurnerBenchmark:
         assert "uuid-2" in variants[100]
         assert "uuid-3" in variants[200]
 
+    @pytest.mark.asyncio
+    async def test_get_iteration_variants_batch_paged(
+        self, kube_burner_benchmark, mock_elastic_service, monkeypatch
+    ):
+        """Test variants of several UUID lists are found by a paged search."""
+        # Given: A composite aggregation returned in two pages of two buckets
+        monkeypatch.setattr("app.api.v1.commons.query.AGG_BUCKET_SIZE", 2)
+        mock_elastic_service.post.side_effect = [
+            {
+                "aggregations": {
+                    "composite": {
+                        "buckets": [
+                            {"key": {"uuid": "a", "iterations": 200}},
+                            {"key": {"uuid": "b", "iterations": 100}},
+                        ],
+                        "after_key": {"uuid": "b", "iterations": 100},
+                    }
+                }
+            },
+            {
+                "aggregations": {
+                    "composite": {
+                        "buckets": [{"key": {"uuid": "c", "iterations": 100}}],
+                        "after_key": {"uuid": "c", "iterations": 100},
+                    }
+                }
+            },
+        ]
+
+        # When: Getting the variants of two lists, with a job lacking a summary
+        found = await kube_burner_benchmark.get_iteration_variants_batch(
+            [["c", "b", "a"], ["x"]]
+        )
+
+        # Then: The lists are resolved together, following the after_key
+        assert found == [{100: ["b", "c"], 200: ["a"]}, {}]
+        first, second = mock_elastic_service.post.call_args_list
+        composite = first.kwargs["query"]["aggs"]["composite"]["composite"]
+        assert composite["size"] == 2
+        assert "after" not in composite
+        assert first.kwargs["query"]["query"]["bool"]["filter"][0] == {
+            "terms": {"uuid.keyword": ["a", "b", "c", "x"]}
+        }
+        composite = second.kwargs["query"]["aggs"]["composite"]["composite"]
+        assert composite["after"] == {"uuid": "b", "iterations": 100}
+
+    @pytest.mark.asyncio
+    async def test_get_iteration_variants_memo(
+        self, kube_burner_benchmark, mock_elastic_service
+    ):
+        """Test iteration counts already found aren't searched again."""
+        mock_elastic_service.post.return_value = {
+            "aggregations": {
+                "composite": {"buckets": [{"key": {"uuid": "a", "iterations": 9}}]}
+            }
+        }
+
+        assert await kube_burner_benchmark.get_iteration_variants(["a"]) == {9: ["a"]}
+        assert await kube_burner_benchmark.get_iteration_variants(["a"]) == {9: ["a"]}
+        assert mock_elastic_service.post.call_count == 1
+
+        # A job without a summary yet is searched again
+        await kube_burner_benchmark.get_iteration_variants(["a", "b"])
+        assert mock_elastic_service.post.call_count == 2
+        query = mock_elastic_service.post.call_args.kwargs["query"]
+        assert query["query"]["bool"]["filter"][0] == {"terms": {"uuid.keyword": ["b"]}}
+
+    def test_iteration_memo_maxsize(self):
+        """Test the oldest iteration counts are forgotten beyond maxsize."""
+        memo = IterationMemo(maxsize=2)
+        memo.update({"a": 1, "b": 2})
+        memo.update({"c": 3})
+        assert memo.lookup(["a", "b", "c"]) == ({"b": 2, "c": 3}, ["a"])
+
     @pytest.mark.asyncio
     async def test_get_iteration_variants_with_date_filter(
         self, kube_burner_benchmark, mock_elastic_service, mock_ocp_summary
@@ -1113,7 +1119,7 @@ class TestKubeBurnerBenchmark:
         # Given: Mock summary with date filter
         mock_ocp_summary.date_filter = {"range": {"timestamp": {"gte": "2024-01-01"}}}
         mock_elastic_service.post.return_value = {
-            "aggregations": {"jobIterations": {"buckets": []}}
+            "aggregations": {"composite": {"buckets": []}}
         }
 
         # When: Getting iteration variants
@@ -1128,35 +1134,23 @@ class TestKubeBurnerBenchmark:
     @pytest.mark.asyncio
     async def test_process(self, kube_burner_benchmark, mock_elastic_service):
         """Test process returns formatted metric data."""
-        # Given: Mock response with metric data
-        mock_elastic_service.post.return_value = {
-            "hits": {
-                "hits": [
-                    {
-                        "_source": {
-                            "uuid": "uuid-1",
-                            "timestamp": "2024-01-15T10:00:00Z",
-                            "P99": 1000,
-                        }
-                    },
-                    {
-                        "_source": {
-                            "uuid": "uuid-2",
-                            "timestamp": "2024-01-15T11:00:00Z",
-                            "P99": 1500,
-                        }
-                    },
-                ]
+        # Given: Mock hits with metric data
+        mock_elastic_service.hits = [
+            {
+                "_source": {
+                    "uuid": "uuid-1",
+                    "timestamp": "2024-01-15T10:00:00Z",
+                    "P99": 1000,
+                }
             },
-            "aggregations": {
-                "stats": {
-                    "min": 1000,
-                    "max": 1500,
-                    "avg": 1250,
-                    "std_deviation": 250,
+            {
+                "_source": {
+                    "uuid": "uuid-2",
+                    "timestamp": "2024-01-15T11:00:00Z",
+                    "P99": 1500,
                 }
             },
-        }
+        ]
 
         # When: Processing metrics
         result = await kube_burner_benchmark.process(
@@ -1170,34 +1164,70 @@ class TestKubeBurnerBenchmark:
         assert len(result["values"]) == 2
         assert result["values"][0]["uuid"] == "uuid-1"
         assert result["values"][0]["value"] == 1000
+        assert result["graph"]["y"] == [1000, 1500]
         assert result["stats"]["min"] == 1000
         assert result["stats"]["max"] == 1500
         assert result["stats"]["avg"] == 1250
+        assert result["stats"]["std_dev"] == 250
+        assert result["stats"]["percentiles"]["50.0"] == 1250
 
     @pytest.mark.asyncio
     async def test_process_with_filter(
         self, kube_burner_benchmark, mock_elastic_service, mock_ocp_summary
     ):
         """Test process applies benchmark filter."""
-        # Given: Mock response and benchmark with filter
-        mock_elastic_service.post.return_value = {
-            "hits": {"hits": []},
-            "aggregations": {
-                "stats": {"min": 0, "max": 0, "avg": 0, "std_deviation": 0}
-            },
-        }
-
-        # When: Processing metrics
-        await kube_burner_benchmark.process("4.18", "config1", 100, ["uuid-1"])
+        # When: Processing metrics with no matching jobs
+        result = await kube_burner_benchmark.process("4.18", "config1", 100, ["uuid-1"])
 
         # Then: Filter should be applied in query
-        call_kwargs = mock_elastic_service.post.call_args.kwargs
+        call_kwargs = mock_elastic_service.scan.call_args.kwargs
         # Check that filter terms are present
         filters = call_kwargs["query"]["query"]["bool"]["filter"]
         assert any(
             "metricName.keyword" in str(f) or "quantileName.keyword" in str(f)
             for f in filters
         )
+        assert result["values"] == []
+        assert result["stats"]["avg"] is None
+
+    @pytest.mark.asyncio
+    async def test_process_batch(self, kube_burner_benchmark, mock_elastic_service):
+        """Test all variants are sampled by one search and grouped."""
+        # Given: Interleaved hits of two variants, in timestamp order
+        mock_elastic_service.hits = [
+            {"_source": {"uuid": u, "timestamp": t, "P99": v}}
+            for u, t, v in [
+                ("a1", "t1", 10),
+                ("b1", "t2", 100),
+                ("a2", "t3", 30),
+                ("b2", "t4", 300),
+                ("a1", "t5", 20),
+            ]
+        ]
+
+        # When: Processing both variants, and one without jobs
+        samples = await kube_burner_benchmark.process_batch(
+            "4.18",
+            [("c1", 100, ["a1", "a2"]), ("c1", 200, ["b1", "b2"]), ("c2", 9, ["z"])],
+        )
+
+        # Then: A single search finds each variant's values in order
+        mock_elastic_service.scan.assert_called_once()
+        query = mock_elastic_service.scan.call_args.kwargs["query"]
+        assert query["query"]["bool"]["filter"][0] == {
+            "terms": {"uuid.keyword": ["a1", "a2", "b1", "b2", "z"]}
+        }
+        assert [v["timestamp"] for v in samples[0]["values"]] == ["t1", "t3", "t5"]
+        assert samples[0]["graph"]["y"] == [10, 30, 20]
+        assert samples[0]["graph"]["name"] == "4.18 cluster-density c1 100"
+        assert samples[0]["stats"]["avg"] == 20
+        assert samples[1]["values"] == [
+            {"uuid": "b1", "timestamp": "t2", "value": 100},
+            {"uuid": "b2", "timestamp": "t4", "value": 300},
+        ]
+        assert samples[1]["stats"]["min"] == 100
+        assert samples[1]["stats"]["std_dev"] == 100
+        assert samples[2]["values"] == []
 
     @pytest.mark.asyncio
     async def test_evaluate_ready(self, kube_burner_benchmark):
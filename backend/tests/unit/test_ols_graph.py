@@ -0,0 +1,41 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.api.v1.endpoints.ols import olsGraphs
+
+"""Unit tests for the OLS job comparison graph"""
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    """Patch the graph's searches, returning the metric search mock"""
+    bucket = {
+        "key": "post_query",
+        "avg_p99Latency": {"value": 3000.0},
+        "avg_statuscode_200": {"value": 5.0},
+    }
+    api = AsyncMock(
+        return_value={"aggregations": {"group_by_metric": {"buckets": [bucket]}}}
+    )
+    monkeypatch.setattr(olsGraphs, "getMetadata", AsyncMock(return_value={}))
+    monkeypatch.setattr(olsGraphs, "getApiMetrics", api)
+    return api
+
+
+class TestGraph:
+
+    @pytest.mark.parametrize(
+        "runs,searched",
+        [
+            (["a", "b", "c"], [["b", "c"], ["a"]]),
+            (["a"], [["a"]]),
+            (["b", "c"], [["b", "c"]]),
+        ],
+    )
+    async def test_graph(self, monkeypatch, metrics, runs, searched):
+        """The job's own metrics are fetched only if it has a baseline"""
+        monkeypatch.setattr(olsGraphs, "getMatchRuns", AsyncMock(return_value=runs))
+        result = await olsGraphs.graph("a")
+        assert [c.args[0] for c in metrics.call_args_list] == searched
+        assert result["latencyResults"][1]["y"] == [3.0]
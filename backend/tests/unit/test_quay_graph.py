@@ -0,0 +1,41 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.api.v1.endpoints.quay import quayGraphs
+
+"""Unit tests for the Quay job comparison graph"""
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    """Patch the graph's searches, returning the metric search mocks"""
+    api = AsyncMock(return_value={"aggregations": {"latency": {"value": 2000.0}}})
+    images = AsyncMock(return_value={"aggregations": {"uuid": {"buckets": []}}})
+    monkeypatch.setattr(quayGraphs, "getMetadata", AsyncMock(return_value={}))
+    monkeypatch.setattr(quayGraphs, "getQuayMetrics", api)
+    monkeypatch.setattr(quayGraphs, "getImageMetrics", images)
+    return api, images
+
+
+class TestGraph:
+
+    async def test_baseline(self, monkeypatch, metrics):
+        """The job's own metrics are compared with its baseline's"""
+        monkeypatch.setattr(
+            quayGraphs, "getMatchRuns", AsyncMock(return_value=["a", "b"])
+        )
+        api, images = metrics
+        result = await quayGraphs.graph("a")
+        assert [c.args[0] for c in api.call_args_list] == [["a", "b"], ["a"]]
+        assert [c.args[0] for c in images.call_args_list] == [["a", "b"], ["a"]]
+        assert result["latencyResults"][1]["y"] == [2.0, 0.0]
+
+    async def test_no_baseline(self, monkeypatch, metrics):
+        """Without other runs, the job's metrics aren't fetched twice"""
+        monkeypatch.setattr(quayGraphs, "getMatchRuns", AsyncMock(return_value=["a"]))
+        api, images = metrics
+        result = await quayGraphs.graph("a")
+        assert [c.args[0] for c in api.call_args_list] == [["a"]]
+        assert [c.args[0] for c in images.call_args_list] == [["a"]]
+        assert result["latencyResults"][0]["y"] == result["latencyResults"][1]["y"]
@@ -246,7 +246,7 @@ class TestQuaySummary:
         # Given: Mock response with benchmark and configuration data
         mock_elastic_service.post.return_value = {
             "aggregations": {
-                "configurations": {
+                "composite": {
                     "buckets": [
                         {
                             "key": {
@@ -257,21 +257,23 @@ class TestQuaySummary:
                                 "hitSize": 256,
                                 "concurrency": 10,
                                 "imagePushPulls": 1000,
-                            },
-                            "benchmarks": {
-                                "buckets": [
-                                    {
-                                        "key": "quay-load-test",
-                                        "uuids": {
-                                            "buckets": [
-                                                {"key": "uuid-1"},
-                                                {"key": "uuid-2"},
-                                            ]
-                                        },
-                                    }
-                                ]
-                            },
-                        }
+                                "benchmark": "quay-load-test",
+                                "uuid": "uuid-1",
+                            }
+                        },
+                        {
+                            "key": {
+                                "masterNodesType": "m5.xlarge",
+                                "masterNodesCount": 3,
+                                "workerNodesType": "m5.2xlarge",
+                                "workerNodesCount": 5,
+                                "hitSize": 256,
+                                "concurrency": 10,
+                                "imagePushPulls": 1000,
+                                "benchmark": "quay-load-test",
+                                "uuid": "uuid-2",
+                            }
+                        },
                     ]
                 }
             }
@@ -297,7 +299,7 @@ class TestQuaySummary:
         mock_quay_summary.date_filter = {"range": {"timestamp": {"gte": "2024-01-01"}}}
         mock_elastic_service.post.return_value = {
             "aggregations": {
-                "configurations": {
+                "composite": {
                     "buckets": [
                         {
                             "key": {
@@ -308,15 +310,9 @@ class TestQuaySummary:
                                 "hitSize": 256,
                                 "concurrency": 10,
                                 "imagePushPulls": 1000,
-                            },
-                            "benchmarks": {
-                                "buckets": [
-                                    {
-                                        "key": "quay-load-test",
-                                        "uuids": {"buckets": [{"key": "uuid-1"}]},
-                                    }
-                                ]
-                            },
+                                "benchmark": "quay-load-test",
+                                "uuid": "uuid-1",
+                            }
                         }
                     ]
                 }
@@ -353,7 +349,7 @@ class TestQuaySummary:
             # get_benchmarks response for 4.18
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -364,21 +360,23 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "quay-load-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                    {"key": "uuid-2"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
-                            }
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-1",
+                                }
+                            },
+                            {
+                                "key": {
+                                    "masterNodesType": "m5.xlarge",
+                                    "masterNodesCount": 3,
+                                    "workerNodesType": "m5.2xlarge",
+                                    "workerNodesCount": 5,
+                                    "hitSize": 256,
+                                    "concurrency": 10,
+                                    "imagePushPulls": 1000,
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-2",
+                                }
+                            },
                         ]
                     }
                 }
@@ -386,7 +384,7 @@ class TestQuaySummary:
             # get_benchmarks response for 4.19
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -397,19 +395,9 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "quay-load-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-3"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-3",
+                                }
                             }
                         ]
                     }
@@ -436,7 +424,7 @@ class TestQuaySummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -447,19 +435,9 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "quay-load-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
@@ -487,7 +465,7 @@ class TestQuaySummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -498,19 +476,9 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "quay-load-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
@@ -557,7 +525,7 @@ class TestQuaySummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -568,19 +536,9 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "quay-load-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
@@ -616,7 +574,7 @@ class TestQuaySummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -627,21 +585,23 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "quay-load-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                    {"key": "uuid-2"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
-                            }
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-1",
+                                }
+                            },
+                            {
+                                "key": {
+                                    "masterNodesType": "m5.xlarge",
+                                    "masterNodesCount": 3,
+                                    "workerNodesType": "m5.2xlarge",
+                                    "workerNodesCount": 5,
+                                    "hitSize": 256,
+                                    "concurrency": 10,
+                                    "imagePushPulls": 1000,
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-2",
+                                }
+                            },
                         ]
                     }
                 }
@@ -680,7 +640,7 @@ class TestQuaySummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -691,21 +651,23 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "quay-load-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                    {"key": "uuid-2"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
-                            }
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-1",
+                                }
+                            },
+                            {
+                                "key": {
+                                    "masterNodesType": "m5.xlarge",
+                                    "masterNodesCount": 3,
+                                    "workerNodesType": "m5.2xlarge",
+                                    "workerNodesCount": 5,
+                                    "hitSize": 256,
+                                    "concurrency": 10,
+                                    "imagePushPulls": 1000,
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-2",
+                                }
+                            },
                         ]
                     }
                 }
@@ -772,7 +734,7 @@ class TestQuaySummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -783,21 +745,23 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "quay-load-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                    {"key": "uuid-2"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
-                            }
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-1",
+                                }
+                            },
+                            {
+                                "key": {
+                                    "masterNodesType": "m5.xlarge",
+                                    "masterNodesCount": 3,
+                                    "workerNodesType": "m5.2xlarge",
+                                    "workerNodesCount": 5,
+                                    "hitSize": 256,
+                                    "concurrency": 10,
+                                    "imagePushPulls": 1000,
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-2",
+                                }
+                            },
                         ]
                     }
                 }
@@ -875,7 +839,7 @@ class TestQuaySummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -886,19 +850,9 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "unsupported-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "unsupported-test",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
@@ -923,7 +877,7 @@ class TestQuaySummary:
             # get_benchmarks response
             {
                 "aggregations": {
-                    "configurations": {
+                    "composite": {
                         "buckets": [
                             {
                                 "key": {
@@ -934,19 +888,9 @@ class TestQuaySummary:
                                     "hitSize": 256,
                                     "concurrency": 10,
                                     "imagePushPulls": 1000,
-                                },
-                                "benchmarks": {
-                                    "buckets": [
-                                        {
-                                            "key": "quay-load-test",
-                                            "uuids": {
-                                                "buckets": [
-                                                    {"key": "uuid-1"},
-                                                ]
-                                            },
-                                        }
-                                    ]
-                                },
+                                    "benchmark": "quay-load-test",
+                                    "uuid": "uuid-1",
+                                }
                             }
                         ]
                     }
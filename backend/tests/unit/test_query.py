@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from app.api.v1.commons.query import (
+    boolFilter,
+    chunkIds,
+    compositeBuckets,
+    matchFilter,
+    mergeBuckets,
+    searchChunks,
+    termFilter,
+    termsFilter,
+)
+
+"""Unit tests for the OpenSearch query builders"""
+
+
+class TestBuilders:
+
+    def test_terms(self):
+        assert termsFilter("uuid.keyword", ("a", "b")) == {
+            "terms": {"uuid.keyword": ["a", "b"]}
+        }
+        assert termFilter("uuid.keyword", "a") == {"term": {"uuid.keyword": "a"}}
+
+    def test_match(self):
+        """Strings are matched as phrases, other values exactly"""
+        assert matchFilter("platform", "AWS") == {"match_phrase": {"platform": "AWS"}}
+        assert matchFilter("workerNodesCount", 24) == {"term": {"workerNodesCount": 24}}
+
+    def test_bool(self):
+        """Clauses are in filter context, skipping empty clauses"""
+        clause = termFilter("a", 1)
+        assert boolFilter(clause, None) == {"bool": {"filter": [clause]}}
+        assert boolFilter(clause, must_not=[termFilter("b", True)]) == {
+            "bool": {"filter": [clause], "must_not": [{"term": {"b": True}}]}
+        }
+
+
+class TestChunks:
+
+    def test_chunk_ids(self):
+        assert chunkIds(range(5), 2) == [[0, 1], [2, 3], [4]]
+        assert chunkIds(["a"], 2) == [["a"]]
+        assert chunkIds([], 2) == [[]]
+
+    async def test_search_chunks(self):
+        """Chunks are searched concurrently, and results kept in order"""
+        running = []
+        overlapped = []
+
+        async def search(chunk: list[int]) -> int:
+            running.append(chunk)
+            await asyncio.sleep(0)
+            overlapped.append(len(running))
+            return sum(chunk)
+
+        assert await searchChunks(range(7), search, 3) == [3, 12, 6]
+        assert max(overlapped) == 3
+
+    async def test_search_single(self):
+        """A short list is searched once"""
+        calls = []
+
+        async def search(chunk: list[str]) -> list[str]:
+            calls.append(chunk)
+            return chunk
+
+        assert await searchChunks(["a", "b"], search) == [["a", "b"]]
+        assert calls == [["a", "b"]]
+
+    async def test_search_failure(self):
+        """A failed chunk cancels the others"""
+        cancelled = []
+
+        async def search(chunk: list[int]) -> int:
+            if chunk[0] == 0:
+                raise ValueError("broken")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(chunk)
+                raise
+            return 0
+
+        with pytest.raises(ValueError, match="broken"):
+            await searchChunks(range(4), search, 2)
+        await asyncio.sleep(0)
+        assert cancelled == [[2, 3]]
+
+    def test_merge_buckets(self):
+        responses = [
+            {
+                "aggregations": {
+                    "time": {"buckets": [{"key": "a"}]},
+                    "uuid": {"buckets": [{"key": "a"}]},
+                }
+            },
+            {
+                "aggregations": {
+                    "time": {"buckets": [{"key": "b"}]},
+                    "uuid": {"buckets": []},
+                }
+            },
+        ]
+        assert mergeBuckets(responses, "time", "uuid") == {
+            "aggregations": {
+                "time": {"buckets": [{"key": "a"}, {"key": "b"}]},
+                "uuid": {"buckets": [{"key": "a"}]},
+            }
+        }
+
+
+class TestComposite:
+
+    async def test_pages(self):
+        """Pages are searched after the previous page's key until one is short"""
+        pages = [
+            {"buckets": [{"key": {"u": "a"}}, {"key": {"u": "b"}}], "after_key": 1},
+            {"buckets": [{"key": {"u": "c"}}], "after_key": 2},
+        ]
+        queries = []
+
+        async def search(query: dict) -> dict:
+            queries.append(query)
+            return {"aggregations": {"groups": pages[len(queries) - 1]}}
+
+        sources = [{"u": {"terms": {"field": "uuid.keyword"}}}]
+        aggs = {"avg": {"avg": {"field": "value"}}}
+        buckets = [
+            b["key"]["u"]
+            async for b in compositeBuckets(
+                search, {"size": 0}, sources, aggs=aggs, name="groups", size=2
+            )
+        ]
+        assert buckets == ["a", "b", "c"]
+        assert [q["aggs"]["groups"]["composite"].get("after") for q in queries] == [
+            None,
+            1,
+        ]
+        assert queries[0] == {
+            "size": 0,
+            "aggs": {
+                "groups": {
+                    "composite": {"size": 2, "sources": sources},
+                    "aggs": aggs,
+                }
+            },
+        }
+
+    async def test_no_after_key(self):
+        """A full page without an after_key is the last"""
+        calls = []
+
+        async def search(query: dict) -> dict:
+            calls.append(query)
+            return {"aggregations": {"composite": {"buckets": [{"key": {}}]}}}
+
+        buckets = [b async for b in compositeBuckets(search, {}, [], size=1)]
+        assert len(buckets) == 1
+        assert len(calls) == 1
+        assert "aggs" not in calls[0]["aggs"]["composite"]
@@ -1,16 +1,26 @@
-from datetime import datetime
+import asyncio
+import copy
+from datetime import datetime, timedelta
 import json
 from unittest.mock import AsyncMock, Mock, patch
 
+from fastapi import HTTPException
 import pytest
 from vyper import Vyper
 
+from app.api.v1.commons.constants import JOB_KEY
+from app.services.cache import history_cache
 from app.services.search import (
     buildPlatformFilter,
+    ClientRegistry,
+    decode_cursor,
+    dedup_hits,
     ElasticService,
-    flatten_dict,
+    encode_cursor,
     getBuildFilter,
     IndexTimestamp,
+    PooledConnection,
+    registry,
     removeKeys,
     SortedIndexList,
 )
@@ -125,36 +135,6 @@ class TestElasticService:
         assert service.new_es is not None
         assert service.prev_es is None
 
-    @patch("app.services.search.AsyncOpenSearch")
-    def test_initialize_es_with_auth(self, mock_es, mock_config_full):
-        """Test initialize_es method with authentication"""
-
-        service = ElasticService("elasticsearch")
-        es, indice, prefix = service.initialize_es(
-            mock_config_full, "elasticsearch", ""
-        )
-
-        mock_es.assert_called_with(
-            "http://localhost:9200",
-            verify_certs=False,
-            http_auth=("testuser", "testpass"),
-        )
-        assert indice == "test-index"
-        assert prefix == "test-"
-
-    @patch("app.services.search.AsyncOpenSearch")
-    def test_initialize_es_without_auth(self, mock_es, mock_config_no_auth):
-        """Test initialize_es method without authentication"""
-
-        service = ElasticService("elasticsearch")
-        es, indice, prefix = service.initialize_es(
-            mock_config_no_auth, "elasticsearch", "custom-index"
-        )
-
-        mock_es.assert_called_with("http://localhost:9200", verify_certs=False)
-        assert indice == "custom-index"
-        assert prefix == ""
-
     @patch("app.services.search.AsyncOpenSearch")
     @patch("app.services.search.jsonable_encoder")
     async def test_post_aggregation_query(
@@ -237,6 +217,325 @@ class TestElasticService:
         assert result["data"] == [{"_source": {"test": "data"}}]
         assert result["total"] == 1
 
+    @staticmethod
+    def hits(*sources):
+        return {
+            "hits": {
+                "hits": [{"_source": s} for s in sources],
+                "total": {"value": len(sources)},
+            }
+        }
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_post_split_range_concurrent(self, mock_es, mock_config_full):
+        """Archive and live halves of a split date range run concurrently"""
+        live_started = asyncio.Event()
+        live, archive = AsyncMock(), AsyncMock()
+        mock_es.side_effect = [live, archive]
+
+        async def archive_search(**kwargs):
+            # Deadlocks (and times out) unless the live search runs meanwhile
+            await asyncio.wait_for(live_started.wait(), 1)
+            return self.hits({"uuid": "old"})
+
+        async def live_search(**kwargs):
+            live_started.set()
+            return self.hits({"uuid": "new"})
+
+        archive.search.side_effect = archive_search
+        live.search.side_effect = live_search
+
+        today = datetime.today().date()
+        split = today - timedelta(days=7)
+        query = {"query": {"bool": {"filter": {"range": {"timestamp": {}}}}}}
+        service = ElasticService("elasticsearch")
+        result = await service.post(
+            query,
+            start_date=today - timedelta(days=30),
+            end_date=today,
+            timestamp_field="timestamp",
+        )
+
+        assert result == {
+            "data": [{"_source": {"uuid": "old"}}, {"_source": {"uuid": "new"}}],
+            "total": 2,
+        }
+        prev_range = archive.search.call_args.kwargs["body"]["query"]["bool"]
+        new_range = live.search.call_args.kwargs["body"]["query"]["bool"]
+        assert prev_range["filter"]["range"]["timestamp"] == {
+            "gte": str(today - timedelta(days=30)),
+            "lte": str(split),
+        }
+        assert new_range["filter"]["range"]["timestamp"] == {
+            "gte": str(split),
+            "lte": str(today),
+        }
+        # The caller's query isn't modified
+        assert query["query"]["bool"]["filter"]["range"]["timestamp"] == {}
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_post_partial_results(self, mock_es, mock_config_full):
+        """A failing archive cluster yields the live results, reported partial"""
+        live, archive = AsyncMock(), AsyncMock()
+        mock_es.side_effect = [live, archive]
+        archive.search.side_effect = asyncio.TimeoutError()
+        live.search.return_value = self.hits({"uuid": "new"})
+
+        service = ElasticService("elasticsearch")
+        result = await service.post({"query": {"match_all": {}}})
+
+        assert result == {
+            "data": [{"_source": {"uuid": "new"}}],
+            "total": 1,
+            "partial": ["archive"],
+        }
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_post_all_clusters_fail(self, mock_es, mock_config_full):
+        """When no cluster responds, the error is raised"""
+        live, archive = AsyncMock(), AsyncMock()
+        mock_es.side_effect = [live, archive]
+        archive.search.side_effect = asyncio.TimeoutError()
+        live.search.side_effect = ValueError("broken")
+
+        service = ElasticService("elasticsearch")
+        with pytest.raises(asyncio.TimeoutError):
+            await service.post({"query": {"match_all": {}}})
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_post_timeout_budgets(self, mock_es, mock_config_full):
+        """Each cluster's search is bounded by its configured timeout"""
+        mock_config_full.set("elasticsearch.internal.timeout", 0.01)
+        live, archive = AsyncMock(), AsyncMock()
+        mock_es.side_effect = [live, archive]
+
+        async def slow_search(**kwargs):
+            await asyncio.sleep(5)
+
+        archive.search.side_effect = slow_search
+        live.search.return_value = self.hits({"uuid": "new"})
+
+        service = ElasticService("elasticsearch")
+        result = await service.post({"query": {"match_all": {}}})
+
+        assert result["partial"] == ["archive"]
+        assert result["total"] == 1
+        assert live.search.call_args.kwargs["request_timeout"] == 50.0
+        assert archive.search.call_args.kwargs["request_timeout"] == 0.01
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_filterPost_partial_results(self, mock_es, mock_config_full):
+        """filterPost reports the cluster missing from its aggregations"""
+        live, archive = AsyncMock(), AsyncMock()
+        mock_es.side_effect = [live, archive]
+        archive.search.side_effect = asyncio.TimeoutError()
+        live.search.return_value = {
+            "hits": {"total": {"value": 3}},
+            "aggregations": {"upstream": {"buckets": [{"key": "a", "doc_count": 3}]}},
+        }
+
+        today = datetime.today().date()
+        service = ElasticService("elasticsearch")
+        result = await service.filterPost(today - timedelta(days=30), today, {}, None)
+
+        assert result["total"] == 3
+        assert result["upstreamList"] == ["a"]
+        assert result["partial"] == ["archive"]
+
+    @staticmethod
+    def sorted_hits(total, *docs):
+        """Build hits carrying the (timestamp, uuid) sort values"""
+        return {
+            "hits": {
+                "hits": [
+                    {"_source": {"uuid": u, "timestamp": t}, "sort": [t, u]}
+                    for t, u in docs
+                ],
+                "total": {"value": total},
+            }
+        }
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_merged_page(self, mock_es, mock_config_full):
+        """A page merges both clusters into exactly size ordered rows"""
+        live, archive = AsyncMock(), AsyncMock()
+        mock_es.side_effect = [live, archive]
+        live.search.return_value = self.sorted_hits(2, (400, "d"), (300, "c"))
+        # The archive also holds "c" (on the split day)
+        archive.search.return_value = self.sorted_hits(
+            5, (300, "c"), (200, "b"), (200, "bb")
+        )
+
+        today = datetime.today().date()
+        query = {
+            "size": 3,
+            "from": 30,
+            "query": {"bool": {"filter": {"range": {"timestamp": {}}}}},
+        }
+        service = ElasticService("elasticsearch")
+        result = await service.merged_page(
+            query,
+            3,
+            start_date=today - timedelta(days=30),
+            end_date=today,
+            timestamp_field="timestamp",
+        )
+
+        assert [h["_source"]["uuid"] for h in result["data"]] == ["d", "c", "b"]
+        assert result["total"] == 7
+        assert decode_cursor(result["cursor"], 2) == [200, "b"]
+        body = live.search.call_args.kwargs["body"]
+        assert "from" not in body
+        assert "search_after" not in body
+        assert body["size"] == 3
+        assert body["sort"] == [
+            {"timestamp": {"order": "desc"}},
+            {"uuid.keyword": {"order": "asc"}},
+        ]
+
+        # The next page resumes after the cursor on both clusters
+        live.search.return_value = self.sorted_hits(2)
+        archive.search.return_value = self.sorted_hits(5, (200, "bb"))
+        result = await service.merged_page(
+            query,
+            3,
+            cursor=result["cursor"],
+            start_date=today - timedelta(days=30),
+            end_date=today,
+            timestamp_field="timestamp",
+        )
+        assert [h["_source"]["uuid"] for h in result["data"]] == ["bb"]
+        assert result["cursor"] is None
+        for es in (live, archive):
+            body = es.search.call_args.kwargs["body"]
+            assert body["search_after"] == [200, "b"]
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_merged_page_query_sort(self, mock_es, mock_config_no_internal):
+        """The query's sort terms are honored, with a unique tiebreaker"""
+        live = AsyncMock()
+        mock_es.return_value = live
+        live.search.return_value = self.sorted_hits(0)
+
+        service = ElasticService("elasticsearch")
+        query = {
+            "query": {"bool": {"filter": {"range": {"timestamp": {}}}}},
+            "sort": [{"ocpVersion.keyword": {"order": "asc"}}],
+        }
+        result = await service.merged_page(query, 10, timestamp_field="timestamp")
+
+        assert result == {"data": [], "total": 0, "cursor": None}
+        assert live.search.call_args.kwargs["body"]["sort"] == [
+            {"ocpVersion.keyword": {"order": "asc"}},
+            {"uuid.keyword": {"order": "asc"}},
+        ]
+
+    @pytest.mark.parametrize(
+        "cursor", ["garbage!", encode_cursor([1]), encode_cursor({"a": 1})]
+    )
+    def test_decode_cursor_invalid(self, cursor):
+        """A malformed cursor is a bad request"""
+        with pytest.raises(HTTPException) as e:
+            decode_cursor(cursor, 2)
+        assert e.value.status_code == 400
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_post_history_cache(self, mock_es, mock_config_full, tmp_path):
+        """Archive results of a split range are reused; the live tail is not"""
+        history_cache.configure(str(tmp_path))
+        live, archive = AsyncMock(), AsyncMock()
+        mock_es.side_effect = [live, archive]
+        live.search.return_value = self.hits({"uuid": "new"})
+        archive.search.return_value = self.hits({"uuid": "old"})
+
+        today = datetime.today().date()
+        for _ in range(2):
+            service = ElasticService("elasticsearch")
+            query = {"query": {"bool": {"filter": {"range": {"timestamp": {}}}}}}
+            result = await service.post(
+                query,
+                start_date=today - timedelta(days=30),
+                end_date=today,
+                timestamp_field="timestamp",
+            )
+            assert [h["_source"]["uuid"] for h in result["data"]] == ["old", "new"]
+            await service.close()
+
+        assert archive.search.await_count == 1
+        assert live.search.await_count == 2
+        assert (await history_cache.stats())["hits"] == 1
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_scan_point_in_time(self, mock_es, mock_config_no_internal):
+        """scan pages through a point-in-time with search_after"""
+        live = AsyncMock()
+        mock_es.return_value = live
+        live.create_point_in_time.return_value = {"pit_id": "pit-1"}
+        pages = [
+            [{"_id": "1", "sort": [1, "1"]}, {"_id": "2", "sort": [2, "2"]}],
+            [{"_id": "3", "sort": [3, "3"]}],
+        ]
+        bodies = []
+
+        async def search(body, **kwargs):
+            bodies.append(copy.deepcopy(body))
+            return {"pit_id": "pit-2", "hits": {"hits": pages[len(bodies) - 1]}}
+
+        live.search.side_effect = search
+
+        service = ElasticService("elasticsearch")
+        query = {
+            "size": 10,
+            "from": 20,
+            "query": {"match_all": {}},
+            "sort": [{"timestamp": "asc"}],
+        }
+        hits = [h async for h in service.scan(query, page_size=2)]
+
+        assert [h["_id"] for h in hits] == ["1", "2", "3"]
+        live.create_point_in_time.assert_awaited_once_with(
+            index="test-test-index*", params={"keep_alive": "1m"}
+        )
+        assert "index" not in live.search.call_args.kwargs
+        assert bodies[0] == {
+            "query": {"match_all": {}},
+            "sort": [{"timestamp": {"order": "asc"}}, {"_id": {"order": "asc"}}],
+            "size": 2,
+            "pit": {"id": "pit-1", "keep_alive": "1m"},
+        }
+        assert bodies[1]["search_after"] == [2, "2"]
+        assert bodies[1]["pit"]["id"] == "pit-2"
+        live.delete_point_in_time.assert_awaited_once_with(body={"pit_id": ["pit-2"]})
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_scan_without_point_in_time(self, mock_es, mock_config_full):
+        """Without point-in-time support, both clusters are paged by index"""
+        live, archive = AsyncMock(), AsyncMock()
+        mock_es.side_effect = [live, archive]
+        for es in (live, archive):
+            es.create_point_in_time.side_effect = Exception("unsupported")
+        archive.search.return_value = {
+            "hits": {"hits": [{"_index": "i", "_id": "1", "sort": ["1"]}]}
+        }
+        # The live cluster holds a copy of the archived document
+        live.search.return_value = {
+            "hits": {
+                "hits": [
+                    {"_index": "i", "_id": "1", "sort": ["1"]},
+                    {"_index": "i", "_id": "2", "sort": ["2"]},
+                ]
+            }
+        }
+
+        service = ElasticService("elasticsearch")
+        hits = [h async for h in service.scan({"query": {"match_all": {}}})]
+
+        assert [h["_id"] for h in hits] == ["1", "2"]
+        assert archive.search.call_args.kwargs["index"] == "internal-internal-index*"
+        assert live.search.call_args.kwargs["index"] == "test-test-index*"
+        assert "pit" not in live.search.call_args.kwargs["body"]
+        live.delete_point_in_time.assert_not_awaited()
+
     async def test_remove_duplicates(self, mock_config):
         """Test remove_duplicates method"""
         service = ElasticService()
@@ -253,6 +552,78 @@ class TestElasticService:
         unique_ids = [item["_source"]["id"] for item in result]
         assert sorted(unique_ids) == [1, 2, 3]
 
+    async def test_remove_duplicates_by_id(self, mock_config):
+        """Hits are identified by "_index" and "_id" regardless of content"""
+        service = ElasticService()
+        test_data = [
+            {"_index": "a", "_id": "1", "_score": 1.0, "_source": {"v": 1}},
+            {"_index": "a", "_id": "1", "_score": 2.0, "_source": {"v": 1}},
+            {"_index": "b", "_id": "1", "_source": {"v": 1}},
+            {"_index": "a", "_id": "2", "_source": {"v": 1}},
+        ]
+
+        result = await service.remove_duplicates(test_data)
+
+        assert result == [test_data[0], test_data[2], test_data[3]]
+
+    async def test_remove_duplicates_by_key(self, mock_config):
+        """A business key identifies hits across indices"""
+        service = ElasticService()
+        test_data = [
+            {"_index": "a", "_id": "1", "_source": {"metadata": {"uuid": "x"}}},
+            {"_index": "b", "_id": "2", "_source": {"metadata": {"uuid": "x"}}},
+            {"_index": "b", "_id": "3", "_source": {"metadata": {"uuid": "y"}}},
+            # Without the key, fall back to the hit identity
+            {"_index": "b", "_id": "4", "_source": {}},
+            {"_index": "b", "_id": "4", "_source": {}},
+        ]
+
+        result = await service.remove_duplicates(test_data, key="metadata.uuid")
+
+        assert result == [test_data[0], test_data[2], test_data[3]]
+        assert await service.remove_duplicates(test_data) == [
+            test_data[0],
+            test_data[1],
+            test_data[2],
+            test_data[3],
+        ]
+
+    @patch("app.services.search.AsyncOpenSearch")
+    async def test_post_dedup_key(self, mock_es, mock_config_full):
+        """Only a search passing a dedup key merges documents by that key"""
+        live, archive = AsyncMock(), AsyncMock()
+        mock_es.side_effect = [live, archive]
+        archive.search.return_value = {
+            "hits": {
+                "hits": [{"_index": "old", "_id": "1", "_source": {"uuid": "a"}}],
+                "total": {"value": 1},
+            }
+        }
+        live.search.return_value = {
+            "hits": {
+                "hits": [{"_index": "new", "_id": "9", "_source": {"uuid": "a"}}],
+                "total": {"value": 1},
+            }
+        }
+
+        service = ElasticService("elasticsearch")
+        query = {"query": {"match_all": {}}}
+        jobs = await service.post(query, dedup=JOB_KEY)
+        metrics = await service.post(query)
+
+        assert [h["_index"] for h in jobs["data"]] == ["old"]
+        assert [h["_index"] for h in metrics["data"]] == ["old", "new"]
+
+    def test_dedup_hits_content(self):
+        """Hits without an identity are compared by content, in any key order"""
+        test_data = [
+            {"_source": {"a": 1, "b": {"c": [1, 2]}}},
+            {"_source": {"b": {"c": [1, 2]}, "a": 1}},
+            {"_source": {"a": 1, "b": {"c": [2, 1]}}},
+        ]
+
+        assert dedup_hits(test_data) == [test_data[0], test_data[2]]
+
     def test_get_unique_values(self, mock_config):
         """Test get_unique_values method"""
         service = ElasticService()
@@ -440,18 +811,111 @@ class TestElasticService:
 
     @patch("app.services.search.AsyncOpenSearch")
     async def test_close(self, mock_es, mock_config_full):
-        """Test close method"""
+        """Test close method releases, but doesn't close, shared clients"""
 
         mock_es_instance = AsyncMock()
         mock_es.return_value = mock_es_instance
 
         service = ElasticService("elasticsearch")
-        service.prev_es = mock_es_instance
+        assert registry.get("elasticsearch").leases == 1
+        assert registry.get("elasticsearch.internal").leases == 1
 
         await service.close()
 
-        # Should be called twice - once for new_es and once for prev_es
-        assert mock_es_instance.close.call_count == 2
+        mock_es_instance.close.assert_not_called()
+        assert registry.get("elasticsearch").leases == 0
+        assert registry.get("elasticsearch.internal").leases == 0
+
+
+class TestClientRegistry:
+    """Test class for the pooled OpenSearch ClientRegistry"""
+
+    @patch("app.services.search.AsyncOpenSearch")
+    def test_clients_are_shared(self, mock_es, mock_config_full):
+        """Services for the same configpath share a single client"""
+        one = ElasticService("elasticsearch")
+        two = ElasticService("elasticsearch", index="other-index")
+
+        assert one.new_es is two.new_es
+        assert one.prev_es is two.prev_es
+        assert two.new_index == "other-index"
+        assert two.prev_index == "other-index"
+        # One client for the live cluster, one for the archive
+        assert mock_es.call_count == 2
+        assert registry.get("elasticsearch").served == 2
+
+    @patch("app.services.search.AsyncOpenSearch")
+    def test_config_read_once(self, mock_es, mock_config_no_internal, monkeypatch):
+        """The configuration is only read when a cluster is first connected"""
+        calls = []
+        monkeypatch.setattr(
+            "app.config.get_config",
+            lambda: calls.append(1) or mock_config_no_internal,
+        )
+        ElasticService("elasticsearch")
+        ElasticService("elasticsearch")
+        assert len(calls) == 2  # the primary and (missing) archive paths
+        assert registry.get("elasticsearch.internal") is None
+
+    @patch("app.services.search.AsyncOpenSearch")
+    def test_pool_settings(self, mock_es, mock_config_full):
+        """Global pool defaults can be overridden per cluster"""
+        mock_config_full.set("opensearch-pool.maxsize", 20)
+        mock_config_full.set("opensearch-pool.keepalive", 60)
+        mock_config_full.set("elasticsearch.internal.maxsize", 4)
+
+        ElasticService("elasticsearch")
+
+        live = registry.get("elasticsearch")
+        archive = registry.get("elasticsearch.internal")
+        assert (live.maxsize, live.keepalive) == (20, 60.0)
+        assert (archive.maxsize, archive.keepalive) == (4, 60.0)
+        mock_es.assert_any_call(
+            "http://internal:9200",
+            verify_certs=False,
+            http_auth=("internal-user", "internal-pass"),
+            connection_class=PooledConnection,
+            maxsize=4,
+            keepalive=60.0,
+        )
+
+    async def test_stats_and_close(self, mock_config_no_auth):
+        """Report utilization of real (unconnected) clients, and close them"""
+        pool = ClientRegistry()
+        cluster = pool.get("elasticsearch")
+        cluster.leases = 1
+        assert pool.get("elasticsearch") is cluster
+        assert pool.stats() == {
+            "elasticsearch": {
+                "maxsize": 10,
+                "keepalive": 15.0,
+                "in_use": 0,
+                "idle": 0,
+                "leases": 1,
+                "served": 0,
+            }
+        }
+        with patch.object(cluster.client, "close", AsyncMock()) as close:
+            await pool.close()
+            close.assert_awaited_once()
+        assert pool.stats() == {}
+
+    def test_pool_stats(self):
+        """Count an open connector's connections, and none otherwise"""
+        connection = PooledConnection(host="localhost", port=9200)
+        assert connection.pool_stats() == (0, 0)
+
+        connection.session = Mock()
+        connector = connection.session.connector
+        connector.closed = False
+        connector._acquired = {"a", "b"}
+        connector._conns = {"key": ["c"], "other": ["d", "e"]}
+        assert connection.pool_stats() == (2, 3)
+
+        connector._conns = None
+        assert connection.pool_stats() == (0, 0)
+        connector.closed = True
+        assert connection.pool_stats() == (0, 0)
 
 
 class TestIndexTimestamp:
@@ -526,28 +990,6 @@ class TestSortedIndexList:
 class TestStandaloneFunctions:
     """Test class for standalone functions"""
 
-    def test_flatten_dict_simple(self):
-        """Test flatten_dict with simple nested dict"""
-        test_dict = {"a": 1, "b": {"c": 2, "d": {"e": 3}}}
-
-        result = flatten_dict(test_dict)
-
-        assert result["a"] == 1
-        assert result["b.c"] == 2
-        assert result["b.d.e"] == 3
-
-    def test_flatten_dict_with_list(self):
-        """Test flatten_dict with list values"""
-        test_dict = {"a": [1, 2, {"b": 3}], "c": {"d": [4, 5]}}
-
-        result = flatten_dict(test_dict)
-
-        assert result["a.0"] == 1
-        assert result["a.1"] == 2
-        assert result["a.2.b"] == 3
-        assert result["c.d.0"] == 4
-        assert result["c.d.1"] == 5
-
     def test_removeKeys(self):
         """Test removeKeys function"""
         test_dict = {
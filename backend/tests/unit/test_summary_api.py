@@ -1,3 +1,5 @@
+import asyncio
+import json
 from typing import Any, Optional
 
 from fastapi.testclient import TestClient
@@ -5,12 +7,16 @@ import pytest
 
 from app.api.v1.endpoints.summary.summary_api import (
     collect,
+    compact_report,
+    compact_sample,
     create,
+    deadline,
     Product,
     ProductContext,
     ProductResults,
     PRODUCTS,
     router,
+    summary_frame,
     summary_svc,
 )
 from app.main import app as fastapi_app
@@ -272,6 +278,18 @@ class TestSummarySvc:
             assert isinstance(summaries, dict)
             assert "ocp" in summaries
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("timeout,expected", [(300, 300.0), (0, None)])
+    async def test_summary_svc_deadline(
+        self, mock_ocp_summary, configured, timeout, expected
+    ):
+        """Test the configured deadline, or none, applies to each product."""
+        configured.set("summary.timeout", timeout)
+        deadline.load(configured)
+
+        async for summaries in summary_svc("ocp"):
+            assert summaries["ocp"].timeout == expected
+
     @pytest.mark.asyncio
     async def test_summary_svc_invalid_product(self, mock_ocp_summary):
         """Test summary_svc with an invalid product."""
@@ -316,12 +334,13 @@ class TestCollect:
         method = "get_versions"
 
         # When
-        result = await collect(products, context, method)
+        result, failed = await collect(products, context, method)
 
         # Then
         assert isinstance(result, dict)
         assert "ocp" in result
         assert result["ocp"]["4.18"] == ["4.18.0", "4.18.1"]
+        assert failed == {}
 
     @pytest.mark.asyncio
     async def test_collect_with_date_filters(self):
@@ -335,7 +354,7 @@ class TestCollect:
         end_date = "2024-12-31"
 
         # When
-        result = await collect(
+        result, failed = await collect(
             products, context, method, start_date=start_date, end_date=end_date
         )
 
@@ -356,7 +375,7 @@ class TestCollect:
         method = "get_configs"
 
         # When
-        result = await collect(
+        result, failed = await collect(
             products,
             context,
             method,
@@ -380,7 +399,7 @@ class TestCollect:
         method = "get_versions"
 
         # When
-        result = await collect(products, context, method)
+        result, failed = await collect(products, context, method)
 
         # Then
         assert isinstance(result, dict)
@@ -396,13 +415,13 @@ class TestCollect:
         method = "nonexistent_method"
 
         # When
-        # collect should handle AttributeError gracefully and return empty dict
-        result = await collect(products, context, method)
+        # collect should handle AttributeError gracefully and report it
+        result, failed = await collect(products, context, method)
 
         # Then
-        # Should return empty dict when method doesn't exist
-        assert isinstance(result, dict)
-        assert len(result) == 0  # No results collected due to error
+        assert result == {}
+        assert "nonexistent_method" in failed["ocp"]["error"]
+        assert failed["ocp"]["timedOut"] is False
 
     @pytest.mark.asyncio
     async def test_collect_non_callable_method(self):
@@ -415,13 +434,92 @@ class TestCollect:
         method = "product"  # This is an attribute, not a method
 
         # When
-        # collect should handle non-callable methods gracefully and return empty dict
-        result = await collect(products, context, method)
+        # collect should handle non-callable methods gracefully and report it
+        result, failed = await collect(products, context, method)
 
         # Then
-        # Should return empty dict when method is not callable
-        assert isinstance(result, dict)
-        assert len(result) == 0  # No results collected due to ValueError
+        assert result == {}
+        assert failed == {
+            "ocp": {"error": "ocp product is not callable", "timedOut": False}
+        }
+
+    @pytest.mark.asyncio
+    async def test_collect_concurrent(self):
+        """Test collect runs the products concurrently."""
+        # Given: Two products which each wait for the other to start
+        started = {"ocp": asyncio.Event(), "quay": asyncio.Event()}
+
+        def waiter(product: str, other: str):
+            async def get_versions():
+                started[product].set()
+                await started[other].wait()
+                return {product: []}
+
+            return get_versions
+
+        context = {}
+        for product, other in (("ocp", "quay"), ("quay", "ocp")):
+            summary = MockSummary(product)
+            summary.get_versions = waiter(product, other)
+            context[product] = ProductContext(product, summary)
+
+        # When
+        result, failed = await asyncio.wait_for(
+            collect("ocp,quay", context, "get_versions"), 1.0
+        )
+
+        # Then
+        assert result == {"ocp": {"ocp": []}, "quay": {"quay": []}}
+
+    @pytest.mark.asyncio
+    async def test_collect_timeout(self):
+        """Test a product exceeding its timeout is cancelled and reported."""
+        # Given: A product which never finishes
+        cancelled = asyncio.Event()
+
+        async def get_versions():
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        slow = MockSummary("quay")
+        slow.get_versions = get_versions
+        context = {
+            "ocp": ProductContext("ocp", MockSummary("ocp")),
+            "quay": ProductContext("quay", slow, timeout=0.01),
+        }
+        timing = {}
+
+        # When
+        result, failed = await collect(
+            "ocp,quay", context, "get_versions", timing=timing
+        )
+
+        # Then
+        assert failed == {
+            "quay": {"error": "timed out after 0.01 seconds", "timedOut": True}
+        }
+        assert list(result) == ["ocp"]
+        assert cancelled.is_set()
+        assert timing["ocp"].startswith("ocp;dur=")
+        assert "desc" not in timing["ocp"]
+        assert timing["quay"].endswith(';desc="timeout"')
+
+    @pytest.mark.asyncio
+    async def test_collect_error_timing(self):
+        """Test a failing product is reported in the timing metrics."""
+        context = {"ocp": ProductContext("ocp", MockSummary("ocp"))}
+        timing = {}
+
+        result, failed = await collect(
+            "ocp", context, "nonexistent_method", timing=timing
+        )
+
+        assert result == {}
+        assert failed["ocp"]["timedOut"] is False
+        assert timing["ocp"].endswith(';desc="error"')
 
 
 class TestProductsEndpoint:
@@ -465,6 +563,13 @@ class TestVersionsEndpoint:
         assert isinstance(data, dict)
         assert "ocp" in data
 
+    def test_versions_endpoint_server_timing(self, client, mock_ocp_summary):
+        """Test the versions endpoint reports each product's timing."""
+        response = client.get("/api/v1/summary/versions")
+
+        assert response.status_code == 200
+        assert response.headers["Server-Timing"].startswith("ocp;dur=")
+
     def test_versions_endpoint_with_product_filter(self, client, mock_ocp_summary):
         """Test getting versions with product filter."""
         # When
@@ -686,6 +791,271 @@ class TestSummaryEndpoint:
         assert response.status_code == 400
 
 
+class TestSummaryExport:
+    """Test exporting the summary samples as a table."""
+
+    REPORT = {
+        "ocp": {
+            "versions": {
+                "4.19": {
+                    "benchmarks": {
+                        "node-density": {
+                            "configurations": {
+                                "c1": {
+                                    "iterations": {
+                                        "100": {
+                                            "values": [
+                                                {
+                                                    "uuid": "u1",
+                                                    "timestamp": "t1",
+                                                    "value": 10,
+                                                },
+                                                {
+                                                    "uuid": "u2",
+                                                    "timestamp": "t2",
+                                                    "value": 12,
+                                                },
+                                            ],
+                                            "readiness": "ready",
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        "quay": {
+            "versions": {
+                "3.14": {
+                    "benchmarks": {
+                        "quay-load-test": {
+                            "configurations": {
+                                "c2": {
+                                    "iterations": {
+                                        "n/a": {
+                                            "values": {
+                                                "pull": [
+                                                    {"timestamp": "t3", "value": 5}
+                                                ]
+                                            },
+                                            "readiness": "warning",
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        },
+    }
+
+    def test_summary_frame(self):
+        """Test each KPI value becomes a row."""
+        frame = summary_frame(self.REPORT)
+        assert frame.to_dict("records") == [
+            {
+                "product": "ocp",
+                "version": "4.19",
+                "benchmark": "node-density",
+                "configuration": "c1",
+                "iteration": "100",
+                "readiness": "ready",
+                "series": None,
+                "uuid": "u1",
+                "timestamp": "t1",
+                "value": 10,
+            },
+            {
+                "product": "ocp",
+                "version": "4.19",
+                "benchmark": "node-density",
+                "configuration": "c1",
+                "iteration": "100",
+                "readiness": "ready",
+                "series": None,
+                "uuid": "u2",
+                "timestamp": "t2",
+                "value": 12,
+            },
+            {
+                "product": "quay",
+                "version": "3.14",
+                "benchmark": "quay-load-test",
+                "configuration": "c2",
+                "iteration": "n/a",
+                "readiness": "warning",
+                "series": "pull",
+                "uuid": None,
+                "timestamp": "t3",
+                "value": 5,
+            },
+        ]
+
+    def test_summary_frame_empty(self):
+        """Test reports without samples give an empty table."""
+        frame = summary_frame({"ocp": {"metrics": {}, "versions": None}})
+        assert frame.empty
+        assert "value" in frame.columns
+
+    def test_summary_endpoint_csv(self, client, monkeypatch, mock_ocp_summary):
+        """Test the summary endpoint exports CSV."""
+
+        async def mock_collect(*args, **kwargs):
+            return self.REPORT, {}
+
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.summary.summary_api.collect", mock_collect
+        )
+
+        response = client.get("/api/v1/summary?format=csv")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.splitlines()
+        assert lines[0].startswith("product,version,benchmark")
+        assert len(lines) == 4
+        assert "X-Errors" not in response.headers
+
+    def test_summary_endpoint_csv_errors(self, client, monkeypatch, mock_ocp_summary):
+        """Test a product that timed out is named in an export's headers."""
+
+        async def mock_collect(*args, **kwargs):
+            report = {"ocp": self.REPORT["ocp"]}
+            return report, {
+                "quay": {"error": "timed out after 120 seconds", "timedOut": True}
+            }
+
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.summary.summary_api.collect", mock_collect
+        )
+
+        response = client.get("/api/v1/summary?format=csv")
+
+        assert response.status_code == 200
+        # Only the ocp samples are exported
+        assert len(response.text.splitlines()) == 3
+        assert json.loads(response.headers["X-Errors"]) == {
+            "quay": "timed out after 120 seconds"
+        }
+
+    def test_summary_endpoint_invalid_format(self, client, mock_ocp_summary):
+        """Test the summary endpoint rejects unknown export formats."""
+        response = client.get("/api/v1/summary?format=xml")
+        assert response.status_code == 422
+
+
+class TestSummaryViews:
+    """Test the compact summary views."""
+
+    SAMPLE = {
+        "values": [
+            {"uuid": "u1", "timestamp": "t1", "value": 10},
+            {"uuid": "u2", "timestamp": "t2", "value": 12},
+        ],
+        "graph": {"x": ["t1", "t2"], "y": [10, 12], "name": "g", "mode": "lines"},
+        "stats": {"min": 10, "max": 12},
+        "readiness": "ready",
+    }
+
+    def test_columnar(self):
+        """Test the columnar view shares the values with the graph."""
+        assert compact_sample(self.SAMPLE, "columnar") == {
+            "values": {
+                "uuid": ["u1", "u2"],
+                "timestamp": ["t1", "t2"],
+                "value": [10, 12],
+            },
+            "graph": {"name": "g", "mode": "lines"},
+            "stats": {"min": 10, "max": 12},
+            "readiness": "ready",
+        }
+
+    def test_columnar_series(self):
+        """Test named series and graph lists are compacted."""
+        sample = {
+            "values": {"pull": [{"timestamp": "t3", "value": 5}]},
+            "graph": [{"x": ["t3"], "y": [5], "name": "pull"}],
+        }
+        assert compact_sample(sample, "columnar") == {
+            "values": {"pull": {"uuid": [None], "timestamp": ["t3"], "value": [5]}},
+            "graph": [{"name": "pull"}],
+        }
+
+    def test_stats(self):
+        """Test the stats view drops the values and graph."""
+        assert compact_sample(self.SAMPLE, "stats") == {
+            "stats": {"min": 10, "max": 12},
+            "readiness": "ready",
+        }
+
+    def test_report_not_modified(self):
+        """Test compacting a report doesn't modify its samples."""
+        report = {
+            "ocp": {
+                "readiness": "ready",
+                "versions": {
+                    "4.19": {
+                        "benchmarks": {
+                            "b": {
+                                "configurations": {
+                                    "c": {"iterations": {"1": self.SAMPLE}}
+                                }
+                            }
+                        }
+                    }
+                },
+            },
+            "quay": {"versions": None},
+        }
+        compact = compact_report(report, "stats")
+        sample = compact["ocp"]["versions"]["4.19"]["benchmarks"]["b"]
+        assert sample["configurations"]["c"]["iterations"]["1"] == {
+            "stats": {"min": 10, "max": 12},
+            "readiness": "ready",
+        }
+        assert compact["ocp"]["readiness"] == "ready"
+        assert compact["quay"] == {"versions": None}
+        assert "values" in self.SAMPLE
+        assert compact_report(report, "full") is report
+
+    def test_summary_endpoint_view(self, client, monkeypatch, mock_ocp_summary):
+        """Test the summary endpoint returns the selected view."""
+
+        async def mock_collect(*args, **kwargs):
+            return TestSummaryExport.REPORT, {}
+
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.summary.summary_api.collect", mock_collect
+        )
+
+        response = client.get("/api/v1/summary?view=columnar")
+        assert response.status_code == 200
+        iterations = response.json()["ocp"]["versions"]["4.19"]["benchmarks"][
+            "node-density"
+        ]["configurations"]["c1"]["iterations"]
+        assert iterations["100"]["values"]["value"] == [10, 12]
+        assert "errors" not in response.json()
+
+    def test_summary_endpoint_errors(self, client, monkeypatch, mock_ocp_summary):
+        """Test failed products are reported apart from the product reports."""
+        failure = {"error": "broken", "timedOut": False}
+
+        async def mock_collect(*args, **kwargs):
+            return {"ocp": TestSummaryExport.REPORT["ocp"]}, {"quay": failure}
+
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.summary.summary_api.collect", mock_collect
+        )
+
+        data = client.get("/api/v1/summary?view=stats").json()
+        assert set(data) == {"ocp", "errors"}
+        assert data["errors"] == {"quay": failure}
+        assert client.get("/api/v1/summary?view=bogus").status_code == 422
+
+
 class TestRouterConfiguration:
     """Test the router configuration."""
 
@@ -799,10 +1169,11 @@ class TestEdgeCases:
         method = "get_versions"
 
         # When
-        result = await collect(products, context, method)
+        result, failed = await collect(products, context, method)
 
-        # Then - should handle error and return result (possibly empty)
-        assert isinstance(result, dict)
+        # Then - should handle error and report it
+        assert result == {}
+        assert failed == {"ocp": {"error": "Test error", "timedOut": False}}
 
     def test_products_endpoint_is_synchronous(self, client):
         """Test that products endpoint is accessible and returns immediately."""
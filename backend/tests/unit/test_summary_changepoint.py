@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+import random
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.api.v1.endpoints.summary.changepoint import ChangePointIndex, changepoints
+from app.main import app as fastapi_app
+
+"""Unit tests for the incremental change-point index"""
+
+
+def points(values: list[float], start: int = 0) -> list[dict]:
+    """Build a sample's points, a day apart"""
+    day = datetime(2025, 1, 1)
+    return [
+        {
+            "uuid": f"u{start + i}",
+            "timestamp": (day + timedelta(days=start + i)).isoformat(),
+            "value": v,
+        }
+        for i, v in enumerate(values)
+    ]
+
+
+def noisy(level: float, count: int, seed: int = 0) -> list[float]:
+    rng = random.Random(seed)
+    return [level + rng.uniform(-1.0, 1.0) for _ in range(count)]
+
+
+KEY = ("ocp", "4.19", "cluster-density-v2", "c1", 10)
+
+
+@pytest.fixture
+def index():
+    index = ChangePointIndex()
+    index.configure(window=3, threshold=4.0, min_change=0.1, min_history=8)
+    return index
+
+
+class TestChangePointIndex:
+
+    def test_step(self, index):
+        """A sustained shift is reported once, where it starts"""
+        values = noisy(100.0, 20) + noisy(150.0, 10, seed=1)
+        changes = index.ingest(KEY, {"values": points(values)})
+
+        assert len(changes) == 1
+        change = changes[0]
+        assert change["uuid"] == "u20"
+        assert change["direction"] == "regression"
+        assert change["before"] == pytest.approx(100.0, abs=1.0)
+        assert change["after"] == pytest.approx(150.0, abs=1.0)
+        assert change["variant"] == "10"
+        assert change["series"] == ""
+
+    def test_noise(self, index):
+        """Noise around a steady level isn't a change point"""
+        assert index.ingest(KEY, {"values": points(noisy(100.0, 50))}) == []
+
+    def test_incremental(self, index):
+        """Adding jobs one at a time finds the same change points"""
+        values = noisy(100.0, 20) + noisy(60.0, 10, seed=1)
+        batch = ChangePointIndex()
+        batch.configure(window=3, threshold=4.0, min_change=0.1, min_history=8)
+        expected = batch.ingest(KEY, {"values": points(values)})
+
+        found = []
+        for i in range(len(values)):
+            # Each sample is the full history, of which only the last is new
+            found.extend(index.ingest(KEY, {"values": points(values[: i + 1])}))
+        assert len(found) == len(expected) == 1
+        for key, value in expected[0].items():
+            assert found[0][key] == pytest.approx(value)
+        state = index.series[("ocp", "4.19", "cluster-density-v2", "c1", "10", "")]
+        assert len(state.tail) == 2
+        assert state.count == 28
+
+    def test_higher_is_better(self, index):
+        """A drop is a regression when higher values are better"""
+        values = noisy(100.0, 20) + noisy(60.0, 10, seed=1)
+        changes = index.ingest(KEY, {"values": points(values)}, True)
+        assert [c["direction"] for c in changes] == ["regression"]
+        assert index.changes() == changes
+        assert index.changes(direction="improvement") == []
+
+    def test_named_series(self, index):
+        """Each named series of a sample is tracked separately"""
+        sample = {
+            "values": {
+                "steady": points(noisy(10.0, 30)),
+                "step": points(noisy(10.0, 20) + noisy(30.0, 10, seed=1)),
+            }
+        }
+        changes = index.ingest(KEY, sample)
+        assert [c["series"] for c in changes] == ["step"]
+
+    def test_select(self, index):
+        """Change points can be selected by product, version, date"""
+        values = noisy(100.0, 20) + noisy(150.0, 10, seed=1)
+        index.ingest(KEY, {"values": points(values)})
+        index.ingest(("quay",) + KEY[1:], {"values": points(values)})
+
+        assert len(index.changes()) == 2
+        assert len(index.changes(products=["quay"])) == 1
+        assert index.changes(versions=["4.20"]) == []
+        assert index.changes(since="2025-02-01") == []
+
+    def test_persist(self, index, tmp_path):
+        """The detector state is saved and restored"""
+        path = tmp_path / "changepoints.json"
+        index.configure(
+            path=str(path), window=3, threshold=4.0, min_change=0.1, min_history=8
+        )
+        values = noisy(100.0, 20) + noisy(150.0, 10, seed=1)
+        index.ingest(KEY, {"values": points(values[:25])})
+        index.save()
+
+        restored = ChangePointIndex()
+        restored.configure(
+            path=str(path), window=3, threshold=4.0, min_change=0.1, min_history=8
+        )
+        assert restored.series == index.series
+        assert restored.ingest(KEY, {"values": points(values)}) == []
+        assert len(restored.changes()) == 1
+
+
+class TestRegressionsEndpoint:
+
+    def test_regressions(self):
+        """The endpoint reports the selected change points"""
+        values = noisy(100.0, 20) + noisy(150.0, 10, seed=1)
+        changepoints.configure(min_history=8)
+        changepoints.ingest(KEY, {"values": points(values)})
+
+        client = TestClient(fastapi_app)
+        response = client.get("/api/v1/summary/regressions?products=ocp")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == 1
+        assert body["changes"][0]["benchmark"] == "cluster-density-v2"
+        assert client.get(
+            "/api/v1/summary/regressions?direction=improvement"
+        ).json() == {"total": 0, "changes": []}
+        assert (
+            client.get("/api/v1/summary/regressions?direction=bad").status_code == 422
+        )
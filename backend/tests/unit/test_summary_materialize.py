@@ -0,0 +1,193 @@
+import asyncio
+from typing import Any, Optional
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.api.v1.endpoints.summary.materialize import (
+    MaterializedReport,
+    Materializer,
+    materializer,
+)
+from app.api.v1.endpoints.summary.summary import BenchmarkBase
+from app.api.v1.endpoints.summary.summary_search import SummarySearch
+
+"""Unit tests for the materialized summary reports"""
+
+
+class CountingBenchmark(BenchmarkBase):
+    """A benchmark helper recording the variants it samples"""
+
+    sampled = []
+
+    async def get_iteration_variants(self, uuids: list[str]) -> dict[str, list[str]]:
+        return {"n/a": uuids}
+
+    async def process(
+        self, version: str, config: str, variant: Any, uuids: list[str]
+    ) -> dict[str, Any]:
+        type(self).sampled.append((version, config, variant))
+        return {"values": [{"value": len(uuids)}], "uuids": uuids}
+
+    async def evaluate(self, metric: dict[str, Any]) -> str:
+        return "warning" if metric["values"][0]["value"] > 2 else "ready"
+
+
+class JobsSummary(SummarySearch):
+    """A summary breaking down a list of dated jobs"""
+
+    def __init__(self, jobs: list[tuple[str, str, str, str, str, str]]):
+        super().__init__("ocp", benchmarks={"counting": CountingBenchmark})
+        self.jobs = jobs
+        self.filters = []
+
+    async def get_iterations(
+        self,
+        versions: Optional[str] = None,
+        benchmarks: Optional[str] = None,
+        configs: Optional[str] = None,
+    ) -> dict[str, Any]:
+        since = (
+            self.date_filter["range"]["timestamp"]["gte"] if self.date_filter else ""
+        )
+        self.filters.append(since)
+        breakdown = {}
+        for day, ver, benchmark, config, variant, uuid in self.jobs:
+            if day >= since:
+                breakdown.setdefault(ver, {}).setdefault(benchmark, {}).setdefault(
+                    config, {}
+                ).setdefault(variant, []).append(uuid)
+        config_key = {c: {"name": c} for _, _, _, c, _, _ in self.jobs}
+        return {"config_key": config_key, "benchmarks": breakdown}
+
+    async def get_versions(self) -> dict[str, list[str]]:
+        return {}
+
+    async def get_benchmarks(self, version: str) -> dict[str, Any]:
+        return {}
+
+    async def get_configs(self, versions=None, benchmarks=None) -> dict[str, Any]:
+        return {}
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    monkeypatch.setattr(
+        "app.api.v1.endpoints.summary.summary_search.ElasticService",
+        lambda configpath: AsyncMock(),
+    )
+    CountingBenchmark.sampled = []
+    return [
+        ("2025-01-01", "4.19", "counting", "c1", "10", "a"),
+        ("2025-01-02", "4.19", "counting", "c1", "10", "b"),
+        ("2025-01-02", "4.19", "counting", "c2", "10", "c"),
+        ("2025-01-02", "4.20", "counting", "c1", "10", "d"),
+        ("2025-01-02", "4.20", "unsupported", "c1", "n/a", "e"),
+    ]
+
+
+class TestMaterializedReport:
+
+    async def test_refresh_and_aggregate(self, jobs):
+        """A materialized report matches the report computed from scratch"""
+        summary = JobsSummary(jobs)
+        report = MaterializedReport("ocp")
+        assert await report.refresh(summary) == 3
+        assert report.ready
+        assert summary.date_filter is None
+
+        live = await summary.metric_aggregation()
+        materialized = report.aggregate(summary)
+        assert materialized["versions"] == live["versions"]
+        assert materialized["readiness"] == live["readiness"]
+        assert materialized["config_key"] == live["config_key"]
+        assert materialized["materialized"]["watermark"] == report.watermark
+
+    async def test_incremental(self, jobs, monkeypatch):
+        """A refresh re-samples only the variants with new jobs"""
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.summary.materialize.watermark_date",
+            lambda when: "2025-01-02",
+        )
+        summary = JobsSummary(jobs)
+        report = MaterializedReport("ocp")
+        await report.refresh(summary)
+        CountingBenchmark.sampled = []
+
+        jobs.append(("2025-01-03", "4.19", "counting", "c1", "10", "f"))
+        assert await report.refresh(summary) == 1
+        assert summary.filters == ["", "2025-01-02"]
+        assert CountingBenchmark.sampled == [("4.19", "c1", "10")]
+        assert report.breakdown["4.19"]["counting"]["c1"]["10"] == ["a", "b", "f"]
+        sample = report.samples[("4.19", "counting", "c1", "10")]
+        assert sample["uuids"] == ["a", "b", "f"]
+        assert sample["readiness"] == "warning"
+
+        # Jobs found again since the inclusive watermark aren't re-sampled
+        assert await report.refresh(summary) == 0
+        assert report.refreshes == 3
+
+    async def test_aggregate_selection(self, jobs):
+        """The stored report can be narrowed by version and benchmark"""
+        summary = JobsSummary(jobs)
+        report = MaterializedReport("ocp")
+        await report.refresh(summary)
+
+        selected = report.aggregate(summary, versions="4.20")
+        assert list(selected["versions"]) == ["4.20"]
+        assert list(selected["versions"]["4.20"]["benchmarks"]) == ["counting"]
+        assert selected["config_key"] == {"c1": {"name": "c1"}}
+        assert report.aggregate(summary, benchmarks="other")["versions"] == {
+            "4.19": {"benchmarks": {}, "readiness": "ready"},
+            "4.20": {"benchmarks": {}, "readiness": "ready"},
+        }
+
+
+class TestMaterializer:
+
+    async def test_metric_aggregation_served(self, jobs):
+        """metric_aggregation uses a materialized report without a date filter"""
+        summary = JobsSummary(jobs)
+        assert await materializer.refresh("ocp", lambda product: summary) == 3
+        CountingBenchmark.sampled = []
+
+        served = await summary.metric_aggregation()
+        assert "materialized" in served
+        assert CountingBenchmark.sampled == []
+
+        summary.set_date_filter("2025-01-02", None)
+        live = await summary.metric_aggregation()
+        assert "materialized" not in live
+        assert len(CountingBenchmark.sampled) == 3
+
+    async def test_failed_refresh(self, jobs):
+        """A failed refresh is counted and leaves no report"""
+        summary = JobsSummary(jobs)
+        summary.get_iterations = AsyncMock(side_effect=ValueError("broken"))
+        assert await materializer.refresh("ocp", lambda product: summary) is None
+        assert materializer.get("ocp") is None
+        assert materializer.stats()["errors"] == 1
+
+    async def test_background(self, jobs):
+        """Reports are refreshed in the background until stopped"""
+        background = Materializer()
+        background.configure(0.01)
+        background.start(["ocp"], lambda product: JobsSummary(jobs))
+        await asyncio.sleep(0.05)
+        await background.stop()
+
+        stats = background.stats()
+        assert not stats["running"]
+        assert stats["products"]["ocp"]["refreshes"] > 1
+        assert stats["products"]["ocp"]["variants"] == 3
+
+    def test_disabled(self):
+        """Without an interval, nothing is refreshed"""
+        background = Materializer()
+        background.configure(0)
+        background.start(["ocp"], lambda product: None)
+        assert background.task is None
+        assert background.stats()["products"] == {}
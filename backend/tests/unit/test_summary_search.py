@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Optional
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -5,7 +6,9 @@ import pytest
 
 from app.api.v1.endpoints.summary.summary import BenchmarkBase
 from app.api.v1.endpoints.summary.summary_search import (
+    backend_limit,
     PerfCiFingerprint,
+    search_limits,
     SearchBenchmark,
     SummarySearch,
 )
@@ -624,6 +627,159 @@ class TestSummarySearch:
         mock_service_instance.close.assert_called_once()
 
 
+class SlowBenchmark(BenchmarkBase):
+    """A benchmark helper recording how many samples run at once."""
+
+    running = 0
+    peak = 0
+    finished = 0
+
+    async def get_iteration_variants(self, uuids: list[str]) -> dict[str, list[str]]:
+        return {"n/a": uuids}
+
+    async def process(
+        self, version: str, config: str, variant: Any, uuids: list[str]
+    ) -> dict[str, Any]:
+        cls = type(self)
+        cls.running += 1
+        cls.peak = max(cls.peak, cls.running)
+        # Finish later samples first, to show the report order is kept
+        await asyncio.sleep(0.001 * (10 - len(uuids)))
+        cls.running -= 1
+        cls.finished += 1
+        if "fail" in uuids:
+            raise ValueError("broken")
+        return {"values": [{"value": len(uuids)}], "key": (version, config, variant)}
+
+    async def evaluate(self, metric: dict[str, Any]) -> str:
+        return "warning" if metric["values"][0]["value"] > 2 else "ready"
+
+
+class BatchedBenchmark(SlowBenchmark):
+    """A benchmark helper sampling all of a version's variants at once."""
+
+    BATCHED = True
+    batches = []
+
+    async def process_batch(self, version, variants):
+        type(self).batches.append(len(variants))
+        return await super().process_batch(version, variants)
+
+
+class TestAggregateMetrics:
+    """Test cases for concurrent benchmark sampling."""
+
+    @pytest.fixture
+    def summary(self, monkeypatch):
+        monkeypatch.setattr(
+            "app.api.v1.endpoints.summary.summary_search.ElasticService",
+            lambda configpath: AsyncMock(),
+        )
+        SlowBenchmark.running = 0
+        SlowBenchmark.peak = 0
+        SlowBenchmark.finished = 0
+        summary = ConcreteSummarySearch(
+            product="ocp", benchmarks={"slow": SlowBenchmark}, concurrency=2
+        )
+        summary.create_helper = SummarySearch.create_helper.__get__(summary)
+        return summary
+
+    @staticmethod
+    def breakdown(count: int) -> dict[str, Any]:
+        return {
+            "4.19": {
+                "slow": {
+                    "c1": {str(i): ["u"] * (i + 1) for i in range(count)},
+                    "c2": {},
+                },
+                "custom": {"c1": {"n/a": ["u"]}},
+            }
+        }
+
+    @pytest.mark.asyncio
+    async def test_order_and_readiness(self, summary):
+        """Test samples are reported in breakdown order with readiness."""
+        versions, readiness = await summary.aggregate_metrics(self.breakdown(4))
+
+        benchmarks = versions["4.19"]["benchmarks"]
+        assert list(benchmarks) == ["slow"]
+        c1 = benchmarks["slow"]["configurations"]["c1"]
+        assert list(c1["iterations"]) == ["0", "1", "2", "3"]
+        assert [s["key"][2] for s in c1["iterations"].values()] == ["0", "1", "2", "3"]
+        assert [s["readiness"] for s in c1["iterations"].values()] == [
+            "ready",
+            "ready",
+            "warning",
+            "warning",
+        ]
+        assert c1["readiness"] == "warning"
+        assert benchmarks["slow"]["configurations"]["c2"] == {
+            "iterations": {},
+            "readiness": "ready",
+        }
+        assert readiness == "warning"
+
+    @pytest.mark.asyncio
+    async def test_batched(self, summary):
+        """Test a BATCHED helper gets each version's variants together."""
+        BatchedBenchmark.batches = []
+        summary.benchmarks = {"slow": BatchedBenchmark}
+        versions, _ = await summary.aggregate_metrics(self.breakdown(3))
+
+        assert BatchedBenchmark.batches == [3]
+        c1 = versions["4.19"]["benchmarks"]["slow"]["configurations"]["c1"]
+        assert [s["key"][2] for s in c1["iterations"].values()] == ["0", "1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, summary):
+        """Test samples run concurrently, within the report's limit."""
+        await summary.aggregate_metrics(self.breakdown(6))
+        assert SlowBenchmark.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_backend_limit(self, summary, configured):
+        """Test the configured backend limit bounds samples across reports."""
+        configured.set("summary.backend_concurrency", 1)
+        search_limits.load(configured)
+        await summary.aggregate_metrics(self.breakdown(3))
+        assert SlowBenchmark.peak == 1
+        assert backend_limit("ocp.elasticsearch") is backend_limit("ocp.elasticsearch")
+
+    @pytest.mark.asyncio
+    async def test_configured_concurrency(self, summary, configured):
+        """Test a report's default limit is set by the summary settings."""
+        configured.set("summary.concurrency", 3)
+        search_limits.load(configured)
+        summary = ConcreteSummarySearch(product="ocp", benchmarks=summary.benchmarks)
+        summary.create_helper = SummarySearch.create_helper.__get__(summary)
+        await summary.aggregate_metrics(self.breakdown(6))
+        assert SlowBenchmark.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels(self, summary):
+        """Test a failed sample fails the report and cancels the others."""
+        breakdown = self.breakdown(4)
+        breakdown["4.19"]["slow"]["c1"]["0"] = ["fail"]
+        with pytest.raises(ValueError):
+            await summary.aggregate_metrics(breakdown)
+        await asyncio.sleep(0.02)
+        assert SlowBenchmark.finished < 4
+
+    @pytest.mark.asyncio
+    async def test_metric_aggregation_timings(self, summary, monkeypatch):
+        """Test metric_aggregation reports the time spent in each stage."""
+
+        async def get_iterations(versions=None, benchmarks=None):
+            return {"config_key": {}, "benchmarks": self.breakdown(2)}
+
+        monkeypatch.setattr(summary, "get_iterations", get_iterations)
+        report = await SummarySearch.metric_aggregation(summary)
+
+        assert report["readiness"] == "ready"
+        assert set(report["timings"]) == {"iterations", "samples", "total"}
+        assert report["timings"]["total"] >= report["timings"]["samples"]
+
+
 class TestSearchBenchmark:
     """Test cases for SearchBenchmark class functionality."""
 
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from app.api.v1.commons.tasks import TaskGraph
+
+"""Unit tests for the dependent query executor"""
+
+
+class Recorder:
+    """Record the steps running at once"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.order = []
+
+    async def step(self, name: str, *inputs, delay: float = 0.01):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(delay)
+        self.running -= 1
+        self.order.append(name)
+        return f"{name}({','.join(inputs)})"
+
+
+class TestTaskGraph:
+
+    async def test_dependencies(self):
+        """Steps get their dependencies' results after their own arguments"""
+        recorder = Recorder()
+        steps = TaskGraph()
+        steps.add("meta", recorder.step, "meta")
+        steps.after("runs", recorder.step, "meta", args=("runs",))
+        steps.add("current", recorder.step, "current", delay=0.005)
+        steps.after("baseline", recorder.step, "runs", "current", args=("base",))
+        steps.after("count", len, "baseline")
+
+        results = await steps.run()
+        assert results == {
+            "meta": "meta()",
+            "runs": "runs(meta())",
+            "current": "current()",
+            "baseline": "base(runs(meta()),current())",
+            "count": 28,
+        }
+        assert recorder.peak == 2
+        assert recorder.order == ["current", "meta", "runs", "base"]
+
+    async def test_concurrent(self):
+        """Independent steps overlap"""
+        recorder = Recorder()
+        steps = TaskGraph()
+        for name in "abcd":
+            steps.add(name, recorder.step, name)
+        await steps.run()
+        assert recorder.peak == 4
+
+    async def test_failure_cancels(self):
+        """A failed step fails the graph and cancels the others"""
+        recorder = Recorder()
+
+        async def fail():
+            raise ValueError("broken")
+
+        steps = TaskGraph()
+        steps.add("slow", recorder.step, "slow", delay=0.05)
+        steps.add("fail", fail)
+        steps.after("never", recorder.step, "fail", args=("never",))
+        with pytest.raises(ValueError):
+            await steps.run()
+        await asyncio.sleep(0.06)
+        assert recorder.order == []
+
+    async def test_duplicate(self):
+        """Step names are unique"""
+        steps = TaskGraph()
+        steps.add("a", asyncio.sleep, 0)
+        with pytest.raises(ValueError):
+            steps.add("a", asyncio.sleep, 0)
+        await steps.run()
+
+    async def test_wait(self):
+        """Steps can be added once a step they're chosen by has finished"""
+        recorder = Recorder()
+        steps = TaskGraph()
+        steps.add("runs", recorder.step, "runs")
+        steps.after("base", recorder.step, "runs", args=("base",))
+        if await steps.wait("runs") == "runs()":
+            steps.add("current", recorder.step, "current")
+        results = await steps.run()
+        assert results["current"] == "current()"
+        assert recorder.peak == 2
+
+    async def test_wait_failure_cancels(self):
+        """A failed step waited for cancels the others"""
+        recorder = Recorder()
+
+        async def fail():
+            raise ValueError("broken")
+
+        steps = TaskGraph()
+        steps.add("slow", recorder.step, "slow", delay=0.05)
+        steps.add("fail", fail)
+        with pytest.raises(ValueError):
+            await steps.wait("fail")
+        await asyncio.sleep(0.06)
+        assert recorder.order == []
@@ -1,4 +1,9 @@
+import io
+import json
+
 from fastapi import HTTPException
+import numpy as np
+import pandas as pd
 import pytest
 
 from app.api.v1.commons import utils
@@ -296,6 +301,204 @@ class TestBuildAndReleaseProcessing:
         assert set(result) == set(expected_result["mapped_streams"])
 
 
+class TestJobEnrichment:
+    """Test cases for the vectorized job enrichment pipeline"""
+
+    JOBS = [
+        {
+            "upstreamJob": "periodic-ci-upgrade-rehearse",
+            "benchmark": "cluster-density",
+            "clusterType": "rosa-hcp",
+            "masterNodesCount": 3,
+            "infraNodesCount": 2,
+            "platform": "AWS",
+            "jobStatus": "SUCCESS",
+            "releaseStream": "4.15.0-0.nightly",
+            "ocpVersion": "4.15.0-0.nightly-2024-01-15-123456",
+        },
+        {
+            "upstreamJob": "pull-ci-openshift",
+            "benchmark": "node-density",
+            "clusterType": "rosa",
+            "masterNodesCount": 0,
+            "infraNodesCount": 0,
+            "platform": "AWS",
+            "jobStatus": "Failure",
+            "releaseStream": "4.14.5",
+            "ocpVersion": "4.14.5-x86_64",
+        },
+        {
+            "upstreamJob": "",
+            "benchmark": "",
+            "clusterType": "rosa",
+            "masterNodesCount": 3,
+            "infraNodesCount": 0,
+            "platform": "AWS",
+            "jobStatus": "",
+            "releaseStream": "",
+            "ocpVersion": "",
+        },
+        {
+            "upstreamJob": "periodic",
+            "benchmark": "ingress-perf",
+            "clusterType": "self-managed",
+            "masterNodesCount": 0,
+            "infraNodesCount": 0,
+            "platform": "GCP",
+            "jobStatus": "success",
+            "releaseStream": "stable",
+            "ocpVersion": "4.16.1",
+        },
+    ]
+
+    def test_enrich_jobs_matches_row_functions(self):
+        """Test enrichJobs derives the same values as the per-job functions."""
+        # Given: Jobs covering each branch of the per-job functions
+        jobs = pd.DataFrame(self.JOBS)
+        expected = {
+            "benchmark": [utils.updateBenchmark(j) for j in self.JOBS],
+            "platform": [utils.clasifyAWSJobs(j) for j in self.JOBS],
+            "jobType": [utils.jobType(j) for j in self.JOBS],
+            "isRehearse": [utils.isRehearse(j) for j in self.JOBS],
+            "jobStatus": [utils.updateStatus(j) for j in self.JOBS],
+            "build": [utils.getBuild(j) for j in self.JOBS],
+        }
+
+        # When: enrichJobs derives every column
+        result = utils.enrichJobs(jobs, list(expected))
+
+        # Then: Each column should match the row-wise results
+        for column, values in expected.items():
+            assert result[column].tolist() == values, column
+
+    def test_enrich_jobs_selected_columns(self):
+        """Test enrichJobs only derives the requested columns."""
+        # Given: A job DataFrame
+        jobs = pd.DataFrame(self.JOBS)
+
+        # When: enrichJobs derives only the job status
+        utils.enrichJobs(jobs, ["jobStatus"])
+
+        # Then: Other columns should be untouched
+        assert "jobType" not in jobs.columns
+        assert jobs["benchmark"].tolist() == [j["benchmark"] for j in self.JOBS]
+        assert jobs["jobStatus"].tolist() == ["success", "failure", "", "success"]
+
+
+class TestStreamJobs:
+    """Test cases for streaming job list responses"""
+
+    METADATA = {"startDate": "2024-01-01", "total": 2, "cursor": None}
+
+    @staticmethod
+    async def body(response) -> bytes:
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    async def test_json_stream_matches_json(self, monkeypatch):
+        """Test json-stream produces the usual response object."""
+        # Given: More jobs than a single streamed chunk, with numpy values
+        monkeypatch.setattr(utils, "STREAM_CHUNK_ROWS", 2)
+        jobs = pd.DataFrame(
+            {"uuid": ["a", "b", "c"], "count": np.array([1, 2, 3], dtype=np.int64)}
+        )
+
+        # When: The jobs are streamed as a JSON object
+        response = utils.streamJobs(self.METADATA, jobs, "json-stream")
+
+        # Then: The body should parse to the non-streamed response
+        assert response.media_type == "application/json"
+        assert json.loads(await self.body(response)) == {
+            **self.METADATA,
+            "results": jobs.to_dict("records"),
+        }
+
+    async def test_json_stream_empty(self):
+        """Test json-stream with no jobs or metadata."""
+        response = utils.streamJobs({}, pd.DataFrame(), "json-stream")
+        assert json.loads(await self.body(response)) == {"results": []}
+
+    async def test_ndjson(self):
+        """Test ndjson sends a job per line and metadata as headers."""
+        # Given: A list of job records
+        jobs = [{"uuid": "a"}, {"uuid": "b"}]
+
+        # When: The jobs are streamed as NDJSON
+        response = utils.streamJobs(self.METADATA, jobs, "ndjson")
+
+        # Then: Each line should be a job, with the metadata in headers
+        body = await self.body(response)
+        assert [json.loads(line) for line in body.splitlines()] == jobs
+        assert response.media_type == "application/x-ndjson"
+        assert response.headers["X-Start-Date"] == "2024-01-01"
+        assert response.headers["X-Total"] == "2"
+        assert "X-Cursor" not in response.headers
+
+
+class TestExport:
+    """Test cases for columnar job exports"""
+
+    @pytest.fixture
+    def jobs(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "uuid": ["a", "b"],
+                "count": [1, 2],
+                "labels": [["x"], {"y": 1}],
+                "mixed": ["s", 3],
+            }
+        )
+
+    @pytest.mark.parametrize(
+        "format,accept,expected",
+        [
+            ("csv", "application/vnd.apache.parquet", "csv"),
+            (None, "text/html, application/vnd.apache.parquet;q=0.9", "parquet"),
+            (None, "application/vnd.apache.arrow.file", "arrow"),
+            (None, "application/json, */*", None),
+            (None, None, None),
+        ],
+    )
+    def test_export_format(self, format, accept, expected):
+        """Test the format parameter overrides the Accept header."""
+        assert utils.exportFormat(format, accept) == expected
+
+    def test_exportable(self, jobs):
+        """Test non-string values in object columns become JSON text."""
+        frame = utils.exportable(jobs)
+        assert frame["labels"].tolist() == ['["x"]', '{"y":1}']
+        assert frame["mixed"].tolist() == ["s", "3"]
+        assert frame["count"].tolist() == [1, 2]
+
+    def test_csv(self, jobs):
+        """Test a CSV export with metadata headers."""
+        response = utils.exportFrame(jobs, "csv", "jobs", {"total": 2})
+        assert response.media_type == "text/csv"
+        assert response.headers["X-Total"] == "2"
+        assert 'filename="jobs.csv"' in response.headers["Content-Disposition"]
+        frame = pd.read_csv(io.BytesIO(response.body))
+        assert frame["uuid"].tolist() == ["a", "b"]
+        assert frame["labels"].tolist() == ['["x"]', '{"y":1}']
+
+    @pytest.mark.parametrize("format", ["parquet", "arrow"])
+    def test_binary(self, jobs, format):
+        """Test Parquet and Arrow exports read back to the same rows."""
+        response = utils.exportFrame(jobs, format, "jobs")
+        read = pd.read_parquet if format == "parquet" else pd.read_feather
+        frame = read(io.BytesIO(response.body))
+        assert frame["uuid"].tolist() == ["a", "b"]
+        assert frame["count"].tolist() == [1, 2]
+
+
+class TestWatermark:
+    """Test the dates from which incremental searches resume."""
+
+    def test_watermark_date(self):
+        """Test the watermark is the date a day before a time."""
+        # 2025-01-02T00:30:00Z, when jobs started late on 2025-01-01 may run
+        assert utils.watermark_date(1735777800) == "2025-01-01"
+        assert utils.watermark_date(1735777800 + 86400) == "2025-01-02"
+
+
 class TestSortingAndPagination:
     """Test cases for sorting and pagination utilities"""
 
@@ -800,3 +1003,32 @@ class TestAsyncMetadataRetrieval:
         # Then: Should raise IndexError since meta[0] won't exist
         with pytest.raises(IndexError):
             await utils.getMetadata(uuid=uuid, configpath="TEST")
+
+    @pytest.mark.asyncio
+    async def test_get_metadata_cached(self, fake_elastic_service):
+        """Test getMetadata searches for a UUID only once."""
+        metadata = {"uuid": "cached-uuid", "benchmark": "node-density"}
+        fake_elastic_service.set_post_response(
+            response_type="post", data_list=[metadata]
+        )
+
+        assert await utils.getMetadata("cached-uuid", "TEST") == metadata
+        # No further response is registered, so a second search would fail
+        assert await utils.getMetadata("cached-uuid", "TEST") == metadata
+
+    @pytest.mark.asyncio
+    async def test_get_metadata_bulk(self, fake_elastic_service):
+        """Test getMetadataBulk searches only for the uncached UUIDs."""
+        fake_elastic_service.set_post_response(
+            response_type="post", data_list=[{"uuid": "a"}, {"uuid": "b"}]
+        )
+        assert await utils.getMetadataBulk(["a", "b", "c"], "TEST") == {
+            "a": {"uuid": "a"},
+            "b": {"uuid": "b"},
+        }
+
+        fake_elastic_service.set_post_response(
+            response_type="post", data_list=[{"uuid": "d"}]
+        )
+        result = await utils.getMetadataBulk(["d", "b", "a"], "TEST")
+        assert list(result) == ["d", "b", "a"]